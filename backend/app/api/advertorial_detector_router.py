@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Body, Depends, HTTPException
+import codecs
+import json
+from typing import Dict, List, Tuple
 
-from app.services.advertorial_detector_service import AdvertorialDetectorService, AdvertorialResult, get_advertorial_detector_service
-from app.services.spa_verifier_service import SPAVerifierService, SPAScanResult, get_spa_verifier_service
-from app.services.education_content_service import EducationContentService, EducationContent, get_education_content_service
-from app.models.advertorial_detector_models import AdvertorialDetectorResponse
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+
+from app.config.settings import settings
+
+from app.services.advertorial_detector_service import AdvertorialDetectorService, get_advertorial_detector_service
+from app.services.spa_verifier_service import SPAVerifierService, get_spa_verifier_service
+from app.services.education_content_service import EducationContentService, get_education_content_service
+from app.services.result_cache import ResultCache, get_check_result_cache
 
 # 1. Definição do Router
 advertorial_detector_router = APIRouter()
@@ -13,10 +20,41 @@ class CheckContentRequest(BaseModel):
     url: str = Field(..., description="A URL da página a ser verificada.")
     content: str = Field(..., description="O conteúdo de texto extraído da página.")
 
+class CheckBatchRequest(BaseModel):
+    items: List[CheckContentRequest] = Field(
+        ...,
+        max_length=settings.DETECTOR_BATCH_MAX_ITEMS,
+        description="Pares (url, content) a serem verificados em uma única chamada."
+    )
+
+class BatchSPAStatus(BaseModel):
+    domain: str
+    status: str
+
+class BatchCheckResult(BaseModel):
+    url_analyzed: str
+    score: int
+    risk_label: str
+    advertorial_evidence: Dict[str, List[str]]
+    spa_verification: List[BatchSPAStatus]
+    education_card: Dict[str, str]
+
+class CheckBatchResponse(BaseModel):
+    results: List[BatchCheckResult]
+
+class StreamCheckResult(BatchCheckResult):
+    partial: bool = Field(
+        False,
+        description=(
+            "True se a leitura parou no teto do score (stop_at_cap): score e risk_label são "
+            "definitivos, mas evidências, verificação SPA e cartão educativo refletem só o trecho lido."
+        )
+    )
+
 # 3. Rota principal de verificação
 @advertorial_detector_router.post(
     "/check",
-    response_model=AdvertorialDetectorResponse,
+    response_model=BatchCheckResult,
     summary="Executa a análise de Advertorial, Verificação SPA e Cartão Educativo.",
     status_code=200
 )
@@ -25,32 +63,211 @@ async def check_content_and_spa(
     # Injeção de Dependência para os três serviços
     detector: AdvertorialDetectorService = Depends(get_advertorial_detector_service),
     verifier: SPAVerifierService = Depends(get_spa_verifier_service), # << REFATORAÇÃO AQUI
-    educator: EducationContentService = Depends(get_education_content_service)
+    educator: EducationContentService = Depends(get_education_content_service),
+    cache: ResultCache = Depends(get_check_result_cache)
 ):
     """
     Orquestra os Cards 1, 2 e 3:
+    - Cache: conteúdo já analisado não passa pelos serviços.
     - Card 1: Detecta o conteúdo de advertorial.
     - Card 2: Verifica se o domínio é um SPA autorizado (usando a fonte dinâmica Card 4).
     - Card 3: Seleciona o cartão educativo baseado nos resultados.
     """
+    # Mesma chave e mesma geração do /check/batch: os dois compartilham as entradas
+    generation = _cache_generation(detector, verifier)
+    cache.ensure_generation(generation)
+    key = detector.cache_key(request.url, request.content)
+    cached = cache.get(key)
+    if cached is not None:
+        return {**cached, "url_analyzed": request.url}
+
+    # --- Card 1: Detecção de Advertorial (páginas grandes vão para o executor) ---
+    report = await detector.detect_async(request.url, request.content)
+
+    # --- Cards 2/4 e 3: Verificação SPA das operadoras e cartão educativo ---
+    # O verifier usa o repositório dinâmico (Card 4)
+    result = _build_check_result(report, verifier, educator, {}, {})
+    # Lista SPA ou regras trocadas durante o cálculo: o resultado não entra no cache
+    cache.ensure_generation(_cache_generation(detector, verifier))
+    cache.put(key, result, generation=generation)
+    return result
+
+# 4. Rota de verificação em lote
+@advertorial_detector_router.post(
+    "/check/batch",
+    response_model=CheckBatchResponse,
+    summary="Executa a análise de Advertorial, Verificação SPA e Cartão Educativo em lote.",
+    status_code=200
+)
+async def check_content_batch(
+    request: CheckBatchRequest,
+    detector: AdvertorialDetectorService = Depends(get_advertorial_detector_service),
+    verifier: SPAVerifierService = Depends(get_spa_verifier_service),
+    educator: EducationContentService = Depends(get_education_content_service),
+    cache: ResultCache = Depends(get_check_result_cache)
+):
+    """
+    Versão em lote do pipeline (Cards 1, 2 e 3) para o crawler:
+    - Cache: conteúdo já analisado (ex: advertorial sindicado) não passa pelos serviços.
+    - Card 1: pontua os demais documentos com o estado compilado compartilhado (detect_many).
+    - Card 2: verifica cada operadora (domínio) distinta uma única vez no lote.
+    - Card 3: seleciona o cartão educativo uma vez por assinatura de evidências.
+    Os resultados seguem a ordem de entrada.
+    """
+    # Regras ou lista SPA alteradas invalidam os resultados cacheados
+    generation = _cache_generation(detector, verifier)
+    cache.ensure_generation(generation)
+
+    keys = [detector.cache_key(item.url, item.content) for item in request.items]
+    results: List[Dict] = [None] * len(keys)
+    misses: Dict[Tuple, List[int]] = {}
+    for index, (item, key) in enumerate(zip(request.items, keys)):
+        cached = cache.get(key)
+        if cached is not None:
+            results[index] = {**cached, "url_analyzed": item.url}
+        else:
+            misses.setdefault(key, []).append(index)
+
+    if misses:
+        # Lotes grandes rodam no executor configurado, liberando o event loop
+        first_indexes = [indexes[0] for indexes in misses.values()]
+        reports = await detector.detect_many_async(
+            [(request.items[i].url, request.items[i].content) for i in first_indexes]
+        )
+
+        spa_status_by_domain: Dict[str, str] = {}
+        cards_by_signature: Dict[Tuple[bool, frozenset], Dict[str, str]] = {}
+        computed = []
+        for (key, indexes), report in zip(misses.items(), reports):
+            result = _build_check_result(report, verifier, educator, spa_status_by_domain, cards_by_signature)
+            computed.append((key, result))
+            for i in indexes:
+                results[i] = {**result, "url_analyzed": request.items[i].url}
+
+        # Lista SPA ou regras trocadas durante o cálculo: os resultados não entram no cache
+        cache.ensure_generation(_cache_generation(detector, verifier))
+        for key, result in computed:
+            cache.put(key, result, generation=generation)
+
+    return CheckBatchResponse(results=results)
+
+
+# Métricas do cache de resultados
+@advertorial_detector_router.get(
+    "/check/cache/stats",
+    summary="Contadores do cache de resultados do pipeline /check.",
+)
+async def check_cache_stats(cache: ResultCache = Depends(get_check_result_cache)) -> Dict[str, int]:
+    return cache.stats()
+
+
+def _cache_generation(detector: AdvertorialDetectorService, verifier: SPAVerifierService) -> Tuple:
+    """Geração das fontes do pipeline /check: regras do detector e lista SPA carregada."""
+    return (detector.rules_version, verifier.repository.generation)
+
+
+def _build_check_result(
+    report: Dict,
+    verifier: SPAVerifierService,
+    educator: EducationContentService,
+    spa_status_by_domain: Dict[str, str],
+    cards_by_signature: Dict[Tuple[bool, frozenset], Dict[str, str]],
+) -> Dict:
+    """
+    Completa um relatório do detector com a verificação SPA (Cards 2/4) e o
+    cartão educativo (Card 3). Os dicionários recebidos memorizam as verificações
+    por domínio e os cartões por assinatura de evidências entre relatórios.
+    """
+    evidence = report["evidence"]
+
+    # --- Card 2/4: uma verificação por domínio distinto ---
+    spa_verification = []
+    for domain in {match.lower() for match in evidence.get("OPERATOR_MATCHES", [])}:
+        status = spa_status_by_domain.get(domain)
+        if status is None:
+            is_authorized = verifier.is_url_authorized(domain).is_authorized
+            status = spa_status_by_domain[domain] = (
+                "AUTHORIZED" if is_authorized else "UNKNOWN_OR_UNAUTHORIZED"
+            )
+        spa_verification.append({"domain": domain, "status": status})
 
-    # --- Card 1: Detecção de Advertorial ---
-    detector_result: AdvertorialResult = detector.check_content(request.content)
-    
-    # --- Card 2/4: Verificação de SPA ---
-    # O verifier agora usa o repositório dinâmico (Card 4)
-    spa_result: SPAScanResult = verifier.is_url_authorized(request.url)
-    
-    # --- Card 3: Seleção de Conteúdo Educativo ---
-    # O educador usa os resultados do Card 1 e Card 2 para determinar a prioridade
-    education_content: EducationContent = educator.select_education_card(
-        is_advertorial=detector_result.is_advertorial,
-        is_spa_authorized=spa_result.is_authorized
+    # --- Card 3: o cartão depende apenas das categorias e da autorização ---
+    signature = (
+        any(v["status"] == "UNKNOWN_OR_UNAUTHORIZED" for v in spa_verification),
+        frozenset(evidence),
     )
+    education_card = cards_by_signature.get(signature)
+    if education_card is None:
+        education_card = cards_by_signature[signature] = educator.get_educational_card({
+            "advertorial_evidence": evidence,
+            "spa_verification": spa_verification,
+        })
+
+    return {
+        "url_analyzed": report["url_analyzed"],
+        "score": report["score"],
+        "risk_label": report["risk_label"],
+        "advertorial_evidence": evidence,
+        "spa_verification": spa_verification,
+        "education_card": education_card,
+    }
+
+
+# 5. Rota de verificação em streaming
+@advertorial_detector_router.post(
+    "/check/stream",
+    response_model=StreamCheckResult,
+    summary="Executa a análise sobre um corpo enviado em partes (texto chunked ou NDJSON).",
+    status_code=200
+)
+async def check_content_stream(
+    request: Request,
+    url: str = Query(..., description="A URL da página a ser verificada."),
+    stop_at_cap: bool = Query(False, description="Interrompe a leitura quando o score atinge 100."),
+    detector: AdvertorialDetectorService = Depends(get_advertorial_detector_service),
+    verifier: SPAVerifierService = Depends(get_spa_verifier_service),
+    educator: EducationContentService = Depends(get_education_content_service)
+):
+    """
+    Detecção incremental (Card 1) para páginas grandes: o corpo não é
+    armazenado nem validado por inteiro, cada parte é varrida ao chegar.
+    - text/plain (ou qualquer outro tipo): o corpo é o próprio texto da página.
+    - application/x-ndjson: uma linha por parte, no formato {"content": "..."}.
+    Com stop_at_cap o restante do corpo não é lido: as operadoras verificadas e o
+    cartão educativo vêm só do trecho lido, e a resposta sai com `partial: true`.
+    """
+    stream = detector.open_stream(url, stop_at_cap=stop_at_cap)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    is_ndjson = request.headers.get("content-type", "").startswith("application/x-ndjson")
+    pending_line = ""
+
+    def feed(text: str, final: bool = False) -> bool:
+        nonlocal pending_line
+        if not is_ndjson:
+            return stream.feed(text)
+        pending_line += text
+        lines = pending_line.split("\n")
+        pending_line = "" if final else lines.pop()
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            content = record.get("content") if isinstance(record, dict) else None
+            if not isinstance(content, str):
+                raise HTTPException(status_code=400, detail="Linha NDJSON inválida: esperado {\"content\": \"...\"}.")
+            if stream.feed(content):
+                return True
+        return False
+
+    capped = False
+    async for raw_chunk in request.stream():
+        if feed(decoder.decode(raw_chunk)):
+            capped = True
+            break
+    if not capped:
+        feed(decoder.decode(b"", final=True), final=True)
 
-    # 4. Agrega e retorna a resposta final
-    return AdvertorialDetectorResponse(
-        detector=detector_result,
-        spa=spa_result,
-        education=education_content
-    )
\ No newline at end of file
+    return {**_build_check_result(stream.close(), verifier, educator, {}, {}), "partial": capped}
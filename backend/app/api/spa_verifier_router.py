@@ -0,0 +1,273 @@
+import codecs
+import csv
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.config.settings import settings
+from app.services.spa_list_repository import SPAListRepository, get_spa_list_repository
+from app.services.spa_verifier_service import SPABulkVerification, SPAVerifierService, get_spa_verifier_service
+
+logger = logging.getLogger(__name__)
+
+# 1. Definição do Router
+spa_verifier_router = APIRouter()
+
+
+def _bulk_format(content_type: str) -> str:
+    """Formato do corpo a partir do Content-Type (qualquer outro tipo = uma URL por linha)."""
+    if content_type.startswith("text/csv"):
+        return "csv"
+    if content_type.startswith("application/x-ndjson"):
+        return "ndjson"
+    return "text"
+
+
+async def _iter_lines(request: Request, max_line_chars: int) -> AsyncIterator[List[Optional[str]]]:
+    """
+    Lê o corpo em partes e gera, a cada parte recebida, as linhas completas (UTF-8).
+    Uma linha maior que `max_line_chars` vira None e é descartada enquanto chega:
+    a memória não cresce com um corpo sem quebras de linha.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    oversized = False  # a linha atual já passou do limite: descarta até o próximo \n
+    async for raw_chunk in request.stream():
+        lines: List[Optional[str]] = (pending + decoder.decode(raw_chunk)).split("\n")
+        pending = lines.pop()
+        if oversized and lines:
+            lines[0], oversized = None, False
+        lines = [None if line is not None and len(line) > max_line_chars else line for line in lines]
+        if len(pending) > max_line_chars:
+            pending, oversized = "", True
+        if lines:
+            yield lines
+    pending += decoder.decode(b"", final=True)
+    if oversized or len(pending) > max_line_chars:
+        yield [None]
+    elif pending:
+        yield [pending]
+
+
+def _csv_quote_state(line: str, state: str) -> str:
+    """
+    Estado do leitor CSV (dialeto padrão) ao fim da linha: "start" (início de campo),
+    "unquoted", "quoted" (campo entre aspas aberto: o registro continua na próxima
+    linha) ou "quote" (aspas dentro de um campo entre aspas, dobradas ou de fechamento).
+    """
+    for char in line:
+        if state == "quoted":
+            if char == '"':
+                state = "quote"
+        elif state == "quote" and char == '"':
+            state = "quoted"
+        elif char == ",":
+            state = "start"
+        else:
+            state = "quoted" if state == "start" and char == '"' else "unquoted"
+    return state
+
+
+# Itens extraídos do corpo, na ordem de entrada: uma URL ou um registro de erro
+_BulkEntry = Union[str, dict]
+
+
+class _LineParser:
+    """
+    Extrai URLs das linhas do corpo, conforme o formato:
+    - text: uma URL por linha;
+    - csv: coluna 'url' (se a primeira linha for um cabeçalho com ela) ou a primeira coluna;
+      campos entre aspas podem conter quebras de linha;
+    - ndjson: uma string JSON ou um objeto {"url": "..."} por linha.
+    Linhas inválidas (ou maiores que `max_line_chars`) viram registros de erro,
+    devolvidos na mesma sequência das URLs (a resposta já está em andamento).
+    """
+
+    def __init__(self, fmt: str, max_line_chars: int):
+        self.fmt = fmt
+        self.max_line_chars = max_line_chars
+        self.line_number = 0
+        self._csv_column: Optional[int] = None
+        # Registro CSV em andamento (campo entre aspas aberto): linhas lidas, tamanho e linha inicial.
+        # Registro grande demais: as linhas são descartadas (None) até as aspas fecharem.
+        self._csv_record: Optional[List[str]] = None
+        self._csv_record_chars = 0
+        self._csv_record_line = 0
+        self._csv_state: Optional[str] = None
+
+    def parse(self, lines: List[Optional[str]]) -> List[_BulkEntry]:
+        entries: List[_BulkEntry] = []
+        for line in lines:
+            self.line_number += 1
+            if line is None:
+                self._csv_state = None  # registro CSV aberto termina junto com a linha descartada
+                entries.append(self._error(f"Linha maior que o limite de {self.max_line_chars} caracteres."))
+            elif self.fmt == "csv":
+                self._parse_csv(line.rstrip("\r"), entries)
+            elif line.strip():
+                if self.fmt == "text":
+                    entries.append(line.strip())
+                else:
+                    self._parse_ndjson(line.strip(), entries)
+        return entries
+
+    def finish(self) -> List[_BulkEntry]:
+        """Fim do corpo: um registro CSV com aspas ainda abertas vira erro."""
+        if self._csv_state is None:
+            return []
+        self._csv_state = None
+        return [self._error("Registro CSV com aspas não fechadas.", self._csv_record_line)]
+
+    def _error(self, message: str, line_number: Optional[int] = None) -> dict:
+        return {"line": line_number or self.line_number, "error": message}
+
+    def _parse_csv(self, line: str, entries: List[_BulkEntry]) -> None:
+        if self._csv_state is None:
+            if not line.strip():
+                return
+            self._csv_record, self._csv_record_chars, self._csv_record_line = [], 0, self.line_number
+            self._csv_state = "start"
+        else:
+            self._csv_state = _csv_quote_state("\n", self._csv_state)
+
+        self._csv_state = _csv_quote_state(line, self._csv_state)
+        if self._csv_record is not None:
+            self._csv_record_chars += len(line) + 1
+            if self._csv_record_chars > self.max_line_chars:
+                self._csv_record = None
+            else:
+                self._csv_record.append(line)
+        if self._csv_state == "quoted":
+            return  # o campo entre aspas continua na próxima linha
+
+        record, self._csv_state = self._csv_record, None
+        if record is None:
+            entries.append(self._error(f"Registro CSV maior que o limite de {self.max_line_chars} caracteres.", self._csv_record_line))
+            return
+        row = next(csv.reader(["\n".join(record)]), [])
+        if self._csv_column is None:
+            header = [cell.strip().lower() for cell in row]
+            self._csv_column = header.index("url") if "url" in header else 0
+            if "url" in header:
+                return
+        if len(row) > self._csv_column:
+            entries.append(row[self._csv_column].strip())
+        else:
+            entries.append(self._error("Linha CSV sem a coluna de URL.", self._csv_record_line))
+
+    def _parse_ndjson(self, line: str, entries: List[_BulkEntry]) -> None:
+        try:
+            item = json.loads(line)
+            url = item if isinstance(item, str) else item["url"]
+            if not isinstance(url, str):
+                raise TypeError
+            entries.append(url.strip())  # como nos formatos text e csv
+        except (ValueError, KeyError, TypeError):
+            entries.append(self._error("Linha NDJSON inválida: esperado \"url\" ou {\"url\": \"...\"}."))
+
+
+class _BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse que envia a resposta enquanto o corpo da requisição ainda é lido.
+    A implementação padrão consome `receive` em paralelo para detectar a desconexão
+    do cliente, o que disputa as mensagens do corpo com `request.stream()`.
+    Aqui apenas enviamos: uma desconexão interrompe o envio com erro.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _encode_results(bulk: SPABulkVerification, entries: List[_BulkEntry]) -> bytes:
+    """Uma linha por item, na ordem de entrada: as URLs do lote são verificadas juntas."""
+    verified = iter(bulk.verify([entry for entry in entries if isinstance(entry, str)]))
+    records = []
+    for entry in entries:
+        if isinstance(entry, str):
+            url, domain, authorized = next(verified)
+            entry = {"url": url, "domain": domain, "is_authorized": authorized}
+        records.append(json.dumps(entry, ensure_ascii=False) + "\n")
+    return "".join(records).encode("utf-8")
+
+
+def _summary_line(bulk: SPABulkVerification) -> bytes:
+    summary = bulk.summary()
+    logger.info(f"Verificação SPA em massa: {summary}")
+    return (json.dumps({"summary": summary}) + "\n").encode("utf-8")
+
+
+# 2. Verificação SPA em massa
+@spa_verifier_router.post(
+    "/spa/verify/bulk",
+    summary="Verifica em massa URLs contra a lista de SPAs autorizados (resposta NDJSON).",
+    response_class=StreamingResponse,
+    status_code=200
+)
+async def verify_bulk(
+    request: Request,
+    batch_size: int = Query(settings.SPA_BULK_BATCH_SIZE, ge=1, le=100_000, description="URLs por lote."),
+    verifier: SPAVerifierService = Depends(get_spa_verifier_service)
+):
+    """
+    Verificação em massa (Card 2) para exportações de redes de anúncios.
+
+    O corpo é lido em streaming (memória limitada ao lote), no formato dado pelo Content-Type:
+    - text/plain: uma URL por linha;
+    - text/csv: coluna 'url' do cabeçalho, ou a primeira coluna;
+    - application/x-ndjson: uma string JSON ou {"url": "..."} por linha;
+    - application/json: {"urls": [...]} (lido por inteiro; prefira os formatos em linha).
+
+    A resposta (application/x-ndjson) traz uma linha por URL, na ordem de entrada:
+    {"url", "domain", "is_authorized"}; linhas inválidas ou maiores que
+    SPA_BULK_MAX_LINE_CHARS geram {"line", "error"} na mesma posição;
+    a última linha é {"summary": {...}} com a vazão em URLs por segundo.
+    """
+    content_type = request.headers.get("content-type", "")
+    bulk = verifier.open_bulk()
+
+    if content_type.startswith("application/json"):
+        try:
+            urls = json.loads(await request.body())["urls"]
+            if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Corpo JSON inválido: esperado {\"urls\": [\"...\"]}.")
+
+        async def json_lines():
+            for start in range(0, len(urls), batch_size):
+                yield _encode_results(bulk, [url.strip() for url in urls[start:start + batch_size]])
+            yield _summary_line(bulk)
+
+        return StreamingResponse(json_lines(), media_type="application/x-ndjson")
+
+    max_line_chars = settings.SPA_BULK_MAX_LINE_CHARS
+    parser = _LineParser(_bulk_format(content_type), max_line_chars)
+
+    async def body_lines():
+        # URLs e registros de erro no mesmo lote: a resposta segue a ordem de entrada
+        batch: List[_BulkEntry] = []
+        async for lines in _iter_lines(request, max_line_chars):
+            batch.extend(parser.parse(lines))
+            while len(batch) >= batch_size:
+                yield _encode_results(bulk, batch[:batch_size])
+                del batch[:batch_size]
+        batch.extend(parser.finish())
+        if batch:
+            yield _encode_results(bulk, batch)
+        yield _summary_line(bulk)
+
+    return _BodyStreamingResponse(body_lines(), media_type="application/x-ndjson")
+
+
+# 3. Métricas da recarga a quente da lista SPA (Card 4)
+@spa_verifier_router.get(
+    "/spa/list/stats",
+    summary="Recargas, falhas, geração e tamanho da lista de SPAs autorizados em uso.",
+)
+async def spa_list_stats(repository: SPAListRepository = Depends(get_spa_list_repository)) -> Dict[str, Any]:
+    return repository.reload_stats()
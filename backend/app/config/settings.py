@@ -1,8 +1,10 @@
 import os
+from typing import Optional
+
 from pydantic_settings import BaseSettings # Importação ajustada para Pydantic V2+
 
 # Define o diretório base do projeto (D:\projetos-inovexa-m\antibet\backend)
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 class Settings(BaseSettings):
     """
@@ -30,6 +32,159 @@ class Settings(BaseSettings):
         "backend",
         "spa_authorized_list.json"
     )
+    # Arquivo public_suffix_list.dat (PSL) para o casamento por domínio registrável.
+    # None = subconjunto embutido em app/services/domain_index.py
+    PUBLIC_SUFFIX_LIST_PATH: Optional[str] = None
+    # Índice binário compilado (python -m app.services.spa_index_file), lido via mmap.
+    # Quando definido, substitui o JSON acima como fonte da lista. None = usa o JSON.
+    SPA_LIST_INDEX_PATH: Optional[str] = None
+    # Capacidade do cache (LRU) de autoridade de URL -> domínio normalizado do verificador
+    SPA_DOMAIN_MEMO_SIZE: int = 65_536
+    # Verificação SPA em massa: URLs por lote resolvido/enviado e limite do memo de domínios por job
+    SPA_BULK_BATCH_SIZE: int = 5_000
+    SPA_BULK_MAX_DOMAINS: int = 100_000
+    # Tamanho máximo (caracteres) de uma linha, ou de um registro CSV, do corpo da verificação em massa
+    SPA_BULK_MAX_LINE_CHARS: int = 8_192
+    # Intervalo (segundos) do monitoramento do arquivo para recarga a quente (0 = desativado)
+    SPA_LIST_WATCH_INTERVAL_SECONDS: float = 5.0
+
+    # --- Configuração do Detector em Lote (POST /check/batch) ---
+
+    # Número máximo de documentos aceitos em uma única requisição de lote
+    DETECTOR_BATCH_MAX_ITEMS: int = 1000
+
+    # --- Configuração do Executor do Detector (Card 1) ---
+
+    # Onde a detecção roda nas rotas assíncronas: "inline", "thread" ou "process"
+    DETECTOR_EXECUTOR_MODE: str = "inline"
+    # Número de workers do pool (None = os.cpu_count())
+    DETECTOR_EXECUTOR_WORKERS: Optional[int] = None
+    # Documentos menores que isso (em caracteres) são processados inline
+    DETECTOR_OFFLOAD_MIN_CHARS: int = 50_000
+
+    # --- Configuração do Cache de Resultados do /check ---
+
+    # Limites de memória do cache (entradas e bytes estimados)
+    CHECK_CACHE_MAX_ENTRIES: int = 50_000
+    CHECK_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Tempo de vida de cada resultado cacheado (segundos)
+    CHECK_CACHE_TTL_SECONDS: float = 3600.0
+
+    # --- Configuração do RAG (Chat) ---
+
+    # Número máximo de chunks injetados no contexto
+    RAG_TOP_K: int = 3
+    # Chunks com score abaixo desta fração do melhor score são descartados
+    RAG_MIN_RELATIVE_SCORE: float = 0.3
+    # Diretório do índice vetorial gerado por `python -m app.services.rag_vector_index`
+    # (None = índice BM25 sobre a base embutida). Requer NumPy.
+    RAG_VECTOR_INDEX_PATH: Optional[str] = None
+    # Listas IVF lidas por consulta (apenas para índices construídos com --ivf)
+    RAG_VECTOR_NPROBE: int = 8
+    # Store da base de conhecimento gerado por `python -m app.services.rag_ingestion`
+    # (None = base embutida). Novas gerações são carregadas sem reiniciar os workers.
+    RAG_KB_DIR: Optional[str] = None
+    # Intervalo (segundos) de verificação de nova geração no store (0 desativa)
+    RAG_KB_WATCH_INTERVAL_SECONDS: float = 5.0
+    # Gerações antigas mantidas no store pela ingestão
+    RAG_KB_KEEP_GENERATIONS: int = 3
+    # Cache de contextos do retrieve_context (limites valem para cada nível: texto exato e normalizado)
+    RAG_CACHE_MAX_ENTRIES: int = 10_000
+    RAG_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # Mensagens maiores que isso (caracteres) não entram no cache pelo texto exato
+    RAG_CACHE_MAX_QUERY_CHARS: int = 512
+
+    # --- Configuração do LLM (Chat) ---
+
+    # Provedor: "stub" (local, respostas simuladas) ou "openai" (API compatível com OpenAI)
+    LLM_PROVIDER: str = "stub"
+    LLM_API_BASE_URL: str = "https://api.openai.com/v1"
+    LLM_API_KEY: Optional[str] = None
+    LLM_MODEL: str = "gpt-4o-mini"
+    LLM_MAX_TOKENS: int = 512
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    # Pool de conexões HTTP (keep-alive) com o provedor, por worker
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    # Atraso entre tokens do provedor stub (simulação de latência)
+    LLM_STUB_TOKEN_DELAY_SECONDS: float = 0.0
+    # Turnos recentes considerados nos percentis de latência (TTFT) do Chat
+    CHAT_METRICS_WINDOW: int = 1000
+
+    # --- Configuração das Sessões do Chat ---
+
+    # Orçamento de tokens do prompt (sistema + RAG + resumo + histórico + mensagem)
+    CHAT_PROMPT_MAX_TOKENS: int = 3000
+    # Histórico mantido na íntegra por sessão; os turnos mais antigos viram resumo
+    CHAT_HISTORY_MAX_TOKENS: int = 1500
+    CHAT_SUMMARY_MAX_TOKENS: int = 300
+    # Limites do store em memória (sessões por worker e expiração por inatividade)
+    CHAT_SESSION_MAX_SESSIONS: int = 50_000
+    CHAT_SESSION_TTL_SECONDS: float = 6 * 3600.0
+    # Prefixos de prompt (sistema + contexto do usuário) cacheados por worker
+    CHAT_PROMPT_PREFIX_CACHE_SIZE: int = 10_000
+
+    # --- Configuração das Metas (Dashboard) ---
+
+    # Banco SQLite único do app: metas, progresso e revogações de token usam este
+    # arquivo (e o mesmo pool de conexões) quando o caminho específico for None
+    APP_DB_PATH: Optional[str] = None
+    # Banco SQLite das metas (compartilhado entre workers). Se None, usa o
+    # repositório em memória (desenvolvimento/testes; nada sobrevive ao restart).
+    GOALS_DB_PATH: Optional[str] = None
+    # Registro de eventos de progresso (dias sem apostar, economia); mesma regra
+    PROGRESS_DB_PATH: Optional[str] = None
+    # Conexões mantidas abertas por worker e espera máxima pelo lock de escrita (metas e progresso)
+    GOALS_DB_POOL_SIZE: int = 8
+    GOALS_DB_BUSY_TIMEOUT_MS: int = 5000
+    # Snapshots materializados do GET /dashboard/data mantidos por worker (LRU)
+    DASHBOARD_SNAPSHOT_MAX_ENTRIES: int = 50_000
+
+    # --- Configuração da Autenticação (JWT) ---
+
+    # "HS256" (biblioteca padrão) ou "EdDSA" (Ed25519; requer o pacote cryptography)
+    JWT_ALGORITHM: str = "HS256"
+    # Segredo HS256 (>= 32 bytes). Em produção vem do .env; este valor é só para desenvolvimento.
+    JWT_SECRET_KEY: str = "dev-only-antibet-jwt-secret-change-me"
+    # Rotação: segredos/chaves públicas anteriores (separados por vírgula), aceitos na verificação
+    JWT_PREVIOUS_SECRET_KEYS: str = ""
+    JWT_PRIVATE_KEY_PATH: Optional[str] = None
+    JWT_PREVIOUS_PUBLIC_KEY_PATHS: str = ""
+    JWT_ISSUER: str = "antibet-backend"
+    JWT_ACCESS_TOKEN_TTL_SECONDS: int = 3600
+    # Tolerância de relógio entre servidores na checagem de exp/nbf
+    JWT_LEEWAY_SECONDS: int = 30
+    # Claims de tokens verificados recentemente (evita refazer a assinatura a cada requisição)
+    JWT_CLAIMS_CACHE_SIZE: int = 50_000
+    JWT_CLAIMS_CACHE_TTL_SECONDS: float = 300.0
+    # Revogação (logout): banco SQLite compartilhado entre workers; se None, em memória
+    REVOCATION_DB_PATH: Optional[str] = None
+    # Filtro de Bloom na frente do banco: só "talvez revogado" consulta o banco
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+    REVOCATION_BLOOM_FALSE_POSITIVE_RATE: float = 0.001
+    # Remontagem do filtro: descarta revogações expiradas e traz as dos outros workers
+    REVOCATION_REBUILD_INTERVAL_SECONDS: float = 30.0
+
+    # --- Configuração do Login (hash de senha e limites) ---
+
+    # Custo do scrypt (potência de 2; 2**14 ≈ 16 MB e dezenas de ms por verificação)
+    PASSWORD_HASH_SCRYPT_N: int = 2 ** 14
+    # Pool dedicado à verificação de senha e tentativas esperando na fila (acima disso: 429)
+    LOGIN_EXECUTOR_WORKERS: int = 4
+    LOGIN_EXECUTOR_MAX_QUEUE: int = 32
+    # Baldes de tokens: tentativas por segundo e rajada máxima, por IP e por e-mail
+    LOGIN_RATE_PER_IP: float = 1.0
+    LOGIN_BURST_PER_IP: int = 20
+    LOGIN_RATE_PER_EMAIL: float = 0.2
+    LOGIN_BURST_PER_EMAIL: int = 5
+    # Chaves (IPs/e-mails) acompanhadas por worker (LRU)
+    LOGIN_RATE_LIMIT_MAX_KEYS: int = 100_000
+
+    # --- Configuração do Startup ---
+
+    # Constrói os serviços no startup, em paralelo (senão, na primeira requisição que os usar)
+    STARTUP_WARMUP: bool = True
+    STARTUP_WARMUP_WORKERS: int = 8
 
     # Nota sobre Pydantic Settings:
     # Por padrão, ele procura um arquivo .env, mas para o ambiente
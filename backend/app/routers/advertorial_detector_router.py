@@ -3,9 +3,9 @@ from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
 
 # Importação dos Serviços de Heurística
-from app.services.advertorial_detector_service import AdvertorialDetectorService
-from app.services.spa_verifier_service import SPAVerifierService
-from app.services.education_content_service import EducationContentService # (Card 3)
+from app.services.advertorial_detector_service import AdvertorialDetectorService, get_advertorial_detector_service
+from app.services.spa_verifier_service import SPAVerifierService, get_spa_verifier_service
+from app.services.education_content_service import EducationContentService, get_education_content_service # (Card 3)
 
 # --- Modelos de Dados (Pydantic) ---
 
@@ -35,16 +35,18 @@ class DetectResponse(BaseModel):
     education_card: EducationCard # <-- EVOLUÇÃO (Card 3)
     url_analyzed: str
 
-# --- Inicialização dos Serviços (Singleton Simulado) ---
-detector_service = AdvertorialDetectorService()
-spa_service = SPAVerifierService()
-education_service = EducationContentService() # (Card 3)
-
 # --- Router ---
+# Serviços injetados pelas factories (Singletons criados na primeira requisição
+# ou no aquecimento do startup, nunca no import do módulo)
 router = APIRouter()
 
 @router.post("/check", response_model=DetectResponse)
-def check_advertorial_risk(request: DetectRequest):
+def check_advertorial_risk(
+    request: DetectRequest,
+    detector_service: AdvertorialDetectorService = Depends(get_advertorial_detector_service),
+    spa_service: SPAVerifierService = Depends(get_spa_verifier_service),
+    education_service: EducationContentService = Depends(get_education_content_service)
+):
     """
     Endpoint principal (Card 1 + Card 2 + Card 3).
     Recebe uma URL e seu conteúdo, calcula o score de advertorial (Card 1),
@@ -60,25 +62,25 @@ def check_advertorial_risk(request: DetectRequest):
 
     # --- Card 2: Verificação SPA ---
     spa_verification_results = []
-    detected_domains = detection_report.get("evidence", {}).get("OPERATOR_MATCHES", [])
-    verified_domains = set()
-    
+    # Um domínio por operadora, em minúsculas (como no /check): 'Blaze' e 'blaze' são o mesmo
+    detected_domains = dict.fromkeys(
+        match.lower() for match in detection_report.get("evidence", {}).get("OPERATOR_MATCHES", [])
+    )
+
     for domain in detected_domains:
-        if domain not in verified_domains:
-            try:
-                spa_status = spa_service.check_domain_authorization(domain)
-                spa_verification_results.append(SPAStatus(
-                    domain=domain,
-                    status=spa_status["status"],
-                    details=spa_status["details"]
-                ))
-                verified_domains.add(domain)
-            except Exception as e:
-                spa_verification_results.append(SPAStatus(
-                    domain=domain,
-                    status="CHECK_ERROR",
-                    details={"error": str(e)}
-                ))
+        try:
+            spa_status = spa_service.is_url_authorized(domain)
+            spa_verification_results.append(SPAStatus(
+                domain=domain,
+                status="AUTHORIZED" if spa_status.is_authorized else "UNKNOWN_OR_UNAUTHORIZED",
+                details={"normalized_domain": spa_status.domain}
+            ))
+        except Exception as e:
+            spa_verification_results.append(SPAStatus(
+                domain=domain,
+                status="CHECK_ERROR",
+                details={"error": str(e)}
+            ))
 
     # --- Card 3: Seleção do Conteúdo Educativo ---
     
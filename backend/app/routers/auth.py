@@ -1,7 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends
+import math
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Response
 from pydantic import BaseModel, Field
-from typing import Dict
-import time
+from typing import Any, Dict, Optional
+
+from app.services.auth_tokens import InvalidTokenError, JWTService, get_jwt_service
+from app.services.login_guard import LoginGuard, LoginOverloadedError, get_login_guard
+from app.services.password_hashing import get_password_hasher
 
 # --- MODELOS DE DADOS (Pydantic) ---
 
@@ -15,17 +20,25 @@ class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     user_id: str
+    expires_in: int
 
 # --- ROTAS DE AUTENTICAÇÃO ---
 
-# Cria um APIRouter para as rotas de autenticação (prefixo será definido no main.py)
+# Cria um APIRouter para as rotas de autenticação (prefixo definido em main.API_V1_ROUTERS)
 router = APIRouter()
 
 # --- SERVIÇO DE AUTENTICAÇÃO (Simulação) ---
 # Em um ambiente real, esta lógica estaria em um serviço separado para injeção.
 
 def verify_user_credentials(email: str, password: str) -> bool:
-    """Simula a verificação de credenciais no banco de dados (PostgreSQL)."""
+    """
+    Simula a verificação de credenciais no banco de dados (PostgreSQL).
+    Roda no executor de login: o hash da senha tem o custo real do scrypt.
+    """
+    # O hash armazenado viria do banco; na simulação, todos usam o hash de referência
+    hasher = get_password_hasher()
+    hasher.verify(password, hasher.dummy_hash)
+
     # Regra de Segurança Crítica: Simulação de falha de credenciais para teste
     if password == "fail_login" or email == "fail@inovexa.com":
         return False
@@ -33,25 +46,40 @@ def verify_user_credentials(email: str, password: str) -> bool:
     # Simulação de credencial válida (aceita qualquer coisa, exceto a falha)
     return True
 
+def _too_many_requests(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
 def create_access_token(user_id: str) -> str:
-    """Simula a criação de um JSON Web Token (JWT) com validade."""
-    # O token real seria assinado com um segredo (SECRET_KEY) e teria claims (exp, sub, iat).
-    timestamp = int(time.time())
-    return f"mock.jwt.token.{user_id}.{timestamp}"
+    """JWT de acesso assinado (claims: sub, iss, iat, exp, jti), com o apelido do usuário."""
+    return get_jwt_service().issue(user_id, {"nickname": user_id})
 
 # --- ENDPOINTS ---
 
 @router.post("/login", response_model=TokenResponse, status_code=200)
-def login_for_access_token(form_data: LoginRequest):
+async def login_for_access_token(
+    form_data: LoginRequest,
+    request: Request,
+    guard: LoginGuard = Depends(get_login_guard)
+):
     """
     Autentica o usuário e retorna um token JWT.
     Substitui o mock do AuthService no Front-end.
     """
     email = form_data.email
     password = form_data.password
+
+    # 0. Limites por IP e por e-mail (antes de gastar qualquer hash)
+    client_ip = request.client.host if request.client else "desconhecido"
+    retry_after = guard.check_rate(client_ip, email)
+    if retry_after:
+        raise _too_many_requests("Muitas tentativas de login. Tente novamente em instantes.", retry_after)
     
-    # 1. Verifica as credenciais
-    if not verify_user_credentials(email, password):
+    # 1. Verifica as credenciais (no executor de login, fora das threads das outras rotas)
+    try:
+        valid = await guard.executor.run(verify_user_credentials, email, password)
+    except LoginOverloadedError:
+        raise _too_many_requests("Serviço de login sobrecarregado. Tente novamente em instantes.", 1)
+    if not valid:
         # Lança exceção de erro padrão (401 Unauthorized)
         raise HTTPException(
             status_code=401,
@@ -67,19 +95,33 @@ def login_for_access_token(form_data: LoginRequest):
     
     return TokenResponse(
         access_token=access_token,
-        user_id=mock_user_id
+        user_id=mock_user_id,
+        expires_in=get_jwt_service().ttl_seconds,
     )
 
+@router.get("/metrics", summary="Fila e tempo de hash do login e limites de tentativas.")
+def get_login_metrics(guard: LoginGuard = Depends(get_login_guard)) -> Dict[str, Any]:
+    return guard.stats()
+
 @router.post("/logout", status_code=204)
-def logout_user():
+def logout_user(
+    authorization: Optional[str] = Header(None),
+    tokens: JWTService = Depends(get_jwt_service)
+):
     """
-    Invalida a sessão do usuário (simulação de blacklist de token no Redis).
-    Retorna 204 No Content.
+    Invalida o token do cabeçalho Authorization (lista de revogação em processo,
+    válida até o exp do token). Retorna 204 No Content.
     """
-    # Lógica real: Adicionar o token recebido no cabeçalho à blacklist do Redis
-    # e remover cookies de sessão.
-    
-    return {"message": "Logout successful"}
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Token ausente.", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        tokens.revoke(token.strip())
+    except InvalidTokenError:
+        # Token já inválido, expirado ou revogado: nada a invalidar
+        raise HTTPException(status_code=401, detail="Token inválido ou expirado.", headers={"WWW-Authenticate": "Bearer"})
+
+    return Response(status_code=204)
 
 # Exemplo de rota protegida que precisaria de Depends(oauth2_scheme)
 # @router.get("/protected_data")
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Dict
-import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+import json
+import logging
 
-# --- IMPORTAÇÃO DO NOVO SERVIÇO RAG ---
-from app.services.rag_service import RAGService 
+# --- ORQUESTRAÇÃO DO CHAT (RAG + PERFIL + LLM) ---
+from app.services.auth_tokens import InvalidTokenError, JWTService, get_jwt_service
+from app.services.chat_orchestrator import ChatOrchestrator, get_chat_orchestrator
+from app.services.llm_client import LLMError
+
+logger = logging.getLogger(__name__)
 
 # --- MODELOS DE DADOS (Pydantic) ---
 
-# Simulação de um modelo de usuário autenticado (retornado após a validação do JWT)
+# Modelo do usuário autenticado (montado a partir das claims do JWT)
 class UserModel(BaseModel):
     id: str
     nickname: str = "Adonis"
@@ -18,91 +24,101 @@ class UserModel(BaseModel):
 # Simulação da mensagem de entrada
 class ChatRequest(BaseModel):
     message: str = Field(..., example="Estou com vontade de apostar.")
-    history: List[Dict[str, str]] = Field(default_factory=list) # Histórico para contexto
+    # Legado: o histórico fica no servidor (sessão por usuário) e o cliente envia só a
+    # mensagem nova. Se enviado, substitui a sessão (clientes que reenviam a conversa).
+    history: List[Dict[str, str]] = Field(default_factory=list)
 
 # Simulação da mensagem de resposta da IA
 class ChatResponse(BaseModel):
     response: str
     sender: str = "AntiBet Coach"
-    token_usage: int = 1 # Simulação do consumo de tokens (para Freemium/Limitado)
+    token_usage: int = 1 # Tokens do turno: prompt + resposta (para Freemium/Limitado)
 
 # --- DEPENDÊNCIAS (Guarda de Segurança) ---
 
-def jwt_auth_guard(token: str = "mock_valid_token") -> UserModel:
-    """Simula a decodificação do JWT e retorna o modelo do usuário."""
-    if not token or "fail" in token:
-         raise HTTPException(status_code=401, detail="Token inválido ou expirado.")
-    return UserModel(id="user_123", nickname="Adonis", gender="Masculino", age=35)
-
-# --- INICIALIZAÇÃO DE SERVIÇOS CORE (Simulação de Injeção) ---
-
-# Em um sistema real, o RAGService seria injetado no construtor
-# do LLMController, mas aqui ele é instanciado para uso direto.
-rag_service = RAGService()
-
-# --- PROMPT DE SISTEMA DA IA (ORQUESTRADOR) ---
-
-SYSTEM_PROMPT = """
-Você é o AntiBet Coach. Sua missão é fornecer apoio psicológico e educacional de forma empática e sem julgamentos.
-REGRAS:
-1. Responda como uma amiga digital, solidária e empática (Zero Julgamento).
-2. Use Terapia Cognitivo-Comportamental (TCC) e Mindfulness (Urge Surfing).
-3. Adapte seu tom ao gênero e idade do usuário.
-4. Chame o usuário pelo apelido.
-5. NUNCA substitua tratamento clínico.
-"""
+def jwt_auth_guard(
+    authorization: Optional[str] = Header(None),
+    tokens: JWTService = Depends(get_jwt_service)
+) -> UserModel:
+    """Valida o Bearer token (assinatura e validade, sem consulta a banco) e retorna o usuário."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Token ausente.", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        claims = tokens.verify(token.strip())
+    except InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Token inválido ou expirado.", headers={"WWW-Authenticate": "Bearer"})
+    # Dados de perfil opcionais no token; o Chat usa o perfil cadastrado quando houver
+    profile = {field: claims[field] for field in ("nickname", "gender", "age") if field in claims}
+    return UserModel(id=claims["sub"], **profile)
 
 # --- ROTAS DE CHAT E IA ---
 
 router = APIRouter()
 
 @router.post("/send", response_model=ChatResponse)
-def send_message_to_ia(
+async def send_message_to_ia(
     request: ChatRequest,
-    current_user: UserModel = Depends(jwt_auth_guard)
+    current_user: UserModel = Depends(jwt_auth_guard),
+    orchestrator: ChatOrchestrator = Depends(get_chat_orchestrator)
 ):
     """
-    Recebe a mensagem do usuário, injeta o contexto do RAG e devolve a resposta do LLM (simulado).
-    """
-    
-    # 1. PREPARAÇÃO DO CONTEXTO DE SISTEMA + PERSONALIZAÇÃO
-    
-    # Contexto de Personalização do Usuário (do JWT/Banco de Dados)
-    user_context = f"""
-    --- CONTEXTO DO USUÁRIO ---
-    Apelido: {current_user.nickname}
-    Gênero: {current_user.gender}
-    Idade: {current_user.age}
+    Recebe a mensagem do usuário, injeta o contexto do RAG e devolve a resposta
+    completa do LLM. Para exibir a resposta enquanto é gerada, use /send/stream.
     """
-    
-    # 2. BUSCA DO CONTEXTO RAG REAL
-    # Busca o contexto científico relevante (TCC, Urge Surfing, Financeiro)
-    rag_context = rag_service.retrieve_context(request.message)
-    
-    # Constrói o Prompt final que será enviado ao LLM
-    final_prompt = (
-        SYSTEM_PROMPT + 
-        user_context + 
-        rag_context + # CONTEXTO RAG INJETADO AQUI
-        "\n--- MENSAGEM DO USUÁRIO ---\n" + request.message
-    )
-    
-    print(f"Prompt Final (Enviado ao LLM Simulado): {final_prompt[:800]}...")
-
-    # 3. CHAMADA AO LLM (Simulação)
-    # A lógica real chamaria a API da OpenAI/Claude aqui.
-    ia_response = _generate_mock_ia_response(request.message, current_user.nickname)
+    try:
+        turn = await orchestrator.complete(request.message, request.history, current_user)
+    except LLMError as e:
+        logger.error(f"Falha no provedor de LLM: {e}")
+        raise HTTPException(status_code=502, detail="O assistente está indisponível no momento. Tente novamente.")
 
     return ChatResponse(
-        response=ia_response,
-        token_usage=len(request.message) // 10 + 20
+        response=turn.response,
+        token_usage=turn.token_usage
     )
 
-def _generate_mock_ia_response(user_message: str, nickname: str) -> str:
-    """Lógica de mock para simular uma resposta relevante da IA."""
-    if "apostar" in user_message.lower() or "jogar" in user_message.lower() or "impulso" in user_message.lower():
-        return f"Sinto muito que você esteja sentindo esse impulso, {nickname}. É um momento difícil. Lembre-se do Urge Surfing: deixe o impulso passar. Quer tentar a respiração 4-7-8 comigo agora?"
-    elif "finanças" in user_message.lower() or "dinheiro" in user_message.lower():
-        return f"As finanças são um ponto chave, {nickname}. Tente rever seu Painel Financeiro e veja o dinheiro que você já economizou. Podemos traçar uma meta simples para esta semana."
-    else:
-        return f"Obrigada por compartilhar, {nickname}. Lembre-se que estou aqui para te apoiar em qualquer desafio. Como posso te ajudar a reestruturar seus pensamentos neste momento?"
\ No newline at end of file
+def _sse(event: str, data: Dict[str, Any]) -> bytes:
+    """Um evento Server-Sent Events (data em JSON, uma linha)."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+@router.post("/send/stream", summary="Resposta do LLM em streaming (Server-Sent Events).")
+async def stream_message_to_ia(
+    request: ChatRequest,
+    current_user: UserModel = Depends(jwt_auth_guard),
+    orchestrator: ChatOrchestrator = Depends(get_chat_orchestrator)
+):
+    """
+    Mesma entrada de /send; a resposta (text/event-stream) traz os tokens à medida
+    que o LLM os gera:
+    - `event: token` com {"text": "..."} para cada parte da resposta;
+    - `event: done` com o uso de tokens (prompt + resposta) e as latências ao final;
+    - `event: error` com {"detail": "..."} se o provedor falhar no meio do caminho.
+    """
+    turn = orchestrator.start_turn(request.message, request.history, current_user)
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            async for token in turn.stream():
+                yield _sse("token", {"text": token})
+        except LLMError as e:
+            logger.error(f"Falha no provedor de LLM: {e}")
+            yield _sse("error", {"detail": "O assistente está indisponível no momento. Tente novamente."})
+            return
+        yield _sse("done", turn.summary())
+
+    # Sem buffering em proxies (nginx) e sem cache: cada evento deve chegar na hora
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+@router.get("/metrics", summary="Latências do Chat (TTFT) e contadores.")
+async def chat_metrics(orchestrator: ChatOrchestrator = Depends(get_chat_orchestrator)) -> Dict[str, Any]:
+    """Percentis do tempo até o primeiro token (métrica principal), preparo e total; montagem do prompt."""
+    return {**orchestrator.metrics.snapshot(), "prompt_assembly": orchestrator.prompt_builder.stats()}
+
+@router.delete("/session", status_code=204, summary="Encerra a conversa (histórico) do usuário no servidor.")
+async def reset_chat_session(
+    current_user: UserModel = Depends(jwt_auth_guard),
+    orchestrator: ChatOrchestrator = Depends(get_chat_orchestrator)
+):
+    """A próxima mensagem começa uma conversa nova (sem histórico nem resumo)."""
+    orchestrator.sessions.reset(current_user.id)
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Literal, Optional, Tuple
 import time
 
+from app.config.settings import settings
 # Reutiliza o modelo do usuário e a função de autenticação (simulada) do módulo chat
 from app.routers.chat import jwt_auth_guard, UserModel 
+from app.services.dashboard_snapshot import DashboardSnapshotStore, etag_matches
+from app.services.goals_repository import GoalNotFoundError, GoalRecord, GoalsRepository, get_goals_repository
+from app.services.progress_ledger import ProgressAggregate, ProgressLedger, get_progress_ledger
 
 # --- MODELOS DE DADOS (Pydantic) ---
 
@@ -22,19 +27,22 @@ class DashboardData(BaseModel):
     days_without_betting: int = Field(..., description="Métrica chave de gamificação.")
     daily_reflection: Reflection
     user_goals: List[Goal]
-    # Outras métricas (ex: economia acumulada)
-    accumulated_savings: float = 7345.50
+    # Outras métricas (derivadas do registro de progresso)
+    accumulated_savings: float = 0.0
+    best_streak_days: int = 0
 
-# --- SIMULAÇÃO DE BANCO DE DADOS (Persistência por usuário) ---
+class ProgressEventRequest(BaseModel):
+    kind: Literal["check_in", "relapse", "avoided_bet"]
+    amount: float = Field(0.0, ge=0, description="Valor da aposta evitada (só para avoided_bet).")
 
-# Dicionário simples para armazenar o estado das metas por ID de usuário
-_user_goals_db: Dict[str, List[Goal]] = {
-    "user_123": [ # Metas para o usuário mockado 'Adonis'
-        Goal(id="g1", title="Evitar o celular na primeira hora do dia", is_completed=True),
-        Goal(id="g2", title="Reservar 10 min para Mindfulness", is_completed=False),
-        Goal(id="g3", title="Rever o Painel Financeiro antes das 18h", is_completed=False),
-    ]
-}
+class ProgressSummary(BaseModel):
+    days_without_betting: int
+    best_streak_days: int
+    accumulated_savings: float
+    check_ins: int
+    relapses: int
+
+_DAY_SECONDS = 86400
 
 def get_daily_reflection() -> Reflection:
     """Simula a seleção da Reflexão Diária (que seria baseada em data)."""
@@ -44,68 +52,105 @@ def get_daily_reflection() -> Reflection:
         source="TCC",
     )
 
+def render_dashboard(user_id: str, goals: List[GoalRecord], progress: ProgressAggregate, now: float) -> Tuple[bytes, float]:
+    """Corpo JSON do Dashboard e o instante em que ele expira (virada do dia)."""
+    data = DashboardData(
+        # Agregados mantidos evento a evento: O(1), qualquer que seja o histórico
+        days_without_betting=progress.days_without_betting(now),
+        daily_reflection=get_daily_reflection(),
+        user_goals=[Goal(id=goal.id, title=goal.title, is_completed=goal.is_completed) for goal in goals],
+        accumulated_savings=round(progress.accumulated_savings, 2),
+        best_streak_days=progress.best_streak_days(now),
+    )
+    # Expira no próximo dia da sequência ou à meia-noite UTC (reflexão diária), o que vier antes
+    valid_until = (now // _DAY_SECONDS + 1) * _DAY_SECONDS
+    next_day_at = progress.next_day_at(now)
+    if next_day_at is not None:
+        valid_until = min(valid_until, next_day_at)
+    return data.model_dump_json().encode("utf-8"), valid_until
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_dashboard_snapshots() -> DashboardSnapshotStore:
+    """
+    Snapshots (Singleton) do Dashboard, sobre o repositório de metas do worker.
+    """
+    return DashboardSnapshotStore(
+        get_goals_repository(), get_progress_ledger(), render_dashboard, max_entries=settings.DASHBOARD_SNAPSHOT_MAX_ENTRIES
+    )
+
 # --- ROTAS DE DASHBOARD E GAMIFICAÇÃO ---
 
 router = APIRouter()
 
-@router.get("/data", response_model=DashboardData)
+@router.get("/data", response_model=DashboardData, responses={304: {"description": "Dashboard inalterado (ETag)."}})
 def get_dashboard_data(
-    current_user: UserModel = Depends(jwt_auth_guard)
+    current_user: UserModel = Depends(jwt_auth_guard),
+    snapshots: DashboardSnapshotStore = Depends(get_dashboard_snapshots),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Fornece todos os dados críticos para a HomeView e ProgressView.
     Substitui os mocks dos Notifiers de Dashboard/Analytics.
+
+    O corpo vem do snapshot materializado do usuário (remontado só quando as
+    metas mudam ou o dia vira). Se o cliente envia o ETag que já tem
+    (If-None-Match), a resposta é 304 sem corpo.
     """
-    user_id = current_user.id
-    
-    # 1. Busca metas do "Banco de Dados"
-    goals = _user_goals_db.get(user_id, [])
-    
-    # 2. Simulação de Dias Sem Apostar (real seria cálculo complexo)
-    days_without_betting = int((time.time() - 1609459200) / 86400) # Simula 4 anos
-    
-    # 3. Retorna os dados agregados
-    return DashboardData(
-        days_without_betting=days_without_betting,
-        daily_reflection=get_daily_reflection(),
-        user_goals=goals,
-    )
+    snapshot = snapshots.get(current_user.id)
+    # "no-cache": o app pode guardar a resposta, mas revalida a cada abertura de tela
+    headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, snapshot.etag):
+        snapshots.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
 
 @router.post("/goals/complete/{goal_id}", status_code=200)
 def complete_goal(
     goal_id: str,
-    current_user: UserModel = Depends(jwt_auth_guard)
+    current_user: UserModel = Depends(jwt_auth_guard),
+    goals_repository: GoalsRepository = Depends(get_goals_repository)
 ):
     """
     Marca uma meta do usuário como concluída.
-    Atualiza o estado da gamificação.
+    Atualiza o estado da gamificação. A conclusão é atômica no repositório:
+    requisições concorrentes para a mesma meta concluem-na uma única vez.
     """
-    user_id = current_user.id
-    goals = _user_goals_db.get(user_id)
-    
-    if not goals:
-        raise HTTPException(status_code=404, detail="Usuário não possui metas.")
-        
-    goal_to_update: Optional[Goal] = None
-    for goal in goals:
-        if goal.id == goal_id:
-            goal_to_update = goal
-            break
-            
-    if not goal_to_update:
-        raise HTTPException(status_code=404, detail="Meta não encontrada.")
-    
-    if goal_to_update.is_completed:
+    try:
+        result = goals_repository.complete_goal(current_user.id, goal_id)
+    except GoalNotFoundError as e:
+        detail = "Meta não encontrada." if e.user_has_goals else "Usuário não possui metas."
+        raise HTTPException(status_code=404, detail=detail)
+
+    if not result.newly_completed:
         return {"message": "Meta já estava concluída."}
 
-    # Lógica de atualização (simulação)
-    goal_to_update.is_completed = True
-    
     # Lógica real: Acionar um evento de Gamificação (ex: +10 XP, Notificação)
-    print(f"Meta '{goal_to_update.title}' marcada como completa para {current_user.nickname}.")
+    print(f"Meta '{result.goal.title}' marcada como completa para {current_user.nickname}.")
     
     return {"message": "Meta marcada como concluída com sucesso."}
 
-# Exemplo de uso para inclusão no main.py:
-# from app.routers import dashboard
-# app.include_router(dashboard.router, prefix="/api/v1/dashboard", tags=["Dashboard & Goals"])
\ No newline at end of file
+@router.post("/progress/events", status_code=201, response_model=ProgressSummary)
+def record_progress_event(
+    event: ProgressEventRequest,
+    current_user: UserModel = Depends(jwt_auth_guard),
+    ledger: ProgressLedger = Depends(get_progress_ledger)
+):
+    """
+    Registra um evento de progresso (check-in, recaída ou aposta evitada).
+    O agregado do usuário é atualizado na mesma escrita; o snapshot do
+    Dashboard percebe a mudança pela versão do registro.
+    """
+    try:
+        _, progress = ledger.append(current_user.id, event.kind, event.amount)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    now = time.time()
+    return ProgressSummary(
+        days_without_betting=progress.days_without_betting(now),
+        best_streak_days=progress.best_streak_days(now),
+        accumulated_savings=round(progress.accumulated_savings, 2),
+        check_ins=progress.check_ins,
+        relapses=progress.relapses,
+    )
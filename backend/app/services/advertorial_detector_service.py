@@ -1,5 +1,13 @@
+import asyncio
+import hashlib
+import os
 import re
-from typing import Dict, List, Any
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Any, Optional, Sequence, Tuple
+
+from app.config.settings import settings
 
 # Constantes de Heurística baseadas no Backlog
 
@@ -18,14 +26,245 @@ LABEL_KEYWORDS = r'conteúdo patrocinado|publi|parceria paga|advertorial|branded
 # URL suspeita (Peso Médio)
 URL_KEYWORDS = r'conteudo-patrocinado|publ(i|ieditorial)|branded|afiliado|parceria'
 
+# Categorias aplicadas ao conteúdo de texto (na ordem de pontuação do detect)
+TEXT_CATEGORIES = ("OPERATOR", "CTA", "DECEPTIVE", "LABEL")
+
+# Alternativa de regra que é um literal puro (sem metacaracteres de regex)
+_LITERAL_ALTERNATIVE = re.compile(r'[^\\.^$*+?{}\[\]|()]+')
+
+# Caracteres que o re.IGNORECASE equipara a letras das regras ('ı' ~ 'i', 'ſ' ~ 's'),
+# mas que str.lower() preserva. Textos com eles seguem pela varredura por categoria.
+_FOLD_UNSAFE_CHARS = "ıſ"
+
+
+def _build_trie_pattern(literals: List[str]) -> str:
+    """
+    Monta uma regex fatorada em trie (ex: 'bet|betano' -> 'bet(?:ano)?').
+    Os ramos são disjuntos pelo próximo caractere, então a regex casa sempre
+    o literal mais longo possível na posição.
+    """
+    trie: Dict[str, Any] = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def emit(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class MultiPatternMatcher:
+    """
+    Motor de varredura única para as regras de texto (Card 1).
+
+    Compila os literais de todas as categorias em uma única trie-regex e percorre
+    o texto (em minúsculas) uma só vez. Para cada posição candidata, uma tabela
+    pré-calculada indica qual literal cada categoria casaria ali, reproduzindo
+    exatamente a semântica de `pattern.findall` com re.IGNORECASE por categoria
+    (primeira alternativa vence, sem sobreposição dentro da categoria).
+    """
+
+    def __init__(self, categories: Dict[str, str]):
+        literals_by_category: Dict[str, List[str]] = {}
+        for category, pattern in categories.items():
+            alternatives = [alternative.lower() for alternative in pattern.split("|")]
+            if not all(_LITERAL_ALTERNATIVE.fullmatch(alt) for alt in alternatives):
+                raise ValueError(f"A regra '{category}' não é uma alternância de literais.")
+            literals_by_category[category] = alternatives
+
+        self.categories = tuple(literals_by_category)
+        all_literals = sorted({lit for lits in literals_by_category.values() for lit in lits})
+        self.max_literal_length = max(len(literal) for literal in all_literals)
+
+        # Lookahead: encontra todas as posições onde algum literal começa,
+        # inclusive as que se sobrepõem a uma correspondência anterior.
+        self._scanner = re.compile(f"(?=({_build_trie_pattern(all_literals)}))")
+
+        # O literal mais longo de uma posição determina todos os que casam nela
+        # (seus prefixos). Para cada categoria, vale a primeira alternativa da regra.
+        self._resolution: Dict[str, tuple] = {}
+        for longest in all_literals:
+            resolved = []
+            for category, alternatives in literals_by_category.items():
+                for alternative in alternatives:
+                    if longest.startswith(alternative):
+                        resolved.append((category, len(alternative)))
+                        break
+            self._resolution[longest] = tuple(resolved)
+
+    def scan(self, text: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Retorna as correspondências únicas (com a grafia original) por categoria,
+        ou None se o texto não puder ser normalizado posição a posição.
+        """
+        found = {category: set() for category in self.categories}
+        cursor = dict.fromkeys(self.categories, 0)
+        if not self.scan_into(text, found, cursor, len(text)):
+            return None
+        return {category: list(matches) for category, matches in found.items()}
+
+    def scan_into(
+        self, text: str, found: Dict[str, set], cursor: Dict[str, int], limit: int
+    ) -> bool:
+        """
+        Varre as posições iniciais [0, limit) de `text`, acumulando em `found` e
+        avançando `cursor` (fim da última correspondência de cada categoria).
+        Usado pela detecção em streaming, que varre o texto em janelas.
+        Retorna False, sem alterar nada, se o texto não puder ser normalizado.
+        """
+        folded = text.lower()
+        if len(folded) != len(text) or any(char in text for char in _FOLD_UNSAFE_CHARS):
+            return False
+
+        for match in self._scanner.finditer(folded):
+            start = match.start()
+            if start >= limit:
+                break
+            for category, length in self._resolution[match.group(1)]:
+                if start >= cursor[category]:
+                    end = start + length
+                    found[category].add(text[start:end])
+                    cursor[category] = end
+        return True
+
+
+class DetectionStream:
+    """
+    Detecção incremental sobre um corpo recebido em partes (Card 1).
+
+    Cada parte é varrida assim que chega; entre partes fica guardada apenas uma
+    cauda menor que o literal mais longo das regras, então correspondências que
+    cruzam a fronteira entre partes são encontradas e a memória não cresce com o
+    tamanho da página. O relatório final é idêntico ao de `detect` sobre o texto
+    completo. Com `stop_at_cap`, a leitura para quando o score atinge 100
+    (score e risk_label são os mesmos; as evidências ficam parciais).
+    """
+
+    def __init__(self, service: "AdvertorialDetectorService", url: str, stop_at_cap: bool = False):
+        self._service = service
+        self._url = url
+        self._url_matches = service._find_matches(service.rules["URL"][0], url)
+        self._stop_at_cap = stop_at_cap
+        self._found: Dict[str, set] = {category: set() for category in TEXT_CATEGORIES}
+        # Fim da última correspondência de cada categoria, relativo ao início da cauda
+        self._cursor = dict.fromkeys(TEXT_CATEGORIES, 0)
+        self._tail = ""
+        # Sem o motor de varredura única (regras não literais) não há limite para o
+        # tamanho de uma correspondência: o texto é acumulado e varrido no final.
+        self._chunks: Optional[List[str]] = [] if service.matcher is None else None
+        self._keep = service.matcher.max_literal_length - 1 if service.matcher is not None else 0
+        self.capped = False
+
+    def feed(self, chunk: str) -> bool:
+        """Processa mais uma parte do texto. Retorna True se o score já atingiu o teto."""
+        if self.capped or not chunk:
+            return self.capped
+        if self._chunks is not None:
+            self._chunks.append(chunk)
+            return False
+
+        buffer = self._tail + chunk
+        limit = len(buffer) - self._keep
+        if limit <= 0:
+            self._tail = buffer
+            return False
+
+        self._scan(buffer, limit)
+        self._tail = buffer[limit:]
+        for category, end in self._cursor.items():
+            self._cursor[category] = max(0, end - limit)
+
+        if self._stop_at_cap and self._report()["score"] >= 100:
+            self.capped = True
+        return self.capped
+
+    def close(self) -> Dict[str, Any]:
+        """Varre o restante e retorna o relatório final."""
+        if self._chunks is not None:
+            return self._service.detect(self._url, "".join(self._chunks))
+        if not self.capped and self._tail:
+            self._scan(self._tail, len(self._tail))
+            self._tail = ""
+        return self._report()
+
+    def _scan(self, buffer: str, limit: int) -> None:
+        if self._service.matcher.scan_into(buffer, self._found, self._cursor, limit):
+            return
+        # Texto que não pode ser normalizado: varredura por categoria na mesma janela
+        for category in TEXT_CATEGORIES:
+            pattern = self._service.rules[category][0]
+            for match in pattern.finditer(buffer, self._cursor[category]):
+                if match.start() >= limit:
+                    break
+                self._found[category].add(match.group())
+                self._cursor[category] = match.end()
+
+    def _report(self) -> Dict[str, Any]:
+        text_matches = {category: list(matches) for category, matches in self._found.items()}
+        return self._service._build_report(self._url, self._url_matches, text_matches)
+
+
+# --- Execução fora do event loop (detecção é trabalho puro de CPU) ---
+
+# Modos de execução suportados para detect_async / detect_many_async
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+# Detector de cada processo do pool, criado (e aquecido) pelo initializer
+_worker_detector: Optional["AdvertorialDetectorService"] = None
+
+
+def _init_worker_detector() -> None:
+    """Initializer do ProcessPoolExecutor: compila as regras uma vez por processo."""
+    global _worker_detector
+    _worker_detector = AdvertorialDetectorService()
+
+
+def _warm_worker() -> bool:
+    """Tarefa vazia usada para forçar a criação dos processos no aquecimento."""
+    return _worker_detector is not None
+
+
+def _detect_in_worker(url: str, text_content: str) -> Dict[str, Any]:
+    return _worker_detector.detect(url, text_content)
+
+
+def _detect_many_in_worker(documents: Sequence[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    return _worker_detector.detect_many(documents)
+
 
 class AdvertorialDetectorService:
     """
     Serviço de Heurística para detectar Advertoriais pró-aposta (Card 1).
     Analisa URL e conteúdo de texto para gerar um Score de Risco.
+
+    As variantes assíncronas (detect_async / detect_many_async) executam a
+    detecção no modo configurado: "inline" (no próprio event loop), "thread"
+    (ThreadPoolExecutor) ou "process" (ProcessPoolExecutor com as regras já
+    compiladas em cada processo). Documentos menores que `offload_min_chars`
+    são sempre processados inline, pois o custo de despacho superaria o ganho.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        executor_mode: str = "inline",
+        max_workers: Optional[int] = None,
+        offload_min_chars: int = 0,
+    ):
+        if executor_mode not in EXECUTOR_MODES:
+            raise ValueError(f"Modo de execução inválido: '{executor_mode}'. Use um de {EXECUTOR_MODES}.")
+        self.executor_mode = executor_mode
+        self.max_workers = max_workers
+        self.offload_min_chars = offload_min_chars
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+
         # Compila os padrões Regex para performance
         self.rules = {
             "OPERATOR": (re.compile(OPERATOR_KEYWORDS, re.IGNORECASE), 25),
@@ -34,52 +273,203 @@ class AdvertorialDetectorService:
             "LABEL": (re.compile(LABEL_KEYWORDS, re.IGNORECASE), 15),
             "URL": (re.compile(URL_KEYWORDS, re.IGNORECASE), 15),
         }
+        # Motor de varredura única para as categorias de texto
+        try:
+            self.matcher: Optional[MultiPatternMatcher] = MultiPatternMatcher(
+                {category: self.rules[category][0].pattern for category in TEXT_CATEGORIES}
+            )
+        except ValueError:
+            # Regras com regex não literal: mantém a varredura por categoria
+            self.matcher = None
         print("AdvertorialDetectorService inicializado com heurísticas.")
 
+    @property
+    def rules_version(self) -> int:
+        """Identifica o conjunto de regras atual (muda se qualquer regra ou peso mudar)."""
+        return hash(tuple(
+            (name, pattern.pattern, pattern.flags, weight)
+            for name, (pattern, weight) in self.rules.items()
+        ))
+
+    def cache_key(self, url: str, text_content: str) -> Tuple[bytes, frozenset]:
+        """
+        Chave de cache de um documento: hash do conteúdo normalizado mais as
+        entradas da regra de URL (as únicas partes da URL que afetam o relatório).
+        Espaços nas bordas são descartados: nenhum literal das regras começa ou
+        termina com espaço, então isso não altera o resultado.
+        """
+        digest = hashlib.blake2b(text_content.strip().encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        return digest, frozenset(self._find_matches(self.rules["URL"][0], url))
+
     def _find_matches(self, pattern: re.Pattern, text: str) -> List[str]:
         """Helper para encontrar todas as correspondências de um padrão."""
         return list(set(pattern.findall(text))) # Lista de correspondências únicas
 
+    def _find_text_matches(self, text: str) -> Dict[str, List[str]]:
+        """
+        Correspondências únicas de cada categoria de texto.
+        Usa o motor de varredura única e, se indisponível, uma varredura por categoria.
+        """
+        matches = self.matcher.scan(text) if self.matcher is not None else None
+        if matches is None:
+            matches = {
+                category: self._find_matches(self.rules[category][0], text)
+                for category in TEXT_CATEGORIES
+            }
+        return matches
+
     def detect(self, url: str, text_content: str) -> Dict[str, Any]:
         """
         Executa a detecção na URL e no conteúdo de texto, retornando o Score e as Evidências.
        
         """
-        score = 0
-        evidence = {}
-        
         # 1. Análise da URL
         url_matches = self._find_matches(self.rules["URL"][0], url)
+
+        # 2. Análise do Conteúdo de Texto (varredura única para todas as categorias)
+        text_matches = self._find_text_matches(text_content)
+
+        return self._build_report(url, url_matches, text_matches)
+
+    def detect_many(self, documents: Sequence[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Executa a detecção em lote sobre pares (url, text_content).
+
+        Reaproveita o estado compilado do serviço e varre cada URL e cada conteúdo
+        distinto apenas uma vez (conteúdo sindicado se repete entre portais).
+        Os relatórios são idênticos aos de `detect` e seguem a ordem de entrada.
+        """
+        url_cache: Dict[str, List[str]] = {}
+        text_cache: Dict[str, Dict[str, List[str]]] = {}
+        reports = []
+
+        for url, text_content in documents:
+            url_matches = url_cache.get(url)
+            if url_matches is None:
+                url_matches = url_cache[url] = self._find_matches(self.rules["URL"][0], url)
+
+            text_matches = text_cache.get(text_content)
+            if text_matches is None:
+                text_matches = text_cache[text_content] = self._find_text_matches(text_content)
+
+            reports.append(self._build_report(url, url_matches, text_matches))
+
+        return reports
+
+    # --- Detecção em streaming ---
+
+    def open_stream(self, url: str, stop_at_cap: bool = False) -> DetectionStream:
+        """Abre uma detecção incremental para um corpo recebido em partes."""
+        return DetectionStream(self, url, stop_at_cap=stop_at_cap)
+
+    def detect_stream(self, url: str, chunks: Iterable[str], stop_at_cap: bool = False) -> Dict[str, Any]:
+        """
+        Executa a detecção consumindo `chunks` (ex: um gerador lendo o corpo da página)
+        sem montar o texto completo em memória. Veja DetectionStream.
+        """
+        stream = self.open_stream(url, stop_at_cap=stop_at_cap)
+        for chunk in chunks:
+            if stream.feed(chunk):
+                break
+        return stream.close()
+
+    # --- Execução assíncrona / Executor ---
+
+    def _get_executor(self) -> Executor:
+        """Cria o executor sob demanda (nada de processos/threads no import)."""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    if self.executor_mode == "process":
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            initializer=_init_worker_detector,
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix="advertorial-detector",
+                        )
+        return self._executor
+
+    def _should_offload(self, size: int) -> bool:
+        return self.executor_mode != "inline" and size >= self.offload_min_chars
+
+    def warm_up(self) -> None:
+        """
+        Inicia todos os processos do pool (modo "process") para que a primeira
+        requisição grande não pague o custo de spawn e de compilação das regras.
+        """
+        if self.executor_mode != "process":
+            return
+        executor = self._get_executor()
+        # Tarefas submetidas juntas: o pool cria um processo para cada uma
+        workers = self.max_workers or os.cpu_count() or 1
+        for future in [executor.submit(_warm_worker) for _ in range(workers)]:
+            future.result()
+
+    async def detect_async(self, url: str, text_content: str) -> Dict[str, Any]:
+        """Versão assíncrona de `detect` que não bloqueia o event loop em documentos grandes."""
+        if not self._should_offload(len(text_content)):
+            return self.detect(url, text_content)
+
+        loop = asyncio.get_running_loop()
+        if self.executor_mode == "process":
+            return await loop.run_in_executor(self._get_executor(), _detect_in_worker, url, text_content)
+        return await loop.run_in_executor(self._get_executor(), self.detect, url, text_content)
+
+    async def detect_many_async(self, documents: Sequence[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Versão assíncrona de `detect_many` (o limiar considera o tamanho total do lote)."""
+        if not self._should_offload(sum(len(text) for _, text in documents)):
+            return self.detect_many(documents)
+
+        loop = asyncio.get_running_loop()
+        if self.executor_mode == "process":
+            return await loop.run_in_executor(self._get_executor(), _detect_many_in_worker, list(documents))
+        return await loop.run_in_executor(self._get_executor(), self.detect_many, documents)
+
+    def shutdown(self) -> None:
+        """Encerra o executor (threads ou processos), se tiver sido criado."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def _build_report(
+        self, url: str, url_matches: List[str], text_matches: Dict[str, List[str]]
+    ) -> Dict[str, Any]:
+        """Calcula o Score e monta o relatório a partir das correspondências encontradas."""
+        score = 0
+        evidence = {}
+
         if url_matches:
             score += self.rules["URL"][1]
-            evidence["URL_MATCHES"] = url_matches
-            
-        # 2. Análise do Conteúdo de Texto
-        
+            evidence["URL_MATCHES"] = list(url_matches)
+
         # Operadoras
-        op_matches = self._find_matches(self.rules["OPERATOR"][0], text_content)
+        op_matches = text_matches["OPERATOR"]
         if op_matches:
             # Peso maior para múltiplas menções
             score += self.rules["OPERATOR"][1] + (len(op_matches) * 2) 
-            evidence["OPERATOR_MATCHES"] = op_matches
+            evidence["OPERATOR_MATCHES"] = list(op_matches)
 
         # CTAs
-        cta_matches = self._find_matches(self.rules["CTA"][0], text_content)
+        cta_matches = text_matches["CTA"]
         if cta_matches:
             score += self.rules["CTA"][1] + (len(cta_matches) * 5)
-            evidence["CTA_MATCHES"] = cta_matches
+            evidence["CTA_MATCHES"] = list(cta_matches)
 
         # Linguagem Enganosa
-        deceptive_matches = self._find_matches(self.rules["DECEPTIVE"][0], text_content)
+        deceptive_matches = text_matches["DECEPTIVE"]
         if deceptive_matches:
             score += self.rules["DECEPTIVE"][1] + (len(deceptive_matches) * 10)
-            evidence["DECEPTIVE_MATCHES"] = deceptive_matches
+            evidence["DECEPTIVE_MATCHES"] = list(deceptive_matches)
 
         # Rótulos
-        label_matches = self._find_matches(self.rules["LABEL"][0], text_content)
+        label_matches = text_matches["LABEL"]
         if label_matches:
             score += self.rules["LABEL"][1]
-            evidence["LABEL_MATCHES"] = label_matches
+            evidence["LABEL_MATCHES"] = list(label_matches)
 
         # 3. Normalização do Score (0-100)
         final_score = min(score, 100)
@@ -99,6 +489,20 @@ class AdvertorialDetectorService:
             "url_analyzed": url
         }
 
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_advertorial_detector_service() -> AdvertorialDetectorService:
+    """
+    Ponto de entrada (Singleton) para o sistema de injeção de dependência.
+    As regras são compiladas uma única vez e compartilhadas entre requisições.
+    """
+    return AdvertorialDetectorService(
+        executor_mode=settings.DETECTOR_EXECUTOR_MODE,
+        max_workers=settings.DETECTOR_EXECUTOR_WORKERS,
+        offload_min_chars=settings.DETECTOR_OFFLOAD_MIN_CHARS,
+    )
+
 # Exemplo de uso (para ser usado pelo Router):
 # if __name__ == "__main__":
 #     service = AdvertorialDetectorService()
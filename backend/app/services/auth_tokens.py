@@ -0,0 +1,308 @@
+"""
+Emissão e verificação de JWT sem consulta a banco (stateless).
+
+- HS256 com a biblioteca padrão (hmac); EdDSA (Ed25519) se o pacote
+  `cryptography` estiver instalado.
+- Material de chave processado uma vez: o HMAC já inicializado com o segredo
+  (cada verificação só copia o estado) e as chaves Ed25519 já carregadas.
+  O cabeçalho do token (igual para todos os tokens de uma chave) também é
+  decodificado uma vez só.
+- Claims de tokens vistos recentemente ficam num cache limitado com TTL (nunca
+  além do `exp`): o caminho quente de um app que repete o mesmo token é uma
+  consulta ao cache.
+- Rotação: `rotate()` passa a assinar com a chave nova e continua aceitando as
+  anteriores (pelo `kid` do cabeçalho); `retire()` deixa de aceitar uma chave e
+  descarta o cache de claims.
+- Logout: `revoke()` registra o `jti` na lista de revogação (token_revocation),
+  consultada a cada verificação, inclusive nos acertos do cache de claims.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.result_cache import ResultCache
+from app.services.token_revocation import TokenRevocationList, get_token_revocation_list
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+except ImportError:  # EdDSA é opcional; HS256 funciona só com a biblioteca padrão
+    Ed25519PrivateKey = None
+
+
+class InvalidTokenError(ValueError):
+    """Token malformado, com assinatura inválida, expirado ou de chave desconhecida."""
+
+
+def b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def b64url_decode(segment: str) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+    except (ValueError, TypeError) as e:
+        raise InvalidTokenError("Segmento base64url inválido.") from e
+
+
+def _json_segment(value: Mapping[str, Any]) -> str:
+    return b64url_encode(json.dumps(value, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+
+
+@lru_cache(maxsize=256)
+def _parse_header(segment: str) -> Tuple[str, Optional[str]]:
+    """(alg, kid) do cabeçalho. Cacheado: o segmento se repete em todos os tokens da chave."""
+    try:
+        header = json.loads(b64url_decode(segment))
+    except ValueError as e:
+        raise InvalidTokenError("Cabeçalho do token inválido.") from e
+    if not isinstance(header, dict) or header.get("typ", "JWT") != "JWT":
+        raise InvalidTokenError("Cabeçalho do token inválido.")
+    alg, kid = header.get("alg"), header.get("kid")
+    # kid vira chave de dicionário: tipos não-string (ex: lista) não podem virar erro 500
+    if not isinstance(alg, str) or not (kid is None or isinstance(kid, str)):
+        raise InvalidTokenError("Cabeçalho do token inválido.")
+    return alg, kid
+
+
+class SigningKey:
+    """Chave já processada: assina (se tiver a parte privada) e verifica."""
+
+    def __init__(self, kid: str, alg: str, sign: Optional[Callable[[bytes], bytes]], verify: Callable[[bytes, bytes], bool]):
+        self.kid = kid
+        self.alg = alg
+        self._sign = sign
+        self.verify = verify
+        # Cabeçalho pronto: emitir um token só serializa as claims
+        self.header_segment = _json_segment({"alg": alg, "kid": kid, "typ": "JWT"})
+
+    @property
+    def can_sign(self) -> bool:
+        return self._sign is not None
+
+    def sign(self, message: bytes) -> bytes:
+        if self._sign is None:
+            raise RuntimeError(f"A chave {self.kid!r} só verifica (sem parte privada).")
+        return self._sign(message)
+
+    @classmethod
+    def hs256(cls, secret: str, kid: Optional[str] = None) -> "SigningKey":
+        secret_bytes = secret.encode("utf-8")
+        if len(secret_bytes) < 32:
+            raise ValueError("O segredo HS256 deve ter pelo menos 32 bytes.")
+        base = hmac.new(secret_bytes, digestmod=hashlib.sha256)
+
+        def sign(message: bytes) -> bytes:
+            mac = base.copy()  # evita refazer o processamento da chave a cada token
+            mac.update(message)
+            return mac.digest()
+
+        def verify(message: bytes, signature: bytes) -> bool:
+            return hmac.compare_digest(sign(message), signature)
+
+        # kid derivado do segredo: o mesmo em todos os workers, sem expor o segredo
+        kid = kid or "hs-" + hashlib.sha256(b"kid:" + secret_bytes).hexdigest()[:12]
+        return cls(kid, "HS256", sign, verify)
+
+    @classmethod
+    def eddsa(cls, private_pem: Optional[bytes] = None, public_pem: Optional[bytes] = None, kid: Optional[str] = None) -> "SigningKey":
+        if Ed25519PrivateKey is None:
+            raise RuntimeError("Tokens EdDSA requerem o pacote cryptography (pip install cryptography).")
+        private_key = serialization.load_pem_private_key(private_pem, password=None) if private_pem else None
+        public_key = private_key.public_key() if private_key is not None else serialization.load_pem_public_key(public_pem)
+        if not isinstance(public_key, Ed25519PublicKey):
+            raise ValueError("A chave EdDSA deve ser Ed25519.")
+
+        def verify(message: bytes, signature: bytes) -> bool:
+            try:
+                public_key.verify(signature, message)
+                return True
+            except InvalidSignature:
+                return False
+
+        raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        kid = kid or "ed-" + hashlib.sha256(raw).hexdigest()[:12]
+        return cls(kid, "EdDSA", private_key.sign if private_key is not None else None, verify)
+
+
+class JWTService:
+    """Emite e verifica tokens de acesso com as chaves do worker."""
+
+    def __init__(
+        self,
+        active_key: SigningKey,
+        previous_keys: Iterable[SigningKey] = (),
+        issuer: str = "antibet-backend",
+        ttl_seconds: int = 3600,
+        leeway_seconds: int = 30,
+        claims_cache: Optional[ResultCache] = None,
+        claims_cache_ttl_seconds: float = 300.0,
+        revocations: Optional[TokenRevocationList] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if not active_key.can_sign:
+            raise ValueError("A chave ativa precisa da parte privada para assinar.")
+        self.issuer = issuer
+        self.ttl_seconds = ttl_seconds
+        self.leeway_seconds = leeway_seconds
+        self.claims_cache_ttl_seconds = claims_cache_ttl_seconds
+        self._clock = clock
+        self._active = active_key
+        # Trocado por cópia (nunca alterado no lugar): leituras sem lock
+        self._keys: Dict[str, SigningKey] = {key.kid: key for key in (*previous_keys, active_key)}
+        self._rotation_lock = threading.Lock()
+        # Tamanho fixo por entrada: os limites são por número de tokens
+        if claims_cache is None:
+            claims_cache = ResultCache(max_entries=50_000, sizeof=lambda _: 1)
+        self._claims_cache = claims_cache
+        self.revocations = revocations
+        self._counters = {"issued": 0, "verified": 0, "rejected": 0, "revoked": 0}
+
+    @property
+    def active_kid(self) -> str:
+        return self._active.kid
+
+    def issue(self, subject: str, claims: Optional[Mapping[str, Any]] = None, ttl_seconds: Optional[int] = None) -> str:
+        """Token assinado com a chave ativa (claims: sub, iss, iat, exp, jti + extras)."""
+        now = int(self._clock())
+        payload = {
+            **(claims or {}),
+            "sub": subject,
+            "iss": self.issuer,
+            "iat": now,
+            "exp": now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds),
+            "jti": secrets.token_urlsafe(12),
+        }
+        key = self._active
+        signing_input = f"{key.header_segment}.{_json_segment(payload)}"
+        self._counters["issued"] += 1
+        return f"{signing_input}.{b64url_encode(key.sign(signing_input.encode('ascii')))}"
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Claims do token (não alterar o dict retornado). Levanta InvalidTokenError."""
+        now = self._clock()
+        claims = self._claims_cache.get(token)
+        if claims is None or now >= claims["exp"] + self.leeway_seconds:
+            try:
+                claims = self._decode(token, now)
+            except InvalidTokenError:
+                self._counters["rejected"] += 1
+                raise
+            # Nunca além do exp (+ tolerância): o cache não prolonga a validade do token
+            ttl = min(self.claims_cache_ttl_seconds, claims["exp"] + self.leeway_seconds - now)
+            self._claims_cache.put(token, claims, ttl_seconds=ttl)
+        # Depois do cache: um logout vale também para tokens já verificados
+        if self.revocations is not None and "jti" in claims and self.revocations.is_revoked(claims["jti"]):
+            self._counters["revoked"] += 1
+            raise InvalidTokenError("Token revogado.")
+        self._counters["verified"] += 1
+        return claims
+
+    def revoke(self, token: str) -> Dict[str, Any]:
+        """Revoga o token (logout) até o exp dele; retorna as claims. Levanta InvalidTokenError."""
+        if self.revocations is None:
+            raise RuntimeError("Serviço de tokens sem lista de revogação configurada.")
+        claims = self.verify(token)
+        if "jti" not in claims:
+            raise InvalidTokenError("Token sem jti não pode ser revogado.")
+        self.revocations.revoke(claims["jti"], claims["exp"] + self.leeway_seconds)
+        return claims
+
+    def _decode(self, token: str, now: float) -> Dict[str, Any]:
+        header_segment, _, rest = token.partition(".")
+        payload_segment, _, signature_segment = rest.partition(".")
+        if not header_segment or not payload_segment or not signature_segment or "." in signature_segment:
+            raise InvalidTokenError("Token malformado.")
+        alg, kid = _parse_header(header_segment)
+        key = self._keys.get(kid)
+        if key is None:
+            raise InvalidTokenError("Chave de assinatura desconhecida.")
+        if alg != key.alg:  # impede troca de algoritmo (ex: "none" ou HS256 com chave pública)
+            raise InvalidTokenError("Algoritmo do token não corresponde à chave.")
+        signing_input = token[: len(header_segment) + 1 + len(payload_segment)].encode("ascii", "replace")
+        if not key.verify(signing_input, b64url_decode(signature_segment)):
+            raise InvalidTokenError("Assinatura inválida.")
+
+        try:
+            claims = json.loads(b64url_decode(payload_segment))
+        except ValueError as e:
+            raise InvalidTokenError("Claims inválidas.") from e
+        if not isinstance(claims, dict) or not isinstance(claims.get("exp"), (int, float)) or "sub" not in claims:
+            raise InvalidTokenError("Claims obrigatórias ausentes.")
+        if now >= claims["exp"] + self.leeway_seconds:
+            raise InvalidTokenError("Token expirado.")
+        if isinstance(claims.get("nbf"), (int, float)) and now + self.leeway_seconds < claims["nbf"]:
+            raise InvalidTokenError("Token ainda não é válido.")
+        if claims.get("iss") != self.issuer:
+            raise InvalidTokenError("Emissor do token inválido.")
+        return claims
+
+    def rotate(self, new_key: SigningKey) -> None:
+        """Passa a assinar com `new_key`; as chaves anteriores continuam aceitas."""
+        if not new_key.can_sign:
+            raise ValueError("A chave ativa precisa da parte privada para assinar.")
+        with self._rotation_lock:
+            self._keys = {**self._keys, new_key.kid: new_key}
+            self._active = new_key
+
+    def retire(self, kid: str) -> None:
+        """Deixa de aceitar a chave `kid` (tokens dela, inclusive os cacheados, passam a falhar)."""
+        with self._rotation_lock:
+            if kid == self._active.kid:
+                raise ValueError("Não é possível aposentar a chave ativa; faça a rotação antes.")
+            self._keys = {k: key for k, key in self._keys.items() if k != kid}
+            self._claims_cache.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        cache = self._claims_cache.stats()
+        lookups = cache["hits"] + cache["misses"]
+        return {
+            **self._counters,
+            "active_kid": self._active.kid,
+            "accepted_kids": sorted(self._keys),
+            "claims_cache": {**cache, "hit_rate": cache["hits"] / lookups if lookups else 0.0},
+            "revocation": self.revocations.stats() if self.revocations is not None else None,
+        }
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_jwt_service() -> JWTService:
+    """
+    Serviço de tokens (Singleton) com as chaves da configuração. As chaves
+    "anteriores" continuam aceitas na verificação (rotação sem derrubar sessões).
+    """
+    if settings.JWT_ALGORITHM == "EdDSA":
+        if not settings.JWT_PRIVATE_KEY_PATH:
+            raise RuntimeError("JWT_ALGORITHM=EdDSA requer JWT_PRIVATE_KEY_PATH.")
+        active = SigningKey.eddsa(private_pem=_read(settings.JWT_PRIVATE_KEY_PATH))
+        previous = [SigningKey.eddsa(public_pem=_read(p.strip())) for p in settings.JWT_PREVIOUS_PUBLIC_KEY_PATHS.split(",") if p.strip()]
+    elif settings.JWT_ALGORITHM == "HS256":
+        active = SigningKey.hs256(settings.JWT_SECRET_KEY)
+        previous = [SigningKey.hs256(s.strip()) for s in settings.JWT_PREVIOUS_SECRET_KEYS.split(",") if s.strip()]
+    else:
+        raise RuntimeError(f"JWT_ALGORITHM não suportado: {settings.JWT_ALGORITHM!r} (use HS256 ou EdDSA).")
+    return JWTService(
+        active,
+        previous,
+        issuer=settings.JWT_ISSUER,
+        ttl_seconds=settings.JWT_ACCESS_TOKEN_TTL_SECONDS,
+        leeway_seconds=settings.JWT_LEEWAY_SECONDS,
+        claims_cache=ResultCache(max_entries=settings.JWT_CLAIMS_CACHE_SIZE, sizeof=lambda _: 1),
+        claims_cache_ttl_seconds=settings.JWT_CLAIMS_CACHE_TTL_SECONDS,
+        revocations=get_token_revocation_list(),
+    )
@@ -0,0 +1,236 @@
+"""
+Orquestração assíncrona do Chat (RAG + perfil + LLM em streaming).
+
+Cada turno:
+1. busca o contexto do RAG (em thread, fora do event loop) e o perfil do
+   usuário concorrentemente;
+2. monta as mensagens do LLM dentro do orçamento de tokens (chat_prompt),
+   a partir do prefixo cacheado do usuário e do histórico guardado no
+   servidor (chat_session): o cliente envia só a mensagem nova;
+3. repassa os tokens do provedor à medida que chegam e, ao final, registra a
+   troca na sessão.
+
+A métrica principal é o tempo até o primeiro token (TTFT), medido desde o
+início do turno; `ChatMetrics` mantém os percentis de uma janela recente.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence
+
+from app.config.settings import settings
+from app.services.chat_prompt import PromptBuilder, PromptPlan
+from app.services.chat_session import ChatSessionStore, get_chat_session_store
+from app.services.llm_client import LLMClient, get_llm_client
+from app.services.rag_service import RAGService, get_rag_service
+from app.services.token_counter import count_tokens
+from app.services.user_profile_service import UserProfileService, get_user_profile_service
+
+logger = logging.getLogger(__name__)
+
+def _percentile(samples: Sequence[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+
+class ChatMetrics:
+    """Latências dos turnos do Chat (janela dos últimos `window` turnos) e contadores."""
+
+    def __init__(self, window: int = 1000):
+        self._ttft_ms: deque = deque(maxlen=window)
+        self._total_ms: deque = deque(maxlen=window)
+        self._prepare_ms: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._counters = {"turns": 0, "errors": 0, "tokens": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0}
+
+    def record(self, turn: "ChatTurn") -> None:
+        with self._lock:
+            self._counters["turns"] += 1
+            self._counters["tokens"] += turn.token_usage
+            self._counters["prompt_tokens"] += turn.prompt_tokens
+            self._counters["cached_prompt_tokens"] += turn.cached_prompt_tokens
+            if turn.error is not None:
+                self._counters["errors"] += 1
+            if turn.ttft_ms is not None:
+                self._ttft_ms.append(turn.ttft_ms)
+            if turn.prepare_ms is not None:
+                self._prepare_ms.append(turn.prepare_ms)
+            if turn.total_ms is not None:
+                self._total_ms.append(turn.total_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            ttft, total, prepare = list(self._ttft_ms), list(self._total_ms), list(self._prepare_ms)
+            counters = dict(self._counters)
+        return {
+            **counters,
+            # Fração do prompt servida pelo cache do provedor (quando ele informa)
+            "provider_cache_rate": counters["cached_prompt_tokens"] / counters["prompt_tokens"] if counters["prompt_tokens"] else 0.0,
+            "ttft_ms": {"p50": _percentile(ttft, 0.5), "p95": _percentile(ttft, 0.95), "p99": _percentile(ttft, 0.99)},
+            "prepare_ms": {"p50": _percentile(prepare, 0.5), "p95": _percentile(prepare, 0.95)},
+            "total_ms": {"p50": _percentile(total, 0.5), "p95": _percentile(total, 0.95)},
+        }
+
+
+class ChatTurn:
+    """
+    Um turno de conversa em andamento. `stream()` gera os tokens da resposta;
+    ao final, `summary()` traz o uso e as latências do turno.
+    """
+
+    def __init__(self, orchestrator: "ChatOrchestrator", message: str, history: Sequence[Mapping[str, str]], user: Any):
+        self._orchestrator = orchestrator
+        self.message = message
+        self.history = history
+        self.user = user
+        self.started = time.perf_counter()
+        self.prepare_ms: Optional[float] = None
+        self.ttft_ms: Optional[float] = None
+        self.total_ms: Optional[float] = None
+        self.tokens = 0  # partes de texto recebidas do provedor
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_prompt_tokens = 0  # parte do prompt que o provedor serviu do cache dele
+        self.plan: Optional[PromptPlan] = None
+        self.error: Optional[Exception] = None
+        self.response: Optional[str] = None
+
+    def _elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 2)
+
+    async def stream(self) -> AsyncIterator[str]:
+        orchestrator = self._orchestrator
+        parts: List[str] = []
+        usage: Dict[str, int] = {}
+        try:
+            self.plan = await orchestrator.build_prompt(self.message, self.history, self.user)
+            self.prepare_ms = self._elapsed_ms()
+            async for token in orchestrator.llm.stream(self.plan.messages, orchestrator.max_tokens, usage):
+                if self.ttft_ms is None:
+                    self.ttft_ms = self._elapsed_ms()
+                self.tokens += 1
+                parts.append(token)
+                yield token
+            self.response = "".join(parts)
+            # Uso informado pelo provedor; sem ele, a contagem local
+            self.prompt_tokens = usage.get("prompt_tokens", self.plan.prompt_tokens)
+            self.completion_tokens = usage.get("completion_tokens") or count_tokens(self.response)
+            self.cached_prompt_tokens = usage.get("cached_prompt_tokens", 0)
+            orchestrator.sessions.append_exchange(self.user.id, self.message, self.response)
+        except Exception as e:
+            self.error = e
+            raise
+        finally:
+            self.total_ms = self._elapsed_ms()
+            orchestrator.metrics.record(self)
+
+    @property
+    def token_usage(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "token_usage": self.token_usage,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "history_turns": self.plan.history_turns if self.plan else 0,
+            "stable_prefix_tokens": self.plan.stable_prefix_tokens if self.plan else 0,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "assembly_ms": round(self.plan.assembly_ms, 3) if self.plan else None,
+            "ttft_ms": self.ttft_ms,
+            "prepare_ms": self.prepare_ms,
+            "total_ms": self.total_ms,
+        }
+
+
+class ChatOrchestrator:
+    """Liga RAG, perfil do usuário, sessão e o cliente de LLM para os turnos do Chat."""
+
+    def __init__(
+        self,
+        rag_service: RAGService,
+        llm: LLMClient,
+        profiles: UserProfileService,
+        max_tokens: int = 512,
+        metrics: Optional[ChatMetrics] = None,
+        sessions: Optional[ChatSessionStore] = None,
+        prompt_builder: Optional[PromptBuilder] = None,
+    ):
+        self.rag_service = rag_service
+        self.llm = llm
+        self.profiles = profiles
+        self.max_tokens = max_tokens
+        self.metrics = metrics or ChatMetrics()
+        self.sessions = sessions or ChatSessionStore()
+        self.prompt_builder = prompt_builder or PromptBuilder()
+        # Perfil alterado: o prefixo cacheado do usuário deixa de valer
+        profiles.add_listener(self.prompt_builder.prefixes.invalidate)
+        print(f"ChatOrchestrator inicializado (provedor LLM: {llm.name}).")
+
+    async def build_prompt(self, message: str, history: Sequence[Mapping[str, str]], user: Any) -> PromptPlan:
+        """
+        Prompt do turno: RAG (thread) e perfil (I/O assíncrono) buscados em paralelo,
+        histórico da sessão do servidor. Um `history` não vazio (clientes antigos,
+        que reenviam a conversa) substitui a sessão antes da montagem.
+        """
+        loop = asyncio.get_running_loop()
+        rag_future = loop.run_in_executor(None, self.rag_service.retrieve_context, message)
+        try:
+            profile = await self.profiles.get_profile(user.id)
+        finally:
+            rag_context = await rag_future
+        profile = profile or {}
+
+        if history:
+            self.sessions.replace(user.id, history)
+        # Contexto de Personalização do Usuário (perfil, com os dados do token como reserva)
+        prefix = self.prompt_builder.prefixes.get(
+            user.id,
+            str(profile.get("nickname", user.nickname)), str(profile.get("gender", user.gender)), int(profile.get("age", user.age)),
+        )
+        plan = self.prompt_builder.build(prefix, rag_context, self.sessions.snapshot(user.id), message)
+        logger.debug(
+            f"Turno do chat: {len(plan.messages)} mensagens, {plan.prompt_tokens} tokens, "
+            f"{plan.history_turns} turnos na íntegra, {plan.omitted_turns} omitidos."
+        )
+        return plan
+
+    def start_turn(self, message: str, history: Sequence[Mapping[str, str]], user: Any) -> ChatTurn:
+        return ChatTurn(self, message, history, user)
+
+    async def complete(self, message: str, history: Sequence[Mapping[str, str]], user: Any) -> ChatTurn:
+        """Turno sem streaming: consome os tokens; o texto fica em `turn.response`."""
+        turn = self.start_turn(message, history, user)
+        async for _ in turn.stream():
+            pass
+        return turn
+
+    async def aclose(self) -> None:
+        await self.llm.aclose()
+
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_chat_orchestrator() -> ChatOrchestrator:
+    """
+    Orquestrador (Singleton) com os serviços compartilhados do worker.
+    """
+    return ChatOrchestrator(
+        rag_service=get_rag_service(),
+        llm=get_llm_client(),
+        profiles=get_user_profile_service(),
+        max_tokens=settings.LLM_MAX_TOKENS,
+        metrics=ChatMetrics(window=settings.CHAT_METRICS_WINDOW),
+        sessions=get_chat_session_store(),
+        prompt_builder=PromptBuilder(
+            settings.CHAT_PROMPT_MAX_TOKENS,
+            prefix_cache_size=settings.CHAT_PROMPT_PREFIX_CACHE_SIZE,
+            metrics_window=settings.CHAT_METRICS_WINDOW,
+        ),
+    )
@@ -0,0 +1,227 @@
+"""
+Montagem do prompt do Chat: templates pré-compilados, prefixo por usuário
+cacheado e orçamento de tokens.
+
+Layout estável (do mais fixo para o mais variável), para que o cache de prompt
+do provedor (que reaproveita o prefixo idêntico de requisições anteriores)
+acerte o máximo possível:
+
+    1. SYSTEM_PROMPT                      igual para todos os usuários
+    2. contexto do usuário                fixo enquanto o perfil não mudar
+    3. resumo da conversa anterior        muda só quando a sessão compacta
+    4. turnos recentes (na íntegra)       só crescem no fim entre um turno e outro
+    5. contexto RAG                       depende da mensagem
+    6. mensagem do usuário
+
+Os templates são analisados uma vez na importação (segmentos literais +
+campos); renderizar é só juntar strings. O prefixo (1 + 2) de cada usuário
+fica num cache LRU com sua contagem de tokens e é invalidado quando o perfil
+muda. `PromptBuilder.stats()` expõe o tempo de montagem e a taxa de acerto.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from string import Formatter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from app.services.chat_session import SessionSnapshot
+from app.services.llm_client import ChatMessages
+from app.services.token_counter import MESSAGE_OVERHEAD_TOKENS, count_tokens
+
+# --- PROMPT DE SISTEMA DA IA (ORQUESTRADOR) ---
+
+SYSTEM_PROMPT = """
+Você é o AntiBet Coach. Sua missão é fornecer apoio psicológico e educacional de forma empática e sem julgamentos.
+REGRAS:
+1. Responda como uma amiga digital, solidária e empática (Zero Julgamento).
+2. Use Terapia Cognitivo-Comportamental (TCC) e Mindfulness (Urge Surfing).
+3. Adapte seu tom ao gênero e idade do usuário.
+4. Chame o usuário pelo apelido.
+5. NUNCA substitua tratamento clínico.
+"""
+
+
+class PromptTemplate:
+    """Template no formato str.format, analisado uma única vez em segmentos."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self._segments: List[Tuple[str, Optional[str]]] = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if spec or conversion:
+                raise ValueError(f"Template não suporta formatação/conversão: {{{field}!{conversion}:{spec}}}")
+            self._segments.append((literal, field))
+        self.fields = frozenset(field for _, field in self._segments if field)
+
+    def render(self, **values: Any) -> str:
+        parts: List[str] = []
+        for literal, field in self._segments:
+            parts.append(literal)
+            if field:
+                parts.append(str(values[field]))
+        return "".join(parts)
+
+
+USER_CONTEXT_TEMPLATE = PromptTemplate(
+    "--- CONTEXTO DO USUÁRIO ---\n"
+    "Apelido: {nickname}\n"
+    "Gênero: {gender}\n"
+    "Idade: {age}\n"
+)
+SUMMARY_TEMPLATE = PromptTemplate("--- RESUMO DA CONVERSA ANTERIOR ---\n{summary}")
+
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+_SYSTEM_TOKENS = count_tokens(SYSTEM_PROMPT) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _percentile(samples: List[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 4)
+
+
+class PromptPrefix(NamedTuple):
+    """Mensagens fixas do início do prompt de um usuário e seus tokens."""
+    messages: Tuple[Dict[str, str], ...]
+    tokens: int
+
+
+class PrefixCache:
+    """
+    Prefixo (sistema + contexto do usuário) por usuário, LRU com `max_entries`.
+    Cada entrada guarda os campos do perfil com que foi montada: um perfil
+    diferente reconstrói a entrada mesmo sem invalidação explícita.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[tuple, PromptPrefix]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def get(self, user_id: str, nickname: str, gender: str, age: int) -> PromptPrefix:
+        fields = (nickname, gender, age)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == fields:
+                self._entries.move_to_end(user_id)
+                self._counters["hits"] += 1
+                return entry[1]
+            self._counters["misses"] += 1
+            if entry is not None:
+                self._counters["invalidations"] += 1  # perfil mudou
+
+        content = USER_CONTEXT_TEMPLATE.render(nickname=nickname, gender=gender, age=age)
+        prefix = PromptPrefix(
+            (_SYSTEM_MESSAGE, {"role": "system", "content": content}),
+            _SYSTEM_TOKENS + count_tokens(content) + MESSAGE_OVERHEAD_TOKENS,
+        )
+        with self._lock:
+            self._entries[user_id] = (fields, prefix)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+        return prefix
+
+    def invalidate(self, user_id: str) -> None:
+        """Descarta o prefixo do usuário (ex: perfil atualizado)."""
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+            }
+
+
+class PromptPlan(NamedTuple):
+    messages: ChatMessages
+    prompt_tokens: int
+    stable_prefix_tokens: int   # tokens antes do contexto RAG (reaproveitáveis pelo provedor)
+    history_turns: int          # turnos recentes incluídos na íntegra
+    omitted_turns: int          # turnos da sessão que não couberam no orçamento
+    summary_included: bool
+    assembly_ms: float
+
+
+class PromptBuilder:
+    """Monta o prompt no layout estável, dentro de `max_prompt_tokens`."""
+
+    def __init__(self, max_prompt_tokens: int = 3000, prefix_cache_size: int = 10_000, metrics_window: int = 1000):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.prefixes = PrefixCache(prefix_cache_size)
+        # Contextos do RAG se repetem (e já vêm do cache do RAGService): a contagem também
+        self._context_tokens: "OrderedDict[str, int]" = OrderedDict()
+        self._assembly_ms: deque = deque(maxlen=metrics_window)
+        self._assemblies = 0
+
+    def _count_context(self, rag_context: str) -> int:
+        tokens = self._context_tokens.get(rag_context)
+        if tokens is None:
+            tokens = self._context_tokens[rag_context] = count_tokens(rag_context) + MESSAGE_OVERHEAD_TOKENS
+            if len(self._context_tokens) > 4096:
+                self._context_tokens.popitem(last=False)
+        return tokens
+
+    def build(self, prefix: PromptPrefix, rag_context: str, session: SessionSnapshot, message: str) -> PromptPlan:
+        started = time.perf_counter()
+        rag_tokens = self._count_context(rag_context)
+        message_tokens = count_tokens(message) + MESSAGE_OVERHEAD_TOKENS
+        used = prefix.tokens + rag_tokens + message_tokens
+        remaining = self.max_prompt_tokens - used
+
+        # Turnos recentes primeiro: são os que mais importam para a resposta
+        selected: List[dict] = []
+        for turn in reversed(session.turns):
+            cost = turn.tokens + MESSAGE_OVERHEAD_TOKENS
+            if cost > remaining:
+                break
+            selected.append({"role": turn.role, "content": turn.content})
+            remaining -= cost
+            used += cost
+        selected.reverse()
+
+        summary_message = None
+        if session.summary:
+            content = SUMMARY_TEMPLATE.render(summary="\n".join(session.summary))
+            cost = count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+            if cost <= remaining:
+                summary_message = {"role": "system", "content": content}
+                used += cost
+
+        messages: ChatMessages = list(prefix.messages)
+        if summary_message is not None:
+            messages.append(summary_message)
+        messages.extend(selected)
+        stable_prefix_tokens = used - rag_tokens - message_tokens
+        messages.append({"role": "system", "content": rag_context})  # CONTEXTO RAG INJETADO AQUI
+        messages.append({"role": "user", "content": message})
+
+        assembly_ms = (time.perf_counter() - started) * 1000
+        self._assembly_ms.append(assembly_ms)
+        self._assemblies += 1
+        return PromptPlan(
+            messages=messages,
+            prompt_tokens=used,
+            stable_prefix_tokens=stable_prefix_tokens,
+            history_turns=len(selected),
+            omitted_turns=len(session.turns) - len(selected),
+            summary_included=summary_message is not None,
+            assembly_ms=assembly_ms,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Tempo de montagem (janela recente) e o cache de prefixos."""
+        samples = list(self._assembly_ms)
+        return {
+            "assemblies": self._assemblies,
+            "assembly_ms": {"p50": _percentile(samples, 0.5), "p95": _percentile(samples, 0.95), "p99": _percentile(samples, 0.99)},
+            "prefix_cache": self.prefixes.stats(),
+        }
@@ -0,0 +1,172 @@
+"""
+Sessões de conversa do Chat no servidor, por usuário, com compactação incremental.
+
+O cliente envia apenas a mensagem nova; o histórico fica aqui. Cada sessão
+guarda os turnos recentes na íntegra (até CHAT_HISTORY_MAX_TOKENS) e, à medida
+que os mais antigos saem dessa janela, eles viram uma linha curta num resumo
+extrativo (até CHAT_SUMMARY_MAX_TOKENS; as linhas mais antigas do resumo são
+descartadas). A compactação acontece ao registrar cada troca, então montar o
+prompt custa O(turnos recentes), não O(conversa inteira).
+"""
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, Iterable, Mapping, NamedTuple, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.token_counter import count_tokens
+
+_ROLES = frozenset(("user", "assistant"))
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+_SUMMARY_LINE_CHARS = 160
+
+
+class HistoryTurn(NamedTuple):
+    role: str
+    content: str
+    tokens: int
+
+
+class SessionSnapshot(NamedTuple):
+    """Cópia imutável do estado de uma sessão, usada na montagem do prompt."""
+    summary: Tuple[str, ...]
+    turns: Tuple[HistoryTurn, ...]
+
+
+def summarize_turn(turn: HistoryTurn) -> str:
+    """Linha do resumo para um turno antigo: primeira frase, truncada."""
+    speaker = "Usuário" if turn.role == "user" else "Coach"
+    sentence = _SENTENCE_END.split(turn.content.strip(), 1)[0]
+    if len(sentence) > _SUMMARY_LINE_CHARS:
+        sentence = sentence[:_SUMMARY_LINE_CHARS].rsplit(" ", 1)[0] + "..."
+    return f"{speaker}: {sentence}"
+
+
+class ChatSession:
+    """Turnos recentes na íntegra + resumo dos antigos (acesso serializado pelo store)."""
+
+    def __init__(self):
+        self.turns: Deque[HistoryTurn] = deque()
+        self.history_tokens = 0
+        self.summary: Deque[Tuple[str, int]] = deque()
+        self.summary_tokens = 0
+        self.updated_at = time.monotonic()
+
+    def append(self, role: str, content: str) -> None:
+        turn = HistoryTurn(role, content, count_tokens(content))
+        self.turns.append(turn)
+        self.history_tokens += turn.tokens
+        self.updated_at = time.monotonic()
+
+    def compact(self, max_history_tokens: int, max_summary_tokens: int) -> int:
+        """Move os turnos mais antigos para o resumo até caber no orçamento. Retorna quantos saíram."""
+        compacted = 0
+        # A última troca (pergunta + resposta) sempre fica na íntegra
+        while self.history_tokens > max_history_tokens and len(self.turns) > 2:
+            turn = self.turns.popleft()
+            self.history_tokens -= turn.tokens
+            line = summarize_turn(turn)
+            tokens = count_tokens(line)
+            self.summary.append((line, tokens))
+            self.summary_tokens += tokens
+            compacted += 1
+        while self.summary_tokens > max_summary_tokens and self.summary:
+            _, tokens = self.summary.popleft()
+            self.summary_tokens -= tokens
+        return compacted
+
+    def snapshot(self) -> SessionSnapshot:
+        return SessionSnapshot(tuple(line for line, _ in self.summary), tuple(self.turns))
+
+
+class ChatSessionStore:
+    """
+    Sessões em memória por usuário, com despejo LRU (`max_sessions`) e expiração
+    por inatividade (`ttl_seconds`). Thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 50_000,
+        ttl_seconds: Optional[float] = None,
+        max_history_tokens: int = 1500,
+        max_summary_tokens: int = 300,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_history_tokens = max_history_tokens
+        self.max_summary_tokens = max_summary_tokens
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"exchanges": 0, "compacted_turns": 0, "evictions": 0, "expirations": 0}
+
+    def _session(self, user_id: str, create: bool) -> Optional[ChatSession]:
+        session = self._sessions.get(user_id)
+        if session is not None and self.ttl_seconds is not None and time.monotonic() - session.updated_at > self.ttl_seconds:
+            del self._sessions[user_id]
+            self._counters["expirations"] += 1
+            session = None
+        if session is None and create:
+            session = self._sessions[user_id] = ChatSession()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._counters["evictions"] += 1
+        if session is not None:
+            self._sessions.move_to_end(user_id)
+        return session
+
+    def snapshot(self, user_id: str) -> SessionSnapshot:
+        """Estado atual da sessão do usuário (vazio se não houver)."""
+        with self._lock:
+            session = self._session(user_id, create=False)
+            return session.snapshot() if session is not None else SessionSnapshot((), ())
+
+    def append_exchange(self, user_id: str, message: str, reply: str) -> None:
+        """Registra uma troca concluída (mensagem do usuário + resposta) e compacta a sessão."""
+        with self._lock:
+            session = self._session(user_id, create=True)
+            session.append("user", message)
+            session.append("assistant", reply)
+            self._counters["exchanges"] += 1
+            self._counters["compacted_turns"] += session.compact(self.max_history_tokens, self.max_summary_tokens)
+
+    def replace(self, user_id: str, history: Iterable[Mapping[str, Any]]) -> None:
+        """
+        Substitui a sessão pelo histórico enviado pelo cliente (clientes antigos que
+        reenviam a conversa inteira). Papéis fora de user/assistant são ignorados.
+        """
+        session = ChatSession()
+        for item in history:
+            if item.get("role") in _ROLES and isinstance(item.get("content"), str):
+                session.append(item["role"], item["content"])
+        compacted = session.compact(self.max_history_tokens, self.max_summary_tokens)
+        with self._lock:
+            self._session(user_id, create=True)
+            self._sessions[user_id] = session
+            self._counters["compacted_turns"] += compacted
+
+    def reset(self, user_id: str) -> bool:
+        """Encerra a conversa do usuário. Retorna True se havia uma sessão."""
+        with self._lock:
+            return self._sessions.pop(user_id, None) is not None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, "sessions": len(self._sessions)}
+
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_chat_session_store() -> ChatSessionStore:
+    """
+    Store (Singleton) das sessões de conversa do worker.
+    """
+    return ChatSessionStore(
+        max_sessions=settings.CHAT_SESSION_MAX_SESSIONS,
+        ttl_seconds=settings.CHAT_SESSION_TTL_SECONDS,
+        max_history_tokens=settings.CHAT_HISTORY_MAX_TOKENS,
+        max_summary_tokens=settings.CHAT_SUMMARY_MAX_TOKENS,
+    )
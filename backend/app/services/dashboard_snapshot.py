@@ -0,0 +1,115 @@
+"""
+Snapshot materializado do Dashboard por usuário (GET /dashboard/data).
+
+O corpo JSON da resposta é montado e serializado uma vez e reaproveitado
+enquanto for válido:
+- as metas e o progresso do usuário não mudaram (`goals_version` do
+  repositório e `version` do registro de progresso, que também enxergam
+  alterações feitas por outros workers no SQLite);
+- o dia não virou (dias sem apostar e reflexão diária dependem da data).
+
+Cada snapshot carrega o ETag (hash do corpo): se o cliente já tem essa versão
+(If-None-Match), a rota responde 304 sem corpo e sem serializar nada.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from app.services.goals_repository import GoalRecord, GoalsRepository
+from app.services.progress_ledger import ProgressAggregate, ProgressLedger
+
+# render(user_id, metas, progresso, agora) -> (corpo JSON, válido até [epoch])
+DashboardRenderer = Callable[[str, List[GoalRecord], ProgressAggregate, float], Tuple[bytes, float]]
+
+
+class DashboardSnapshot(NamedTuple):
+    body: bytes
+    etag: str
+    version: Hashable    # estado das fontes quando o snapshot foi montado
+    valid_until: float   # epoch a partir do qual o conteúdo expira (virada do dia)
+
+
+def compute_etag(body: bytes) -> str:
+    """ETag forte: corpos idênticos têm o mesmo ETag, mesmo remontados."""
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Avalia o cabeçalho If-None-Match (lista de ETags, fracos ou "*")."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate == etag or candidate == "W/" + etag:
+            return True
+    return False
+
+
+class DashboardSnapshotStore:
+    """
+    Snapshots por usuário, LRU com `max_entries`. Thread-safe.
+    `invalidate(user_id)` descarta o snapshot (mudanças fora das fontes versionadas).
+    """
+
+    def __init__(
+        self,
+        repository: GoalsRepository,
+        ledger: ProgressLedger,
+        render: DashboardRenderer,
+        max_entries: int = 50_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._repository = repository
+        self._ledger = ledger
+        self._render = render
+        self.max_entries = max_entries
+        self._clock = clock
+        self._snapshots: "OrderedDict[str, DashboardSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "builds": 0, "invalidations": 0, "evictions": 0, "not_modified": 0}
+
+    def _version(self, user_id: str) -> Hashable:
+        return (self._repository.goals_version(user_id), self._ledger.version(user_id))
+
+    def get(self, user_id: str) -> DashboardSnapshot:
+        """Snapshot válido do usuário, remontando-o se as fontes mudaram ou o dia virou."""
+        # Versão lida antes dos dados: um snapshot nunca fica com versão mais nova que o conteúdo
+        version = self._version(user_id)
+        now = self._clock()
+        with self._lock:
+            snapshot = self._snapshots.get(user_id)
+            if snapshot is not None and snapshot.version == version and now < snapshot.valid_until:
+                self._snapshots.move_to_end(user_id)
+                self._counters["hits"] += 1
+                return snapshot
+
+        body, valid_until = self._render(user_id, self._repository.list_goals(user_id), self._ledger.aggregate(user_id), now)
+        snapshot = DashboardSnapshot(body, compute_etag(body), version, valid_until)
+        with self._lock:
+            self._snapshots[user_id] = snapshot
+            self._snapshots.move_to_end(user_id)
+            self._counters["builds"] += 1
+            while len(self._snapshots) > self.max_entries:
+                self._snapshots.popitem(last=False)
+                self._counters["evictions"] += 1
+        return snapshot
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            if self._snapshots.pop(user_id, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self._counters["not_modified"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self._counters["hits"] + self._counters["builds"]
+            return {
+                **self._counters,
+                "snapshots": len(self._snapshots),
+                "hit_rate": self._counters["hits"] / requests if requests else 0.0,
+            }
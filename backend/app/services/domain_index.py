@@ -0,0 +1,175 @@
+import logging
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# --- LISTA DE SUFIXOS PÚBLICOS (Public Suffix List) ---
+
+# Subconjunto embutido da PSL (https://publicsuffix.org) com os sufixos relevantes
+# para o mercado brasileiro de apostas. Em produção, aponte
+# PUBLIC_SUFFIX_LIST_PATH para o arquivo public_suffix_list.dat completo.
+_DEFAULT_PUBLIC_SUFFIXES = """
+com
+net
+org
+info
+io
+app
+bet
+br
+com.br
+net.br
+org.br
+gov.br
+app.br
+bet.br
+blog.br
+tv.br
+"""
+
+
+class PublicSuffixList:
+    """
+    Regras da Public Suffix List (normais, curingas '*.x' e exceções '!x')
+    para calcular o domínio registrável (eTLD+1) de um host.
+    """
+
+    def __init__(self, rules: Iterable[str]):
+        normal, wildcards, exceptions = set(), set(), set()
+        for line in rules:
+            rule = line.strip().lower()
+            if not rule or rule.startswith("//"):
+                continue
+            rule = rule.split()[0]
+            if rule.startswith("!"):
+                exceptions.add(rule[1:])
+            elif rule.startswith("*."):
+                wildcards.add(rule[2:])
+            else:
+                normal.add(rule)
+        self._rules = frozenset(normal)
+        self._wildcards = frozenset(wildcards)
+        self._exceptions = frozenset(exceptions)
+
+    @classmethod
+    def from_file(cls, path: str) -> "PublicSuffixList":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(f)
+
+    def public_suffix(self, domain: str) -> str:
+        """Sufixo público mais longo de `domain` (regra padrão '*': o último rótulo)."""
+        labels = domain.split(".")
+        for i in range(len(labels)):
+            candidate = ".".join(labels[i:])
+            if candidate in self._exceptions:
+                return ".".join(labels[i + 1:])
+            if candidate in self._rules or ".".join(labels[i + 1:]) in self._wildcards:
+                return candidate
+        return labels[-1]
+
+    def is_public_suffix(self, domain: str) -> bool:
+        return self.public_suffix(domain) == domain
+
+    def registrable_domain(self, domain: str) -> Optional[str]:
+        """Domínio registrável (sufixo público + um rótulo), ou None se `domain` for um sufixo."""
+        suffix = self.public_suffix(domain)
+        if suffix == domain:
+            return None
+        prefix = domain[: -len(suffix) - 1]
+        return f"{prefix.rsplit('.', 1)[-1]}.{suffix}"
+
+
+@lru_cache(maxsize=1)
+def get_public_suffix_list() -> PublicSuffixList:
+    """PSL (Singleton): arquivo configurado em PUBLIC_SUFFIX_LIST_PATH ou o subconjunto embutido."""
+    path = settings.PUBLIC_SUFFIX_LIST_PATH
+    if path:
+        try:
+            return PublicSuffixList.from_file(path)
+        except OSError as e:
+            logger.error(f"Erro ao carregar a Public Suffix List de {path}: {e}. Usando a lista embutida.")
+    return PublicSuffixList(_DEFAULT_PUBLIC_SUFFIXES.splitlines())
+
+
+# --- ÍNDICE DE DOMÍNIOS POR SUFIXO ---
+
+def normalize_domain(domain: str) -> str:
+    """
+    Minúsculas, sem ponto final (forma FQDN 'exemplo.com.') e, para domínios
+    internacionalizados, na forma ASCII/punycode ('apostá.com' -> 'xn--apost-1qa.com').
+    """
+    domain = domain.strip().lower().rstrip(".")
+    if not domain.isascii():
+        try:
+            domain = domain.encode("idna").decode("ascii")
+        except UnicodeError:
+            # Rótulo vazio ou longo demais: mantém como está (não casará com a lista)
+            pass
+    return domain
+
+
+def classify_entries(
+    entries: Iterable[str], public_suffixes: Optional[PublicSuffixList] = None
+) -> Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]:
+    """
+    Normaliza as entradas da lista e as separa em:
+    - exatas: hosts autorizados;
+    - subárvores: domínios cujos subdomínios são autorizados (curingas e
+      domínios registráveis). Curingas sobre sufixos públicos são descartados.
+    Retorna (entradas normalizadas, exatas, subárvores).
+    """
+    psl = public_suffixes or get_public_suffix_list()
+    normalized = frozenset(normalize_domain(str(entry)) for entry in entries)
+    exact, subtree = set(), set()
+    for entry in normalized:
+        if entry.startswith("*."):
+            base = entry[2:]
+            if psl.is_public_suffix(base):
+                logger.warning(f"Curinga sobre sufixo público ignorado: {entry}")
+                continue
+            subtree.add(base)
+        elif entry:
+            exact.add(entry)
+            if psl.registrable_domain(entry) == entry:
+                subtree.add(entry)
+    return normalized, frozenset(exact), frozenset(subtree)
+
+
+class DomainIndex:
+    """
+    Índice imutável de domínios autorizados (Card 4), montado na carga da lista.
+
+    Tipos de entrada:
+    - Exata ("app.exemplo.com"): autoriza apenas esse host.
+    - Curinga ("*.exemplo.com"): autoriza qualquer subdomínio de exemplo.com.
+    - Domínio registrável ("betano.bet.br", conforme a PSL): autoriza o próprio
+      domínio e todos os seus subdomínios (ex: "m.betano.bet.br").
+    Curingas sobre sufixos públicos ("*.com.br") são ignorados.
+
+    A busca testa o host e cada sufixo de rótulos em conjuntos hash: o custo
+    depende do número de rótulos do host, não do tamanho da lista.
+    """
+
+    def __init__(self, entries: Iterable[str], public_suffixes: Optional[PublicSuffixList] = None):
+        self.entries, self._exact, self._subtree = classify_entries(entries, public_suffixes)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def is_authorized(self, domain: str) -> bool:
+        domain = normalize_domain(domain)
+        if domain in self._exact:
+            return True
+        subtree = self._subtree
+        if not subtree:
+            return False
+        # Sufixos de rótulos: "m.betano.bet.br" -> "betano.bet.br" -> "bet.br" -> "br"
+        dot = domain.find(".")
+        while dot != -1:
+            if domain[dot + 1:] in subtree:
+                return True
+            dot = domain.find(".", dot + 1)
+        return False
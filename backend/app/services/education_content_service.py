@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Dict, Any, List
 
 # --- BASE DE CONHECIMENTO DOS CARTÕES EDUCATIVOS (Card 3) ---
@@ -69,6 +70,15 @@ class EducationContentService:
         # 5. Fallback Padrão
         return _EDUCATION_CARDS["DEFAULT"]
 
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_education_content_service() -> EducationContentService:
+    """
+    Ponto de entrada (Singleton) para o sistema de injeção de dependência.
+    """
+    return EducationContentService()
+
 # Exemplo de uso (para ser usado pelo Router ou UI):
 # if __name__ == "__main__":
 #     service = EducationContentService()
@@ -0,0 +1,244 @@
+"""
+Armazenamento das metas do Dashboard (gamificação).
+
+`GoalsRepository` é a interface usada pelas rotas; há duas implementações:
+
+- `InMemoryGoalsRepository`: dicionário por usuário, indexado por goal_id,
+  protegido por lock (desenvolvimento/testes; nada sobrevive ao restart).
+- `SQLiteGoalsRepository`: arquivo SQLite compartilhado entre workers, em modo
+  WAL, com pool de conexões por processo (sqlite_pool). A chave primária
+  (user_id, goal_id) é o índice das consultas.
+  A conclusão é decidida por um UPDATE condicional (`... AND is_completed = 0`),
+  atômico mesmo com vários processos: exatamente uma requisição conclui a meta.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.sqlite_pool import SQLitePool, get_sqlite_pool
+
+logger = logging.getLogger(__name__)
+
+# --- SIMULAÇÃO DE BANCO DE DADOS (Metas iniciais do usuário mockado 'Adonis') ---
+
+_DEMO_GOALS: Dict[str, List[Tuple[str, str, bool]]] = {
+    "user_123": [
+        ("g1", "Evitar o celular na primeira hora do dia", True),
+        ("g2", "Reservar 10 min para Mindfulness", False),
+        ("g3", "Rever o Painel Financeiro antes das 18h", False),
+    ]
+}
+
+
+class GoalRecord(NamedTuple):
+    id: str
+    title: str
+    is_completed: bool
+    completed_at: Optional[float] = None
+
+
+class CompletionResult(NamedTuple):
+    goal: GoalRecord
+    newly_completed: bool  # False: a meta já estava concluída
+
+
+class GoalNotFoundError(LookupError):
+    """Meta inexistente. `user_has_goals` distingue usuário sem metas de meta desconhecida."""
+
+    def __init__(self, user_id: str, goal_id: str, user_has_goals: bool):
+        super().__init__(f"Meta {goal_id!r} não encontrada para {user_id!r}.")
+        self.user_has_goals = user_has_goals
+
+
+class GoalsRepository(ABC):
+    """Interface de armazenamento das metas por usuário."""
+
+    @abstractmethod
+    def list_goals(self, user_id: str) -> List[GoalRecord]:
+        """Metas do usuário, na ordem em que foram criadas."""
+
+    @abstractmethod
+    def add_goal(self, user_id: str, goal_id: str, title: str, is_completed: bool = False) -> GoalRecord:
+        """Cria a meta (ou mantém a existente com o mesmo id)."""
+
+    @abstractmethod
+    def complete_goal(self, user_id: str, goal_id: str) -> CompletionResult:
+        """Marca a meta como concluída. Levanta GoalNotFoundError se ela não existir."""
+
+    @abstractmethod
+    def goals_version(self, user_id: str) -> int:
+        """Contador que muda a cada alteração nas metas do usuário (validação de caches)."""
+
+    def seed(self, goals: Dict[str, List[Tuple[str, str, bool]]]) -> None:
+        """Cria as metas que ainda não existem (idempotente)."""
+        for user_id, items in goals.items():
+            for goal_id, title, is_completed in items:
+                self.add_goal(user_id, goal_id, title, is_completed)
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryGoalsRepository(GoalsRepository):
+    def __init__(self):
+        self._goals: Dict[str, Dict[str, GoalRecord]] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def list_goals(self, user_id: str) -> List[GoalRecord]:
+        with self._lock:
+            return list(self._goals.get(user_id, {}).values())
+
+    def add_goal(self, user_id: str, goal_id: str, title: str, is_completed: bool = False) -> GoalRecord:
+        with self._lock:
+            goals = self._goals.setdefault(user_id, {})
+            if goal_id not in goals:
+                goals[goal_id] = GoalRecord(goal_id, title, is_completed, time.time() if is_completed else None)
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            return goals[goal_id]
+
+    def complete_goal(self, user_id: str, goal_id: str) -> CompletionResult:
+        with self._lock:
+            goals = self._goals.get(user_id, {})
+            goal = goals.get(goal_id)
+            if goal is None:
+                raise GoalNotFoundError(user_id, goal_id, bool(goals))
+            if goal.is_completed:
+                return CompletionResult(goal, False)
+            # Registros imutáveis: leitores concorrentes nunca veem meia atualização
+            goal = goals[goal_id] = goal._replace(is_completed=True, completed_at=time.time())
+            self._versions[user_id] += 1
+            return CompletionResult(goal, True)
+
+    def goals_version(self, user_id: str) -> int:
+        return self._versions.get(user_id, 0)
+
+
+class SQLiteGoalsRepository(GoalsRepository):
+    """Metas num arquivo SQLite (WAL), seguro para várias threads e processos."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS goals (
+            user_id      TEXT    NOT NULL,
+            goal_id      TEXT    NOT NULL,
+            position     INTEGER NOT NULL,
+            title        TEXT    NOT NULL,
+            is_completed INTEGER NOT NULL DEFAULT 0,
+            completed_at REAL,
+            PRIMARY KEY (user_id, goal_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS goal_versions (
+            user_id TEXT    NOT NULL PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """
+    _SELECT_USER = "SELECT goal_id, title, is_completed, completed_at FROM goals WHERE user_id = ? ORDER BY position"
+    _SELECT_GOAL = "SELECT goal_id, title, is_completed, completed_at FROM goals WHERE user_id = ? AND goal_id = ?"
+    _USER_EXISTS = "SELECT 1 FROM goals WHERE user_id = ? LIMIT 1"
+    _INSERT = (
+        "INSERT OR IGNORE INTO goals (user_id, goal_id, position, title, is_completed, completed_at) "
+        "SELECT ?1, ?2, COALESCE(MAX(position) + 1, 0), ?3, ?4, ?5 FROM goals WHERE user_id = ?1"
+    )
+    _COMPLETE = "UPDATE goals SET is_completed = 1, completed_at = ? WHERE user_id = ? AND goal_id = ? AND is_completed = 0"
+    _SELECT_VERSION = "SELECT version FROM goal_versions WHERE user_id = ?"
+    _BUMP_VERSION = (
+        "INSERT INTO goal_versions (user_id, version) VALUES (?, 1) "
+        "ON CONFLICT (user_id) DO UPDATE SET version = version + 1"
+    )
+
+    def __init__(self, path: str, pool_size: int = 8, busy_timeout_ms: int = 5000, pool: Optional[SQLitePool] = None):
+        self.path = path
+        # Pool recebido (compartilhado com outros repositórios do mesmo banco) não é fechado aqui
+        self._owns_pool = pool is None
+        self._pool = pool if pool is not None else SQLitePool(path, pool_size, busy_timeout_ms)
+        with self._pool.connection() as conn:
+            conn.executescript(self._SCHEMA)
+        logger.info(f"Repositório de metas SQLite em {path} (pool de {pool_size} conexões).")
+
+    def _connection(self):
+        return self._pool.connection()
+
+    def _transaction(self, conn: sqlite3.Connection):
+        return self._pool.transaction(conn)
+
+    @staticmethod
+    def _record(row: tuple) -> GoalRecord:
+        return GoalRecord(row[0], row[1], bool(row[2]), row[3])
+
+    def list_goals(self, user_id: str) -> List[GoalRecord]:
+        with self._connection() as conn:
+            return [self._record(row) for row in conn.execute(self._SELECT_USER, (user_id,))]
+
+    def add_goal(self, user_id: str, goal_id: str, title: str, is_completed: bool = False) -> GoalRecord:
+        completed_at = time.time() if is_completed else None
+        with self._connection() as conn:
+            with self._transaction(conn):
+                if conn.execute(self._INSERT, (user_id, goal_id, title, int(is_completed), completed_at)).rowcount:
+                    conn.execute(self._BUMP_VERSION, (user_id,))
+            return self._record(conn.execute(self._SELECT_GOAL, (user_id, goal_id)).fetchone())
+
+    def seed(self, goals: Dict[str, List[Tuple[str, str, bool]]]) -> None:
+        rows: Iterable[tuple] = [
+            (user_id, goal_id, title, int(done), time.time() if done else None)
+            for user_id, items in goals.items()
+            for goal_id, title, done in items
+        ]
+        with self._connection() as conn:
+            with self._transaction(conn):
+                for row in rows:
+                    if conn.execute(self._INSERT, row).rowcount:
+                        conn.execute(self._BUMP_VERSION, (row[0],))
+
+    def complete_goal(self, user_id: str, goal_id: str) -> CompletionResult:
+        with self._connection() as conn:
+            row = conn.execute(self._SELECT_GOAL, (user_id, goal_id)).fetchone()
+            if row is None:
+                user_has_goals = conn.execute(self._USER_EXISTS, (user_id,)).fetchone() is not None
+                raise GoalNotFoundError(user_id, goal_id, user_has_goals)
+            if row[2]:
+                # Já concluída: responde pela leitura, sem disputar o lock de escrita
+                return CompletionResult(self._record(row), False)
+            # O UPDATE condicional decide a corrida entre requisições/processos
+            with self._transaction(conn):
+                updated = conn.execute(self._COMPLETE, (time.time(), user_id, goal_id)).rowcount
+                if updated:
+                    conn.execute(self._BUMP_VERSION, (user_id,))
+            row = conn.execute(self._SELECT_GOAL, (user_id, goal_id)).fetchone()
+            return CompletionResult(self._record(row), updated == 1)
+
+    def goals_version(self, user_id: str) -> int:
+        with self._connection() as conn:
+            row = conn.execute(self._SELECT_VERSION, (user_id,)).fetchone()
+            return row[0] if row else 0
+
+    def close(self) -> None:
+        if self._owns_pool:
+            self._pool.close()
+
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_goals_repository() -> GoalsRepository:
+    """
+    Repositório (Singleton) das metas: SQLite se GOALS_DB_PATH (ou APP_DB_PATH)
+    estiver definido, senão em memória. Em DEBUG, cria as metas do usuário mockado.
+    """
+    path = settings.GOALS_DB_PATH or settings.APP_DB_PATH
+    if path:
+        repository: GoalsRepository = SQLiteGoalsRepository(
+            path,
+            pool_size=settings.GOALS_DB_POOL_SIZE,
+            busy_timeout_ms=settings.GOALS_DB_BUSY_TIMEOUT_MS,
+            pool=get_sqlite_pool(path, settings.GOALS_DB_POOL_SIZE, settings.GOALS_DB_BUSY_TIMEOUT_MS),
+        )
+    else:
+        repository = InMemoryGoalsRepository()
+    if settings.DEBUG:
+        repository.seed(_DEMO_GOALS)
+    return repository
@@ -0,0 +1,205 @@
+"""
+Clientes de LLM do Chat, com interface comum de streaming.
+
+- `StubLLMClient`: provedor local determinístico (testes, desenvolvimento e
+  benchmarks), com atraso por token configurável para simular a latência.
+- `OpenAICompatibleClient`: API de chat completions compatível com OpenAI
+  (stream=True), sobre um único httpx.AsyncClient com pool de conexões
+  keep-alive, compartilhado por todas as requisições do worker.
+
+O provedor é escolhido por LLM_PROVIDER ("stub" ou "openai").
+"""
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.config.settings import settings
+from app.services.token_counter import count_message_tokens, count_tokens
+
+logger = logging.getLogger(__name__)
+
+ChatMessages = List[Dict[str, str]]
+
+
+class LLMError(Exception):
+    """Falha ao obter a resposta do provedor de LLM."""
+
+
+class LLMClient(ABC):
+    """Interface dos provedores: gera a resposta em partes (tokens) à medida que chegam."""
+
+    name = "llm"
+
+    @abstractmethod
+    def stream(
+        self, messages: ChatMessages, max_tokens: int, usage: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Partes de texto da resposta para as mensagens (formato role/content).
+        Se `usage` for informado, o provedor preenche "prompt_tokens" e
+        "completion_tokens" quando conhece o uso real.
+        """
+
+    async def aclose(self) -> None:
+        """Libera conexões abertas (chamado no shutdown da aplicação)."""
+
+
+# --- PROVEDOR LOCAL (STUB) ---
+
+def _mock_reply(user_message: str, nickname: str) -> str:
+    """Lógica de mock para simular uma resposta relevante da IA."""
+    message = user_message.lower()
+    if "apostar" in message or "jogar" in message or "impulso" in message:
+        return f"Sinto muito que você esteja sentindo esse impulso, {nickname}. É um momento difícil. Lembre-se do Urge Surfing: deixe o impulso passar. Quer tentar a respiração 4-7-8 comigo agora?"
+    elif "finanças" in message or "dinheiro" in message:
+        return f"As finanças são um ponto chave, {nickname}. Tente rever seu Painel Financeiro e veja o dinheiro que você já economizou. Podemos traçar uma meta simples para esta semana."
+    else:
+        return f"Obrigada por compartilhar, {nickname}. Lembre-se que estou aqui para te apoiar em qualquer desafio. Como posso te ajudar a reestruturar seus pensamentos neste momento?"
+
+
+class StubLLMClient(LLMClient):
+    """
+    Provedor local: responde com as mensagens simuladas do Coach, palavra por
+    palavra. O apelido é lido da mensagem de sistema ("Apelido: ...").
+    """
+
+    name = "stub"
+
+    def __init__(self, token_delay_seconds: float = 0.0, first_token_delay_seconds: float = 0.0):
+        self.token_delay_seconds = token_delay_seconds
+        self.first_token_delay_seconds = first_token_delay_seconds
+
+    async def stream(
+        self, messages: ChatMessages, max_tokens: int, usage: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[str]:
+        user_message = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+        nickname = "amigo"
+        for message in messages:
+            if message.get("role") == "system" and "Apelido:" in message["content"]:
+                nickname = message["content"].split("Apelido:", 1)[1].split("\n", 1)[0].strip() or nickname
+                break
+
+        if self.first_token_delay_seconds:
+            await asyncio.sleep(self.first_token_delay_seconds)
+        words = _mock_reply(user_message, nickname).split(" ")[:max_tokens]
+        if usage is not None:
+            usage["prompt_tokens"] = count_message_tokens(messages)
+            usage["completion_tokens"] = count_tokens(" ".join(words))
+        for position, word in enumerate(words):
+            if position and self.token_delay_seconds:
+                await asyncio.sleep(self.token_delay_seconds)
+            yield word if position == 0 else " " + word
+
+
+# --- PROVEDOR HTTP (API COMPATÍVEL COM OPENAI) ---
+
+class OpenAICompatibleClient(LLMClient):
+    """
+    Chat completions em streaming (Server-Sent Events do provedor).
+
+    O httpx.AsyncClient é criado na primeira chamada (dentro do event loop) e
+    reutilizado: as conexões TLS ficam abertas no pool (keep-alive) e as
+    requisições seguintes não pagam handshake.
+    """
+
+    name = "openai"
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str],
+        model: str,
+        timeout_seconds: float = 30.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self._headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._timeout = httpx.Timeout(timeout_seconds, connect=min(timeout_seconds, 5.0))
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self._headers,
+                timeout=self._timeout,
+                limits=self._limits,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def stream(
+        self, messages: ChatMessages, max_tokens: int, usage: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[str]:
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "stream": True,
+            # O último evento traz o uso real de tokens (sem "choices")
+            "stream_options": {"include_usage": True},
+        }
+        try:
+            async with self._http().stream("POST", "/chat/completions", json=payload) as response:
+                if response.status_code != 200:
+                    body = (await response.aread())[:300]
+                    raise LLMError(f"Provedor de LLM respondeu {response.status_code}: {body!r}")
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        event = json.loads(data)
+                        if usage is not None and event.get("usage"):
+                            usage["prompt_tokens"] = int(event["usage"]["prompt_tokens"])
+                            usage["completion_tokens"] = int(event["usage"]["completion_tokens"])
+                            # Prefixo reaproveitado pelo cache de prompt do provedor (se informado)
+                            details = event["usage"].get("prompt_tokens_details") or {}
+                            usage["cached_prompt_tokens"] = int(details.get("cached_tokens") or 0)
+                        choices = event.get("choices") or ()
+                        delta = choices[0].get("delta", {}).get("content") if choices else None
+                    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+                        logger.warning(f"Evento inválido do provedor de LLM ignorado: {data[:200]}")
+                        continue
+                    if delta:
+                        yield delta
+        except httpx.HTTPError as e:
+            raise LLMError(f"Falha de comunicação com o provedor de LLM: {e}") from e
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_llm_client() -> LLMClient:
+    """
+    Cliente de LLM (Singleton) do provedor configurado em LLM_PROVIDER.
+    """
+    if settings.LLM_PROVIDER == "openai":
+        return OpenAICompatibleClient(
+            base_url=settings.LLM_API_BASE_URL,
+            api_key=settings.LLM_API_KEY,
+            model=settings.LLM_MODEL,
+            timeout_seconds=settings.LLM_TIMEOUT_SECONDS,
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        )
+    if settings.LLM_PROVIDER != "stub":
+        raise ValueError(f"LLM_PROVIDER desconhecido: {settings.LLM_PROVIDER}")
+    return StubLLMClient(token_delay_seconds=settings.LLM_STUB_TOKEN_DELAY_SECONDS)
@@ -0,0 +1,179 @@
+"""
+Proteção do /auth/login contra saturação e tentativas em massa.
+
+- `LoginExecutor`: a verificação de senha (cara de propósito) roda num pool de
+  threads próprio e limitado, fora das threads que servem as outras rotas.
+  Há um teto de requisições na fila: acima dele, `LoginOverloadedError` na
+  hora (a rota responde 429) em vez de acumular espera sem fim.
+- `TokenBucketLimiter`: balde de tokens por chave (IP, e-mail), em memória,
+  com atualização O(1) e número de chaves limitado (LRU).
+- Métricas: tempo de espera na fila e tempo do hash, separados (janela recente).
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from app.config.settings import settings
+
+T = TypeVar("T")
+
+
+def _percentile(samples: List[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+
+class LoginOverloadedError(RuntimeError):
+    """Fila do executor de login cheia: a requisição é recusada sem esperar."""
+
+
+class TokenBucketLimiter:
+    """
+    `rate` tokens por segundo até `burst` por chave; cada tentativa consome um.
+    O balde é reabastecido na própria consulta (sem timers). Thread-safe.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # chave -> (tokens, atualizado em)
+        self._lock = threading.Lock()
+        self._counters = {"allowed": 0, "limited": 0, "evictions": 0}
+
+    def acquire(self, key: str) -> float:
+        """Consome um token. Retorna 0.0 se permitido, senão os segundos até o próximo token."""
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+            if tokens >= 1.0:
+                tokens -= 1.0
+                retry_after = 0.0
+                self._counters["allowed"] += 1
+            else:
+                retry_after = (1.0 - tokens) / self.rate
+                self._counters["limited"] += 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # Esquecer um balde só devolve o burst à chave: limite de memória sem custo de correção
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self._counters["evictions"] += 1
+            return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "keys": len(self._buckets)}
+
+
+class LoginExecutor:
+    """Pool de `workers` threads com no máximo `max_queue` tarefas esperando."""
+
+    def __init__(self, workers: int = 4, max_queue: int = 32, metrics_window: int = 1000):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counters = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0}
+        self._queue_wait_ms: deque = deque(maxlen=metrics_window)
+        self._run_ms: deque = deque(maxlen=metrics_window)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Cria o pool sob demanda (nada de threads no import)."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="login")
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Executa `fn(*args)` no pool. Levanta LoginOverloadedError se a fila estiver cheia."""
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._counters["rejected"] += 1
+                raise LoginOverloadedError("Fila de login cheia.")
+            self._in_flight += 1
+            self._counters["submitted"] += 1
+        enqueued = time.perf_counter()
+
+        def task() -> T:
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._queue_wait_ms.append((started - enqueued) * 1000)
+                    self._run_ms.append((finished - started) * 1000)
+
+        def release(future: "Future[T]") -> None:
+            # A vaga só é liberada quando a tarefa termina (ou sai da fila cancelada),
+            # não quando quem esperava desiste: o teto vale para o trabalho real
+            with self._lock:
+                self._in_flight -= 1
+                self._counters["completed" if not future.cancelled() and future.exception() is None else "failed"] += 1
+
+        future = self._get_executor().submit(task)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            wait, run = list(self._queue_wait_ms), list(self._run_ms)
+            return {
+                **self._counters,
+                "in_flight": self._in_flight,
+                "capacity": self.workers + self.max_queue,
+                "queue_wait_ms": {"p50": _percentile(wait, 0.5), "p95": _percentile(wait, 0.95), "p99": _percentile(wait, 0.99)},
+                "hash_ms": {"p50": _percentile(run, 0.5), "p95": _percentile(run, 0.95), "p99": _percentile(run, 0.99)},
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+class LoginGuard:
+    """Limites por IP e por e-mail na frente do executor de login."""
+
+    def __init__(self, executor: LoginExecutor, per_ip: TokenBucketLimiter, per_email: TokenBucketLimiter):
+        self.executor = executor
+        self.per_ip = per_ip
+        self.per_email = per_email
+
+    def check_rate(self, ip: str, email: str) -> float:
+        """0.0 se a tentativa pode seguir, senão o Retry-After (segundos)."""
+        retry_after = self.per_ip.acquire(ip)
+        if retry_after:
+            return retry_after
+        # E-mail normalizado: variações de caixa não multiplicam as tentativas
+        return self.per_email.acquire(email.strip().lower())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "executor": self.executor.stats(),
+            "rate_limit": {"per_ip": self.per_ip.stats(), "per_email": self.per_email.stats()},
+        }
+
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_login_guard() -> LoginGuard:
+    """Executor e limitadores de login (Singleton) com os limites da configuração."""
+    return LoginGuard(
+        LoginExecutor(workers=settings.LOGIN_EXECUTOR_WORKERS, max_queue=settings.LOGIN_EXECUTOR_MAX_QUEUE),
+        per_ip=TokenBucketLimiter(settings.LOGIN_RATE_PER_IP, settings.LOGIN_BURST_PER_IP, settings.LOGIN_RATE_LIMIT_MAX_KEYS),
+        per_email=TokenBucketLimiter(settings.LOGIN_RATE_PER_EMAIL, settings.LOGIN_BURST_PER_EMAIL, settings.LOGIN_RATE_LIMIT_MAX_KEYS),
+    )
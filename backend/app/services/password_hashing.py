@@ -0,0 +1,55 @@
+"""
+Hash de senhas com scrypt (biblioteca padrão; custo de memória, como o argon2).
+
+Formato armazenado: `scrypt$<n>$<r>$<p>$<salt b64>$<hash b64>`, com os
+parâmetros no próprio hash: aumentar o custo não invalida as senhas antigas.
+O cálculo libera o GIL, então roda em paralelo nas threads do executor de
+login (login_guard) sem travar o event loop.
+"""
+import base64
+import hashlib
+import hmac
+import secrets
+from functools import lru_cache
+
+from app.config.settings import settings
+
+
+class PasswordHasher:
+    """scrypt com custo `n` (potência de 2), `r` e `p`; salt aleatório por senha."""
+
+    def __init__(self, n: int = 2 ** 14, r: int = 8, p: int = 1, dklen: int = 32):
+        if n < 2 or n & (n - 1):
+            raise ValueError("O custo n do scrypt deve ser uma potência de 2.")
+        self.n, self.r, self.p, self.dklen = n, r, p, dklen
+        # Hash de referência: usuários inexistentes custam o mesmo tempo (sem enumeração por tempo)
+        self.dummy_hash = self.hash(secrets.token_urlsafe(16))
+
+    @staticmethod
+    def _derive(password: str, salt: bytes, n: int, r: int, p: int, dklen: int) -> bytes:
+        return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024, dklen=dklen)
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(16)
+        digest = self._derive(password, salt, self.n, self.r, self.p, self.dklen)
+        encode = lambda raw: base64.b64encode(raw).decode("ascii")
+        return f"scrypt${self.n}${self.r}${self.p}${encode(salt)}${encode(digest)}"
+
+    def verify(self, password: str, stored_hash: str) -> bool:
+        try:
+            scheme, n, r, p, salt, digest = stored_hash.split("$")
+            if scheme != "scrypt":
+                return False
+            expected = base64.b64decode(digest)
+            actual = self._derive(password, base64.b64decode(salt), int(n), int(r), int(p), len(expected))
+        except ValueError:
+            return False
+        return hmac.compare_digest(actual, expected)
+
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_password_hasher() -> PasswordHasher:
+    """Hasher (Singleton) com o custo da configuração."""
+    return PasswordHasher(n=settings.PASSWORD_HASH_SCRYPT_N)
@@ -0,0 +1,347 @@
+"""
+Registro de progresso do usuário (event sourcing): dias sem apostar e economia.
+
+Os eventos (recaída, check-in, aposta evitada com valor) só são acrescentados,
+nunca alterados. Junto com cada evento, na mesma transação, o agregado do
+usuário é atualizado de forma incremental (`apply_event`): a leitura do
+Dashboard é uma consulta por chave, O(1), não importa o tamanho do histórico.
+
+O log é a fonte da verdade: `replay()` (ou a linha de comando abaixo) refaz os
+agregados do zero a partir dos eventos, para corrigir divergências ou aplicar
+uma regra de agregação nova.
+
+Uso (a partir de backend/):
+    python -m app.services.progress_ledger --db data/progress.db [--user ID] [--check]
+"""
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.sqlite_pool import SQLitePool, get_sqlite_pool
+
+logger = logging.getLogger(__name__)
+
+EVENT_KINDS = frozenset(("check_in", "relapse", "avoided_bet"))
+DAY_SECONDS = 86400
+
+# --- SIMULAÇÃO DE BANCO DE DADOS (Histórico inicial do usuário mockado 'Adonis') ---
+
+# (tipo, valor, instante): acompanhamento desde 01/01/2021 e a economia já registrada
+_DEMO_EVENTS: Dict[str, List[Tuple[str, float, float]]] = {
+    "user_123": [("check_in", 0.0, 1609459200.0), ("avoided_bet", 7345.50, 1609459200.0)],
+}
+
+
+class ProgressEvent(NamedTuple):
+    seq: int
+    user_id: str
+    kind: str
+    at: float
+    amount: float = 0.0
+
+
+class ProgressAggregate(NamedTuple):
+    """Estado derivado do histórico de um usuário (mantido evento a evento)."""
+    started_at: Optional[float] = None     # primeiro evento: início do acompanhamento
+    streak_start: Optional[float] = None   # última recaída (ou o início)
+    longest_streak_seconds: float = 0.0    # maior sequência já encerrada por recaída
+    relapses: int = 0
+    check_ins: int = 0
+    last_check_in_at: Optional[float] = None
+    accumulated_savings: float = 0.0
+    events: int = 0
+    last_seq: int = 0
+
+    def days_without_betting(self, now: float) -> int:
+        if self.streak_start is None:
+            return 0
+        return max(0, int((now - self.streak_start) // DAY_SECONDS))
+
+    def best_streak_days(self, now: float) -> int:
+        if self.streak_start is None:
+            return 0
+        return int(max(self.longest_streak_seconds, now - self.streak_start) // DAY_SECONDS)
+
+    def next_day_at(self, now: float) -> Optional[float]:
+        """Instante em que `days_without_betting` muda (None sem acompanhamento)."""
+        if self.streak_start is None:
+            return None
+        return self.streak_start + (self.days_without_betting(now) + 1) * DAY_SECONDS
+
+
+def validate_event(kind: str, amount: float) -> None:
+    if kind not in EVENT_KINDS:
+        raise ValueError(f"Tipo de evento desconhecido: {kind!r}.")
+    if kind == "avoided_bet" and not amount > 0:
+        raise ValueError("Aposta evitada exige um valor positivo.")
+    if kind != "avoided_bet" and amount:
+        raise ValueError(f"Eventos {kind!r} não têm valor.")
+
+
+def apply_event(aggregate: ProgressAggregate, event: ProgressEvent) -> ProgressAggregate:
+    """Agregado após o evento. Função pura: o replay e a escrita usam a mesma regra."""
+    started_at = event.at if aggregate.started_at is None else aggregate.started_at
+    streak_start = event.at if aggregate.streak_start is None else aggregate.streak_start
+    longest = aggregate.longest_streak_seconds
+    relapses, check_ins = aggregate.relapses, aggregate.check_ins
+    last_check_in_at, savings = aggregate.last_check_in_at, aggregate.accumulated_savings
+    if event.kind == "relapse":
+        longest = max(longest, event.at - streak_start)
+        streak_start = max(streak_start, event.at)
+        relapses += 1
+    elif event.kind == "check_in":
+        check_ins += 1
+        last_check_in_at = event.at if last_check_in_at is None else max(last_check_in_at, event.at)
+    elif event.kind == "avoided_bet":
+        savings += event.amount
+    return ProgressAggregate(
+        started_at, streak_start, longest, relapses, check_ins, last_check_in_at, savings, aggregate.events + 1, event.seq
+    )
+
+
+def fold_events(events: Iterable[ProgressEvent]) -> Dict[str, ProgressAggregate]:
+    """Agregados de todos os usuários presentes nos eventos (em ordem de seq)."""
+    aggregates: Dict[str, ProgressAggregate] = {}
+    for event in events:
+        aggregates[event.user_id] = apply_event(aggregates.get(event.user_id, ProgressAggregate()), event)
+    return aggregates
+
+
+def _replay_report(stored: Dict[str, ProgressAggregate], rebuilt: Dict[str, ProgressAggregate], started: float) -> Dict[str, Any]:
+    mismatched = sorted(user for user in set(stored) | set(rebuilt) if stored.get(user) != rebuilt.get(user))
+    return {
+        "users": len(rebuilt),
+        "events": sum(aggregate.events for aggregate in rebuilt.values()),
+        "mismatched_users": mismatched,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+class ProgressLedger(ABC):
+    """Log de eventos de progresso + agregados por usuário."""
+
+    @abstractmethod
+    def append(self, user_id: str, kind: str, amount: float = 0.0, at: Optional[float] = None) -> Tuple[ProgressEvent, ProgressAggregate]:
+        """Acrescenta o evento e devolve o agregado atualizado. Levanta ValueError se inválido."""
+
+    @abstractmethod
+    def aggregate(self, user_id: str) -> ProgressAggregate:
+        """Agregado atual do usuário (vazio se não houver eventos). O(1)."""
+
+    @abstractmethod
+    def events(self, user_id: Optional[str] = None) -> Iterator[ProgressEvent]:
+        """Eventos em ordem de seq (de um usuário ou de todos)."""
+
+    @abstractmethod
+    def replay(self, user_id: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """Refaz os agregados a partir do log. `dry_run` só compara com os atuais."""
+
+    @abstractmethod
+    def seed(self, events: Dict[str, List[Tuple[str, float, float]]]) -> None:
+        """Registra o histórico de usuários que ainda não têm eventos (idempotente)."""
+
+    def version(self, user_id: str) -> int:
+        """Muda a cada evento do usuário (validação de caches, ex: snapshot do Dashboard)."""
+        return self.aggregate(user_id).last_seq
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryProgressLedger(ProgressLedger):
+    def __init__(self):
+        self._events: List[ProgressEvent] = []
+        self._aggregates: Dict[str, ProgressAggregate] = {}
+        self._lock = threading.Lock()
+
+    def _append_locked(self, user_id: str, kind: str, amount: float, at: float) -> Tuple[ProgressEvent, ProgressAggregate]:
+        event = ProgressEvent(len(self._events) + 1, user_id, kind, at, float(amount))
+        self._events.append(event)
+        aggregate = self._aggregates[user_id] = apply_event(self._aggregates.get(user_id, ProgressAggregate()), event)
+        return event, aggregate
+
+    def append(self, user_id: str, kind: str, amount: float = 0.0, at: Optional[float] = None) -> Tuple[ProgressEvent, ProgressAggregate]:
+        validate_event(kind, amount)
+        with self._lock:
+            return self._append_locked(user_id, kind, amount, time.time() if at is None else at)
+
+    def aggregate(self, user_id: str) -> ProgressAggregate:
+        return self._aggregates.get(user_id, ProgressAggregate())
+
+    def events(self, user_id: Optional[str] = None) -> Iterator[ProgressEvent]:
+        with self._lock:
+            events = list(self._events)
+        return (event for event in events if user_id is None or event.user_id == user_id)
+
+    def replay(self, user_id: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
+        started = time.perf_counter()
+        with self._lock:
+            rebuilt = fold_events(e for e in self._events if user_id is None or e.user_id == user_id)
+            stored = {u: a for u, a in self._aggregates.items() if user_id is None or u == user_id}
+            if not dry_run:
+                for user in stored.keys() - rebuilt.keys():
+                    del self._aggregates[user]
+                self._aggregates.update(rebuilt)
+        return _replay_report(stored, rebuilt, started)
+
+    def seed(self, events: Dict[str, List[Tuple[str, float, float]]]) -> None:
+        with self._lock:
+            for user_id, items in events.items():
+                if user_id not in self._aggregates:
+                    for kind, amount, at in items:
+                        self._append_locked(user_id, kind, amount, at)
+
+
+class SQLiteProgressLedger(ProgressLedger):
+    """Log e agregados no mesmo arquivo SQLite (WAL); evento e agregado na mesma transação."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS progress_events (
+            seq     INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT    NOT NULL,
+            kind    TEXT    NOT NULL,
+            at      REAL    NOT NULL,
+            amount  REAL    NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS progress_events_user ON progress_events (user_id, seq);
+        CREATE TABLE IF NOT EXISTS progress_aggregates (
+            user_id                TEXT    NOT NULL PRIMARY KEY,
+            started_at             REAL,
+            streak_start           REAL,
+            longest_streak_seconds REAL    NOT NULL,
+            relapses               INTEGER NOT NULL,
+            check_ins              INTEGER NOT NULL,
+            last_check_in_at       REAL,
+            accumulated_savings    REAL    NOT NULL,
+            events                 INTEGER NOT NULL,
+            last_seq               INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """
+    _INSERT_EVENT = "INSERT INTO progress_events (user_id, kind, at, amount) VALUES (?, ?, ?, ?)"
+    _SELECT_AGGREGATE = (
+        "SELECT started_at, streak_start, longest_streak_seconds, relapses, check_ins, last_check_in_at, "
+        "accumulated_savings, events, last_seq FROM progress_aggregates WHERE user_id = ?"
+    )
+    _UPSERT_AGGREGATE = "INSERT OR REPLACE INTO progress_aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    _SELECT_EVENTS = "SELECT seq, user_id, kind, at, amount FROM progress_events ORDER BY seq"
+    _SELECT_USER_EVENTS = "SELECT seq, user_id, kind, at, amount FROM progress_events WHERE user_id = ? ORDER BY seq"
+
+    def __init__(self, path: str, pool_size: int = 8, busy_timeout_ms: int = 5000, pool: Optional[SQLitePool] = None):
+        self.path = path
+        # Pool recebido (compartilhado com outros repositórios do mesmo banco) não é fechado aqui
+        self._owns_pool = pool is None
+        self._pool = pool if pool is not None else SQLitePool(path, pool_size, busy_timeout_ms)
+        with self._pool.connection() as conn:
+            conn.executescript(self._SCHEMA)
+        logger.info(f"Registro de progresso SQLite em {path} (pool de {pool_size} conexões).")
+
+    def _load(self, conn: sqlite3.Connection, user_id: str) -> ProgressAggregate:
+        row = conn.execute(self._SELECT_AGGREGATE, (user_id,)).fetchone()
+        return ProgressAggregate(*row) if row else ProgressAggregate()
+
+    def _append(self, conn: sqlite3.Connection, user_id: str, kind: str, amount: float, at: float) -> Tuple[ProgressEvent, ProgressAggregate]:
+        seq = conn.execute(self._INSERT_EVENT, (user_id, kind, at, float(amount))).lastrowid
+        event = ProgressEvent(seq, user_id, kind, at, float(amount))
+        aggregate = apply_event(self._load(conn, user_id), event)
+        conn.execute(self._UPSERT_AGGREGATE, (user_id, *aggregate))
+        return event, aggregate
+
+    def append(self, user_id: str, kind: str, amount: float = 0.0, at: Optional[float] = None) -> Tuple[ProgressEvent, ProgressAggregate]:
+        validate_event(kind, amount)
+        with self._pool.connection() as conn:
+            with self._pool.transaction(conn):
+                return self._append(conn, user_id, kind, amount, time.time() if at is None else at)
+
+    def aggregate(self, user_id: str) -> ProgressAggregate:
+        with self._pool.connection() as conn:
+            return self._load(conn, user_id)
+
+    def events(self, user_id: Optional[str] = None) -> Iterator[ProgressEvent]:
+        with self._pool.connection() as conn:
+            if user_id is None:
+                rows = conn.execute(self._SELECT_EVENTS).fetchall()
+            else:
+                rows = conn.execute(self._SELECT_USER_EVENTS, (user_id,)).fetchall()
+        return (ProgressEvent(*row) for row in rows)
+
+    def replay(self, user_id: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
+        started = time.perf_counter()
+        with self._pool.connection() as conn:
+            # Lock de escrita durante o replay: nenhum evento entra entre a leitura e a gravação
+            with self._pool.transaction(conn):
+                if user_id is None:
+                    rows = conn.execute(self._SELECT_EVENTS)
+                    stored_rows = conn.execute("SELECT * FROM progress_aggregates").fetchall()
+                else:
+                    rows = conn.execute(self._SELECT_USER_EVENTS, (user_id,))
+                    stored_rows = conn.execute("SELECT * FROM progress_aggregates WHERE user_id = ?", (user_id,)).fetchall()
+                rebuilt = fold_events(ProgressEvent(*row) for row in rows)
+                stored = {row[0]: ProgressAggregate(*row[1:]) for row in stored_rows}
+                if not dry_run:
+                    if user_id is None:
+                        conn.execute("DELETE FROM progress_aggregates")
+                    else:
+                        conn.execute("DELETE FROM progress_aggregates WHERE user_id = ?", (user_id,))
+                    conn.executemany(self._UPSERT_AGGREGATE, [(user, *aggregate) for user, aggregate in rebuilt.items()])
+        return _replay_report(stored, rebuilt, started)
+
+    def seed(self, events: Dict[str, List[Tuple[str, float, float]]]) -> None:
+        with self._pool.connection() as conn:
+            with self._pool.transaction(conn):
+                for user_id, items in events.items():
+                    if self._load(conn, user_id).events == 0:
+                        for kind, amount, at in items:
+                            self._append(conn, user_id, kind, amount, at)
+
+    def close(self) -> None:
+        if self._owns_pool:
+            self._pool.close()
+
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_progress_ledger() -> ProgressLedger:
+    """
+    Registro de progresso (Singleton): SQLite se PROGRESS_DB_PATH (ou APP_DB_PATH)
+    estiver definido, senão em memória. Em DEBUG, cria o histórico do usuário mockado.
+    """
+    path = settings.PROGRESS_DB_PATH or settings.APP_DB_PATH
+    if path:
+        ledger: ProgressLedger = SQLiteProgressLedger(
+            path,
+            pool_size=settings.GOALS_DB_POOL_SIZE,
+            busy_timeout_ms=settings.GOALS_DB_BUSY_TIMEOUT_MS,
+            pool=get_sqlite_pool(path, settings.GOALS_DB_POOL_SIZE, settings.GOALS_DB_BUSY_TIMEOUT_MS),
+        )
+    else:
+        ledger = InMemoryProgressLedger()
+    if settings.DEBUG:
+        ledger.seed(_DEMO_EVENTS)
+    return ledger
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refaz os agregados de progresso a partir do log de eventos.")
+    parser.add_argument("--db", default=settings.PROGRESS_DB_PATH, required=settings.PROGRESS_DB_PATH is None, help="Arquivo SQLite do registro.")
+    parser.add_argument("--user", default=None, help="Refaz apenas este usuário.")
+    parser.add_argument("--check", action="store_true", help="Só compara com os agregados atuais (não grava).")
+    args = parser.parse_args()
+
+    ledger = SQLiteProgressLedger(args.db)
+    report = ledger.replay(args.user, dry_run=args.check)
+    ledger.close()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.check and report["mismatched_users"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Índice invertido com ranqueamento BM25 para o RAG do Chat.
+
+Construído uma única vez na carga da base de conhecimento: cada termo aponta
+para as listas de postings (chunk, peso BM25 pré-calculado). Uma consulta
+apenas soma os pesos dos postings dos seus termos e seleciona os k melhores
+com um heap, sem varrer os chunks.
+
+Normalização para português: minúsculas, remoção de acentos, stopwords e um
+stemmer leve por sufixos ("apostar", "aposta", "apostas" -> "apost").
+"""
+import heapq
+from bisect import bisect_left
+from functools import lru_cache
+import math
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+# --- NORMALIZAÇÃO (PORTUGUÊS) ---
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset("""
+a ao aos aquela aquelas aquele aqueles aquilo as ate com como da das de dela delas dele deles
+depois do dos e ela elas ele eles em entre era eram essa essas esse esses esta estas este estes
+estou esta estao eu foi for foram ha isso isto ja la lhe lhes mais mas me mesmo meu meus minha
+minhas muita muitas muito muitos na nao nas nem no nos nossa nossas nosso nossos num numa o os
+ou para pela pelas pelo pelos por qual quando que quem se sem ser seu seus so sua suas tambem
+te tem tenho ter teu tua um uma umas uns voce voces vou agora aqui
+""".split())
+
+# Plurais (após a remoção de acentos): "opcoes" -> "opcao", "finais" -> "final"
+_PLURAL_RULES = (("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"), ("ois", "ol"), ("ns", "m"), ("res", "r"), ("les", "l"))
+
+# Sufixos derivacionais e verbais, do mais longo para o mais curto
+_SUFFIXES = tuple(sorted((
+    "amente", "mente", "idade", "dade", "icao", "acao", "cao", "coes", "ismo", "ista", "ador", "adora",
+    "eiro", "eira", "ando", "endo", "indo", "ado", "ada", "ido", "ida", "avel", "ivel", "ario", "aria",
+    "ar", "er", "ir", "ou", "ei", "ia", "ico", "ica", "oso", "osa",
+), key=len, reverse=True))
+
+_MIN_STEM = 3
+
+
+def fold_accents(text: str) -> str:
+    """Minúsculas sem acentos: 'Finanças' -> 'financas'."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return decomposed.encode("ascii", "ignore").decode("ascii")
+
+
+def stem(token: str) -> str:
+    """Stemmer leve para português (plural, sufixos e vogal temática final)."""
+    if len(token) <= _MIN_STEM:
+        return token
+    if token.endswith("s"):
+        for suffix, replacement in _PLURAL_RULES:
+            if token.endswith(suffix):
+                token = token[: -len(suffix)] + replacement
+                break
+        else:
+            token = token[:-1]
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+            token = token[: -len(suffix)]
+            break
+    if len(token) > _MIN_STEM and token[-1] in "aeo":
+        token = token[:-1]
+    return token
+
+
+# O vocabulário é limitado: memoizar o stemmer acelera a construção do índice
+_cached_stem = lru_cache(maxsize=200_000)(stem)
+
+
+def analyze(text: str) -> List[str]:
+    """Texto -> termos indexáveis (sem acentos, sem stopwords, com stemming)."""
+    return [_cached_stem(token) for token in _TOKEN.findall(fold_accents(text)) if token not in _STOPWORDS]
+
+
+# Peso de cada campo do chunk no índice (palavras-chave valem mais que o conteúdo)
+INDEXED_FIELDS = {"keywords": 2.0, "content": 1.0}
+
+
+def term_frequencies(chunk: Mapping[str, object], fields: Mapping[str, float]) -> Dict[str, float]:
+    """Frequência ponderada de cada termo do chunk (soma dos pesos dos campos onde aparece)."""
+    counter: Counter = Counter()
+    for field, weight in fields.items():
+        value = chunk.get(field) or ""
+        text = " ".join(value) if isinstance(value, (list, tuple)) else str(value)
+        for term in analyze(text):
+            counter[term] += weight
+    return dict(counter)
+
+
+# --- ÍNDICE INVERTIDO ---
+
+class InvertedIndex:
+    """
+    Índice invertido imutável com BM25 (k1, b) sobre os chunks da base.
+
+    Cada chunk é indexado a partir dos campos em `fields`, com peso por campo
+    (ex: palavras-chave valem mais que o conteúdo). Os postings (ordenados por
+    chunk) guardam o peso BM25 final de cada (termo, chunk) e o maior peso do
+    termo, então a consulta é só soma e heap.
+
+    Consulta term-at-a-time com parada antecipada exata: os termos são lidos do
+    maior para o menor impacto máximo; quando o que resta não consegue levar um
+    chunk ainda não visto acima do k-ésimo score parcial, os termos restantes só
+    atualizam os candidatos existentes (busca binária nos postings), sem
+    percorrer as listas longas dos termos comuns.
+    """
+
+    def __init__(
+        self,
+        chunks: Sequence[Mapping[str, object]],
+        fields: Mapping[str, float],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self._build([term_frequencies(chunk, fields) for chunk in chunks], k1, b)
+
+    @classmethod
+    def from_term_frequencies(
+        cls, frequencies: Sequence[Mapping[str, float]], k1: float = 1.2, b: float = 0.75
+    ) -> "InvertedIndex":
+        """
+        Monta o índice a partir das frequências já analisadas de cada chunk
+        (ex: persistidas pela ingestão), sem tokenizar o texto novamente.
+        """
+        index = cls.__new__(cls)
+        index._build(frequencies, k1, b)
+        return index
+
+    def _build(self, frequencies: Sequence[Mapping[str, float]], k1: float, b: float) -> None:
+        lengths = [sum(counter.values()) for counter in frequencies]
+        self.size = len(frequencies)
+        average_length = (sum(lengths) / self.size) if self.size else 0.0
+        document_frequency: Counter = Counter()
+        for counter in frequencies:
+            document_frequency.update(counter.keys())
+
+        # idf e listas de postings calculados uma vez por termo, fora do laço dos chunks
+        size = self.size
+        idf = {term: math.log(1 + (size - df + 0.5) / (df + 0.5)) * (k1 + 1) for term, df in document_frequency.items()}
+        postings: Dict[str, Tuple[array, array]] = {term: (array("I"), array("f")) for term in document_frequency}
+        for doc_id, counter in enumerate(frequencies):
+            norm = k1 * (1 - b + b * lengths[doc_id] / average_length) if average_length else k1
+            for term, tf in counter.items():
+                ids, weights = postings[term]
+                ids.append(doc_id)
+                weights.append(idf[term] * tf / (tf + norm))
+        self._postings = {term: (ids, weights, max(weights)) for term, (ids, weights) in postings.items()}
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings)
+
+    def search(self, query: str, k: int) -> List[Tuple[float, int]]:
+        """Top-k (score, índice do chunk) para a consulta, do mais relevante ao menos."""
+        return self.search_terms(analyze(query), k)
+
+    def search_terms(self, terms: Iterable[str], k: int) -> List[Tuple[float, int]]:
+        query = []
+        for term, count in Counter(terms).items():
+            entry = self._postings.get(term)
+            if entry is not None:
+                query.append((entry[2] * count, count, entry[0], entry[1]))
+        if not query or k <= 0:
+            return []
+        query.sort(key=itemgetter(0), reverse=True)
+
+        scores: Dict[int, float] = {}
+        get = scores.get
+        remaining = sum(upper for upper, _, _, _ in query)
+        for upper, count, ids, weights in query:
+            # Um chunk fora de `scores` soma no máximo `remaining` daqui em diante
+            if len(scores) >= k and heapq.nlargest(k, scores.values())[-1] > remaining:
+                for doc_id in scores:
+                    position = bisect_left(ids, doc_id)
+                    if position < len(ids) and ids[position] == doc_id:
+                        scores[doc_id] += weights[position] * count
+            else:
+                for doc_id, weight in zip(ids, weights):
+                    scores[doc_id] = get(doc_id, 0.0) + weight * count
+            remaining -= upper
+        # Empates mantêm a ordem dos chunks na base (nlargest com key é estável)
+        top = heapq.nlargest(k, scores.items(), key=itemgetter(1))
+        return [(score, doc_id) for doc_id, score in top]
@@ -0,0 +1,320 @@
+"""
+Ingestão da base de conhecimento do RAG (markdown) com reindexação incremental.
+
+A base deixa de ser uma lista no código: um diretório de arquivos .md é
+dividido em chunks (rag_vector_index.chunk_markdown), cada chunk recebe um
+fingerprint do seu conteúdo e os termos analisados são persistidos junto dele.
+Uma nova execução só relê os arquivos cujo (tamanho, mtime) mudou e só analisa
+os chunks com fingerprint novo; o resto é reaproveitado da geração anterior.
+
+    python -m app.services.rag_ingestion docs/base --store data/rag_kb
+
+Layout do diretório do store:
+
+    CURRENT                 número da geração publicada (trocado via rename)
+    generations/<n>.json    arquivos da geração: caminho, stat, hash e segmento
+    segments/<hash>.jsonl   chunks de uma versão de um arquivo (com os termos)
+
+Segmentos são endereçados pelo conteúdo e imutáveis: uma geração nova grava
+apenas os segmentos dos arquivos alterados e um manifesto pequeno, e é
+publicada com uma única troca atômica de CURRENT. O RAGService monitora CURRENT
+e monta o índice BM25 a partir dos termos persistidos, sem tokenizar de novo.
+
+Opcionalmente, um arquivo pode começar com um cabeçalho de palavras-chave,
+aplicadas a todos os seus chunks (mesmo peso das `keywords` da base embutida):
+
+    ---
+    keywords: impulso, ansiedade, crise
+    ---
+
+Um único processo de ingestão por store de cada vez (o RAGService só lê).
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.rag_index import INDEXED_FIELDS, term_frequencies
+from app.services.rag_vector_index import chunk_markdown
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+SOURCE_SUFFIX = ".md"
+
+_CURRENT = "CURRENT"
+_GENERATIONS = "generations"
+_SEGMENTS = "segments"
+
+
+def _digest(*parts: bytes) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part)
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def chunk_fingerprint(chunk: Dict) -> str:
+    """Identidade do conteúdo indexado de um chunk (origem, palavras-chave e texto)."""
+    keywords = ",".join(chunk.get("keywords") or ())
+    return _digest(chunk["source"].encode("utf-8"), keywords.encode("utf-8"), chunk["content"].encode("utf-8"))
+
+
+def split_front_matter(text: str) -> Tuple[List[str], str]:
+    """Separa o cabeçalho opcional `keywords:` (entre linhas '---') do corpo do markdown."""
+    lines = text.splitlines()
+    if not lines or lines[0].strip() != "---":
+        return [], text
+    for end in range(1, len(lines)):
+        if lines[end].strip() == "---":
+            break
+    else:
+        return [], text
+    keywords: List[str] = []
+    for line in lines[1:end]:
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "keywords":
+            keywords.extend(word.strip() for word in value.split(",") if word.strip())
+    return keywords, "\n".join(lines[end + 1:])
+
+
+def chunk_source_file(text: str, document: str, max_words: int, overlap: int) -> List[Dict]:
+    """Chunks de um arquivo markdown, com as palavras-chave do cabeçalho (se houver)."""
+    keywords, body = split_front_matter(text)
+    chunks = chunk_markdown(body, document, max_words=max_words, overlap=overlap)
+    if keywords:
+        for chunk in chunks:
+            chunk["keywords"] = keywords
+    return chunks
+
+
+class KnowledgeBaseSnapshot(NamedTuple):
+    """Conteúdo de uma geração publicada: chunks (na ordem do índice) e seus termos."""
+    generation: int
+    chunks: List[Dict]
+    frequencies: List[Dict[str, float]]
+
+
+class KnowledgeBaseStore:
+    """
+    Store versionado da base de conhecimento (ver docstring do módulo).
+    `ingest()` publica uma nova geração; `current_generation()` e `load()` são
+    usados pelo RAGService para detectar e carregar a geração publicada.
+    """
+
+    def __init__(self, path: str, keep_generations: int = 3):
+        self.path = path
+        self.keep_generations = max(1, keep_generations)
+
+    # --- Leitura ---
+
+    def current_generation(self) -> Optional[int]:
+        """Geração publicada (None se nada foi ingerido ainda)."""
+        try:
+            with open(os.path.join(self.path, _CURRENT), "r", encoding="utf-8") as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _generation_path(self, generation: int) -> str:
+        return os.path.join(self.path, _GENERATIONS, f"{generation:08d}.json")
+
+    def _segment_path(self, segment: str) -> str:
+        return os.path.join(self.path, _SEGMENTS, f"{segment}.jsonl")
+
+    def _read_manifest(self, generation: int) -> Dict:
+        with open(self._generation_path(generation), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Geração {generation} em formato incompatível.")
+        return manifest
+
+    def _read_segment(self, segment: str) -> Iterator[Dict]:
+        with open(self._segment_path(segment), "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def load(self, generation: Optional[int] = None) -> KnowledgeBaseSnapshot:
+        """Carrega uma geração (por padrão, a publicada). FileNotFoundError se não houver."""
+        if generation is None:
+            generation = self.current_generation()
+            if generation is None:
+                raise FileNotFoundError(f"Nenhuma geração publicada em {self.path}")
+        manifest = self._read_manifest(generation)
+        chunks: List[Dict] = []
+        frequencies: List[Dict[str, float]] = []
+        for entry in manifest["files"]:
+            for record in self._read_segment(entry["segment"]):
+                frequencies.append(record.pop("terms"))
+                record.pop("fingerprint", None)
+                chunks.append(record)
+        return KnowledgeBaseSnapshot(generation, chunks, frequencies)
+
+    # --- Ingestão ---
+
+    def ingest(self, source_dir: str, max_words: int = 120, overlap: int = 20) -> Dict:
+        """
+        Sincroniza o store com os arquivos .md de `source_dir` e publica uma nova
+        geração se algo mudou. Retorna um relatório (arquivos e chunks reaproveitados
+        x reprocessados, geração publicada e duração).
+        """
+        started = time.perf_counter()
+        previous_generation = self.current_generation()
+        previous_files: Dict[str, Dict] = {}
+        if previous_generation is not None:
+            previous_files = {entry["path"]: entry for entry in self._read_manifest(previous_generation)["files"]}
+        os.makedirs(os.path.join(self.path, _SEGMENTS), exist_ok=True)
+        os.makedirs(os.path.join(self.path, _GENERATIONS), exist_ok=True)
+
+        params = f"{max_words}:{overlap}"
+        report = {"files": 0, "changed_files": 0, "removed_files": 0, "chunks": 0,
+                  "analyzed_chunks": 0, "reused_chunks": 0}
+        files: List[Dict] = []
+        for relative_path in _list_sources(source_dir):
+            full_path = os.path.join(source_dir, relative_path)
+            stat = os.stat(full_path)
+            previous = previous_files.get(relative_path)
+            report["files"] += 1
+
+            # Caminho rápido: arquivo não tocado desde a última ingestão
+            if (previous is not None and previous["params"] == params
+                    and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns):
+                files.append(previous)
+                report["chunks"] += previous["chunks"]
+                report["reused_chunks"] += previous["chunks"]
+                continue
+
+            with open(full_path, "rb") as f:
+                data = f.read()
+            segment = _digest(relative_path.encode("utf-8"), params.encode("ascii"), data)
+            entry = {"path": relative_path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                     "params": params, "segment": segment}
+            if os.path.exists(self._segment_path(segment)):
+                # Conteúdo já conhecido (só o mtime mudou, ou o arquivo voltou a uma versão anterior)
+                with open(self._segment_path(segment), "rb") as f:
+                    entry["chunks"] = sum(1 for _ in f)
+                report["reused_chunks"] += entry["chunks"]
+            else:
+                known = {} if previous is None else self._known_terms(previous["segment"])
+                document = os.path.splitext(relative_path)[0].replace(os.sep, "/")
+                chunks = chunk_source_file(data.decode("utf-8", errors="replace"), document, max_words, overlap)
+                records = []
+                for chunk in chunks:
+                    fingerprint = chunk_fingerprint(chunk)
+                    terms = known.get(fingerprint)
+                    if terms is None:
+                        terms = term_frequencies(chunk, INDEXED_FIELDS)
+                        report["analyzed_chunks"] += 1
+                    else:
+                        report["reused_chunks"] += 1
+                    records.append({"fingerprint": fingerprint, **chunk, "terms": terms})
+                self._write_segment(segment, records)
+                entry["chunks"] = len(records)
+            if previous is None or previous["segment"] != segment:
+                report["changed_files"] += 1
+            report["chunks"] += entry["chunks"]
+            files.append(entry)
+
+        current_paths = {entry["path"] for entry in files}
+        report["removed_files"] = sum(1 for path in previous_files if path not in current_paths)
+
+        generation = previous_generation
+        if previous_generation is None or report["changed_files"] or report["removed_files"]:
+            generation = (previous_generation or 0) + 1
+            self._publish(generation, files)
+            self._collect_garbage(generation)
+        elif any(entry is not previous_files[entry["path"]] for entry in files):
+            # Apenas metadados (mtime) mudaram: atualiza o manifesto sem nova geração
+            self._write_manifest(generation, files)
+        report["generation"] = generation
+        report["published"] = generation != previous_generation
+        report["elapsed_seconds"] = round(time.perf_counter() - started, 4)
+        logger.info(f"Ingestão da base de conhecimento: {report}")
+        return report
+
+    def _known_terms(self, segment: str) -> Dict[str, Dict[str, float]]:
+        """Termos já analisados da versão anterior do arquivo, por fingerprint do chunk."""
+        try:
+            return {record["fingerprint"]: record["terms"] for record in self._read_segment(segment)}
+        except (OSError, ValueError):
+            return {}
+
+    def _write_segment(self, segment: str, records: List[Dict]) -> None:
+        payload = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        _atomic_write(self._segment_path(segment), payload.encode("utf-8"))
+
+    def _write_manifest(self, generation: int, files: List[Dict]) -> None:
+        manifest = {"version": FORMAT_VERSION, "generation": generation, "created_at": time.time(), "files": files}
+        _atomic_write(self._generation_path(generation), json.dumps(manifest).encode("utf-8"))
+
+    def _publish(self, generation: int, files: List[Dict]) -> None:
+        """Grava o manifesto da geração e só então troca CURRENT (rename atômico)."""
+        self._write_manifest(generation, files)
+        _atomic_write(os.path.join(self.path, _CURRENT), str(generation).encode("ascii"))
+
+    def _collect_garbage(self, current: int) -> None:
+        """Remove gerações antigas (mantém `keep_generations`) e segmentos sem referência."""
+        generations_dir = os.path.join(self.path, _GENERATIONS)
+        kept = set(range(current - self.keep_generations + 1, current + 1))
+        referenced = set()
+        for name in os.listdir(generations_dir):
+            stem, extension = os.path.splitext(name)
+            if extension != ".json" or not stem.isdigit():
+                continue
+            if int(stem) in kept:
+                referenced.update(entry["segment"] for entry in self._read_manifest(int(stem))["files"])
+            else:
+                os.unlink(os.path.join(generations_dir, name))
+        segments_dir = os.path.join(self.path, _SEGMENTS)
+        for name in os.listdir(segments_dir):
+            if name.endswith(".jsonl") and name[:-len(".jsonl")] not in referenced:
+                os.unlink(os.path.join(segments_dir, name))
+
+
+def _list_sources(source_dir: str) -> List[str]:
+    """Caminhos relativos dos arquivos .md (recursivo, ordem estável)."""
+    paths = []
+    for root, dirs, names in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in names:
+            if name.endswith(SOURCE_SUFFIX) and not name.startswith("."):
+                paths.append(os.path.relpath(os.path.join(root, name), source_dir))
+    return sorted(paths)
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".rag-kb-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Ingestão incremental da base de conhecimento (markdown) do RAG.")
+    parser.add_argument("source_dir", help="Diretório com os arquivos .md")
+    parser.add_argument("--store", required=True, help="Diretório do store (RAG_KB_DIR)")
+    parser.add_argument("--max-words", type=int, default=120)
+    parser.add_argument("--overlap", type=int, default=20)
+    parser.add_argument("--keep", type=int, default=settings.RAG_KB_KEEP_GENERATIONS, help="Gerações mantidas no store")
+    args = parser.parse_args(argv)
+
+    store = KnowledgeBaseStore(args.store, keep_generations=args.keep)
+    report = store.ingest(args.source_dir, max_words=args.max_words, overlap=args.overlap)
+    print(json.dumps(report, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
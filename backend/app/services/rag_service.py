@@ -1,5 +1,16 @@
-from typing import List, Dict
-import random
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Union
+
+from app.config.settings import settings
+from app.services.rag_index import INDEXED_FIELDS, InvertedIndex, analyze
+from app.services.rag_ingestion import KnowledgeBaseStore
+from app.services.rag_vector_index import VectorIndex, load_vector_index
+from app.services.result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
 
 # --- BASE DE CONHECIMENTO (Extraído de Base_de_Conhecimento_AntiBet_v2.md) ---
 
@@ -31,56 +42,258 @@ _KNOWLEDGE_BASE_TEXT = [
     }
 ]
 
+# Intenções do usuário -> termos da base (sinônimos do domínio). Aplicadas sobre
+# os termos já normalizados da consulta, com custo de uma busca em dict por termo.
+_IMPULSE_TERMS = "crise impulso ansiedade vontade de jogar"
+_FINANCIAL_TERMS = "dinheiro perdas economia"
+_PROFESSIONAL_TERMS = "terapia clínico psicólogo"
+_INTENT_EXPANSIONS = {
+    "apostar": _IMPULSE_TERMS, "jogar": _IMPULSE_TERMS, "impulso": _IMPULSE_TERMS,
+    "dinheiro": _FINANCIAL_TERMS, "perdi": _FINANCIAL_TERMS, "finanças": _FINANCIAL_TERMS,
+    "psicólogo": _PROFESSIONAL_TERMS, "terapia": _PROFESSIONAL_TERMS,
+}
+
+
+def _compile_expansions(expansions: Dict[str, str]) -> Dict[str, List[str]]:
+    """Normaliza gatilhos e expansões com o mesmo analisador do índice."""
+    compiled: Dict[str, List[str]] = {}
+    for trigger, expansion in expansions.items():
+        for term in analyze(trigger):
+            targets = compiled.setdefault(term, [])
+            targets.extend(t for t in analyze(expansion) if t not in targets)
+    return compiled
+
+
+class _KnowledgeState(NamedTuple):
+    """Base publicada para as consultas; trocada inteira, com uma única atribuição."""
+    index: Union[InvertedIndex, VectorIndex]
+    chunk: Callable[[int], Dict]
+    fallback_content: str
+    generation: int
+
 # --- SERVIÇO RAG ---
 
 class RAGService:
     """
     Simula o serviço de Retrieval-Augmented Generation (RAG).
     Responsável por buscar o contexto relevante na Base de Conhecimento para injetar no Prompt do LLM.
+
+    A busca usa um índice invertido com BM25 (rag_index.InvertedIndex), construído
+    uma única vez na carga: o custo por consulta depende dos termos da consulta,
+    não do número de chunks da base.
+
+    Com RAG_VECTOR_INDEX_PATH, usa o índice vetorial local gerado offline
+    (rag_vector_index.VectorIndex, via mmap) no lugar de um VectorDB externo.
+
+    Com RAG_KB_DIR, a base vem do store gerado pela ingestão incremental
+    (rag_ingestion.KnowledgeBaseStore). `reload_if_changed()` (ou o watcher em
+    background) detecta uma nova geração publicada, monta o índice a partir dos
+    termos persistidos fora do caminho das consultas e publica o novo estado com
+    uma única atribuição: cada consulta vê a geração antiga ou a nova, inteira.
+
+    O contexto montado é cacheado (ResultCache, LRU com limite de entradas e de
+    bytes) em dois níveis: pelo texto exato da mensagem (uma busca em dict) e
+    pelos termos normalizados da consulta (variações de caixa, acentos,
+    pontuação e stopwords compartilham a entrada). As chaves incluem a geração
+    da base, e a recarga de uma nova geração invalida os dois níveis.
     """
 
-    def __init__(self):
-        # Em produção, aqui seria a conexão com o cliente do VectorDB (ex: ChromaDB)
-        print("RAGService inicializado. Base de Conhecimento carregada (4 chunks).")
+    def __init__(
+        self,
+        knowledge_base: Optional[Sequence[Dict]] = None,
+        vector_index: Optional[VectorIndex] = None,
+        kb_store: Optional[KnowledgeBaseStore] = None,
+    ):
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+        self._reload_stats = {"reloads": 0, "failures": 0, "last_reload_at": None, "last_duration_ms": None}
+        self._exact_cache = ResultCache(
+            max_entries=settings.RAG_CACHE_MAX_ENTRIES, max_bytes=settings.RAG_CACHE_MAX_BYTES
+        )
+        self._query_cache = ResultCache(
+            max_entries=settings.RAG_CACHE_MAX_ENTRIES, max_bytes=settings.RAG_CACHE_MAX_BYTES
+        )
+        if knowledge_base is None and vector_index is None and kb_store is None:
+            if settings.RAG_VECTOR_INDEX_PATH:
+                vector_index = load_vector_index(settings.RAG_VECTOR_INDEX_PATH, nprobe=settings.RAG_VECTOR_NPROBE)
+            elif settings.RAG_KB_DIR:
+                kb_store = KnowledgeBaseStore(settings.RAG_KB_DIR, keep_generations=settings.RAG_KB_KEEP_GENERATIONS)
+        self._kb_store = kb_store
 
-    def _get_relevant_chunks(self, keywords: List[str]) -> List[str]:
-        """Simula a busca semântica no VectorDB."""
-        
-        relevant_chunks = []
-        
-        # Simulação de Score de Relevância (busca por palavra-chave)
-        for chunk in _KNOWLEDGE_BASE_TEXT:
-            if any(kw in keywords for kw in chunk["keywords"]):
-                # Retorna o conteúdo relevante formatado
-                relevant_chunks.append(f"({chunk['id']} - Fonte: {chunk['source']}): {chunk['content']}")
-                
-        return relevant_chunks
+        if vector_index is not None:
+            self._state = _KnowledgeState(vector_index, vector_index.chunk, _KNOWLEDGE_BASE_TEXT[0]["content"], 0)
+            description = f"índice vetorial, {len(vector_index)} chunks"
+        elif kb_store is not None and self.reload():
+            description = f"geração {self._state.generation}, {len(self._state.index)} chunks"
+        else:
+            if kb_store is not None:
+                logger.warning(f"Store da base de conhecimento sem geração válida ({kb_store.path}); usando a base embutida.")
+            chunks = list(knowledge_base if knowledge_base is not None else _KNOWLEDGE_BASE_TEXT)
+            self._state = _KnowledgeState(
+                InvertedIndex(chunks, INDEXED_FIELDS), chunks.__getitem__, chunks[0]["content"] if chunks else "", 0
+            )
+            description = f"{len(chunks)} chunks"
+        self._expansions = _compile_expansions(_INTENT_EXPANSIONS)
+        print(f"RAGService inicializado. Base de Conhecimento carregada ({description}).")
+
+    @property
+    def generation(self) -> int:
+        """Geração da base em uso (0 = base embutida ou índice vetorial)."""
+        return self._state.generation
+
+    # --- Recarga a quente (store da ingestão) ---
+
+    def reload(self) -> bool:
+        """Carrega a geração publicada no store. Retorna True se um novo estado foi publicado."""
+        if self._kb_store is None:
+            return False
+        with self._reload_lock:
+            started = time.perf_counter()
+            try:
+                snapshot = self._kb_store.load()
+                chunks = snapshot.chunks
+                index = InvertedIndex.from_term_frequencies(snapshot.frequencies)
+                fallback = chunks[0]["content"] if chunks else _KNOWLEDGE_BASE_TEXT[0]["content"]
+                # Troca atômica: uma única atribuição de referência
+                self._state = _KnowledgeState(index, chunks.__getitem__, fallback, snapshot.generation)
+                # Contextos da geração anterior não servem mais (as chaves já não casariam)
+                self._exact_cache.ensure_generation(snapshot.generation)
+                self._query_cache.ensure_generation(snapshot.generation)
+                self._reload_stats["reloads"] += 1
+                logger.info(f"Base de conhecimento: geração {snapshot.generation} carregada ({len(chunks)} chunks).")
+                return True
+            except Exception as e:  # Mantém a base anterior
+                logger.error(f"Erro ao carregar a base de conhecimento de {self._kb_store.path}: {e}")
+                self._reload_stats["failures"] += 1
+                return False
+            finally:
+                self._reload_stats["last_reload_at"] = time.time()
+                self._reload_stats["last_duration_ms"] = (time.perf_counter() - started) * 1000
+
+    def reload_if_changed(self) -> bool:
+        """Recarrega apenas se o store publicou outra geração desde a última carga."""
+        if self._kb_store is None:
+            return False
+        generation = self._kb_store.current_generation()
+        if generation is None or generation == self._state.generation:
+            return False
+        return self.reload()
+
+    def start_watcher(self, interval_seconds: float) -> None:
+        """Inicia (uma vez) a thread que verifica o store a cada `interval_seconds`."""
+        with self._reload_lock:
+            if self._kb_store is None or (self._watcher is not None and self._watcher.is_alive()):
+                return
+            self._watcher_stop.clear()
+            self._watcher = threading.Thread(
+                target=self._watch, args=(interval_seconds,), name="rag-kb-watcher", daemon=True
+            )
+            self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        """Interrompe a thread de monitoramento, se estiver ativa."""
+        self._watcher_stop.set()
+        watcher = self._watcher
+        if watcher is not None:
+            watcher.join()
+        self._watcher = None
+
+    def _watch(self, interval_seconds: float) -> None:
+        while not self._watcher_stop.wait(interval_seconds):
+            try:
+                self.reload_if_changed()
+            except Exception as e:  # A thread de monitoramento nunca deve morrer
+                logger.error(f"Erro no monitoramento da base de conhecimento: {e}")
+
+    def reload_stats(self) -> Dict[str, Any]:
+        """Métricas de recarga (observabilidade)."""
+        return {
+            **self._reload_stats,
+            "generation": self._state.generation,
+            "chunks": len(self._state.index),
+            "watching": self._watcher is not None and self._watcher.is_alive(),
+        }
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Métricas do cache de contextos: taxa de acerto total e por nível."""
+        exact = self._exact_cache.stats()
+        normalized = self._query_cache.stats()
+        queries = exact["hits"] + exact["misses"]
+        hits = exact["hits"] + normalized["hits"]
+        return {
+            "queries": queries,
+            "hits": hits,
+            "hit_rate": hits / queries if queries else 0.0,
+            "exact_hits": exact["hits"],
+            "normalized_hits": normalized["hits"],
+            "entries": exact["entries"] + normalized["entries"],
+            "bytes": exact["bytes"] + normalized["bytes"],
+            "evictions": exact["evictions"] + normalized["evictions"],
+            "invalidations": normalized["invalidations"],
+            "generation": self._state.generation,
+        }
+
+    def _expand_query(self, user_query: str) -> List[str]:
+        """Termos da consulta + termos das intenções detectadas (sem duplicação)."""
+        terms = analyze(user_query)
+        present = set(terms)
+        for term in list(terms):
+            for extra in self._expansions.get(term, ()):
+                if extra not in present:
+                    present.add(extra)
+                    terms.append(extra)
+        return terms
+
+    def _get_relevant_chunks(self, terms: List[str], state: Optional[_KnowledgeState] = None) -> List[str]:
+        """
+        Top-k chunks (BM25 ou similaridade de cosseno). Descarta os que ficam abaixo
+        de RAG_MIN_RELATIVE_SCORE do melhor score (ruído de termos genéricos).
+        """
+        state = state or self._state  # uma única leitura: a consulta inteira usa a mesma geração
+        ranked = state.index.search_terms(terms, settings.RAG_TOP_K)
+        if not ranked:
+            return []
+        threshold = ranked[0][0] * settings.RAG_MIN_RELATIVE_SCORE
+        return [
+            f"({chunk['id']} - Fonte: {chunk['source']}): {chunk['content']}"
+            for score, position in ranked
+            if score >= threshold
+            for chunk in (state.chunk(position),)
+        ]
 
     def retrieve_context(self, user_query: str) -> str:
         """
         Busca e compila o contexto mais relevante para a query do usuário.
         """
-        user_query_lower = user_query.lower()
-        
-        # 1. Identificação de Intenção (Keywords)
-        keywords_detected = []
-        if "apostar" in user_query_lower or "jogar" in user_query_lower or "impulso" in user_query_lower:
-            keywords_detected.extend(["crise", "impulso", "ansiedade", "vontade de jogar"])
-        
-        if "dinheiro" in user_query_lower or "perdi" in user_query_lower or "finanças" in user_query_lower:
-            keywords_detected.extend(["dinheiro", "perdas", "economia"])
-            
-        if "psicólogo" in user_query_lower or "terapia" in user_query_lower:
-             keywords_detected.extend(["terapia", "clínico", "psicólogo"])
-
-        # 2. Busca dos Chunks Relevantes (sem duplicação)
-        chunks = self._get_relevant_chunks(keywords_detected)
+        state = self._state
+
+        # 1. Mensagem repetida: uma busca no cache pelo texto exato
+        exact_key = (state.generation, user_query)
+        context = self._exact_cache.get(exact_key)
+        if context is not None:
+            return context
+
+        # 2. Normalização da consulta e expansão por intenção (a chave do cache normalizado)
+        terms = self._expand_query(user_query)
+        query_key = (state.generation, tuple(terms))
+        context = self._query_cache.get(query_key)
+        if context is None:
+            context = self._compile_context(terms, state)
+            self._query_cache.put(query_key, context)
+        if len(user_query) <= settings.RAG_CACHE_MAX_QUERY_CHARS:
+            self._exact_cache.put(exact_key, context)
+        return context
+
+    def _compile_context(self, terms: List[str], state: _KnowledgeState) -> str:
+        # Busca dos Chunks Relevantes (índice invertido BM25 ou vetorial)
+        chunks = self._get_relevant_chunks(terms, state)
         
         if not chunks:
             # Se não houver relevância direta, injeta um princípio básico de segurança (Ética/TCC)
-            return _KNOWLEDGE_BASE_TEXT[0]["content"] # Retorna o chunk de TCC
+            return state.fallback_content # Retorna o chunk de TCC
 
-        # 3. Compilação do Contexto
+        # Compilação do Contexto
         context_string = "\n".join(chunks)
         
         return f"""
@@ -89,6 +302,15 @@ class RAGService:
 --- FIM RAG ---
 """
 
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_rag_service() -> RAGService:
+    """
+    Instância única do RAGService (a base e o watcher de recarga são compartilhados).
+    """
+    return RAGService()
+
 # --- EXEMPLO DE USO (Para ser importado pelo chat.py) ---
 # rag_service = RAGService()
 # contexto = rag_service.retrieve_context("Estou com vontade de apostar e preciso de ajuda.")
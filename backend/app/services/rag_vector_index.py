@@ -0,0 +1,330 @@
+"""
+Índice vetorial local (denso) para o RAG do Chat, sem VectorDB externo.
+
+Construído offline a partir da base de conhecimento em markdown:
+
+    python -m app.services.rag_vector_index docs/base/*.md --out data/rag_index \
+        [--include-builtin] [--dim 1024] [--quantize int8] [--ivf 256]
+
+Cada chunk vira um vetor TF-IDF com hashing (feature hashing com sinal sobre os
+termos do mesmo analisador do índice BM25, normalizado L2). O diretório gerado
+contém:
+
+    manifest.json       versão do formato, dimensão, quantização, nº de listas IVF
+    vectors.npy         matriz (N, dim) float32 ou int8, aberta com mmap
+    scales.npy          escala por linha (apenas int8)
+    idf.json            idf por termo (termos fora do vocabulário são ignorados)
+    chunks.jsonl        metadados/conteúdo dos chunks, na ordem das linhas
+    chunk_offsets.npy   deslocamentos das linhas de chunks.jsonl (leitura sob demanda)
+    ivf_centroids.npy   centróides (listas, dim) - apenas no modo IVF
+    ivf_offsets.npy     início de cada lista na matriz (linhas agrupadas por lista)
+
+A consulta é um produto matriz-vetor em blocos com seleção top-k parcial
+(argpartition). No modo IVF, apenas as `nprobe` listas mais próximas são lidas.
+Requer NumPy; sem ele, o RAGService continua usando o índice BM25.
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: o índice vetorial fica indisponível
+    np = None
+
+from app.services.rag_index import analyze
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+QUANTIZATIONS = ("float32", "int8")
+
+_BLOCK_ROWS = 32_768
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+
+
+# --- CHUNKING DO MARKDOWN ---
+
+def chunk_markdown(text: str, document: str, max_words: int = 120, overlap: int = 20) -> List[Dict]:
+    """
+    Divide o markdown por seções (títulos) e, dentro de cada seção, em janelas de
+    até `max_words` palavras com `overlap` palavras de sobreposição.
+    `source` guarda o caminho de títulos da seção ("Documento > Seção > Subseção").
+    """
+    chunks: List[Dict] = []
+    headings: List[str] = []
+    section: List[str] = []
+
+    def flush() -> None:
+        words = " ".join(section).split()
+        step = max(1, max_words - overlap)
+        for start in range(0, len(words), step):
+            chunks.append({
+                "id": f"{document}#{len(chunks) + 1}",
+                "source": " > ".join([document] + headings),
+                "content": " ".join(words[start:start + max_words]),
+            })
+            if start + max_words >= len(words):
+                break
+        section.clear()
+
+    for line in text.splitlines():
+        heading = _HEADING.match(line.strip())
+        if heading:
+            flush()
+            level = len(heading.group(1))
+            del headings[level - 1:]
+            headings.append(heading.group(2).strip())
+        elif line.strip():
+            section.append(line.strip())
+    flush()
+    return chunks
+
+
+# --- EMBEDDING (TF-IDF COM HASHING) ---
+
+class HashedTfidfEmbedder:
+    """
+    Termos -> vetor denso de `dim` posições (feature hashing com sinal).
+    tf sublinear (1 + log tf) x idf do termo, normalizado L2.
+    """
+
+    def __init__(self, dim: int, idf: Dict[str, float]):
+        if dim <= 0 or dim & (dim - 1) or dim > 1 << 16:
+            raise ValueError("dim deve ser potência de 2 (até 65536).")
+        self.dim = dim
+        self.idf = idf
+        self._slots: Dict[str, Tuple[int, float]] = {}
+
+    def _slot(self, term: str) -> Tuple[int, float]:
+        slot = self._slots.get(term)
+        if slot is None:
+            h = zlib.crc32(term.encode("utf-8"))
+            slot = self._slots[term] = (h & (self.dim - 1), 1.0 if h >> 31 else -1.0)
+        return slot
+
+    def embed_terms(self, terms: Iterable[str]):
+        counts: Dict[str, int] = {}
+        for term in terms:
+            if term in self.idf:
+                counts[term] = counts.get(term, 0) + 1
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for term, count in counts.items():
+            position, sign = self._slot(term)
+            vector[position] += sign * (1.0 + np.log(count)) * self.idf[term]
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
+def compute_idf(documents: Sequence[List[str]]) -> Dict[str, float]:
+    df: Dict[str, int] = {}
+    for terms in documents:
+        for term in set(terms):
+            df[term] = df.get(term, 0) + 1
+    total = len(documents)
+    return {term: float(np.log((1 + total) / (1 + count)) + 1.0) for term, count in df.items()}
+
+
+# --- CONSTRUÇÃO OFFLINE ---
+
+def _spherical_kmeans(vectors, lists: int, iterations: int, seed: int):
+    """K-means esférico (similaridade de cosseno) para particionar as linhas em listas IVF."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=lists, replace=False)].copy()
+    assignment = np.zeros(len(vectors), dtype=np.int64)
+    for _ in range(iterations):
+        for start in range(0, len(vectors), _BLOCK_ROWS):
+            block = vectors[start:start + _BLOCK_ROWS]
+            assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        for cluster in range(lists):
+            members = vectors[assignment == cluster]
+            if len(members):
+                centroid = members.sum(axis=0)
+            else:  # lista vazia: re-semeia com uma linha aleatória
+                centroid = vectors[rng.integers(len(vectors))].copy()
+            norm = np.linalg.norm(centroid)
+            centroids[cluster] = centroid / norm if norm else centroid
+    return centroids.astype(np.float32), assignment
+
+
+def build_vector_index(
+    chunks: Sequence[Dict],
+    out_dir: str,
+    dim: int = 1024,
+    quantize: str = "float32",
+    ivf_lists: int = 0,
+    seed: int = 7,
+) -> Dict:
+    """Gera o diretório do índice vetorial. Retorna o manifesto gravado."""
+    if np is None:
+        raise RuntimeError("O índice vetorial requer NumPy (pip install numpy).")
+    if quantize not in QUANTIZATIONS:
+        raise ValueError(f"Quantização inválida: {quantize}. Use {QUANTIZATIONS}.")
+    if ivf_lists and ivf_lists > len(chunks):
+        raise ValueError("O número de listas IVF não pode exceder o número de chunks.")
+
+    documents = [analyze(" ".join(chunk.get("keywords") or []) + " " + chunk["content"]) for chunk in chunks]
+    idf = compute_idf(documents)
+    embedder = HashedTfidfEmbedder(dim, idf)
+    vectors = np.vstack([embedder.embed_terms(terms) for terms in documents]) if documents else np.zeros((0, dim), np.float32)
+
+    order = np.arange(len(chunks))
+    manifest = {"format_version": FORMAT_VERSION, "dim": dim, "count": len(chunks), "quantization": quantize, "ivf_lists": ivf_lists}
+    os.makedirs(out_dir, exist_ok=True)
+    if ivf_lists:
+        centroids, assignment = _spherical_kmeans(vectors, ivf_lists, iterations=10, seed=seed)
+        # Linhas agrupadas por lista: cada lista é uma fatia contígua da matriz
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.searchsorted(assignment[order], np.arange(ivf_lists + 1)).astype(np.int64)
+        vectors = vectors[order]
+        np.save(os.path.join(out_dir, "ivf_centroids.npy"), centroids)
+        np.save(os.path.join(out_dir, "ivf_offsets.npy"), offsets)
+
+    if quantize == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        np.save(os.path.join(out_dir, "vectors.npy"), np.round(vectors / scales[:, None]).astype(np.int8))
+        np.save(os.path.join(out_dir, "scales.npy"), scales.astype(np.float32))
+    else:
+        np.save(os.path.join(out_dir, "vectors.npy"), vectors.astype(np.float32))
+
+    offsets = [0]
+    with open(os.path.join(out_dir, "chunks.jsonl"), "wb") as f:
+        for position in order:
+            chunk = chunks[int(position)]
+            line = json.dumps(
+                {"id": chunk.get("id"), "source": chunk.get("source", ""), "content": chunk["content"]},
+                ensure_ascii=False,
+            ).encode("utf-8") + b"\n"
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+    np.save(os.path.join(out_dir, "chunk_offsets.npy"), np.asarray(offsets, dtype=np.int64))
+    with open(os.path.join(out_dir, "idf.json"), "w", encoding="utf-8") as f:
+        json.dump(idf, f, ensure_ascii=False)
+    # O manifesto é gravado por último: um diretório sem ele está incompleto
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+# --- CONSULTA (MMAP) ---
+
+class VectorIndex:
+    """
+    Índice vetorial aberto com mmap (matriz e textos ficam no page cache, não no heap).
+    `search_terms` devolve (similaridade de cosseno, posição do chunk), como o InvertedIndex.
+    """
+
+    def __init__(self, path: str, nprobe: int = 8):
+        if np is None:
+            raise RuntimeError("O índice vetorial requer NumPy (pip install numpy).")
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Versão do índice vetorial incompatível: {self.manifest.get('format_version')}")
+        with open(os.path.join(path, "idf.json"), encoding="utf-8") as f:
+            self.embedder = HashedTfidfEmbedder(self.manifest["dim"], json.load(f))
+
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.scales = (
+            np.load(os.path.join(path, "scales.npy"), mmap_mode="r")
+            if self.manifest["quantization"] == "int8" else None
+        )
+        self.nprobe = nprobe
+        self.centroids = self.ivf_offsets = None
+        if self.manifest.get("ivf_lists"):
+            self.centroids = np.load(os.path.join(path, "ivf_centroids.npy"))
+            self.ivf_offsets = np.load(os.path.join(path, "ivf_offsets.npy"))
+
+        self._chunk_offsets = np.load(os.path.join(path, "chunk_offsets.npy"), mmap_mode="r")
+        with open(os.path.join(path, "chunks.jsonl"), "rb") as f:
+            self._chunks_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.manifest["count"] else b""
+
+    def __len__(self) -> int:
+        return self.manifest["count"]
+
+    def chunk(self, position: int) -> Dict:
+        start, end = int(self._chunk_offsets[position]), int(self._chunk_offsets[position + 1])
+        return json.loads(self._chunks_file[start:end])
+
+    def _ranges(self, query) -> List[Tuple[int, int]]:
+        if self.centroids is None:
+            return [(0, len(self))]
+        nprobe = min(self.nprobe, len(self.centroids))
+        nearest = np.argpartition(self.centroids @ query, -nprobe)[-nprobe:]
+        return [(int(self.ivf_offsets[c]), int(self.ivf_offsets[c + 1])) for c in nearest]
+
+    def search_vector(self, query, k: int) -> List[Tuple[float, int]]:
+        """Top-k por produto interno, em blocos de linhas (memória limitada ao bloco)."""
+        best_scores, best_rows = [], []
+        for start, end in self._ranges(query):
+            for block_start in range(start, end, _BLOCK_ROWS):
+                block_end = min(block_start + _BLOCK_ROWS, end)
+                block = self.vectors[block_start:block_end]
+                if self.scales is not None:
+                    # Conversão explícita do bloco: int8 @ float32 não usa o caminho BLAS
+                    scores = (block.astype(np.float32) @ query) * self.scales[block_start:block_end]
+                else:
+                    scores = block @ query
+                if len(scores) > k:
+                    top = np.argpartition(scores, -k)[-k:]
+                else:
+                    top = np.arange(len(scores))
+                best_scores.append(scores[top])
+                best_rows.append(top + block_start)
+        if not best_scores:
+            return []
+        scores = np.concatenate(best_scores)
+        rows = np.concatenate(best_rows)
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(float(scores[i]), int(rows[i])) for i in order if scores[i] > 0]
+
+    def search_terms(self, terms: Iterable[str], k: int) -> List[Tuple[float, int]]:
+        query = self.embedder.embed_terms(terms)
+        if not query.any():
+            return []
+        return self.search_vector(query, k)
+
+    def search(self, query: str, k: int) -> List[Tuple[float, int]]:
+        return self.search_terms(analyze(query), k)
+
+
+def load_vector_index(path: str, nprobe: int = 8) -> Optional[VectorIndex]:
+    """Abre o índice; em caso de erro (ou sem NumPy), registra e retorna None."""
+    try:
+        return VectorIndex(path, nprobe=nprobe)
+    except Exception as e:
+        logger.error(f"Índice vetorial do RAG indisponível ({path}): {e}. Usando o índice BM25.")
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Constrói o índice vetorial do RAG a partir de arquivos markdown.")
+    parser.add_argument("sources", nargs="*", help="Arquivos .md da base de conhecimento")
+    parser.add_argument("--out", required=True, help="Diretório de saída do índice")
+    parser.add_argument("--include-builtin", action="store_true", help="Inclui os chunks embutidos do RAGService")
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--quantize", choices=QUANTIZATIONS, default="float32")
+    parser.add_argument("--ivf", type=int, default=0, help="Número de listas IVF (0 = busca exaustiva)")
+    parser.add_argument("--max-words", type=int, default=120)
+    args = parser.parse_args(argv)
+
+    chunks: List[Dict] = []
+    if args.include_builtin:
+        from app.services.rag_service import _KNOWLEDGE_BASE_TEXT
+        chunks.extend(_KNOWLEDGE_BASE_TEXT)
+    for source in args.sources:
+        with open(source, encoding="utf-8") as f:
+            name = os.path.splitext(os.path.basename(source))[0]
+            chunks.extend(chunk_markdown(f.read(), name, max_words=args.max_words))
+    manifest = build_vector_index(chunks, args.out, dim=args.dim, quantize=args.quantize, ivf_lists=args.ivf)
+    print(f"{manifest['count']} chunks -> {args.out} ({manifest})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.config.settings import settings
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimativa (em bytes) da memória ocupada por um valor cacheado.
+    Percorre dicts, listas, tuplas e sets; objetos compartilhados entre
+    entradas são contados em cada uma (estimativa conservadora).
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class ResultCache:
+    """
+    Cache em memória com despejo LRU, limite de entradas e de bytes, e TTL por entrada.
+
+    - A memória é contabilizada por entrada (função `sizeof`); ao exceder
+      `max_bytes` ou `max_entries`, as entradas menos usadas são despejadas.
+    - `ensure_generation` invalida todo o cache quando as entradas que o
+      alimentam mudam (ex: lista SPA recarregada, regras alteradas). Um `put`
+      com a geração lida antes do cálculo é descartado se ela já mudou.
+    - `stats()` expõe contadores de hits, misses, despejos e invalidações.
+    Thread-safe: rotas síncronas do FastAPI rodam em um threadpool.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof
+        # chave -> (valor, expira_em, tamanho)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._generation: Any = None
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0, "stale_puts": 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna o valor cacheado (marcando-o como usado recentemente) ou `default`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None, generation: Any = None) -> None:
+        """
+        Armazena um valor; `ttl_seconds` sobrepõe o TTL padrão do cache.
+        `generation`: geração das fontes usada no cálculo do valor. Se o cache já
+        passou para outra geração (ex: lista SPA recarregada durante o cálculo),
+        o valor está desatualizado e não é armazenado.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return # Maior que o cache inteiro: não vale a pena armazenar
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self._counters["stale_puts"] += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters["evictions"] += 1
+
+    def invalidate(self) -> None:
+        """Descarta todas as entradas."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._counters["invalidations"] += 1
+
+    def ensure_generation(self, generation: Hashable) -> bool:
+        """
+        Associa o cache a uma geração das suas fontes de dados.
+        Se a geração mudou, todas as entradas são descartadas. Retorna True nesse caso.
+        """
+        with self._lock:
+            if generation == self._generation:
+                return False
+            changed = self._generation is not None
+            self._generation = generation
+        if changed:
+            self.invalidate()
+        return changed
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores do cache (para métricas/observabilidade)."""
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries), "bytes": self._bytes}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_check_result_cache() -> ResultCache:
+    """
+    Cache (Singleton) dos resultados do pipeline /check (detector -> SPA -> cartão educativo).
+    """
+    return ResultCache(
+        max_entries=settings.CHECK_CACHE_MAX_ENTRIES,
+        max_bytes=settings.CHECK_CACHE_MAX_BYTES,
+        ttl_seconds=settings.CHECK_CACHE_TTL_SECONDS,
+    )
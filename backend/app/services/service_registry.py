@@ -0,0 +1,202 @@
+"""
+Registro dos serviços do worker e seu ciclo de vida (lifespan do FastAPI).
+
+- Construção preguiçosa: cada componente é registrado pelo caminho da sua
+  factory ("modulo:funcao"); nem o módulo é importado antes do primeiro uso.
+  Importar o app não cria serviço nenhum (nada de regex compilada, arquivo
+  lido ou print no import), o que mantém o cold start curto ao escalar.
+- Aquecimento paralelo no startup: os componentes são construídos em ondas
+  (um componente só começa depois das suas dependências), cada onda em
+  paralelo num pool de threads, e o tempo de cada um fica registrado.
+- Encerramento: só o que foi de fato construído é fechado, na ordem inversa.
+
+As factories continuam sendo as de cada serviço (`@lru_cache`): as rotas as
+usam via Depends e recebem a mesma instância que o registro aquece.
+"""
+import asyncio
+import importlib
+import inspect
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class _Component:
+    def __init__(self, name: str, factory_path: str, depends_on: Sequence[str], warm: Optional[Callable[[Any], Any]], close: Optional[Callable[[Any], Any]]):
+        self.name = name
+        self.factory_path = factory_path
+        self.depends_on = tuple(depends_on)
+        self.warm = warm
+        self.close = close
+        self.lock = threading.Lock()
+        self.instance: Any = None
+        self.built = False
+        self.init_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def factory(self) -> Callable[[], Any]:
+        module_name, _, attribute = self.factory_path.partition(":")
+        return getattr(importlib.import_module(module_name), attribute)
+
+    def built_elsewhere(self) -> bool:
+        """True se a factory (lru_cache) já criou a instância fora do registro (ex: via Depends)."""
+        module = sys.modules.get(self.factory_path.partition(":")[0])
+        factory = getattr(module, self.factory_path.partition(":")[2], None) if module is not None else None
+        return factory is not None and hasattr(factory, "cache_info") and factory.cache_info().currsize > 0
+
+
+class ServiceRegistry:
+    """Componentes nomeados, construídos sob demanda ou no aquecimento do startup."""
+
+    def __init__(self):
+        self._components: Dict[str, _Component] = {}
+        self._build_order: List[str] = []
+        self._order_lock = threading.Lock()
+        self.warmup_ms: Optional[float] = None
+
+    def register(
+        self,
+        name: str,
+        factory_path: str,
+        depends_on: Sequence[str] = (),
+        warm: Optional[Callable[[Any], Any]] = None,
+        close: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """
+        `factory_path`: "modulo:funcao" sem argumentos (normalmente a factory com lru_cache).
+        `warm`: preparo extra depois de construir (ex: subir os processos do executor).
+        `close`: encerramento no shutdown (síncrono ou corrotina).
+        """
+        unknown = [dep for dep in depends_on if dep not in self._components]
+        if unknown:
+            raise ValueError(f"Dependências de {name!r} não registradas: {unknown}.")
+        self._components[name] = _Component(name, factory_path, depends_on, warm, close)
+
+    def get(self, name: str) -> Any:
+        """Instância do componente, construindo-o (e às dependências) se preciso."""
+        component = self._components[name]
+        if component.built:
+            return component.instance
+        for dep in component.depends_on:
+            self.get(dep)
+        with component.lock:
+            if not component.built:
+                started = time.perf_counter()
+                try:
+                    instance = component.factory()()
+                    if component.warm is not None:
+                        component.warm(instance)
+                except Exception as e:
+                    component.error = f"{type(e).__name__}: {e}"
+                    raise
+                component.init_ms = round((time.perf_counter() - started) * 1000, 2)
+                component.instance, component.built, component.error = instance, True, None
+                with self._order_lock:
+                    self._build_order.append(name)
+        return component.instance
+
+    async def warm_up(self, max_workers: int = 8, names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Constrói os componentes em paralelo, em ondas respeitando as dependências.
+        Falhas são registradas (e o componente volta a ser tentado na primeira
+        requisição); não impedem o worker de subir.
+        """
+        pending = set(names if names is not None else self._components)
+        for name in list(pending):
+            pending.update(self._components[name].depends_on)
+        failed: set = set()
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warmup") as pool:
+            while pending:
+                # Dependência que falhou: os dependentes ficam para a primeira requisição
+                blocked = {n for n in pending if any(dep in failed for dep in self._components[n].depends_on)}
+                failed |= blocked
+                pending -= blocked
+                wave = [n for n in pending if all(self._components[dep].built for dep in self._components[n].depends_on)]
+                if not wave:
+                    break
+                results = await asyncio.gather(
+                    *(loop.run_in_executor(pool, self.get, name) for name in wave), return_exceptions=True
+                )
+                for name, result in zip(wave, results):
+                    pending.discard(name)
+                    if isinstance(result, BaseException):
+                        failed.add(name)
+                        logger.error(f"Falha ao aquecer {name!r}: {result}")
+        self.warmup_ms = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(f"Aquecimento do startup em {self.warmup_ms} ms ({len(self._build_order)} componentes).")
+        return self.stats()
+
+    async def shutdown(self) -> None:
+        """
+        Fecha os componentes construídos, na ordem inversa da construção (os
+        criados direto pela factory, sem passar pelo registro, por último).
+        """
+        with self._order_lock:
+            order, self._build_order = list(self._build_order), []
+        order.reverse()
+        order += [name for name, c in self._components.items() if not c.built and c.built_elsewhere()]
+        for name in order:
+            component = self._components[name]
+            if not component.built:
+                component.instance = component.factory()()
+            if component.close is not None:
+                try:
+                    result = component.close(component.instance)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Falha ao encerrar {name!r}: {e}")
+            component.instance, component.built = None, False
+            # A instância fechada sai do cache da factory: um novo startup cria outra
+            factory = component.factory()
+            if hasattr(factory, "cache_clear"):
+                factory.cache_clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "warmup_ms": self.warmup_ms,
+            "components": {
+                name: {"built": c.built, "init_ms": c.init_ms, "error": c.error, "depends_on": list(c.depends_on)}
+                for name, c in self._components.items()
+            },
+        }
+
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_service_registry() -> ServiceRegistry:
+    """
+    Registro (Singleton) com os serviços compartilhados do worker. Só guarda os
+    caminhos das factories: nenhum módulo de serviço é importado aqui.
+    """
+    registry = ServiceRegistry()
+    registry.register("spa_list_repository", "app.services.spa_list_repository:get_spa_list_repository", close=lambda repo: repo.stop_watcher())
+    registry.register("advertorial_detector", "app.services.advertorial_detector_service:get_advertorial_detector_service", warm=lambda detector: detector.warm_up(), close=lambda detector: detector.shutdown())
+    registry.register("education_content", "app.services.education_content_service:get_education_content_service")
+    registry.register("check_result_cache", "app.services.result_cache:get_check_result_cache")
+    registry.register("rag_service", "app.services.rag_service:get_rag_service", close=lambda rag: rag.stop_watcher())
+    registry.register("llm_client", "app.services.llm_client:get_llm_client", close=lambda llm: llm.aclose())
+    registry.register("user_profiles", "app.services.user_profile_service:get_user_profile_service")
+    registry.register("chat_sessions", "app.services.chat_session:get_chat_session_store")
+    registry.register(
+        "chat_orchestrator",
+        "app.services.chat_orchestrator:get_chat_orchestrator",
+        depends_on=("rag_service", "llm_client", "user_profiles", "chat_sessions"),
+    )
+    registry.register("goals_repository", "app.services.goals_repository:get_goals_repository", close=lambda repo: repo.close())
+    registry.register("progress_ledger", "app.services.progress_ledger:get_progress_ledger", close=lambda ledger: ledger.close())
+    registry.register("dashboard_snapshots", "app.routers.dashboard:get_dashboard_snapshots", depends_on=("goals_repository", "progress_ledger"))
+    registry.register("token_revocation", "app.services.token_revocation:get_token_revocation_list", close=lambda revocations: revocations.close())
+    registry.register("jwt_service", "app.services.auth_tokens:get_jwt_service", depends_on=("token_revocation",))
+    registry.register("password_hasher", "app.services.password_hashing:get_password_hasher")
+    registry.register("login_guard", "app.services.login_guard:get_login_guard", close=lambda guard: guard.executor.shutdown())
+    return registry
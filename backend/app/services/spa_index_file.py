@@ -0,0 +1,230 @@
+"""
+Formato binário compacto da lista de SPAs autorizados (Card 4), lido via mmap.
+
+O arquivo é compilado offline a partir do JSON (ou de listas texto, um domínio
+por linha) e aberto com mmap somente leitura: a abertura é O(1), nada é
+desserializado, e as páginas do arquivo ficam no page cache do sistema,
+compartilhadas entre todos os workers que abrirem o mesmo arquivo.
+
+Layout (little-endian):
+
+    cabeçalho   magic (8 bytes) | versão u32 | registros u32 | slots u32 | entradas u32
+    slots       `slots` x (fingerprint u32 | offset u32)   -- endereçamento aberto
+    registros   flags u8 | tamanho u16 | domínio (utf-8)
+
+A tabela de slots usa sondagem linear sobre um fingerprint CRC-32 (estável entre
+processos, ao contrário de hash(); tamanho potência de 2, ocupação <= 50%). O domínio do registro é comparado no
+acerto, então colisões de fingerprint nunca produzem falso positivo.
+
+Uso:
+    python -m app.services.spa_index_file spa_authorized_list.json spa_authorized_list.idx
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from app.services.domain_index import PublicSuffixList, classify_entries, normalize_domain
+
+MAGIC = b"SPAIDX\x00\x01"
+FORMAT_VERSION = 1
+
+FLAG_EXACT = 1     # o próprio host é autorizado
+FLAG_SUBTREE = 2   # os subdomínios são autorizados
+FLAG_ENTRY = 4     # entrada original da lista (reconstrução de `entries`)
+
+_HEADER = struct.Struct("<8sIIII")
+_SLOT = struct.Struct("<II")
+_RECORD = struct.Struct("<BH")
+_EMPTY = 0xFFFFFFFF
+_SLOTS_START = _HEADER.size
+_unpack_slot = _SLOT.unpack_from
+_unpack_record = _RECORD.unpack_from
+
+
+_fingerprint = zlib.crc32
+
+
+def _slot_count(entries: int) -> int:
+    slots = 8
+    while slots < entries * 2:
+        slots <<= 1
+    return slots
+
+
+def build_index_bytes(entries: Iterable[str], public_suffixes: Optional[PublicSuffixList] = None) -> bytes:
+    """Compila as entradas da lista (mesma semântica do DomainIndex) no formato binário."""
+    normalized, exact, subtree = classify_entries(entries, public_suffixes)
+    flags: Dict[str, int] = {}
+    for domain in exact:
+        flags[domain] = flags.get(domain, 0) | FLAG_EXACT
+    for domain in subtree:
+        flags[domain] = flags.get(domain, 0) | FLAG_SUBTREE
+    # Curingas são guardados como registro próprio apenas para reconstruir `entries`
+    for entry in normalized:
+        if entry:
+            flags[entry] = flags.get(entry, 0) | FLAG_ENTRY
+
+    slot_count = _slot_count(len(flags))
+    mask = slot_count - 1
+    slots: List[Optional[tuple]] = [None] * slot_count
+    records = bytearray()
+    records_base = _HEADER.size + slot_count * _SLOT.size
+
+    for domain in sorted(flags):
+        key = domain.encode("utf-8")
+        if len(key) > 0xFFFF:
+            raise ValueError(f"Domínio longo demais para o índice: {domain[:50]}...")
+        offset = records_base + len(records)
+        if offset > _EMPTY - 1:
+            raise ValueError("Índice excede o limite de 4 GiB do formato.")
+        records += _RECORD.pack(flags[domain], len(key)) + key
+        fingerprint = _fingerprint(key)
+        position = fingerprint & mask
+        while slots[position] is not None:
+            position = (position + 1) & mask
+        slots[position] = (fingerprint, offset)
+
+    entry_count = sum(1 for value in flags.values() if value & FLAG_ENTRY)
+    out = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, len(flags), slot_count, entry_count))
+    for slot in slots:
+        out += _SLOT.pack(*(slot or (0, _EMPTY)))
+    out += records
+    return bytes(out)
+
+
+def write_index_file(
+    entries: Iterable[str], path: str, public_suffixes: Optional[PublicSuffixList] = None
+) -> int:
+    """
+    Grava o índice em `path` de forma atômica (arquivo temporário + rename), para
+    que o watcher do repositório nunca leia um arquivo pela metade.
+    Retorna o tamanho em bytes.
+    """
+    data = build_index_bytes(entries, public_suffixes)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".spa-index-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return len(data)
+
+
+def read_source_entries(path: str) -> List[str]:
+    """Lê as entradas de um JSON {"authorized_domains": [...]} ou de um texto (um por linha)."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            domains = json.load(f).get("authorized_domains", [])
+            if not isinstance(domains, list):
+                raise ValueError("Chave 'authorized_domains' não é uma lista.")
+            return [str(domain) for domain in domains]
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+class MappedDomainIndex:
+    """
+    Índice de domínios lido diretamente do arquivo mapeado em memória.
+    Mesma interface e semântica do DomainIndex (`is_authorized`, `entries`, `len`).
+
+    Imutável e sem lock: o repositório publica uma nova instância a cada recarga.
+    O mapeamento anterior é liberado pelo GC quando nenhum leitor o referencia.
+    """
+
+    def __init__(self, buffer):
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Arquivo de índice SPA truncado.")
+        magic, version, count, slot_count, entry_count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Arquivo não é um índice SPA compatível.")
+        if slot_count & (slot_count - 1) or len(buffer) < _HEADER.size + slot_count * _SLOT.size:
+            raise ValueError("Cabeçalho do índice SPA inconsistente.")
+        self._buffer = buffer
+        self._count = count
+        self._entry_count = entry_count
+        self._slot_count = slot_count
+        self._mask = slot_count - 1
+        self._entries: Optional[FrozenSet[str]] = None
+
+    @classmethod
+    def open(cls, path: str) -> "MappedDomainIndex":
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def __len__(self) -> int:
+        return self._entry_count
+
+    def _flags(self, key: bytes) -> int:
+        buffer = self._buffer
+        mask = self._mask
+        fingerprint = _fingerprint(key)
+        position = fingerprint & mask
+        while True:
+            slot_fingerprint, offset = _unpack_slot(buffer, _SLOTS_START + (position << 3))  # slot = 8 bytes
+            if offset == _EMPTY:
+                return 0
+            if slot_fingerprint == fingerprint:
+                flags, length = _unpack_record(buffer, offset)
+                start = offset + 3  # registro = flags u8 + tamanho u16
+                if buffer[start:start + length] == key:
+                    return flags
+            position = (position + 1) & mask
+
+    def is_authorized(self, domain: str) -> bool:
+        domain = normalize_domain(domain)
+        if not domain:
+            return False
+        key = domain.encode("utf-8")
+        if self._flags(key) & FLAG_EXACT:
+            return True
+        # Sufixos de rótulos: "m.betano.bet.br" -> "betano.bet.br" -> "bet.br" -> "br"
+        dot = key.find(b".")
+        while dot != -1:
+            if self._flags(key[dot + 1:]) & FLAG_SUBTREE:
+                return True
+            dot = key.find(b".", dot + 1)
+        return False
+
+    @property
+    def entries(self) -> FrozenSet[str]:
+        """Entradas originais da lista, reconstruídas sob demanda (varredura dos registros)."""
+        if self._entries is None:
+            buffer = self._buffer
+            offset = _HEADER.size + self._slot_count * _SLOT.size
+            entries = []
+            for _ in range(self._count):
+                flags, length = _RECORD.unpack_from(buffer, offset)
+                start = offset + _RECORD.size
+                if flags & FLAG_ENTRY:
+                    entries.append(bytes(buffer[start:start + length]).decode("utf-8"))
+                offset = start + length
+            self._entries = frozenset(entries)
+        return self._entries
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compila a lista de SPAs autorizados no formato mmap.")
+    parser.add_argument("sources", nargs="+", help="Arquivos .json (authorized_domains) ou texto, um domínio por linha")
+    parser.add_argument("output", help="Arquivo de índice de saída")
+    args = parser.parse_args(argv)
+
+    entries: List[str] = []
+    for source in args.sources:
+        entries.extend(read_source_entries(source))
+    size = write_index_file(entries, args.output)
+    print(f"{len(entries)} entradas -> {args.output} ({size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,16 @@
 import json
 import threading
 import os
+import time
 from functools import lru_cache
-from typing import Set
+from typing import Any, Dict, FrozenSet, Optional, Union
 
 import logging
-from fastapi import Depends
 
 # Importa as configurações do Card 5
 from app.config.settings import Settings, settings
+from app.services.domain_index import DomainIndex
+from app.services.spa_index_file import MappedDomainIndex
 
 # Configuração de logging
 logger = logging.getLogger(__name__)
@@ -19,9 +21,22 @@ class SPAListRepository:
 
     Lê a partir de um arquivo JSON (simulando uma fonte de dados externa).
     O caminho do arquivo é fornecido via objeto Settings.
+
+    As entradas são indexadas por sufixo (DomainIndex): entradas exatas,
+    curingas "*.dominio" e domínios registráveis (que autorizam seus subdomínios).
+    Se SPA_LIST_INDEX_PATH estiver definido, a lista é lida do índice binário
+    compilado (MappedDomainIndex, via mmap) em vez do JSON.
+
+    Recarga a quente: `reload()` (chamado manualmente ou pelo watcher em
+    background) monta um novo índice imutável fora do caminho das requisições e o
+    publica com uma única atribuição de referência. As leituras
+    (`is_domain_authorized`) nunca adquirem lock: veem a lista antiga ou a nova,
+    nunca um estado intermediário. Se a recarga falhar, a lista anterior é mantida.
     """
     _instance = None
     _lock = threading.Lock()
+    # Incrementada a cada carga da lista (invalida caches derivados dela)
+    generation = 0
 
     def __new__(cls, settings_obj: Settings):
         # Implementação de Singleton thread-safe (Apenas a primeira chamada cria)
@@ -39,7 +54,18 @@ class SPAListRepository:
             with self._lock:
                 if not hasattr(self, '_initialized'):
                     # O settings_obj já foi armazenado no __new__
-                    self._authorized_domains: Set[str] = set()
+                    self._index: Union[DomainIndex, MappedDomainIndex] = DomainIndex(())
+                    # Serializa as recargas (leitores não usam este lock)
+                    self._reload_lock = threading.Lock()
+                    self._watcher: Optional[threading.Thread] = None
+                    self._watcher_stop = threading.Event()
+                    self._file_signature: Optional[tuple] = None
+                    self._reload_stats = {
+                        "reloads": 0,
+                        "failures": 0,
+                        "last_reload_at": None,
+                        "last_duration_ms": None,
+                    }
                     self._load_domains()
                     self._initialized = True
         
@@ -47,59 +73,149 @@ class SPAListRepository:
         self._settings = settings_obj
 
 
+    def _source_path(self) -> str:
+        """Arquivo de origem da lista: o índice binário, se configurado, ou o JSON."""
+        # getattr: objetos de configuração antigos/simulados podem não ter o campo
+        return getattr(self._settings, "SPA_LIST_INDEX_PATH", None) or self._settings.SPA_LIST_FILE_PATH
+
     def _load_domains(self):
         """
         Carrega os domínios do arquivo JSON para a memória (em um set),
         usando o caminho fornecido pelo Settings.
+        Com SPA_LIST_INDEX_PATH, apenas mapeia o índice binário (sem desserializar).
+        O novo conjunto é publicado de uma só vez, apenas se a carga tiver sucesso.
         """
-        config_file_path = self._settings.SPA_LIST_FILE_PATH # << USO DO CARD 5
+        index_path = getattr(self._settings, "SPA_LIST_INDEX_PATH", None)
+        config_file_path = index_path or self._settings.SPA_LIST_FILE_PATH # << USO DO CARD 5
+        started = time.perf_counter()
         
         try:
             logger.info(f"Carregando lista de SPAs autorizados de: {config_file_path}")
-            with open(config_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                # Espera-se que o JSON seja: { "authorized_domains": ["exemplo.com", ...] }
-                domains = data.get("authorized_domains", [])
-                
-                if not isinstance(domains, list):
-                    raise ValueError("Chave 'authorized_domains' não é uma lista.")
+            signature = self._stat_signature(config_file_path)
+            if index_path:
+                new_index = MappedDomainIndex.open(index_path)
+            else:
+                with open(config_file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
                     
-                self._authorized_domains = {str(domain).lower() for domain in domains}
-                logger.info(f"{len(self._authorized_domains)} domínios SPA carregados.")
+                    # Espera-se que o JSON seja: { "authorized_domains": ["exemplo.com", ...] }
+                    domains = data.get("authorized_domains", [])
+                    
+                    if not isinstance(domains, list):
+                        raise ValueError("Chave 'authorized_domains' não é uma lista.")
+                        
+                    new_index = DomainIndex(domains)
+
+            # Troca atômica: uma única atribuição de referência
+            self._index = new_index
+            self._file_signature = signature
+            self.generation += 1
+            self._reload_stats["reloads"] += 1
+            logger.info(f"{len(new_index)} domínios SPA carregados.")
+            return True
 
         except FileNotFoundError:
             logger.error(f"Arquivo de configuração de SPA não encontrado: {config_file_path}")
-            self._authorized_domains = set()
         except json.JSONDecodeError:
             logger.error(f"Erro ao decodificar JSON de SPAs: {config_file_path}")
-            self._authorized_domains = set()
         except Exception as e:
             logger.error(f"Erro inesperado ao carregar domínios SPA: {e}")
-            self._authorized_domains = set()
+        finally:
+            self._reload_stats["last_reload_at"] = time.time()
+            self._reload_stats["last_duration_ms"] = (time.perf_counter() - started) * 1000
+
+        self._reload_stats["failures"] += 1
+        return False
+
+    @staticmethod
+    def _stat_signature(path: str) -> Optional[tuple]:
+        """Identifica a versão do arquivo (uma troca por rename muda o inode)."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    # --- Recarga a quente ---
+
+    def reload(self) -> bool:
+        """Recarrega a lista do arquivo. Retorna True se uma nova lista foi publicada."""
+        with self._reload_lock:
+            return self._load_domains()
+
+    def reload_if_changed(self) -> bool:
+        """Recarrega apenas se o arquivo mudou desde a última carga bem-sucedida."""
+        signature = self._stat_signature(self._source_path())
+        if signature is None or signature == self._file_signature:
+            return False
+        return self.reload()
+
+    def start_watcher(self, interval_seconds: float) -> None:
+        """Inicia (uma vez) a thread que verifica o arquivo a cada `interval_seconds`."""
+        with self._reload_lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            self._watcher_stop.clear()
+            self._watcher = threading.Thread(
+                target=self._watch, args=(interval_seconds,), name="spa-list-watcher", daemon=True
+            )
+            self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        """Interrompe a thread de monitoramento, se estiver ativa."""
+        self._watcher_stop.set()
+        watcher = self._watcher
+        if watcher is not None:
+            watcher.join()
+        self._watcher = None
+
+    def _watch(self, interval_seconds: float) -> None:
+        while not self._watcher_stop.wait(interval_seconds):
+            try:
+                self.reload_if_changed()
+            except Exception as e: # A thread de monitoramento nunca deve morrer
+                logger.error(f"Erro no monitoramento da lista SPA: {e}")
+
+    def reload_stats(self) -> Dict[str, Any]:
+        """Métricas de recarga (observabilidade)."""
+        return {
+            **self._reload_stats,
+            "generation": self.generation,
+            "domains": len(self._index),
+            "watching": self._watcher is not None and self._watcher.is_alive(),
+        }
+
+    def get_authorized_domains(self) -> FrozenSet[str]:
+        """
+        Retorna o conjunto (imutável) de entradas da lista autorizada.
+        """
+        return self._index.entries
 
-    def get_authorized_domains(self) -> Set[str]:
+    def snapshot(self) -> Union[DomainIndex, MappedDomainIndex]:
         """
-        Retorna o conjunto (set) de domínios autorizados.
+        Índice imutável publicado no momento da chamada. Operações longas (ex:
+        verificação em massa) consultam sempre a mesma versão da lista, mesmo
+        que uma recarga ocorra no meio.
         """
-        return self._authorized_domains
+        return self._index
 
     def is_domain_authorized(self, domain: str) -> bool:
         """
-        Verifica se um domínio específico está no 'set' (Busca O(1)).
+        Verifica se um domínio está autorizado: entrada exata, curinga ou
+        subdomínio de um domínio registrável listado.
+        Custo proporcional ao número de rótulos do domínio, sem lock.
         """
-        return domain.lower() in self._authorized_domains
+        return self._index.is_authorized(domain)
 
 # --- Factory para Injeção de Dependência (FastAPI) ---
 
 @lru_cache(maxsize=1)
-def get_spa_list_repository(
-    settings_obj: Settings = Depends(lambda: settings) # Injeta o singleton settings
-) -> SPAListRepository:
+def get_spa_list_repository() -> SPAListRepository:
     """
     Ponto de entrada (Singleton) para o sistema de injeção de dependência.
     
-    Injeta as configurações e garante que o repositório seja criado
-    e inicializado apenas uma vez.
+    Injeta as configurações (singleton settings) e garante que o repositório
+    seja criado e inicializado apenas uma vez.
+    O lru_cache exige argumentos hasheáveis, por isso Settings não é um parâmetro.
     """
-    return SPAListRepository(settings_obj=settings_obj)
\ No newline at end of file
+    return SPAListRepository(settings_obj=settings)
\ No newline at end of file
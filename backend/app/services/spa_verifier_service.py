@@ -1,13 +1,129 @@
-from urllib.parse import urlparse
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
 from pydantic import BaseModel
 from fastapi import Depends
+from app.config.settings import settings
+from .domain_index import normalize_domain
 from .spa_list_repository import SPAListRepository, get_spa_list_repository
 
+# --- Normalização de URLs (compartilhada entre requisições) ---
+
+# "https://", "http://", "ftp://"... apenas no início da URL
+_SCHEME_PREFIX = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*://")
+# Host "nu" (sem esquema, caminho, porta ou credenciais): dispensa qualquer parsing
+_BARE_HOST = re.compile(r"[A-Za-z0-9.-]+")
+
+
+def _extract_authority(url: str) -> str:
+    """
+    Recorta a autoridade ('usuario@host:porta') da URL com operações de string,
+    sem urlparse: ignora o esquema e corta no primeiro '/', '?' ou '#'.
+    """
+    scheme = _SCHEME_PREFIX.match(url)
+    start = scheme.end() if scheme else 0
+    end = len(url)
+    for separator in "/?#":
+        position = url.find(separator, start)
+        if position != -1 and position < end:
+            end = position
+    return url[start:end]
+
+
+@lru_cache(maxsize=settings.SPA_DOMAIN_MEMO_SIZE)
+def normalize_authority(authority: str) -> str:
+    """
+    Autoridade da URL -> domínio normalizado (memoizado, limitado e thread-safe).
+    Remove credenciais e porta, ponto final e 'www.', e converte IDN para punycode.
+    """
+    host = authority.rpartition("@")[2]
+    if host.startswith("["):
+        # IPv6 literal: '[::1]:8080' -> '[::1]'
+        host = host[:host.find("]") + 1] or host
+    else:
+        name, colon, port = host.rpartition(":")
+        if colon and (not port or port.isdigit()):
+            host = name
+    domain = normalize_domain(host)
+    # Remove 'www.' (apenas um nível e nunca do domínio inteiro: 'www.com' fica)
+    if domain.startswith("www.") and "." in domain[4:]:
+        domain = domain[4:]
+    return domain
+
+
+def normalize_url_domain(url: str) -> str:
+    """
+    Extrai e normaliza o domínio de uma URL.
+    (ex: 'https://user@WWW.Exemplo.com.:443/path' -> 'exemplo.com')
+
+    Caminho rápido: hosts nus ('exemplo.com') não passam pelo recorte da URL.
+    Espaços nas bordas (exportações com valores preenchidos) são descartados antes
+    de tudo: com eles o esquema não seria reconhecido e viraria o host.
+    """
+    url = url.strip() if url else ""
+    if not url:
+        return ""
+    if _BARE_HOST.fullmatch(url):
+        return normalize_authority(url)
+    return normalize_authority(_extract_authority(url))
+
+
 class SPAScanResult(BaseModel):
     """Modelo de Pydantic para o resultado da verificação de SPA."""
     is_authorized: bool
     domain: str
 
+class SPABulkVerification:
+    """
+    Verificação em massa de URLs (Card 2), alimentada em lotes.
+
+    Todos os lotes consultam o mesmo snapshot da lista (Card 4). Os domínios são
+    normalizados, deduplicados por conjunto e só os ainda desconhecidos são
+    resolvidos no índice. O memo de domínios do job é limitado a `max_domains`
+    (esvaziado ao atingir o limite), então a memória não cresce com o volume.
+    """
+
+    def __init__(self, index: Any, max_domains: int):
+        self._index = index
+        self._max_domains = max_domains
+        self._known: Dict[str, bool] = {}
+        self._started = time.perf_counter()
+        self.urls = 0
+        self.authorized = 0
+        self.domain_lookups = 0
+
+    def verify(self, urls: List[str]) -> List[Tuple[str, str, bool]]:
+        """Retorna (url, domínio normalizado, autorizado) para cada URL do lote, na ordem."""
+        domains = [normalize_url_domain(url) for url in urls]
+        known = self._known
+        pending = set(domains).difference(known)
+        if pending:
+            if len(known) + len(pending) > self._max_domains:
+                known.clear()
+            is_authorized = self._index.is_authorized
+            for domain in pending:
+                known[domain] = bool(domain) and is_authorized(domain)
+            self.domain_lookups += len(pending)
+
+        results = [(url, domain, known[domain]) for url, domain in zip(urls, domains)]
+        self.urls += len(results)
+        self.authorized += sum(1 for result in results if result[2])
+        return results
+
+    def summary(self) -> Dict[str, Any]:
+        """Métricas do job, incluindo a vazão em URLs por segundo."""
+        elapsed = time.perf_counter() - self._started
+        return {
+            "urls": self.urls,
+            "authorized": self.authorized,
+            "domain_lookups": self.domain_lookups,
+            "elapsed_seconds": round(elapsed, 3),
+            "urls_per_second": round(self.urls / elapsed, 1) if elapsed > 0 else None,
+        }
+
+
 class SPAVerifierService:
     """
     Serviço de verificação de SPA (Card 2).
@@ -30,27 +146,9 @@ class SPAVerifierService:
         """
         Extrai e normaliza o domínio de uma URL.
         (ex: 'https://www.exemplo.com/path' -> 'exemplo.com')
+        Delegado a normalize_url_domain, cujo cache é compartilhado entre requisições.
         """
-        if not url:
-            return ""
-        
-        try:
-            # Garante que a URL tenha um schema para o urlparse funcionar
-            if '://' not in url:
-                url = f"http://{url}"
-                
-            parsed_url = urlparse(url)
-            domain = parsed_url.netloc
-            
-            # Remove 'www.' se existir
-            if domain.startswith('www.'):
-                domain = domain[4:]
-                
-            return domain.lower()
-        except Exception:
-            # Se a URL for inválida (ex: "texto aleatório"), 
-            # retorna o input original (que falhará a verificação, como esperado)
-            return url.lower()
+        return normalize_url_domain(url)
 
     def is_url_authorized(self, url: str) -> SPAScanResult:
         """
@@ -66,6 +164,30 @@ class SPAVerifierService:
         
         return SPAScanResult(is_authorized=is_auth, domain=domain)
 
+    def open_bulk(self, max_domains: Optional[int] = None) -> SPABulkVerification:
+        """Inicia uma verificação em massa sobre o snapshot atual da lista."""
+        return SPABulkVerification(
+            self.repository.snapshot(), max_domains or settings.SPA_BULK_MAX_DOMAINS
+        )
+
+    def verify_bulk(
+        self, urls: Iterable[str], batch_size: Optional[int] = None
+    ) -> Iterator[Tuple[str, str, bool]]:
+        """
+        Verifica um iterável (potencialmente enorme) de URLs em lotes, sem
+        materializá-lo. Gera (url, domínio, autorizado) na ordem de entrada.
+        """
+        bulk = self.open_bulk()
+        batch_size = batch_size or settings.SPA_BULK_BATCH_SIZE
+        batch: List[str] = []
+        for url in urls:
+            batch.append(url)
+            if len(batch) >= batch_size:
+                yield from bulk.verify(batch)
+                batch = []
+        if batch:
+            yield from bulk.verify(batch)
+
 # --- Factory para Injeção de Dependência (FastAPI) ---
 
 def get_spa_verifier_service(
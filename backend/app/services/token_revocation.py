@@ -0,0 +1,284 @@
+"""
+Lista de revogação de tokens (logout) sem I/O no caminho comum.
+
+- O armazenamento exato (`RevocationStore`: SQLite compartilhado entre
+  workers, ou em memória) guarda o `jti` de cada token revogado até o `exp`
+  dele; depois disso o próprio token já é rejeitado e a entrada é descartada.
+- Na frente do armazenamento fica um filtro de Bloom em memória: um `jti` que
+  o filtro não conhece certamente não foi revogado (sem falsos negativos) e a
+  requisição segue sem consulta nenhuma. Só as respostas "talvez" (tokens
+  revogados e os raros falsos positivos) vão ao armazenamento.
+- O filtro é remontado periodicamente a partir do armazenamento: entradas
+  expiradas saem (o filtro não cresce para sempre) e revogações feitas por
+  outros workers entram (propagação em até `rebuild_interval_seconds`).
+  Revogações do próprio worker entram no filtro na hora.
+"""
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.sqlite_pool import SQLitePool, get_sqlite_pool
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre um bytearray (hash duplo derivado do hash() da chave)."""
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    @staticmethod
+    def _hashes(key: str) -> Tuple[int, int]:
+        # hash() do Python (SipHash, semente por processo): o filtro nunca sai do
+        # processo e é remontado a partir do armazenamento, então a semente não importa
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        return h & 0xFFFFFFFF, (h >> 32) | 1
+
+    def add(self, key: str) -> None:
+        h1, h2 = self._hashes(key)
+        bits, m = self._bits, self.num_bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % m
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = self._hashes(key)
+        bits, m = self._bits, self.num_bits
+        # Sai no primeiro bit zerado: um jti não revogado costuma parar nas primeiras posições
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % m
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+class RevocationStore(ABC):
+    """Armazenamento exato dos `jti` revogados, cada um com o seu prazo (epoch)."""
+
+    @abstractmethod
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Registra a revogação (idempotente; mantém o maior prazo)."""
+
+    @abstractmethod
+    def is_revoked(self, jti: str, now: float) -> bool:
+        """True se o `jti` foi revogado e a entrada ainda não expirou."""
+
+    @abstractmethod
+    def active(self, now: float) -> List[str]:
+        """`jti` revogados ainda não expirados (remontagem do filtro)."""
+
+    @abstractmethod
+    def purge(self, now: float) -> int:
+        """Descarta as entradas expiradas; retorna quantas saíram."""
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryRevocationStore(RevocationStore):
+    def __init__(self):
+        self._entries: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[jti] = max(expires_at, self._entries.get(jti, 0.0))
+
+    def is_revoked(self, jti: str, now: float) -> bool:
+        return self._entries.get(jti, 0.0) > now
+
+    def active(self, now: float) -> List[str]:
+        with self._lock:
+            return [jti for jti, expires_at in self._entries.items() if expires_at > now]
+
+    def purge(self, now: float) -> int:
+        with self._lock:
+            expired = [jti for jti, expires_at in self._entries.items() if expires_at <= now]
+            for jti in expired:
+                del self._entries[jti]
+            return len(expired)
+
+
+class SQLiteRevocationStore(RevocationStore):
+    """Revogações num arquivo SQLite (WAL) compartilhado entre workers."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            jti        TEXT NOT NULL PRIMARY KEY,
+            expires_at REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS revoked_tokens_expiry ON revoked_tokens (expires_at);
+    """
+    _UPSERT = (
+        "INSERT INTO revoked_tokens (jti, expires_at) VALUES (?, ?) "
+        "ON CONFLICT (jti) DO UPDATE SET expires_at = MAX(expires_at, excluded.expires_at)"
+    )
+    _SELECT = "SELECT 1 FROM revoked_tokens WHERE jti = ? AND expires_at > ?"
+    _ACTIVE = "SELECT jti FROM revoked_tokens WHERE expires_at > ?"
+    _PURGE = "DELETE FROM revoked_tokens WHERE expires_at <= ?"
+
+    def __init__(self, path: str, pool_size: int = 8, busy_timeout_ms: int = 5000, pool: Optional[SQLitePool] = None):
+        self.path = path
+        # Pool recebido (compartilhado com outros repositórios do mesmo banco) não é fechado aqui
+        self._owns_pool = pool is None
+        self._pool = pool if pool is not None else SQLitePool(path, pool_size, busy_timeout_ms)
+        with self._pool.connection() as conn:
+            conn.executescript(self._SCHEMA)
+        logger.info(f"Lista de revogação de tokens SQLite em {path}.")
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        with self._pool.connection() as conn:
+            conn.execute(self._UPSERT, (jti, expires_at))
+
+    def is_revoked(self, jti: str, now: float) -> bool:
+        with self._pool.connection() as conn:
+            return conn.execute(self._SELECT, (jti, now)).fetchone() is not None
+
+    def active(self, now: float) -> List[str]:
+        with self._pool.connection() as conn:
+            return [row[0] for row in conn.execute(self._ACTIVE, (now,))]
+
+    def purge(self, now: float) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute(self._PURGE, (now,)).rowcount
+
+    def close(self) -> None:
+        if self._owns_pool:
+            self._pool.close()
+
+
+class TokenRevocationList:
+    """
+    Consulta de revogação: filtro de Bloom em memória na frente do `RevocationStore`.
+    O filtro é trocado por inteiro na remontagem (leituras sem lock).
+    """
+
+    def __init__(
+        self,
+        store: RevocationStore,
+        expected_revocations: int = 100_000,
+        false_positive_rate: float = 0.001,
+        rebuild_interval_seconds: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.store = store
+        self.expected_revocations = expected_revocations
+        self.false_positive_rate = false_positive_rate
+        self.rebuild_interval_seconds = rebuild_interval_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters = {"checks": 0, "filter_negatives": 0, "store_lookups": 0, "false_positives": 0, "revoked": 0, "rebuilds": 0, "purged": 0}
+        self._filter = BloomFilter(expected_revocations, false_positive_rate)
+        self._next_rebuild = 0.0
+        self.rebuild()
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Revoga o `jti` até `expires_at` (normalmente o exp do token)."""
+        if expires_at <= self._clock():
+            return  # o token já expirou por conta própria
+        # Sob o lock: uma remontagem em andamento não perde esta revogação
+        with self._lock:
+            self.store.revoke(jti, expires_at)
+            self._filter.add(jti)
+            self._counters["revoked"] += 1
+
+    def is_revoked(self, jti: str) -> bool:
+        now = self._clock()
+        if now >= self._next_rebuild:
+            self._maybe_rebuild()
+        self._counters["checks"] += 1
+        if jti not in self._filter:
+            self._counters["filter_negatives"] += 1
+            return False
+        self._counters["store_lookups"] += 1
+        revoked = self.store.is_revoked(jti, now)
+        if not revoked:
+            self._counters["false_positives"] += 1
+        return revoked
+
+    def _maybe_rebuild(self) -> None:
+        # Só uma thread remonta; as demais seguem com o filtro atual
+        if self._lock.acquire(blocking=False):
+            try:
+                if self._clock() >= self._next_rebuild:
+                    self._rebuild_locked()
+            finally:
+                self._lock.release()
+
+    def rebuild(self) -> None:
+        """Remonta o filtro a partir do armazenamento (descartando as entradas expiradas)."""
+        with self._lock:
+            self._rebuild_locked()
+
+    def _rebuild_locked(self) -> None:
+        now = self._clock()
+        purged = self.store.purge(now)
+        active = self.store.active(now)
+        # Folga de 2x: o filtro continua no erro previsto até a próxima remontagem
+        bloom = BloomFilter(max(self.expected_revocations, 2 * len(active)), self.false_positive_rate)
+        for jti in active:
+            bloom.add(jti)
+        self._filter = bloom
+        self._next_rebuild = now + self.rebuild_interval_seconds
+        self._counters["rebuilds"] += 1
+        self._counters["purged"] += purged
+
+    def stats(self) -> Dict[str, Any]:
+        bloom = self._filter
+        checks = self._counters["checks"]
+        return {
+            **self._counters,
+            "no_io_rate": self._counters["filter_negatives"] / checks if checks else 0.0,
+            "filter": {
+                "entries": bloom.count,
+                "capacity": bloom.capacity,
+                "bytes": bloom.size_bytes,
+                "hashes": bloom.num_hashes,
+            },
+        }
+
+    def close(self) -> None:
+        self.store.close()
+
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_token_revocation_list() -> TokenRevocationList:
+    """
+    Lista de revogação (Singleton): SQLite se REVOCATION_DB_PATH (ou APP_DB_PATH)
+    estiver definido (revogações vistas por todos os workers), senão em memória.
+    """
+    path = settings.REVOCATION_DB_PATH or settings.APP_DB_PATH
+    if path:
+        store: RevocationStore = SQLiteRevocationStore(
+            path,
+            pool_size=settings.GOALS_DB_POOL_SIZE,
+            busy_timeout_ms=settings.GOALS_DB_BUSY_TIMEOUT_MS,
+            pool=get_sqlite_pool(path, settings.GOALS_DB_POOL_SIZE, settings.GOALS_DB_BUSY_TIMEOUT_MS),
+        )
+    else:
+        store = InMemoryRevocationStore()
+    return TokenRevocationList(
+        store,
+        expected_revocations=settings.REVOCATION_BLOOM_CAPACITY,
+        false_positive_rate=settings.REVOCATION_BLOOM_FALSE_POSITIVE_RATE,
+        rebuild_interval_seconds=settings.REVOCATION_REBUILD_INTERVAL_SECONDS,
+    )
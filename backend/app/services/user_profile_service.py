@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# --- SIMULAÇÃO DE BANCO DE DADOS (Perfis de usuário) ---
+
+_user_profiles_db: Dict[str, Dict[str, object]] = {
+    "user_123": {"nickname": "Adonis", "gender": "Masculino", "age": 35},
+}
+
+
+class UserProfileService:
+    """
+    Perfil do usuário usado na personalização do Chat (apelido, gênero, idade).
+    Interface assíncrona: em produção, a consulta é de I/O (banco/cache) e roda
+    em paralelo com a busca do RAG. `latency_seconds` simula essa latência.
+    """
+
+    def __init__(self, profiles: Optional[Dict[str, Dict[str, object]]] = None, latency_seconds: float = 0.0):
+        self._profiles = _user_profiles_db if profiles is None else profiles
+        self.latency_seconds = latency_seconds
+        self._listeners: List[Callable[[str], None]] = []
+
+    async def get_profile(self, user_id: str) -> Optional[Dict[str, object]]:
+        """Perfil do usuário, ou None se não houver cadastro."""
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        profile = self._profiles.get(user_id)
+        return dict(profile) if profile is not None else None
+
+    async def update_profile(self, user_id: str, **fields: object) -> Dict[str, object]:
+        """Atualiza (ou cria) o perfil e avisa os interessados (ex: cache de prefixos do Chat)."""
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        profile = self._profiles.setdefault(user_id, {})
+        profile.update(fields)
+        for listener in self._listeners:
+            try:
+                listener(user_id)
+            except Exception as e:
+                logger.error(f"Falha ao notificar mudança de perfil de {user_id}: {e}")
+        return dict(profile)
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """Registra `listener(user_id)`, chamado a cada atualização de perfil."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+
+# --- Factory para Injeção de Dependência (FastAPI) ---
+
+@lru_cache(maxsize=1)
+def get_user_profile_service() -> UserProfileService:
+    """
+    Instância única do serviço de perfis.
+    """
+    return UserProfileService()
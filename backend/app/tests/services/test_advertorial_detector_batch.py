@@ -0,0 +1,58 @@
+import pytest
+
+from app.services.advertorial_detector_service import (
+    AdvertorialDetectorService,
+    get_advertorial_detector_service,
+)
+
+# Testes da detecção em lote (Card 1 - detect_many)
+
+@pytest.fixture
+def detector_service():
+    """Fixture para criar uma instância reutilizável do serviço de detecção."""
+    return AdvertorialDetectorService()
+
+DOCUMENTS = [
+    ("https://portal-exemplo.com/publieditorial/como-ganhar-facil",
+     "Conteúdo patrocinado: use o hack do tigrinho. Cadastre-se na Blaze e ganhe bônus!"),
+    ("https://portal-legitimo.com/noticia/economia",
+     "O banco central anunciou novas taxas de juros."),
+    ("https://outro-portal.com/afiliado/bet",
+     "Conteúdo patrocinado: use o hack do tigrinho. Cadastre-se na Blaze e ganhe bônus!"),
+]
+
+def _as_sets(report):
+    return {**report, "evidence": {k: set(v) for k, v in report["evidence"].items()}}
+
+def test_detect_many_matches_detect_in_input_order(detector_service: AdvertorialDetectorService):
+    """Cada relatório do lote é idêntico ao de `detect` e a ordem de entrada é preservada."""
+    reports = detector_service.detect_many(DOCUMENTS)
+
+    assert [r["url_analyzed"] for r in reports] == [url for url, _ in DOCUMENTS]
+    for (url, content), report in zip(DOCUMENTS, reports):
+        assert _as_sets(report) == _as_sets(detector_service.detect(url, content))
+
+def test_detect_many_scans_repeated_content_once(detector_service: AdvertorialDetectorService, monkeypatch):
+    """Conteúdo sindicado (idêntico) é varrido uma única vez por lote."""
+    calls = []
+    original = detector_service._find_text_matches
+    monkeypatch.setattr(detector_service, "_find_text_matches", lambda text: calls.append(text) or original(text))
+
+    detector_service.detect_many(DOCUMENTS)
+
+    assert len(calls) == 2
+
+def test_detect_many_reports_do_not_share_evidence(detector_service: AdvertorialDetectorService):
+    """Relatórios de conteúdos repetidos não compartilham as listas de evidências."""
+    first, _, third = detector_service.detect_many(DOCUMENTS)
+
+    first["evidence"]["CTA_MATCHES"].append("mutado")
+
+    assert "mutado" not in third["evidence"]["CTA_MATCHES"]
+
+def test_detect_many_empty_batch(detector_service: AdvertorialDetectorService):
+    assert detector_service.detect_many([]) == []
+
+def test_factory_returns_singleton():
+    """O factory de injeção de dependência compartilha o estado compilado."""
+    assert get_advertorial_detector_service() is get_advertorial_detector_service()
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from app.services.advertorial_detector_service import AdvertorialDetectorService
+
+# Testes dos modos de execução do detector (inline / thread / process)
+
+URL = "https://portal-exemplo.com/publieditorial/como-ganhar-facil"
+CONTENT = "Conteúdo patrocinado. Use o hack do tigrinho e cadastre-se na Betano! " * 50
+
+def _as_sets(report):
+    return {**report, "evidence": {k: set(v) for k, v in report["evidence"].items()}}
+
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+def test_detect_async_matches_detect_in_every_mode(mode: str):
+    """O modo de execução não altera o relatório."""
+    service = AdvertorialDetectorService(executor_mode=mode, max_workers=2)
+    try:
+        report = asyncio.run(service.detect_async(URL, CONTENT))
+        reports = asyncio.run(service.detect_many_async([(URL, CONTENT), (URL, "notícia")]))
+    finally:
+        service.shutdown()
+
+    assert _as_sets(report) == _as_sets(service.detect(URL, CONTENT))
+    assert [_as_sets(r) for r in reports] == [_as_sets(r) for r in service.detect_many([(URL, CONTENT), (URL, "notícia")])]
+
+def test_small_documents_stay_inline():
+    """Abaixo do limiar, a detecção não cria nem usa o executor."""
+    service = AdvertorialDetectorService(executor_mode="process", offload_min_chars=10_000)
+
+    asyncio.run(service.detect_async(URL, "Cadastre-se na Betano"))
+
+    assert service._executor is None
+
+def test_large_documents_are_offloaded():
+    """A partir do limiar, a detecção roda no executor configurado."""
+    service = AdvertorialDetectorService(executor_mode="thread", max_workers=1, offload_min_chars=100)
+    try:
+        asyncio.run(service.detect_async(URL, CONTENT))
+        assert service._executor is not None
+    finally:
+        service.shutdown()
+    assert service._executor is None
+
+def test_process_pool_warm_up():
+    """O aquecimento inicia os processos com as regras já compiladas."""
+    service = AdvertorialDetectorService(executor_mode="process", max_workers=2)
+    try:
+        service.warm_up()
+        assert service._executor is not None
+    finally:
+        service.shutdown()
+
+def test_invalid_executor_mode():
+    with pytest.raises(ValueError):
+        AdvertorialDetectorService(executor_mode="gpu")
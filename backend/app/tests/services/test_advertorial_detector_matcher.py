@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from app.services.advertorial_detector_service import (
+    AdvertorialDetectorService,
+    MultiPatternMatcher,
+    TEXT_CATEGORIES,
+)
+
+# Testes do motor de varredura única do detector (Card 1)
+
+@pytest.fixture
+def detector_service():
+    """Fixture para criar uma instância reutilizável do serviço de detecção."""
+    return AdvertorialDetectorService()
+
+def _legacy_matches(service: AdvertorialDetectorService, text: str):
+    """Varredura original: um findall com re.IGNORECASE por categoria."""
+    return {
+        category: set(service._find_matches(service.rules[category][0], text))
+        for category in TEXT_CATEGORIES
+    }
+
+def test_matcher_is_enabled_for_default_rules(detector_service: AdvertorialDetectorService):
+    """As regras padrão são alternâncias literais e usam o motor de varredura única."""
+    assert detector_service.matcher is not None
+
+def test_matcher_keeps_first_alternative_semantics(detector_service: AdvertorialDetectorService):
+    """
+    'bet' é a primeira alternativa de OPERATOR: em 'Betano' a regra casa 'Bet',
+    e em '1xbet' o literal mais longo consome o 'bet' interno.
+    """
+    matches = detector_service.matcher.scan("Cadastre-se na Betano e na 1xBet.")
+
+    assert set(matches["OPERATOR"]) == {"Bet", "1xBet"}
+    assert matches["CTA"] == ["Cadastre-se"]
+
+def test_matcher_finds_matches_overlapping_other_categories(detector_service: AdvertorialDetectorService):
+    """Correspondências de categorias diferentes podem se sobrepor (como nas varreduras separadas)."""
+    text = "cadastre-sestratégia infalível e jogue agorafiliado"
+
+    matches = detector_service.matcher.scan(text)
+
+    assert {k: set(v) for k, v in matches.items()} == _legacy_matches(detector_service, text)
+    assert set(matches["DECEPTIVE"]) == {"estratégia infalível"}
+    assert set(matches["LABEL"]) == {"afiliado"}
+
+@pytest.mark.parametrize("text", ["İnsta BET", "ſtake aqui", "pıxbet"])
+def test_matcher_defers_unsafe_case_folding(detector_service: AdvertorialDetectorService, text: str):
+    """Textos que str.lower() não normaliza posição a posição usam a varredura por categoria."""
+    assert detector_service.matcher.scan(text) is None
+
+    report = detector_service.detect("https://exemplo.com", text)
+    legacy = _legacy_matches(detector_service, text)
+    assert set(report["evidence"].get("OPERATOR_MATCHES", [])) == legacy["OPERATOR"]
+
+def test_matcher_rejects_non_literal_rules():
+    """Regras com metacaracteres não podem ser compiladas no motor."""
+    with pytest.raises(ValueError):
+        MultiPatternMatcher({"URL": r"publ(i|ieditorial)"})
+
+def test_detect_is_equivalent_to_per_category_scans(detector_service: AdvertorialDetectorService):
+    """Fuzz: score, risk_label e evidências idênticos aos da varredura original."""
+    rng = random.Random(42)
+    fragments = [
+        "bet", "BET365", "Betano", "1xbet", "pixbet", "kto", "blaze", "stake", "LeoVegas",
+        "cadastre-se", "Ganhe Bônus", "aposte agora", "deposite aqui", "jogue agora",
+        "estratégia infalível", "como ganhar sempre", "hack do tigrinho", "ganhe fácil",
+        "dinheiro rápido", "conteúdo patrocinado", "publi", "parceria paga", "parceria",
+        "advertorial", "branded", "afiliado", "notícia", "economia", " ", "-", "a", "e",
+    ]
+    for _ in range(300):
+        text = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 40)))
+
+        report = detector_service.detect("https://exemplo.com/noticia", text)
+
+        matcher = detector_service.matcher
+        detector_service.matcher = None
+        try:
+            legacy_report = detector_service.detect("https://exemplo.com/noticia", text)
+        finally:
+            detector_service.matcher = matcher
+
+        assert report["score"] == legacy_report["score"]
+        assert report["risk_label"] == legacy_report["risk_label"]
+        assert {k: set(v) for k, v in report["evidence"].items()} == \
+            {k: set(v) for k, v in legacy_report["evidence"].items()}
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from app.services.advertorial_detector_service import AdvertorialDetectorService
+
+# Testes da detecção em streaming (Card 1 - detect_stream)
+
+URL = "https://portal-exemplo.com/publieditorial/como-ganhar-facil"
+
+@pytest.fixture
+def detector_service():
+    """Fixture para criar uma instância reutilizável do serviço de detecção."""
+    return AdvertorialDetectorService()
+
+def _as_sets(report):
+    return {**report, "evidence": {k: set(v) for k, v in report["evidence"].items()}}
+
+def _chunks(text: str, sizes):
+    position = 0
+    for size in sizes:
+        yield text[position:position + size]
+        position += size
+    yield text[position:]
+
+def test_match_across_chunk_boundary(detector_service: AdvertorialDetectorService):
+    """Uma correspondência dividida entre duas partes é encontrada."""
+    report = detector_service.detect_stream(URL, ["Use o hack do ti", "grinho e cadastre", "-se já"])
+
+    assert set(report["evidence"]["DECEPTIVE_MATCHES"]) == {"hack do tigrinho"}
+    assert set(report["evidence"]["CTA_MATCHES"]) == {"cadastre-se"}
+
+def test_stream_is_equivalent_to_detect(detector_service: AdvertorialDetectorService):
+    """Fuzz: qualquer particionamento do texto produz o mesmo relatório de `detect`."""
+    rng = random.Random(7)
+    fragments = [
+        "bet", "BET365", "Betano", "1xbet", "cadastre-se", "Ganhe Bônus", "estratégia infalível",
+        "hack do tigrinho", "conteúdo patrocinado", "parceria paga", "parceria", "publi",
+        "notícia", " ", "-", "a", "e", "ſ", "İ",
+    ]
+    for _ in range(200):
+        text = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 60)))
+        sizes = [rng.randint(0, 12) for _ in range(rng.randint(0, 15))]
+
+        report = detector_service.detect_stream(URL, _chunks(text, sizes))
+
+        assert _as_sets(report) == _as_sets(detector_service.detect(URL, text))
+
+def test_stream_keeps_bounded_tail(detector_service: AdvertorialDetectorService):
+    """Entre partes, apenas uma cauda menor que o literal mais longo é mantida."""
+    stream = detector_service.open_stream(URL)
+    for _ in range(1000):
+        stream.feed("O banco central anunciou novas taxas de juros. " * 20)
+        assert len(stream._tail) < detector_service.matcher.max_literal_length
+
+    assert stream.close()["score"] == 15 # Apenas a URL
+
+def test_stream_stops_at_score_cap(detector_service: AdvertorialDetectorService):
+    """Com stop_at_cap, o consumo das partes para quando o score atinge 100."""
+    consumed = []
+
+    def body():
+        for chunk in ["Conteúdo patrocinado! Hack do tigrinho. ", "Cadastre-se na Blaze e ganhe bônus! "] + ["notícia "] * 100:
+            consumed.append(chunk)
+            yield chunk
+
+    report = detector_service.detect_stream(URL, body(), stop_at_cap=True)
+
+    assert report["score"] == 100
+    assert report["risk_label"] == "Alto"
+    assert len(consumed) < 10
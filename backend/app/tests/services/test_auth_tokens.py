@@ -0,0 +1,124 @@
+import json
+
+import pytest
+
+from app.services.auth_tokens import InvalidTokenError, JWTService, SigningKey, b64url_decode, b64url_encode
+
+# Testes da emissão/verificação de JWT (HS256, rotação, cache de claims)
+
+SECRET = "segredo-de-teste-com-mais-de-32-bytes!!"
+
+
+class _Clock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _service(clock=None, **kwargs) -> JWTService:
+    return JWTService(SigningKey.hs256(SECRET), clock=clock or _Clock(), **kwargs)
+
+
+def test_round_trip_and_claims_cache():
+    service = _service()
+    token = service.issue("user_123", {"nickname": "Adonis"})
+
+    claims = service.verify(token)
+    assert claims["sub"] == "user_123" and claims["nickname"] == "Adonis"
+    assert claims["exp"] - claims["iat"] == service.ttl_seconds and claims["jti"]
+    assert service.verify(token) is claims  # segunda verificação vem do cache
+    assert service.stats()["claims_cache"]["hits"] == 1
+    # Mesmo segredo em outro worker: mesmo kid, token aceito
+    assert _service().verify(token)["sub"] == "user_123"
+
+
+def test_rejects_tampered_foreign_and_alg_swapped_tokens():
+    service = _service()
+    header, payload, signature = service.issue("user_123").split(".")
+    forged_payload = b64url_encode(b64url_decode(payload).replace(b"user_123", b"user_999"))
+    other = JWTService(SigningKey.hs256("outro-segredo-com-mais-de-32-bytes!!!"), clock=_Clock())
+    none_header = b64url_encode(b64url_decode(header).replace(b'"HS256"', b'"none"'))
+
+    for token in (
+        f"{header}.{forged_payload}.{signature}",
+        other.issue("user_123"),
+        f"{none_header}.{payload}.",
+        f"{none_header}.{payload}.{signature}",
+        "mock.jwt.token.user_123.1700000000",
+        "abc",
+    ):
+        with pytest.raises(InvalidTokenError):
+            service.verify(token)
+    assert service.stats()["rejected"] == 6
+
+
+@pytest.mark.parametrize("header", [
+    {"alg": "HS256", "kid": [1], "typ": "JWT"},
+    {"alg": "HS256", "kid": {"a": 1}, "typ": "JWT"},
+    {"alg": ["HS256"], "typ": "JWT"},
+    ["HS256"],
+])
+def test_malformed_header_is_an_invalid_token(header):
+    service = _service()
+    _, payload, signature = service.issue("user_123").split(".")
+    forged_header = b64url_encode(json.dumps(header).encode("utf-8"))
+
+    with pytest.raises(InvalidTokenError):
+        service.verify(f"{forged_header}.{payload}.{signature}")
+
+
+def test_expiry_is_enforced_even_for_cached_claims():
+    clock = _Clock()
+    service = _service(clock, ttl_seconds=60, leeway_seconds=5)
+    token = service.issue("user_123")
+    service.verify(token)
+
+    clock.now += 64
+    assert service.verify(token)["sub"] == "user_123"  # dentro da tolerância
+    clock.now += 1
+    with pytest.raises(InvalidTokenError):
+        service.verify(token)
+
+
+def test_rotation_keeps_old_tokens_until_the_key_is_retired():
+    service = _service()
+    old_kid = service.active_kid
+    old_token = service.issue("user_123")
+    service.verify(old_token)
+
+    service.rotate(SigningKey.hs256("segredo-novo-com-bem-mais-de-32-bytes!!"))
+    new_token = service.issue("user_123")
+    assert service.active_kid != old_kid
+    assert service.verify(old_token)["sub"] == service.verify(new_token)["sub"] == "user_123"
+
+    service.retire(old_kid)
+    with pytest.raises(InvalidTokenError):
+        service.verify(old_token)  # estava no cache, mas a chave não é mais aceita
+    assert service.verify(new_token)["sub"] == "user_123"
+    with pytest.raises(ValueError):
+        service.retire(service.active_kid)
+
+
+def test_short_secrets_are_refused():
+    with pytest.raises(ValueError):
+        SigningKey.hs256("curto")
+
+
+def test_eddsa_tokens():
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+    private = Ed25519PrivateKey.generate()
+    private_pem = private.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    public_pem = private.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    issuer = JWTService(SigningKey.eddsa(private_pem=private_pem), clock=_Clock())
+    token = issuer.issue("user_123")
+
+    # Quem só verifica precisa apenas da chave pública
+    verifier_key = SigningKey.eddsa(public_pem=public_pem)
+    verifier = JWTService(SigningKey.hs256(SECRET), [verifier_key], clock=_Clock())
+    assert verifier_key.kid == issuer.active_kid
+    assert verifier.verify(token)["sub"] == "user_123"
@@ -0,0 +1,72 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.chat_orchestrator import ChatOrchestrator
+from app.services.chat_prompt import SYSTEM_PROMPT, PrefixCache, PromptBuilder, PromptTemplate
+from app.services.chat_session import HistoryTurn, SessionSnapshot
+from app.services.llm_client import StubLLMClient
+from app.services.rag_service import RAGService
+from app.services.token_counter import count_message_tokens
+from app.services.user_profile_service import UserProfileService
+
+# Testes da montagem do prompt (templates, prefixo por usuário, layout estável)
+
+USER = SimpleNamespace(id="user_42", nickname="Token", gender="Feminino", age=29)
+
+
+def test_template_renders_like_str_format():
+    template = PromptTemplate("Apelido: {nickname}\nIdade: {age}\n")
+
+    assert template.fields == {"nickname", "age"}
+    assert template.render(nickname="Ana", age=29) == "Apelido: {nickname}\nIdade: {age}\n".format(nickname="Ana", age=29)
+    with pytest.raises(ValueError):
+        PromptTemplate("Idade: {age:>3}")
+
+
+def test_prefix_cache_hits_and_rebuilds_on_profile_change():
+    cache = PrefixCache()
+    first = cache.get("u1", "Ana", "Feminino", 29)
+
+    assert cache.get("u1", "Ana", "Feminino", 29) is first
+    # Perfil diferente do que montou a entrada: reconstrói mesmo sem invalidação explícita
+    changed = cache.get("u1", "Aninha", "Feminino", 29)
+    assert "Apelido: Aninha" in changed.messages[1]["content"]
+    assert changed.messages[0] is first.messages[0]  # mensagem de sistema compartilhada
+    assert cache.stats() == {"hits": 1, "misses": 2, "invalidations": 1, "evictions": 0, "entries": 1, "hit_rate": 1 / 3}
+
+
+def test_stable_prefix_layout_across_turns():
+    builder = PromptBuilder()
+    prefix = builder.prefixes.get("u1", "Ana", "Feminino", 29)
+    turns = (HistoryTurn("user", "oi", 1), HistoryTurn("assistant", "olá, Ana", 3))
+    first = builder.build(prefix, "contexto A", SessionSnapshot((), turns[:0]), "oi")
+    second = builder.build(prefix, "contexto B", SessionSnapshot(("Usuário: oi.",), turns), "perdi dinheiro")
+
+    assert first.messages[0] == {"role": "system", "content": SYSTEM_PROMPT}  # idêntico para todos os usuários
+    # O que varia por mensagem (RAG + pergunta) fica no fim
+    assert [m["content"] for m in second.messages[-2:]] == ["contexto B", "perdi dinheiro"]
+    assert second.messages[:2] == first.messages[:2]
+    assert second.stable_prefix_tokens == count_message_tokens(second.messages[:-2])
+    assert second.prompt_tokens == count_message_tokens(second.messages)
+    stats = builder.stats()
+    assert stats["assemblies"] == 2 and stats["assembly_ms"]["p50"] is not None
+
+
+def test_profile_update_invalidates_cached_prefix():
+    profiles = UserProfileService(profiles={"user_42": {"nickname": "Ana", "gender": "Feminino", "age": 29}})
+    orchestrator = ChatOrchestrator(RAGService(), StubLLMClient(), profiles)
+
+    async def run():
+        before = await orchestrator.build_prompt("oi", [], USER)
+        again = await orchestrator.build_prompt("oi", [], USER)
+        await profiles.update_profile("user_42", nickname="Aninha")
+        after = await orchestrator.build_prompt("oi", [], USER)
+        return before, again, after
+
+    before, again, after = asyncio.run(run())
+    assert again.messages[1] is before.messages[1]
+    assert "Apelido: Aninha" in after.messages[1]["content"]
+    stats = orchestrator.prompt_builder.stats()["prefix_cache"]
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
@@ -0,0 +1,73 @@
+import time
+
+from app.services.chat_prompt import PrefixCache, PromptBuilder
+from app.services.chat_session import ChatSessionStore, HistoryTurn, SessionSnapshot, summarize_turn
+from app.services.token_counter import count_message_tokens, count_tokens
+
+# Testes das sessões do Chat (compactação do histórico e orçamento de tokens)
+
+LONG_REPLY = "Entendo como isso é difícil. " + "Vamos respirar juntos e observar o impulso passar. " * 8
+
+
+def test_token_counter_is_bpe_like():
+    assert count_tokens("") == 0
+    assert count_tokens("oi") == 1
+    assert count_tokens("responsabilidade") == 4  # palavras longas viram vários tokens
+    assert count_tokens("Olá, tudo bem?") == 5
+    assert count_message_tokens([{"role": "user", "content": "oi"}]) == 1 + 4
+
+
+def test_old_turns_are_compacted_into_summary():
+    store = ChatSessionStore(max_history_tokens=200, max_summary_tokens=1000)
+    for turn in range(6):
+        store.append_exchange("u1", f"Mensagem número {turn}. Detalhes extras.", LONG_REPLY)
+    snapshot = store.snapshot("u1")
+
+    assert sum(turn.tokens for turn in snapshot.turns) <= 200 or len(snapshot.turns) == 2
+    assert snapshot.summary[0] == "Usuário: Mensagem número 0."
+    assert snapshot.summary[1] == "Coach: Entendo como isso é difícil."
+    assert len(snapshot.summary) + len(snapshot.turns) == 12
+    assert store.stats()["compacted_turns"] == len(snapshot.summary)
+
+
+def test_summary_budget_drops_oldest_lines():
+    store = ChatSessionStore(max_history_tokens=0, max_summary_tokens=20)
+    for turn in range(10):
+        store.append_exchange("u1", f"Pergunta {turn}", "Resposta curta.")
+    snapshot = store.snapshot("u1")
+
+    assert len(snapshot.turns) == 2  # a última troca fica sempre na íntegra
+    assert sum(count_tokens(line) for line in snapshot.summary) <= 20
+    assert snapshot.summary[-1] == "Coach: Resposta curta."
+
+
+def test_sessions_lru_and_ttl():
+    store = ChatSessionStore(max_sessions=2, ttl_seconds=0.05)
+    for user in ("a", "b", "c"):
+        store.append_exchange(user, "oi", "olá")
+    assert store.snapshot("a").turns == ()
+    assert store.stats()["evictions"] == 1
+
+    time.sleep(0.06)
+    assert store.snapshot("c").turns == ()
+    assert store.stats()["expirations"] == 1
+
+
+def test_prompt_builder_keeps_recent_turns_within_budget():
+    turns = tuple(HistoryTurn("user" if i % 2 == 0 else "assistant", f"turno {i} " * 20, count_tokens(f"turno {i} " * 20)) for i in range(10))
+    prefix = PrefixCache().get("user_123", "Adonis", "Masculino", 35)
+    builder = PromptBuilder(max_prompt_tokens=prefix.tokens + 300)
+    plan = builder.build(prefix, "contexto", SessionSnapshot(("Usuário: primeira pergunta.",), turns), "nova mensagem")
+
+    assert plan.prompt_tokens <= builder.max_prompt_tokens
+    assert plan.prompt_tokens == count_message_tokens(plan.messages)
+    # Os incluídos são os mais recentes, na ordem original
+    included = [m["content"] for m in plan.messages if m["role"] in ("user", "assistant")][:-1]
+    assert included == [turn.content for turn in turns[-plan.history_turns:]]
+    assert plan.omitted_turns == 10 - plan.history_turns > 0
+    assert plan.messages[-1] == {"role": "user", "content": "nova mensagem"}
+
+
+def test_summarize_turn_truncates_long_sentences():
+    line = summarize_turn(HistoryTurn("user", "palavra " * 100, 100))
+    assert line.startswith("Usuário: palavra") and line.endswith("...") and len(line) < 180
@@ -0,0 +1,87 @@
+import json
+
+from app.routers.dashboard import render_dashboard
+from app.services.dashboard_snapshot import DashboardSnapshotStore, etag_matches
+from app.services.goals_repository import InMemoryGoalsRepository
+from app.services.progress_ledger import InMemoryProgressLedger
+
+# Testes do snapshot materializado do Dashboard
+
+DAY = 86400
+START = 1609459200
+
+
+class _Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _store(clock=None, **kwargs):
+    repository = InMemoryGoalsRepository()
+    repository.seed({"user_123": [("g1", "Meditar", False)], "user_9": [("m1", "Ler", False)]})
+    ledger = InMemoryProgressLedger()
+    ledger.seed({"user_123": [("check_in", 0.0, START)]})
+    store = DashboardSnapshotStore(repository, ledger, render_dashboard, clock=clock or _Clock(START + 10 * DAY + 5), **kwargs)
+    return repository, ledger, store
+
+
+def test_snapshot_is_reused_until_goals_change():
+    repository, _, store = _store()
+    first = store.get("user_123")
+
+    assert store.get("user_123") is first
+    repository.complete_goal("user_123", "g1")
+    rebuilt = store.get("user_123")
+    assert rebuilt.etag != first.etag
+    assert json.loads(rebuilt.body)["user_goals"][0]["is_completed"] is True
+    assert store.stats()["builds"] == 2 and store.stats()["hits"] == 1
+
+
+def test_snapshot_expires_when_the_day_turns():
+    clock = _Clock(START + 10 * DAY + 5)
+    _, _, store = _store(clock)
+    first = store.get("user_123")
+    assert json.loads(first.body)["days_without_betting"] == 10
+
+    clock.now = START + 11 * DAY - 1
+    assert store.get("user_123") is first
+    clock.now = START + 11 * DAY
+    assert json.loads(store.get("user_123").body)["days_without_betting"] == 11
+
+
+def test_progress_events_refresh_the_snapshot():
+    clock = _Clock(START + 10 * DAY + 5)
+    _, ledger, store = _store(clock)
+    first = store.get("user_123")
+
+    ledger.append("user_123", "avoided_bet", 150.0, at=clock.now)
+    with_savings = json.loads(store.get("user_123").body)
+    assert with_savings["accumulated_savings"] == 150.0 and with_savings["days_without_betting"] == 10
+    ledger.append("user_123", "relapse", at=clock.now)
+    after_relapse = store.get("user_123")
+    assert json.loads(after_relapse.body)["days_without_betting"] == 0
+    assert json.loads(after_relapse.body)["best_streak_days"] == 10
+    # O próximo dia da nova sequência conta a partir da recaída, não da meia-noite
+    assert after_relapse.valid_until == min(clock.now + DAY, (clock.now // DAY + 1) * DAY)
+    assert first.etag != after_relapse.etag
+
+
+def test_invalidate_and_lru_limit():
+    _, _, store = _store(max_entries=1)
+    first = store.get("user_123")
+    store.get("user_9")  # despeja user_123
+    again = store.get("user_123")
+
+    assert again is not first and again.etag == first.etag  # mesmo conteúdo, mesmo ETag
+    store.invalidate("user_123")
+    assert store.stats() == {"hits": 0, "builds": 3, "invalidations": 1, "evictions": 2, "not_modified": 0, "snapshots": 0, "hit_rate": 0.0}
+
+
+def test_etag_matching():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches(None, '"abc"') and not etag_matches('"abd"', '"abc"')
@@ -0,0 +1,61 @@
+import pytest
+
+from app.services.domain_index import DomainIndex, PublicSuffixList, get_public_suffix_list
+
+# Testes do índice de domínios por sufixo (Card 4)
+
+@pytest.fixture
+def psl():
+    return PublicSuffixList(["com", "br", "com.br", "bet.br", "*.ck", "!www.ck"])
+
+@pytest.fixture
+def index(psl):
+    return DomainIndex(
+        ["betano.bet.br", "app.exemplo-autorizado.com", "*.operador.com", "Portal.Outro-Exemplo.com.br."],
+        public_suffixes=psl,
+    )
+
+def test_registrable_domain(psl):
+    assert psl.registrable_domain("m.betano.bet.br") == "betano.bet.br"
+    assert psl.registrable_domain("app.exemplo.com") == "exemplo.com"
+    assert psl.registrable_domain("bet.br") is None
+    # Regra curinga e exceção da PSL
+    assert psl.registrable_domain("a.b.ck") == "a.b.ck"
+    assert psl.registrable_domain("www.ck") == "www.ck"
+    # Regra padrão '*': TLD desconhecido é sufixo público
+    assert psl.registrable_domain("exemplo.desconhecido") == "exemplo.desconhecido"
+
+def test_exact_entry_does_not_authorize_subdomains(index: DomainIndex):
+    """Entradas abaixo do domínio registrável autorizam apenas o próprio host."""
+    assert index.is_authorized("app.exemplo-autorizado.com") is True
+    assert index.is_authorized("api.app.exemplo-autorizado.com") is False
+    assert index.is_authorized("exemplo-autorizado.com") is False
+
+def test_registrable_entry_authorizes_subdomains(index: DomainIndex):
+    assert index.is_authorized("betano.bet.br") is True
+    assert index.is_authorized("m.betano.bet.br") is True
+    assert index.is_authorized("a.b.betano.bet.br") is True
+    assert index.is_authorized("outro.bet.br") is False
+    assert index.is_authorized("betano.bet.br.golpe.com") is False
+
+def test_wildcard_entry(index: DomainIndex):
+    """'*.dominio' autoriza subdomínios, mas não o próprio domínio."""
+    assert index.is_authorized("apostas.operador.com") is True
+    assert index.is_authorized("x.apostas.operador.com") is True
+    assert index.is_authorized("operador.com") is False
+    assert index.is_authorized("falsooperador.com") is False
+
+def test_wildcard_on_public_suffix_is_ignored(psl):
+    index = DomainIndex(["*.com.br", "*.bet.br"], public_suffixes=psl)
+
+    assert index.is_authorized("qualquer.com.br") is False
+    assert index.is_authorized("golpe.bet.br") is False
+
+def test_normalization(index: DomainIndex):
+    """Maiúsculas e ponto final (FQDN) são normalizados na carga e na busca."""
+    assert index.is_authorized("PORTAL.outro-exemplo.com.br.") is True
+    assert "portal.outro-exemplo.com.br" in index.entries
+    assert index.is_authorized("") is False
+
+def test_default_public_suffix_list_knows_bet_br():
+    assert get_public_suffix_list().registrable_domain("m.betano.bet.br") == "betano.bet.br"
@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+from app.services.goals_repository import (
+    GoalNotFoundError,
+    InMemoryGoalsRepository,
+    SQLiteGoalsRepository,
+)
+
+# Testes do armazenamento das metas (memória e SQLite)
+
+SEED = {"user_123": [("g1", "Meditar", True), ("g2", "Caminhar", False), ("g3", "Ler", False)]}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request, tmp_path):
+    repository = InMemoryGoalsRepository() if request.param == "memory" else SQLiteGoalsRepository(str(tmp_path / "goals.db"), pool_size=4)
+    repository.seed(SEED)
+    yield repository
+    repository.close()
+
+
+def test_lists_goals_in_creation_order_and_seed_is_idempotent(repository):
+    repository.complete_goal("user_123", "g2")
+    repository.seed(SEED)  # não recria nem reabre metas existentes
+
+    goals = repository.list_goals("user_123")
+    assert [(goal.id, goal.is_completed) for goal in goals] == [("g1", True), ("g2", True), ("g3", False)]
+    assert repository.list_goals("ninguem") == []
+
+
+def test_complete_goal_reports_state(repository):
+    version = repository.goals_version("user_123")
+    first = repository.complete_goal("user_123", "g3")
+    again = repository.complete_goal("user_123", "g3")
+    assert repository.goals_version("user_123") == version + 1  # só a conclusão efetiva muda a versão
+
+    assert first.newly_completed and first.goal.completed_at is not None
+    assert not again.newly_completed and again.goal == first.goal
+    with pytest.raises(GoalNotFoundError) as unknown_goal:
+        repository.complete_goal("user_123", "g9")
+    assert unknown_goal.value.user_has_goals
+    with pytest.raises(GoalNotFoundError) as unknown_user:
+        repository.complete_goal("ninguem", "g1")
+    assert not unknown_user.value.user_has_goals
+
+
+def test_concurrent_completions_succeed_exactly_once(repository):
+    for i in range(20):
+        repository.add_goal("user_9", f"m{i}", f"Meta {i}")
+    newly = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        for i in range(20):
+            newly.append(repository.complete_goal("user_9", f"m{i}").newly_completed)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert newly.count(True) == 20 and len(newly) == 160
+    assert all(goal.is_completed for goal in repository.list_goals("user_9"))
+
+
+def test_sqlite_is_shared_between_instances(tmp_path):
+    # Dois "workers" (instâncias independentes) sobre o mesmo arquivo
+    path = str(tmp_path / "goals.db")
+    worker_a, worker_b = SQLiteGoalsRepository(path), SQLiteGoalsRepository(path)
+    worker_a.seed(SEED)
+
+    assert worker_b.complete_goal("user_123", "g2").newly_completed
+    assert not worker_a.complete_goal("user_123", "g2").newly_completed
+    worker_a.close()
+    worker_b.close()
+
+    reopened = SQLiteGoalsRepository(path)  # sobrevive ao restart
+    assert [goal.is_completed for goal in reopened.list_goals("user_123")] == [True, True, False]
+    with reopened._connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    reopened.close()
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.login_guard import LoginExecutor, LoginOverloadedError, TokenBucketLimiter
+from app.services.password_hashing import PasswordHasher
+
+# Testes do executor de login, dos baldes de tokens e do hash de senha
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_refills():
+    clock = _Clock()
+    limiter = TokenBucketLimiter(rate=0.5, burst=3, clock=clock)
+
+    assert [limiter.acquire("1.2.3.4") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("1.2.3.4") == pytest.approx(2.0)  # 1 token a cada 2 s
+    assert limiter.acquire("5.6.7.8") == 0.0  # chaves independentes
+    clock.now += 2.0
+    assert limiter.acquire("1.2.3.4") == 0.0
+    assert limiter.stats() == {"allowed": 5, "limited": 1, "evictions": 0, "keys": 2}
+
+
+def test_token_bucket_keeps_a_bounded_number_of_keys():
+    limiter = TokenBucketLimiter(rate=1.0, burst=1, max_keys=100, clock=_Clock())
+    for i in range(1000):
+        limiter.acquire(f"10.0.{i // 256}.{i % 256}")
+    assert limiter.stats()["keys"] == 100 and limiter.stats()["evictions"] == 900
+
+
+def test_executor_rejects_beyond_queue_limit_and_measures_wait():
+    executor = LoginExecutor(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        queued = asyncio.ensure_future(executor.run(lambda: "ok"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(LoginOverloadedError):
+            await executor.run(lambda: "excedente")
+        release.set()
+        return await running, await queued
+
+    try:
+        assert asyncio.run(scenario()) == (True, "ok")
+    finally:
+        executor.shutdown()
+    stats = executor.stats()
+    assert stats["submitted"] == 2 and stats["rejected"] == 1 and stats["completed"] == 2
+    assert stats["in_flight"] == 0
+    assert stats["queue_wait_ms"]["p99"] >= 40  # a segunda tarefa esperou a primeira
+
+
+def test_password_hasher_round_trip():
+    hasher = PasswordHasher(n=2 ** 10)
+    stored = hasher.hash("senha_segura_123")
+
+    assert stored.startswith("scrypt$1024$8$1$")
+    assert hasher.verify("senha_segura_123", stored)
+    assert not hasher.verify("outra", stored)
+    assert not hasher.verify("senha_segura_123", "bcrypt$invalido")
+    assert stored != hasher.hash("senha_segura_123")  # salt por senha
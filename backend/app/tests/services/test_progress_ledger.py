@@ -0,0 +1,77 @@
+import pytest
+
+from app.services.progress_ledger import (
+    DAY_SECONDS,
+    InMemoryProgressLedger,
+    ProgressAggregate,
+    SQLiteProgressLedger,
+    fold_events,
+)
+
+# Testes do registro de progresso (eventos + agregados incrementais)
+
+T0 = 1_700_000_000.0
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def ledger(request, tmp_path):
+    ledger = InMemoryProgressLedger() if request.param == "memory" else SQLiteProgressLedger(str(tmp_path / "progress.db"), pool_size=2)
+    yield ledger
+    ledger.close()
+
+
+def test_aggregates_follow_the_events(ledger):
+    ledger.append("u1", "check_in", at=T0)
+    ledger.append("u1", "avoided_bet", 120.0, at=T0 + DAY_SECONDS)
+    ledger.append("u1", "relapse", at=T0 + 5 * DAY_SECONDS)
+    _, aggregate = ledger.append("u1", "avoided_bet", 30.5, at=T0 + 6 * DAY_SECONDS)
+
+    assert aggregate == ledger.aggregate("u1")
+    assert aggregate.events == 4 and aggregate.relapses == 1 and aggregate.check_ins == 1
+    assert aggregate.accumulated_savings == 150.5
+    now = T0 + 8 * DAY_SECONDS + 10
+    assert aggregate.days_without_betting(now) == 3
+    assert aggregate.best_streak_days(now) == 5  # a sequência antes da recaída
+    assert ledger.aggregate("ninguem") == ProgressAggregate() and ledger.version("ninguem") == 0
+
+
+def test_invalid_events_are_rejected(ledger):
+    for kind, amount in (("bet", 0.0), ("avoided_bet", 0.0), ("relapse", 5.0)):
+        with pytest.raises(ValueError):
+            ledger.append("u1", kind, amount)
+    assert ledger.version("u1") == 0 and list(ledger.events()) == []
+
+
+def test_replay_rebuilds_aggregates_from_the_log(ledger):
+    for i in range(30):
+        ledger.append(f"u{i % 3}", ("check_in", "avoided_bet", "relapse")[i % 3], 10.0 if i % 3 == 1 else 0.0, at=T0 + i * 3600)
+    expected = {user: ledger.aggregate(user) for user in ("u0", "u1", "u2")}
+    assert fold_events(ledger.events()) == expected
+
+    assert ledger.replay(dry_run=True)["mismatched_users"] == []
+    assert ledger.replay()["events"] == 30
+    assert {user: ledger.aggregate(user) for user in expected} == expected
+
+
+def test_seed_only_fills_empty_histories(ledger):
+    ledger.append("u1", "check_in", at=T0)
+    ledger.seed({"u1": [("avoided_bet", 50.0, T0)], "u2": [("avoided_bet", 50.0, T0)]})
+    ledger.seed({"u2": [("avoided_bet", 50.0, T0)]})
+
+    assert ledger.aggregate("u1").accumulated_savings == 0.0
+    assert ledger.aggregate("u2").accumulated_savings == 50.0
+
+
+def test_sqlite_replay_repairs_a_diverged_aggregate(tmp_path):
+    path = str(tmp_path / "progress.db")
+    ledger = SQLiteProgressLedger(path)
+    ledger.append("u1", "avoided_bet", 99.0, at=T0)
+    with ledger._pool.connection() as conn:
+        conn.execute("UPDATE progress_aggregates SET accumulated_savings = 0 WHERE user_id = 'u1'")
+
+    other_worker = SQLiteProgressLedger(path)
+    assert other_worker.replay(dry_run=True)["mismatched_users"] == ["u1"]
+    assert other_worker.replay("u1")["mismatched_users"] == ["u1"]
+    assert ledger.aggregate("u1").accumulated_savings == 99.0
+    ledger.close()
+    other_worker.close()
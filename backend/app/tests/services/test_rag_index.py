@@ -0,0 +1,61 @@
+import pytest
+
+from app.services.rag_index import InvertedIndex, analyze, fold_accents, stem
+
+# Testes do índice invertido BM25 do RAG (Chat)
+
+CHUNKS = [
+    {"id": "A", "keywords": ["impulso"], "content": "Quando o impulso de apostar vier, respire fundo."},
+    {"id": "B", "keywords": ["dinheiro"], "content": "Controle suas finanças e registre as perdas com apostas."},
+    {"id": "C", "keywords": [], "content": "Procure ajuda profissional: CAPS AD e CVV."},
+]
+
+@pytest.fixture
+def index() -> InvertedIndex:
+    return InvertedIndex(CHUNKS, {"keywords": 2.0, "content": 1.0})
+
+def test_portuguese_normalization():
+    assert fold_accents("Finanças Clínico") == "financas clinico"
+    assert stem("apostar") == stem("aposta") == stem("apostas") == "apost"
+    assert stem("finanças".replace("ç", "c")) == stem("financeiro")
+    assert stem("opcoes") == stem("opcao")
+    # Stopwords são descartadas
+    assert analyze("Estou com muita vontade de jogar") == ["vontad", "jog"]
+
+def test_bm25_ranking(index: InvertedIndex):
+    ranked = index.search("Tenho um impulso de apostar", k=3)
+
+    assert [CHUNKS[position]["id"] for _, position in ranked] == ["A", "B"]
+    assert ranked[0][0] > ranked[1][0]
+
+def test_accent_and_inflection_insensitive(index: InvertedIndex):
+    assert index.search("FINANCAS", k=1)[0][1] == 1
+    assert index.search("profissionais", k=1)[0][1] == 2
+
+def test_top_k_and_no_match(index: InvertedIndex):
+    assert len(index.search("apostas perdas impulso", k=1)) == 1
+    assert index.search("capital da França", k=3) == []
+    assert InvertedIndex([], {"content": 1.0}).search("impulso", k=3) == []
+
+def test_rare_terms_weigh_more(index: InvertedIndex):
+    """IDF: um termo presente em um único chunk pesa mais que um termo comum."""
+    common = index.search("apostas", k=3)
+    rare = index.search("respire", k=3)
+    assert rare[0][0] > common[0][0]
+
+def test_early_termination_matches_exhaustive_scoring():
+    """A parada antecipada não altera o top-k em relação à soma completa dos postings."""
+    import random
+
+    rng = random.Random(3)
+    words = [f"termo{i}" for i in range(300)]
+    weights = [1 / (rank + 1) for rank in range(300)]
+    chunks = [{"content": " ".join(rng.choices(words, weights=weights, k=40))} for _ in range(500)]
+    index = InvertedIndex(chunks, {"content": 1.0})
+
+    for _ in range(50):
+        terms = analyze(" ".join(rng.choices(words, weights=weights, k=5)))
+        top = index.search_terms(terms, k=3)
+        exhaustive = index.search_terms(terms, k=len(chunks))[:3]
+        assert [doc for _, doc in top] == [doc for _, doc in exhaustive]
+        assert [score for score, _ in top] == pytest.approx([score for score, _ in exhaustive])
@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+from app.services.rag_index import INDEXED_FIELDS, InvertedIndex
+from app.services.rag_ingestion import KnowledgeBaseStore, split_front_matter
+from app.services.rag_service import RAGService
+
+# Testes da ingestão incremental da base de conhecimento do RAG (Chat)
+
+DOCS = {
+    "tcc.md": "---\nkeywords: impulso, crise\n---\n# TCC\nReestruture o pensamento automático antes de apostar.\n",
+    "financeiro.md": "# Finanças\nRegistre as perdas e acompanhe a economia acumulada.\n",
+    "apoio/etica.md": "# Ética\nProcure ajuda profissional: CAPS AD e CVV.\n",
+}
+
+
+def _write(source_dir, name: str, text: str) -> None:
+    path = os.path.join(source_dir, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    directory = tmp_path / "docs"
+    for name, text in DOCS.items():
+        _write(str(directory), name, text)
+    return str(directory)
+
+
+@pytest.fixture
+def store(tmp_path) -> KnowledgeBaseStore:
+    return KnowledgeBaseStore(str(tmp_path / "kb"), keep_generations=2)
+
+
+def test_first_ingestion_publishes_generation(store: KnowledgeBaseStore, source_dir):
+    report = store.ingest(source_dir, max_words=5, overlap=1)
+    snapshot = store.load()
+
+    assert report["published"] and report["generation"] == 1 == store.current_generation()
+    assert report["analyzed_chunks"] == report["chunks"] == len(snapshot.chunks)
+    assert {chunk["id"].split("#")[0] for chunk in snapshot.chunks} == {"apoio/etica", "financeiro", "tcc"}
+    # Palavras-chave do cabeçalho valem para todos os chunks do arquivo
+    assert all(chunk["keywords"] == ["impulso", "crise"] for chunk in snapshot.chunks if chunk["id"].startswith("tcc"))
+
+
+def test_incremental_ingestion_only_analyzes_changed_chunks(store: KnowledgeBaseStore, source_dir):
+    first = store.ingest(source_dir)
+
+    unchanged = store.ingest(source_dir)
+    assert not unchanged["published"] and unchanged["analyzed_chunks"] == 0
+
+    # Nova seção no fim do arquivo: o chunk da seção existente é reaproveitado
+    _write(source_dir, "financeiro.md", DOCS["financeiro.md"] + "# Dívidas\nNegocie as dívidas com calma.\n")
+    report = store.ingest(source_dir)
+
+    assert report["published"] and report["generation"] == first["generation"] + 1
+    assert report["changed_files"] == 1 and report["analyzed_chunks"] == 1
+    assert report["reused_chunks"] == report["chunks"] - 1
+
+
+def test_removed_files_and_garbage_collection(store: KnowledgeBaseStore, source_dir):
+    for version in range(3):
+        _write(source_dir, "financeiro.md", DOCS["financeiro.md"] + f"Versão {version}.\n")
+        store.ingest(source_dir)
+    os.remove(os.path.join(source_dir, "apoio", "etica.md"))
+    report = store.ingest(source_dir)
+
+    assert report["removed_files"] == 1
+    assert all(not chunk["id"].startswith("apoio/") for chunk in store.load().chunks)
+    generations = os.listdir(os.path.join(store.path, "generations"))
+    assert len(generations) == 2
+    # Apenas os segmentos das gerações mantidas continuam: última versão de
+    # financeiro.md, tcc.md e etica.md (ainda referenciado pela geração anterior)
+    assert len(os.listdir(os.path.join(store.path, "segments"))) == 3
+
+
+def test_persisted_terms_match_a_full_rebuild(store: KnowledgeBaseStore, source_dir):
+    store.ingest(source_dir, max_words=5, overlap=1)
+    snapshot = store.load()
+
+    from_store = InvertedIndex.from_term_frequencies(snapshot.frequencies)
+    rebuilt = InvertedIndex(snapshot.chunks, INDEXED_FIELDS)
+    for query in ("impulso de apostar", "perdas e economia", "ajuda profissional"):
+        assert from_store.search(query, k=5) == rebuilt.search(query, k=5)
+
+
+def test_rag_service_picks_up_new_generation(store: KnowledgeBaseStore, source_dir):
+    store.ingest(source_dir)
+    service = RAGService(kb_store=store)
+    assert service.generation == 1
+    assert "CAPS AD" in service.retrieve_context("preciso de ajuda profissional")
+    assert not service.reload_if_changed()
+
+    _write(source_dir, "apoio/etica.md", "# Ética\nProcure ajuda profissional: ligue para o CVV (188).\n")
+    store.ingest(source_dir)
+
+    assert service.reload_if_changed()
+    assert service.generation == 2
+    context = service.retrieve_context("preciso de ajuda profissional")
+    assert "188" in context and "CAPS AD" not in context
+
+
+def test_missing_store_falls_back_to_builtin_base(tmp_path):
+    service = RAGService(kb_store=KnowledgeBaseStore(str(tmp_path / "empty")))
+
+    assert service.generation == 0
+    assert "TCC" in service.retrieve_context("Estou com vontade de apostar")
+
+
+def test_front_matter_is_optional():
+    assert split_front_matter("# Título\ntexto") == ([], "# Título\ntexto")
+    assert split_front_matter("---\nkeywords: a, b\n---\ncorpo") == (["a", "b"], "corpo")
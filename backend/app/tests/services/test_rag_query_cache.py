@@ -0,0 +1,75 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from app.services.rag_ingestion import KnowledgeBaseStore
+from app.services.rag_service import RAGService
+
+# Testes do cache de contextos do RAGService.retrieve_context
+
+@pytest.fixture
+def service() -> RAGService:
+    return RAGService()
+
+
+def test_repeated_query_is_served_from_cache(service: RAGService):
+    first = service.retrieve_context("Estou com vontade de apostar")
+
+    with patch.object(service, "_compile_context", side_effect=AssertionError("não deveria recalcular")):
+        assert service.retrieve_context("Estou com vontade de apostar") is first
+
+    stats = service.cache_stats()
+    assert stats["queries"] == 2 and stats["exact_hits"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_query_variants_share_the_normalized_entry(service: RAGService):
+    first = service.retrieve_context("Estou com vontade de apostar")
+
+    # Caixa, acentos, pontuação e stopwords não mudam os termos da consulta
+    with patch.object(service, "_compile_context", side_effect=AssertionError("não deveria recalcular")):
+        assert service.retrieve_context("estou com VONTADE de apostar!!") == first
+        assert service.retrieve_context("vontade apostar") == first
+
+    stats = service.cache_stats()
+    assert stats["normalized_hits"] == 2 and stats["hits"] == 2
+
+
+def test_cache_respects_entry_limit():
+    with patch("app.services.rag_service.settings.RAG_CACHE_MAX_ENTRIES", 2):
+        service = RAGService()
+    for query in ("impulso", "dinheiro", "terapia", "ansiedade"):
+        service.retrieve_context(query)
+
+    stats = service.cache_stats()
+    assert stats["entries"] == 4  # 2 por nível
+    assert stats["evictions"] == 4
+
+
+def test_long_messages_skip_the_exact_level(service: RAGService):
+    message = "vontade de apostar " * 100
+    service.retrieve_context(message)
+    service.retrieve_context(message)
+
+    stats = service.cache_stats()
+    assert stats["exact_hits"] == 0 and stats["normalized_hits"] == 1
+
+
+def test_new_generation_invalidates_cached_contexts(tmp_path):
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    etica = source_dir / "etica.md"
+    etica.write_text("# Ética\nProcure ajuda profissional: CAPS AD.\n", encoding="utf-8")
+    store = KnowledgeBaseStore(str(tmp_path / "kb"))
+    store.ingest(str(source_dir))
+    service = RAGService(kb_store=store)
+    assert "CAPS AD" in service.retrieve_context("ajuda profissional")
+
+    etica.write_text("# Ética\nProcure ajuda profissional: ligue 188.\n", encoding="utf-8")
+    os.utime(etica, ns=(0, 0))  # garante stat diferente mesmo em sistemas de arquivos com mtime grosso
+    store.ingest(str(source_dir))
+    assert service.reload_if_changed()
+
+    assert "188" in service.retrieve_context("ajuda profissional")
+    assert service.cache_stats()["invalidations"] == 1
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.rag_service import RAGService, _KNOWLEDGE_BASE_TEXT
+from app.services.rag_vector_index import (
+    VectorIndex,
+    build_vector_index,
+    chunk_markdown,
+    load_vector_index,
+    main,
+)
+
+# Testes do índice vetorial local do RAG (Chat)
+
+MARKDOWN = """# Base AntiBet
+Introdução geral sobre apoio ao apostador.
+
+## Urge Surfing
+Quando o impulso vier, imagine uma onda e respire.
+
+## Finanças
+Registre as perdas e acompanhe a economia acumulada.
+"""
+
+def _synthetic_chunks(count: int, rng: random.Random):
+    words = [f"palavra{i}" for i in range(2000)]
+    return [{"id": f"C{i}", "source": "sintético", "content": " ".join(rng.choices(words, k=30))} for i in range(count)]
+
+def test_chunk_markdown_follows_headings():
+    chunks = chunk_markdown(MARKDOWN, "base", max_words=6, overlap=2)
+
+    assert chunks[0]["source"] == "base > Base AntiBet"
+    assert any(c["source"] == "base > Base AntiBet > Urge Surfing" and "impulso" in c["content"] for c in chunks)
+    # Janelas com sobreposição dentro de uma seção longa
+    finance = [c for c in chunks if c["source"].endswith("Finanças")]
+    assert len(finance) == 2 and finance[0]["content"].split()[-2:] == finance[1]["content"].split()[:2]
+
+def test_flat_index_retrieves_source_chunk(tmp_path):
+    chunks = _synthetic_chunks(300, random.Random(1))
+    build_vector_index(chunks, str(tmp_path), dim=1024)
+    index = VectorIndex(str(tmp_path))
+
+    for position in (0, 42, 299):
+        query = " ".join(chunks[position]["content"].split()[:8])
+        score, found = index.search(query, k=1)[0]
+        assert found == position and 0 < score <= 1.0001
+        assert index.chunk(found)["id"] == chunks[position]["id"]
+    assert index.search("termo desconhecido", k=3) == []
+
+@pytest.mark.parametrize("quantize, ivf_lists", [("int8", 0), ("float32", 8), ("int8", 8)])
+def test_quantized_and_ivf_modes(tmp_path, quantize, ivf_lists):
+    chunks = _synthetic_chunks(400, random.Random(2))
+    build_vector_index(chunks, str(tmp_path), dim=1024, quantize=quantize, ivf_lists=ivf_lists)
+    index = VectorIndex(str(tmp_path), nprobe=8)  # nprobe = todas as listas: resultado exato
+
+    hits = 0
+    for position in range(0, 400, 20):
+        query = " ".join(chunks[position]["content"].split()[:8])
+        top = index.search(query, k=3)
+        hits += any(index.chunk(found)["id"] == chunks[position]["id"] for _, found in top)
+    assert hits == 20
+
+def test_rag_service_uses_vector_index(tmp_path):
+    main(["--out", str(tmp_path), "--include-builtin", "--dim", "256"])
+    service = RAGService(vector_index=VectorIndex(str(tmp_path)))
+
+    context = service.retrieve_context("Perdi muito dinheiro esta semana.")
+    assert "Simulador de Oportunidade Perdida" in context
+    # Sem relevância: mesmo fallback de segurança do modo BM25
+    assert service.retrieve_context("Qual a capital da França?") == _KNOWLEDGE_BASE_TEXT[0]["content"]
+
+def test_load_failure_falls_back_to_none(tmp_path):
+    assert load_vector_index(str(tmp_path / "inexistente")) is None
@@ -0,0 +1,106 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.services.result_cache import ResultCache, estimate_size
+
+# Testes do cache de resultados (LRU + TTL + contabilização de memória)
+
+def test_hit_and_miss_counters():
+    cache = ResultCache(max_entries=10)
+    cache.put("a", {"score": 90})
+
+    assert cache.get("a") == {"score": 90}
+    assert cache.get("b") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+def test_lru_eviction_by_entry_count():
+    """A entrada menos usada recentemente é despejada primeiro."""
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a") # "a" passa a ser a mais recente
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_eviction_by_size_accounting():
+    """O limite de bytes considera o tamanho estimado de cada entrada."""
+    cache = ResultCache(max_entries=100, max_bytes=300, sizeof=lambda value: 100)
+    for key in range(5):
+        cache.put(key, "x")
+
+    assert len(cache) == 3
+    assert cache.stats()["bytes"] == 300
+    assert cache.stats()["evictions"] == 2
+
+def test_entry_larger_than_cache_is_not_stored():
+    cache = ResultCache(max_bytes=10, sizeof=lambda value: 100)
+    cache.put("a", "x")
+
+    assert len(cache) == 0
+
+def test_ttl_expiration():
+    cache = ResultCache(ttl_seconds=10)
+    with patch("app.services.result_cache.time.monotonic", return_value=1000.0):
+        cache.put("a", 1)
+        cache.put("b", 2, ttl_seconds=100)
+    with patch("app.services.result_cache.time.monotonic", return_value=1011.0):
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["entries"] == 1
+
+def test_generation_change_invalidates_entries():
+    """Uma nova geração das fontes (lista SPA, regras) descarta o cache."""
+    cache = ResultCache()
+    assert cache.ensure_generation(("regras-v1", 1)) is False
+    cache.put("a", 1)
+
+    assert cache.ensure_generation(("regras-v1", 1)) is False
+    assert cache.get("a") == 1
+
+    assert cache.ensure_generation(("regras-v1", 2)) is True
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+
+def test_put_with_outdated_generation_is_dropped():
+    """Valor calculado com a geração anterior (fontes recarregadas no meio) não é armazenado."""
+    cache = ResultCache()
+    cache.ensure_generation(("regras-v1", 1))
+    cache.put("atual", 1, generation=("regras-v1", 1))
+
+    cache.ensure_generation(("regras-v1", 2))
+    cache.put("antigo", 2, generation=("regras-v1", 1))
+
+    assert cache.get("antigo") is None
+    assert cache.stats()["stale_puts"] == 1
+
+def test_estimate_size_grows_with_content():
+    assert estimate_size({"evidence": ["a" * 1000]}) > estimate_size({"evidence": ["a"]})
+
+def test_concurrent_puts_respect_limits():
+    cache = ResultCache(max_entries=50)
+
+    def writer(offset):
+        for i in range(500):
+            cache.put((offset, i), i)
+            cache.get((offset, i - 1))
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(cache) == 50
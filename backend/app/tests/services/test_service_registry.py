@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+from functools import lru_cache
+
+from app.services.service_registry import ServiceRegistry
+
+# Testes do registro de serviços (construção preguiçosa, aquecimento e encerramento)
+
+EVENTS = []
+_HERE = __name__
+
+
+class _Service:
+    def __init__(self, name: str):
+        self.name = name
+        self.thread = threading.current_thread().name
+        EVENTS.append(("build", name))
+
+
+@lru_cache(maxsize=1)
+def _config():
+    return _Service("config")
+
+
+@lru_cache(maxsize=1)
+def _database():
+    time.sleep(0.1)
+    return _Service("database")
+
+
+@lru_cache(maxsize=1)
+def _cache():
+    time.sleep(0.1)
+    return _Service("cache")
+
+
+@lru_cache(maxsize=1)
+def _api():
+    return _Service("api")
+
+
+def _broken():
+    raise RuntimeError("arquivo ausente")
+
+
+def _registry() -> ServiceRegistry:
+    EVENTS.clear()
+    for factory in (_config, _database, _cache, _api):
+        factory.cache_clear()
+
+    async def aclose(service):
+        EVENTS.append(("close", service.name))
+
+    registry = ServiceRegistry()
+    registry.register("config", f"{_HERE}:_config", close=lambda s: EVENTS.append(("close", s.name)))
+    registry.register("database", f"{_HERE}:_database", depends_on=("config",), close=aclose)
+    registry.register("cache", f"{_HERE}:_cache", depends_on=("config",))
+    registry.register("api", f"{_HERE}:_api", depends_on=("database", "cache"), close=aclose)
+    return registry
+
+
+def test_components_are_built_lazily_with_their_dependencies():
+    registry = _registry()
+    assert EVENTS == [] and not registry.stats()["components"]["api"]["built"]
+
+    assert registry.get("api") is _api()
+    assert EVENTS[0] == ("build", "config") and EVENTS[-1] == ("build", "api")
+    assert registry.stats()["components"]["database"]["init_ms"] >= 100
+
+
+def test_warm_up_builds_independent_components_in_parallel():
+    registry = _registry()
+    started = time.perf_counter()
+    stats = asyncio.run(registry.warm_up(max_workers=4))
+    elapsed = time.perf_counter() - started
+
+    assert all(component["built"] for component in stats["components"].values())
+    assert elapsed < 0.19  # database e cache (0,1 s cada) na mesma onda
+    assert EVENTS.index(("build", "api")) == 3  # depois das dependências
+
+
+def test_warm_up_failure_does_not_block_other_components():
+    registry = _registry()
+    registry.register("broken", f"{_HERE}:_broken")
+    registry.register("needs_broken", f"{_HERE}:_config", depends_on=("broken",))
+
+    stats = asyncio.run(registry.warm_up())
+    assert stats["components"]["broken"]["error"] == "RuntimeError: arquivo ausente"
+    assert not stats["components"]["needs_broken"]["built"]
+    assert stats["components"]["api"]["built"]
+
+
+def test_shutdown_closes_built_components_in_reverse_order():
+    registry = _registry()
+    registry.get("database")
+    _cache()  # construído direto pela factory (via Depends), fora do registro
+
+    asyncio.run(registry.shutdown())
+    assert [event for event in EVENTS if event[0] == "close"] == [("close", "database"), ("close", "config")]
+    assert _database.cache_info().currsize == 0  # o próximo startup cria outra instância
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from app.services.domain_index import DomainIndex, PublicSuffixList
+from app.services.spa_index_file import (
+    MappedDomainIndex,
+    build_index_bytes,
+    main,
+    write_index_file,
+)
+
+# Testes do índice binário (mmap) da lista de SPAs (Card 4)
+
+ENTRIES = ["betano.bet.br", "app.exemplo-autorizado.com", "*.operador.com", "Portal.Outro-Exemplo.com.br.", "*.com.br"]
+
+@pytest.fixture
+def psl():
+    return PublicSuffixList(["com", "br", "com.br", "bet.br"])
+
+@pytest.fixture
+def index_path(tmp_path, psl):
+    path = tmp_path / "spa.idx"
+    write_index_file(ENTRIES, str(path), public_suffixes=psl)
+    return path
+
+def test_same_semantics_as_domain_index(index_path, psl):
+    mapped = MappedDomainIndex.open(str(index_path))
+    reference = DomainIndex(ENTRIES, public_suffixes=psl)
+    queries = [
+        "betano.bet.br", "m.betano.bet.br", "outro.bet.br", "betano.bet.br.golpe.com",
+        "app.exemplo-autorizado.com", "api.app.exemplo-autorizado.com", "exemplo-autorizado.com",
+        "apostas.operador.com", "operador.com", "qualquer.com.br", "PORTAL.outro-exemplo.com.br.", "", "br",
+    ]
+    for query in queries:
+        assert mapped.is_authorized(query) == reference.is_authorized(query), query
+    assert mapped.entries == reference.entries
+    assert len(mapped) == len(reference)
+
+def test_large_list_random_lookups(tmp_path, psl):
+    rng = random.Random(7)
+    domains = [f"op{i}.bet.br" for i in range(5000)] + [f"app{i}.site{i}.com" for i in range(5000)]
+    path = tmp_path / "grande.idx"
+    write_index_file(domains, str(path), public_suffixes=psl)
+    mapped = MappedDomainIndex.open(str(path))
+    reference = DomainIndex(domains, public_suffixes=psl)
+
+    for _ in range(2000):
+        i = rng.randrange(12000)
+        query = rng.choice([f"op{i}.bet.br", f"m.op{i}.bet.br", f"app{i}.site{i}.com", f"x.app{i}.site{i}.com"])
+        assert mapped.is_authorized(query) == reference.is_authorized(query), query
+
+def test_rejects_invalid_file(tmp_path):
+    path = tmp_path / "invalido.idx"
+    path.write_bytes(b"nao-e-um-indice-spa" * 4)
+    with pytest.raises(ValueError):
+        MappedDomainIndex.open(str(path))
+    with pytest.raises(ValueError):
+        MappedDomainIndex(build_index_bytes(["a.com"])[:10])
+
+def test_cli_compiles_json_and_text_sources(tmp_path):
+    json_source = tmp_path / "lista.json"
+    json_source.write_text('{"authorized_domains": ["betano.bet.br"]}', encoding="utf-8")
+    text_source = tmp_path / "extra.txt"
+    text_source.write_text("# comentário\napp.exemplo.com\n\n", encoding="utf-8")
+    output = tmp_path / "saida.idx"
+
+    main([str(json_source), str(text_source), str(output)])
+
+    mapped = MappedDomainIndex.open(str(output))
+    assert mapped.entries == {"betano.bet.br", "app.exemplo.com"}
+    assert mapped.is_authorized("m.betano.bet.br") is True
@@ -1,8 +1,13 @@
 import pytest
 import json
 import builtins
-from unittest.mock import patch, mock_open
+import os
+import threading
+import time
+from unittest.mock import patch, mock_open, MagicMock
 
+from app.config.settings import Settings
+from app.services.spa_index_file import write_index_file
 from app.services.spa_list_repository import SPAListRepository, get_spa_list_repository
 
 # Forçamos a re-criação da instância para cada teste
@@ -10,10 +15,12 @@ from app.services.spa_list_repository import SPAListRepository, get_spa_list_rep
 def reset_repository_singleton():
     """
     Garante que cada teste receba uma instância 'limpa' do repositório,
-    resetando o cache do singleton.
+    resetando o cache do singleton e a flag de inicialização interna.
     """
     SPAListRepository._instance = None
-    SPAListRepository._initialized = False # Flag de inicialização interna
+    # O repositório checa a flag com hasattr: ela precisa ser removida, não zerada
+    if hasattr(SPAListRepository, '_initialized'):
+        del SPAListRepository._initialized
     get_spa_list_repository.cache_clear()
 
 
@@ -128,4 +135,129 @@ def test_singleton_behavior(mock_config_path):
     assert repo1 is repo2
     
     # O arquivo deve ter sido lido apenas UMA vez (na primeira chamada)
-    mock_file.assert_called_once()
\ No newline at end of file
+    mock_file.assert_called_once()
+
+
+@pytest.fixture
+def mock_settings():
+    """Mock de Settings injetado direto no repositório (SPAListRepository(settings_obj=...))."""
+    mock_set = MagicMock(spec=Settings)
+    mock_set.SPA_LIST_FILE_PATH = '/mock/path/spa_list.json'
+    mock_set.SPA_LIST_INDEX_PATH = None
+    return mock_set
+
+# --- Testes de Recarga a Quente ---
+
+def _write_domains(path, domains):
+    """Escreve a lista de forma atômica (arquivo temporário + rename), como em produção."""
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps({"authorized_domains": domains}), encoding='utf-8')
+    os.replace(tmp, path)
+
+@pytest.fixture
+def spa_file(tmp_path, mock_settings):
+    """Arquivo real da lista SPA, apontado pelo mock de Settings."""
+    path = tmp_path / 'spa_list.json'
+    _write_domains(path, ["fixo.com", "v0.com"])
+    mock_settings.SPA_LIST_FILE_PATH = str(path)
+    return path
+
+def test_reload_swaps_domain_set(spa_file, mock_settings):
+    """A recarga publica a nova lista e incrementa a geração."""
+    repo = SPAListRepository(settings_obj=mock_settings)
+    generation = repo.generation
+
+    _write_domains(spa_file, ["fixo.com", "v1.com"])
+    assert repo.reload() is True
+
+    assert repo.is_domain_authorized("v1.com") is True
+    assert repo.is_domain_authorized("v0.com") is False
+    assert repo.generation == generation + 1
+    assert repo.reload_stats()["reloads"] == 2
+
+def test_failed_reload_keeps_previous_list(spa_file, mock_settings, caplog):
+    """Um arquivo corrompido não derruba a lista em uso."""
+    repo = SPAListRepository(settings_obj=mock_settings)
+
+    spa_file.write_text('{"authorized_domains": [', encoding='utf-8')
+    assert repo.reload() is False
+
+    assert repo.is_domain_authorized("v0.com") is True
+    assert repo.reload_stats()["failures"] == 1
+    assert "Erro ao decodificar JSON de SPAs" in caplog.text
+
+def test_reload_if_changed_skips_unchanged_file(spa_file, mock_settings):
+    repo = SPAListRepository(settings_obj=mock_settings)
+
+    assert repo.reload_if_changed() is False
+
+    _write_domains(spa_file, ["fixo.com", "v1.com", "v2.com"])
+    assert repo.reload_if_changed() is True
+
+def test_watcher_picks_up_file_changes(spa_file, mock_settings):
+    """O watcher em background recarrega a lista quando o arquivo muda."""
+    repo = SPAListRepository(settings_obj=mock_settings)
+    repo.start_watcher(interval_seconds=0.01)
+    try:
+        _write_domains(spa_file, ["fixo.com", "novo.com"])
+        deadline = time.monotonic() + 5
+        while not repo.is_domain_authorized("novo.com") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert repo.is_domain_authorized("novo.com") is True
+        assert repo.reload_stats()["watching"] is True
+    finally:
+        repo.stop_watcher()
+    assert repo.reload_stats()["watching"] is False
+
+def test_lookups_during_repeated_reloads(spa_file, mock_settings):
+    """
+    Leitores concorrentes (sem lock) durante recargas sucessivas: nenhuma
+    exceção e cada leitura vê uma lista completa (antiga ou nova).
+    """
+    repo = SPAListRepository(settings_obj=mock_settings)
+    stop = threading.Event()
+    errors = []
+    lookups = [0]
+
+    def reader():
+        while not stop.is_set():
+            try:
+                domains = repo.get_authorized_domains()
+                # Toda versão da lista contém 'fixo.com' e exatamente um 'vN.com'
+                assert "fixo.com" in domains
+                assert sum(1 for d in domains if d.startswith("v")) == 1
+                assert repo.is_domain_authorized("FIXO.COM") is True
+                lookups[0] += 1
+            except Exception as e:
+                errors.append(e)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    try:
+        for version in range(1, 51):
+            _write_domains(spa_file, ["fixo.com", f"v{version}.com"] + [f"d{i}.com" for i in range(200)])
+            assert repo.reload() is True
+    finally:
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+    assert errors == []
+    assert lookups[0] > 0
+    assert repo.is_domain_authorized("v50.com") is True
+
+def test_loads_from_mapped_index(tmp_path, mock_settings):
+    """Com SPA_LIST_INDEX_PATH, o índice binário (mmap) substitui o JSON e é recarregado a quente."""
+    index_path = tmp_path / 'spa_list.idx'
+    write_index_file(["betano.bet.br"], str(index_path))
+    mock_settings.SPA_LIST_INDEX_PATH = str(index_path)
+
+    repo = SPAListRepository(settings_obj=mock_settings)
+    assert repo.is_domain_authorized("m.betano.bet.br") is True
+    assert repo.get_authorized_domains() == frozenset({"betano.bet.br"})
+
+    write_index_file(["novo.com"], str(index_path))
+    assert repo.reload_if_changed() is True
+    assert repo.is_domain_authorized("novo.com") is True
+    assert repo.is_domain_authorized("betano.bet.br") is False
@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.domain_index import DomainIndex
+from app.services.spa_list_repository import SPAListRepository
+from app.services.spa_verifier_service import SPAVerifierService
+
+# Testes da verificação SPA em massa (Cards 2 e 4)
+
+@pytest.fixture
+def index() -> DomainIndex:
+    return DomainIndex(["betano.bet.br", "app.exemplo-autorizado.com"])
+
+@pytest.fixture
+def verifier_service(index: DomainIndex) -> SPAVerifierService:
+    repository = MagicMock(spec=SPAListRepository)
+    repository.snapshot.return_value = index
+    return SPAVerifierService(repository=repository)
+
+def test_verify_bulk_preserves_order_and_normalizes(verifier_service: SPAVerifierService):
+    urls = ["https://m.betano.bet.br/promo", "golpe.com", "", "https://www.app.exemplo-autorizado.com/x"]
+
+    results = list(verifier_service.verify_bulk(urls, batch_size=2))
+
+    assert results == [
+        ("https://m.betano.bet.br/promo", "m.betano.bet.br", True),
+        ("golpe.com", "golpe.com", False),
+        ("", "", False),
+        ("https://www.app.exemplo-autorizado.com/x", "app.exemplo-autorizado.com", True),
+    ]
+
+def test_domains_are_resolved_once_per_job(verifier_service: SPAVerifierService, index: DomainIndex):
+    bulk = verifier_service.open_bulk()
+    index.is_authorized = MagicMock(wraps=index.is_authorized)
+
+    bulk.verify([f"https://betano.bet.br/{i}" for i in range(100)])
+    bulk.verify(["http://betano.bet.br/", "golpe.com"])
+
+    assert index.is_authorized.call_count == 2
+    summary = bulk.summary()
+    assert summary["urls"] == 102
+    assert summary["authorized"] == 101
+    assert summary["domain_lookups"] == 2
+    assert summary["urls_per_second"] > 0
+
+def test_domain_memo_is_bounded(verifier_service: SPAVerifierService):
+    bulk = verifier_service.open_bulk(max_domains=10)
+
+    for start in range(0, 100, 5):
+        bulk.verify([f"site{i}.com" for i in range(start, start + 5)])
+
+    assert len(bulk._known) <= 10
+    assert bulk.domain_lookups == 100
@@ -0,0 +1,91 @@
+import pytest
+
+from app.services.auth_tokens import InvalidTokenError, JWTService, SigningKey
+from app.services.token_revocation import (
+    BloomFilter,
+    InMemoryRevocationStore,
+    SQLiteRevocationStore,
+    TokenRevocationList,
+)
+
+# Testes da lista de revogação (filtro de Bloom + armazenamento exato)
+
+
+class _Clock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(10_000, 0.01)
+    for i in range(10_000):
+        bloom.add(f"revogado-{i}")
+
+    assert all(f"revogado-{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"valido-{i}" in bloom for i in range(20_000))
+    assert false_positives / 20_000 < 0.02
+
+
+def test_store_is_only_consulted_on_filter_hits():
+    clock = _Clock()
+    revocations = TokenRevocationList(InMemoryRevocationStore(), expected_revocations=1000, clock=clock)
+    revocations.revoke("jti-revogado", clock.now + 600)
+
+    assert revocations.is_revoked("jti-revogado")
+    assert not any(revocations.is_revoked(f"jti-{i}") for i in range(1000))
+    stats = revocations.stats()
+    assert stats["checks"] == 1001
+    assert stats["store_lookups"] == 1 + stats["false_positives"]
+    assert stats["no_io_rate"] > 0.98
+
+
+def test_entries_expire_at_token_exp_and_leave_the_filter_on_rebuild():
+    clock = _Clock()
+    store = InMemoryRevocationStore()
+    revocations = TokenRevocationList(store, rebuild_interval_seconds=60, clock=clock)
+    revocations.revoke("curto", clock.now + 30)
+    revocations.revoke("longo", clock.now + 3600)
+    revocations.revoke("ja-expirado", clock.now - 1)  # ignorado
+
+    clock.now += 61  # passa do exp de "curto" e do intervalo de remontagem
+    assert not revocations.is_revoked("curto")
+    assert revocations.is_revoked("longo")
+    stats = revocations.stats()
+    assert stats["rebuilds"] == 2 and stats["purged"] == 1
+    assert stats["filter"]["entries"] == 1 and store.active(clock.now) == ["longo"]
+
+
+def test_sqlite_store_shares_revocations_between_workers(tmp_path):
+    clock = _Clock()
+    path = str(tmp_path / "revogacoes.db")
+    worker_a = TokenRevocationList(SQLiteRevocationStore(path), rebuild_interval_seconds=30, clock=clock)
+    worker_b = TokenRevocationList(SQLiteRevocationStore(path), rebuild_interval_seconds=30, clock=clock)
+    try:
+        worker_a.revoke("jti-1", clock.now + 600)
+        assert worker_a.is_revoked("jti-1")
+        # O outro worker passa a enxergar a revogação na próxima remontagem do filtro
+        clock.now += 31
+        assert worker_b.is_revoked("jti-1")
+    finally:
+        worker_a.close()
+        worker_b.close()
+
+
+def test_revoked_token_is_rejected_even_from_the_claims_cache():
+    clock = _Clock()
+    service = JWTService(
+        SigningKey.hs256("segredo-de-teste-com-mais-de-32-bytes!!"),
+        revocations=TokenRevocationList(InMemoryRevocationStore(), clock=clock),
+        clock=clock,
+    )
+    token, other = service.issue("user_123"), service.issue("user_123")
+    service.verify(token)  # claims no cache
+
+    service.revoke(token)
+    with pytest.raises(InvalidTokenError, match="revogado"):
+        service.verify(token)
+    assert service.verify(other)["sub"] == "user_123"  # só o token do logout cai
+    assert service.stats()["revoked"] == 1
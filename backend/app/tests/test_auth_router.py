@@ -0,0 +1,65 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers.auth import router
+from app.services.auth_tokens import b64url_encode, get_jwt_service
+from app.services.login_guard import LoginExecutor, LoginGuard, TokenBucketLimiter, get_login_guard
+
+# --- Testes de Integração da API (/api/v1/auth) ---
+
+application = FastAPI()
+application.include_router(router, prefix="/api/v1/auth")
+client = TestClient(application)
+
+
+def test_login_issues_a_signed_token():
+    response = client.post("/api/v1/auth/login", json={"email": "ana@inovexa.com", "password": "senha"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["user_id"] == "ana" and body["expires_in"] == get_jwt_service().ttl_seconds
+    claims = get_jwt_service().verify(body["access_token"])
+    assert claims["sub"] == "ana" and claims["nickname"] == "ana"
+
+
+def test_login_with_invalid_credentials():
+    response = client.post("/api/v1/auth/login", json={"email": "fail@inovexa.com", "password": "x"})
+    assert response.status_code == 401
+
+
+def test_logout_revokes_the_token():
+    token = client.post("/api/v1/auth/login", json={"email": "ana@inovexa.com", "password": "senha"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 204
+    # O mesmo token não serve mais (nem para um segundo logout)
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 401
+    assert client.post("/api/v1/auth/logout").status_code == 401
+
+
+def test_login_is_rate_limited_per_email():
+    guard = LoginGuard(
+        LoginExecutor(workers=1, max_queue=1),
+        per_ip=TokenBucketLimiter(rate=100.0, burst=100),
+        per_email=TokenBucketLimiter(rate=0.01, burst=2),
+    )
+    application.dependency_overrides[get_login_guard] = lambda: guard
+    try:
+        statuses = [
+            client.post("/api/v1/auth/login", json={"email": email, "password": "senha"}).status_code
+            for email in ("bia@inovexa.com", "BIA@inovexa.com", "bia@inovexa.com", "caio@inovexa.com")
+        ]
+        limited = client.post("/api/v1/auth/login", json={"email": "bia@inovexa.com", "password": "senha"})
+    finally:
+        application.dependency_overrides.clear()
+        guard.executor.shutdown()
+
+    assert statuses == [200, 200, 429, 200]
+    assert limited.status_code == 429 and int(limited.headers["Retry-After"]) >= 1
+    assert guard.stats()["executor"]["completed"] == 3  # tentativas limitadas não gastam hash
+
+
+def test_logout_with_malformed_token_header_is_unauthorized():
+    forged = b64url_encode(b'{"alg":"HS256","kid":[1],"typ":"JWT"}') + ".e30.c2ln"
+    response = client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {forged}"})
+    assert response.status_code == 401
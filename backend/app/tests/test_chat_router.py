@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers.chat import router
+from app.services.auth_tokens import get_jwt_service
+from app.services.chat_orchestrator import ChatOrchestrator, get_chat_orchestrator
+from app.services.llm_client import LLMClient, LLMError, StubLLMClient
+from app.services.rag_service import RAGService
+from app.services.token_counter import count_tokens
+from app.services.user_profile_service import UserProfileService
+
+# --- Testes de Integração da API (/api/v1/chat) ---
+
+class _FailingLLM(LLMClient):
+    async def stream(self, messages, max_tokens, usage=None):
+        yield "Olá"
+        raise LLMError("conexão perdida")
+
+
+def _client(llm: LLMClient) -> TestClient:
+    orchestrator = ChatOrchestrator(RAGService(), llm, UserProfileService())
+    application = FastAPI()
+    application.include_router(router, prefix="/api/v1/chat")
+    application.dependency_overrides[get_chat_orchestrator] = lambda: orchestrator
+    client = TestClient(application)
+    client.headers["Authorization"] = f"Bearer {get_jwt_service().issue('user_123')}"
+    return client
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return _client(StubLLMClient())
+
+
+def _events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_send_returns_full_reply(client: TestClient):
+    response = client.post("/api/v1/chat/send", json={"message": "Perdi muito dinheiro"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["response"].startswith("As finanças são um ponto chave, Adonis.")
+    # Uso real: prompt (sistema + RAG + mensagem) mais a resposta
+    assert body["token_usage"] > count_tokens(body["response"]) > len(body["response"].split(" "))
+
+
+def test_stream_sends_tokens_then_summary(client: TestClient):
+    response = client.post("/api/v1/chat/send/stream", json={"message": "Estou com vontade de apostar"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    *tokens, (last_event, summary) = _events(response)
+    assert {event for event, _ in tokens} == {"token"}
+    assert "".join(data["text"] for _, data in tokens).endswith("respiração 4-7-8 comigo agora?")
+    assert last_event == "done"
+    assert summary["token_usage"] == summary["prompt_tokens"] + summary["completion_tokens"]
+    assert summary["ttft_ms"] <= summary["total_ms"]
+
+    metrics = client.get("/api/v1/chat/metrics").json()
+    assert metrics["turns"] == 1 and metrics["ttft_ms"]["p50"] == summary["ttft_ms"]
+
+
+def test_provider_failure_mid_stream_sends_error_event():
+    client = _client(_FailingLLM())
+
+    events = _events(client.post("/api/v1/chat/send/stream", json={"message": "oi"}))
+    assert events[0] == ("token", {"text": "Olá"})
+    assert events[-1][0] == "error"
+
+    response = client.post("/api/v1/chat/send", json={"message": "oi"})
+    assert response.status_code == 502
+    assert client.get("/api/v1/chat/metrics").json()["errors"] == 2
+
+
+def test_history_lives_on_the_server_until_reset(client: TestClient):
+    client.post("/api/v1/chat/send", json={"message": "Estou com vontade de apostar"})
+    summary = _events(client.post("/api/v1/chat/send/stream", json={"message": "Perdi dinheiro"}))[-1][1]
+    assert summary["history_turns"] == 2
+
+    assert client.delete("/api/v1/chat/session").status_code == 204
+    summary = _events(client.post("/api/v1/chat/send/stream", json={"message": "Perdi dinheiro"}))[-1][1]
+    assert summary["history_turns"] == 0
+
+
+def test_requests_without_a_valid_token_are_rejected(client: TestClient):
+    for authorization in ("", "Bearer mock_valid_token", "Basic abc"):
+        response = client.post("/api/v1/chat/send", json={"message": "oi"}, headers={"Authorization": authorization})
+        assert response.status_code == 401
+        assert response.headers["www-authenticate"] == "Bearer"
@@ -0,0 +1,69 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers.dashboard import get_dashboard_snapshots, render_dashboard, router
+from app.services.auth_tokens import get_jwt_service
+from app.services.dashboard_snapshot import DashboardSnapshotStore
+from app.services.goals_repository import SQLiteGoalsRepository, get_goals_repository
+from app.services.progress_ledger import SQLiteProgressLedger, get_progress_ledger
+
+# --- Testes de Integração da API (/api/v1/dashboard) ---
+
+@pytest.fixture
+def client(tmp_path) -> TestClient:
+    repository = SQLiteGoalsRepository(str(tmp_path / "goals.db"))
+    repository.seed({"user_123": [("g1", "Meditar", True), ("g2", "Caminhar", False)]})
+    application = FastAPI()
+    application.include_router(router, prefix="/api/v1/dashboard")
+    ledger = SQLiteProgressLedger(str(tmp_path / "goals.db"))
+    snapshots = DashboardSnapshotStore(repository, ledger, render_dashboard)
+    application.dependency_overrides[get_goals_repository] = lambda: repository
+    application.dependency_overrides[get_progress_ledger] = lambda: ledger
+    application.dependency_overrides[get_dashboard_snapshots] = lambda: snapshots
+    client = TestClient(application)
+    client.headers["Authorization"] = f"Bearer {get_jwt_service().issue('user_123')}"
+    yield client
+    repository.close()
+    ledger.close()
+
+
+def test_complete_goal_flow(client: TestClient):
+    assert client.post("/api/v1/dashboard/goals/complete/g2").json() == {"message": "Meta marcada como concluída com sucesso."}
+    assert client.post("/api/v1/dashboard/goals/complete/g2").json() == {"message": "Meta já estava concluída."}
+
+    response = client.post("/api/v1/dashboard/goals/complete/g9")
+    assert response.status_code == 404 and response.json()["detail"] == "Meta não encontrada."
+
+    goals = client.get("/api/v1/dashboard/data").json()["user_goals"]
+    assert goals == [
+        {"id": "g1", "title": "Meditar", "is_completed": True},
+        {"id": "g2", "title": "Caminhar", "is_completed": True},
+    ]
+
+
+def test_dashboard_revalidates_with_etag(client: TestClient):
+    first = client.get("/api/v1/dashboard/data")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"] == "private, no-cache"
+
+    cached = client.get("/api/v1/dashboard/data", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b"" and cached.headers["etag"] == etag
+
+    # Concluir uma meta muda o snapshot: o ETag antigo deixa de valer
+    client.post("/api/v1/dashboard/goals/complete/g2")
+    changed = client.get("/api/v1/dashboard/data", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert changed.json()["user_goals"][1]["is_completed"] is True
+
+
+def test_progress_events_update_the_dashboard(client: TestClient):
+    etag = client.get("/api/v1/dashboard/data").headers["etag"]
+
+    response = client.post("/api/v1/dashboard/progress/events", json={"kind": "avoided_bet", "amount": 80.5})
+    assert response.status_code == 201
+    assert response.json() == {"days_without_betting": 0, "best_streak_days": 0, "accumulated_savings": 80.5, "check_ins": 0, "relapses": 0}
+    assert client.post("/api/v1/dashboard/progress/events", json={"kind": "relapse", "amount": 3}).status_code == 422
+
+    dashboard = client.get("/api/v1/dashboard/data", headers={"If-None-Match": etag})
+    assert dashboard.status_code == 200 and dashboard.json()["accumulated_savings"] == 80.5
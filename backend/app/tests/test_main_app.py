@@ -0,0 +1,114 @@
+from fastapi.testclient import TestClient
+
+from app.config.settings import settings
+from app.services.advertorial_detector_service import get_advertorial_detector_service
+from app.services.result_cache import ResultCache, get_check_result_cache
+from app.services.spa_list_repository import get_spa_list_repository
+from app.services.goals_repository import get_goals_repository
+from app.services.progress_ledger import get_progress_ledger
+from app.services.sqlite_pool import close_sqlite_pools
+from main import create_application
+
+# Testes do app único (todos os routers sob o prefixo da versão)
+
+
+def test_all_routers_are_mounted_under_the_version_prefix():
+    paths = {route.path for route in create_application().routes}
+    for path in ("/auth/login", "/auth/logout", "/chat/send", "/chat/send/stream", "/dashboard/data",
+                 "/detector/check", "/check", "/check/batch"):
+        assert f"{settings.API_V1_STR}{path}" in paths
+    assert {"/", "/startup"} <= paths
+
+
+def test_login_dashboard_chat_and_logout_on_one_app():
+    with TestClient(create_application()) as client:
+        login = client.post(f"{settings.API_V1_STR}/auth/login", json={"email": "user_123@inovexa.com", "password": "senha"})
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+        assert client.get(f"{settings.API_V1_STR}/dashboard/data").status_code == 200
+        chat = client.post(f"{settings.API_V1_STR}/chat/send", json={"message": "Estou com vontade de apostar.", "history": []})
+        assert chat.status_code == 200 and chat.json()["response"]
+        assert client.post(f"{settings.API_V1_STR}/auth/logout").status_code == 204
+        # Revogação vista pelas outras rotas do mesmo worker
+        assert client.get(f"{settings.API_V1_STR}/dashboard/data").status_code == 401
+
+        startup = client.get("/startup").json()
+        assert startup["components"]["jwt_service"]["built"]
+
+
+def test_app_db_path_shares_one_connection_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "APP_DB_PATH", str(tmp_path / "antibet.db"))
+    get_goals_repository.cache_clear()
+    get_progress_ledger.cache_clear()
+    try:
+        repository, ledger = get_goals_repository(), get_progress_ledger()
+        assert repository._pool is ledger._pool
+        repository.close()  # pool compartilhado continua aberto para o outro
+        assert ledger.aggregate("user_123").check_ins >= 0
+    finally:
+        get_goals_repository.cache_clear()
+        get_progress_ledger.cache_clear()
+        close_sqlite_pools()
+
+
+def test_check_result_is_cached_across_single_and_batch_routes(monkeypatch):
+    application = create_application()
+    cache = ResultCache()
+    application.dependency_overrides[get_check_result_cache] = lambda: cache
+    detector = get_advertorial_detector_service()
+    payload = {"url": "https://portal.com/publieditorial/a", "content": "Conteúdo patrocinado: cadastre-se na Blaze!"}
+    client = TestClient(application)
+
+    first = client.post(f"{settings.API_V1_STR}/check", json=payload).json()
+    # Acerto no cache: nenhum dos serviços é chamado de novo
+    monkeypatch.setattr(detector, "detect_async", lambda *args: (_ for _ in ()).throw(AssertionError("detector chamado")))
+    monkeypatch.setattr(detector, "detect_many_async", lambda *args: (_ for _ in ()).throw(AssertionError("detector chamado")))
+    again = client.post(f"{settings.API_V1_STR}/check", json={**payload, "url": "https://portal.com/publieditorial/b"}).json()
+    batch = client.post(f"{settings.API_V1_STR}/check/batch", json={"items": [payload]}).json()
+
+    assert again == {**first, "url_analyzed": "https://portal.com/publieditorial/b"}
+    assert batch["results"] == [first]
+    assert cache.stats()["hits"] == 2
+
+
+def test_check_result_computed_across_a_spa_list_reload_is_not_cached(monkeypatch):
+    """A lista SPA recarregada entre o cálculo e o put: o resultado antigo não fica no cache."""
+    application = create_application()
+    cache = ResultCache()
+    application.dependency_overrides[get_check_result_cache] = lambda: cache
+    detector = get_advertorial_detector_service()
+    repository = get_spa_list_repository()
+    detect_async = detector.detect_async
+
+    async def detect_then_reload(url, content):
+        report = await detect_async(url, content)
+        repository.reload()
+        return report
+
+    async def detect_many_then_reload(documents):
+        reports = [await detect_async(url, content) for url, content in documents]
+        repository.reload()
+        return reports
+
+    monkeypatch.setattr(detector, "detect_async", detect_then_reload)
+    monkeypatch.setattr(detector, "detect_many_async", detect_many_then_reload)
+    client = TestClient(application)
+    payload = {"url": "https://portal.com/publieditorial/a", "content": "Conteúdo patrocinado: cadastre-se na Blaze!"}
+
+    assert client.post(f"{settings.API_V1_STR}/check", json=payload).status_code == 200
+    assert client.post(f"{settings.API_V1_STR}/check/batch", json={"items": [payload]}).status_code == 200
+
+    assert len(cache) == 0
+    assert cache.stats()["stale_puts"] == 2
+
+
+def test_spa_list_reload_metrics_are_exposed():
+    client = TestClient(create_application())
+    before = client.get(f"{settings.API_V1_STR}/spa/list/stats").json()
+
+    assert get_spa_list_repository().reload() is True
+    after = client.get(f"{settings.API_V1_STR}/spa/list/stats").json()
+
+    assert after["reloads"] == before["reloads"] + 1
+    assert after["generation"] == before["generation"] + 1
+    assert after["domains"] > 0
@@ -0,0 +1,122 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.spa_verifier_router import spa_verifier_router
+from app.config.settings import settings
+from app.services.domain_index import DomainIndex
+from app.services.spa_list_repository import SPAListRepository, get_spa_list_repository
+from app.services.spa_verifier_service import SPAVerifierService, get_spa_verifier_service
+
+# --- Testes de Integração da API (/api/v1/spa/verify/bulk) ---
+
+@pytest.fixture
+def client() -> TestClient:
+    repository = MagicMock(spec=SPAListRepository)
+    repository.snapshot.return_value = DomainIndex(["betano.bet.br"])
+    application = FastAPI()
+    application.include_router(spa_verifier_router, prefix="/api/v1")
+    application.dependency_overrides[get_spa_verifier_service] = lambda: SPAVerifierService(repository=repository)
+    application.dependency_overrides[get_spa_list_repository] = lambda: repository
+    return TestClient(application)
+
+def _records(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_bulk_text_upload(client: TestClient):
+    body = "https://m.betano.bet.br/promo\n\ngolpe.com\nhttps://betano.bet.br"
+    response = client.post("/api/v1/spa/verify/bulk?batch_size=2", content=body, headers={"content-type": "text/plain"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    *results, summary = _records(response)
+    assert [(r["domain"], r["is_authorized"]) for r in results] == [
+        ("m.betano.bet.br", True), ("golpe.com", False), ("betano.bet.br", True)
+    ]
+    assert summary["summary"]["urls"] == 3
+    assert summary["summary"]["authorized"] == 2
+
+def test_bulk_csv_upload_uses_url_column(client: TestClient):
+    body = "campanha,url\nc1,https://betano.bet.br/a\n\"c2, extra\",golpe.com\n"
+    response = client.post("/api/v1/spa/verify/bulk", content=body, headers={"content-type": "text/csv"})
+
+    *results, _ = _records(response)
+    assert [(r["url"], r["is_authorized"]) for r in results] == [
+        ("https://betano.bet.br/a", True), ("golpe.com", False)
+    ]
+
+def test_bulk_ndjson_reports_invalid_lines(client: TestClient):
+    body = '{"url": "betano.bet.br"}\n"golpe.com"\n{"outro": 1}\n'
+    response = client.post("/api/v1/spa/verify/bulk", content=body, headers={"content-type": "application/x-ndjson"})
+
+    records = _records(response)
+    assert [r["is_authorized"] for r in records[:2]] == [True, False]
+    assert {"line": 3, "error": records[2]["error"]} == records[2]
+    assert records[-1]["summary"]["urls"] == 2
+
+def test_bulk_error_records_keep_input_order(client: TestClient):
+    """O registro de erro sai na posição da linha inválida, mesmo com URLs ainda no lote."""
+    body = '"betano.bet.br"\n{"outro": 1}\n"golpe.com"\n'
+    response = client.post("/api/v1/spa/verify/bulk?batch_size=10", content=body, headers={"content-type": "application/x-ndjson"})
+
+    records = _records(response)[:-1]
+    assert [r.get("url", r.get("line")) for r in records] == ["betano.bet.br", 2, "golpe.com"]
+
+def test_bulk_rejects_lines_over_the_limit(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "SPA_BULK_MAX_LINE_CHARS", 64)
+
+    def body():
+        yield b"betano.bet.br\n" + b"a" * 50
+        yield b"a" * 50  # a linha cresce além do limite sem quebra
+        yield b"a" * 50 + b".com\ngolpe.com\n" + b"b" * 100
+
+    response = client.post("/api/v1/spa/verify/bulk", content=body(), headers={"content-type": "text/plain"})
+
+    records = _records(response)[:-1]
+    assert records[0]["url"] == "betano.bet.br"
+    assert records[1]["line"] == 2 and "limite" in records[1]["error"]
+    assert records[2]["url"] == "golpe.com"
+    assert records[3]["line"] == 4 and "limite" in records[3]["error"]
+
+def test_bulk_csv_quoted_field_across_lines(client: TestClient):
+    """Campos entre aspas com quebra de linha não desalinham as linhas seguintes."""
+    body = 'campanha,url\n"c1\nsegunda linha, com vírgula",betano.bet.br\n"c2 ""aspas""",golpe.com\n"c3,sem fim\n'
+    response = client.post("/api/v1/spa/verify/bulk", content=body, headers={"content-type": "text/csv"})
+
+    records = _records(response)
+    assert [(r["url"], r["is_authorized"]) for r in records[:2]] == [("betano.bet.br", True), ("golpe.com", False)]
+    assert records[2]["line"] == 5 and "aspas" in records[2]["error"]
+    assert records[-1]["summary"]["urls"] == 2
+
+def test_bulk_json_list(client: TestClient):
+    response = client.post("/api/v1/spa/verify/bulk", json={"urls": ["betano.bet.br", "golpe.com"]})
+    assert [r.get("is_authorized") for r in _records(response)[:-1]] == [True, False]
+
+    invalid = client.post("/api/v1/spa/verify/bulk", json={"urls": "betano.bet.br"})
+    assert invalid.status_code == 400
+
+def test_bulk_strips_padded_ndjson_and_json_urls(client: TestClient):
+    """Valores com espaços nas bordas (exportações preenchidas) resolvem o domínio certo."""
+    body = '"  https://betano.bet.br/a  "\n{"url": "\\thttps://golpe.com/b"}\n'
+    ndjson = client.post("/api/v1/spa/verify/bulk", content=body, headers={"content-type": "application/x-ndjson"})
+    as_json = client.post("/api/v1/spa/verify/bulk", json={"urls": ["  https://betano.bet.br/a  ", "\thttps://golpe.com/b"]})
+
+    for response in (ndjson, as_json):
+        *results, _ = _records(response)
+        assert [(r["url"], r["domain"], r["is_authorized"]) for r in results] == [
+            ("https://betano.bet.br/a", "betano.bet.br", True), ("https://golpe.com/b", "golpe.com", False)
+        ]
+
+# --- Testes de Integração da API (/api/v1/spa/list/stats) ---
+
+def test_spa_list_stats_exposes_reload_metrics(client: TestClient):
+    stats = {"reloads": 3, "failures": 1, "generation": 3, "domains": 1, "watching": True}
+    client.app.dependency_overrides[get_spa_list_repository]().reload_stats.return_value = stats
+
+    response = client.get("/api/v1/spa/list/stats")
+
+    assert response.status_code == 200
+    assert response.json() == stats
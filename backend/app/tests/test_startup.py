@@ -0,0 +1,35 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# Orçamento de tempo de import do app (cold start ao escalar workers)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+# Total (inclui FastAPI/pydantic) e só os módulos do próprio app (main + app.*)
+IMPORT_BUDGET_SECONDS = 1.5
+APP_MODULES_BUDGET_SECONDS = 0.25
+
+
+def _import_main():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)", line)
+        if match:
+            timings[match[3]] = (int(match[1]) / 1e6, int(match[2]) / 1e6)  # (próprio, acumulado) em s
+    return result.stdout, timings
+
+
+def test_importing_the_app_builds_no_service_and_fits_the_budget():
+    stdout, timings = _import_main()
+
+    # Os serviços anunciam a inicialização no stdout: nada pode aparecer no import
+    assert stdout == ""
+    assert timings["main"][1] < IMPORT_BUDGET_SECONDS
+    own = sum(self_time for name, (self_time, _) in timings.items() if name == "main" or name.startswith("app."))
+    assert own < APP_MODULES_BUDGET_SECONDS
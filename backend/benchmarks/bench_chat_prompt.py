@@ -0,0 +1,86 @@
+"""
+Benchmark da montagem do prompt do Chat: prefixo cacheado e layout estável.
+
+Compara a montagem antiga (SYSTEM_PROMPT + contexto do usuário refeitos por
+f-string e recontados a cada mensagem, RAG logo após o sistema) com a nova
+(prefixo por usuário cacheado, RAG no fim) numa carga de vários usuários com
+conversas em andamento. Mede:
+- tempo de montagem por prompt e taxa de acerto do cache de prefixos;
+- prefixo reaproveitável pelo cache do provedor: quantos tokens do início do
+  prompt são idênticos ao prompt anterior do mesmo usuário.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_chat_prompt
+"""
+import random
+import time
+
+from app.services.chat_prompt import SYSTEM_PROMPT, PromptBuilder
+from app.services.chat_session import ChatSessionStore
+from app.services.token_counter import MESSAGE_OVERHEAD_TOKENS, count_message_tokens, count_tokens
+
+USERS = 500
+MESSAGES = 20_000
+CONTEXTS = [f"--- CONTEXTO RAG {i} ---\n" + "Técnica de respiração e controle financeiro. " * 30 for i in range(50)]
+REPLY = "Entendo. Vamos tentar a respiração 4-7-8 juntos e anotar o que disparou a vontade de apostar hoje."
+
+
+def legacy_build(user, rag_context, session, message):
+    """Montagem de antes: tudo refeito e recontado a cada mensagem."""
+    user_context = f"""
+    --- CONTEXTO DO USUÁRIO ---
+    Apelido: {user[1]}
+    Gênero: {user[2]}
+    Idade: {user[3]}
+    """
+    messages = [{"role": "system", "content": SYSTEM_PROMPT + user_context}, {"role": "system", "content": rag_context}]
+    messages += [{"role": turn.role, "content": turn.content} for turn in session.turns]
+    messages.append({"role": "user", "content": message})
+    return messages, count_message_tokens(messages)
+
+
+def common_prefix_tokens(previous, current) -> int:
+    tokens = 0
+    for old, new in zip(previous, current):
+        if old != new:
+            break
+        tokens += count_tokens(new["content"]) + MESSAGE_OVERHEAD_TOKENS
+    return tokens
+
+
+def main() -> None:
+    rng = random.Random(7)
+    users = [(f"user_{i}", f"Apelido{i}", rng.choice(("Masculino", "Feminino")), rng.randint(18, 70)) for i in range(USERS)]
+    workload = [(rng.choice(users), rng.choice(CONTEXTS), f"Mensagem {n}: hoje senti vontade de apostar.") for n in range(MESSAGES)]
+
+    results = {}
+    for label in ("antes", "depois"):
+        sessions = ChatSessionStore()
+        builder = PromptBuilder()
+        previous, reused, total_tokens, elapsed = {}, 0, 0, 0.0
+        for user, rag_context, message in workload:
+            snapshot = sessions.snapshot(user[0])
+            started = time.perf_counter()
+            if label == "antes":
+                messages, tokens = legacy_build(user, rag_context, snapshot, message)
+            else:
+                plan = builder.build(builder.prefixes.get(*user), rag_context, snapshot, message)
+                messages, tokens = plan.messages, plan.prompt_tokens
+            elapsed += time.perf_counter() - started
+            if user[0] in previous:
+                reused += common_prefix_tokens(previous[user[0]], messages)
+            total_tokens += tokens
+            previous[user[0]] = messages
+            sessions.append_exchange(user[0], message, REPLY)
+        hit_rate = builder.prefixes.stats()["hit_rate"] if label == "depois" else None
+        results[label] = (elapsed / MESSAGES * 1e6, reused / total_tokens, hit_rate)
+
+    print(f"{USERS} usuários, {MESSAGES} mensagens")
+    print(f"{'':>7} | {'montagem (µs)':>13} | {'prefixo reaproveitável':>22} | {'acerto do cache de prefixos':>27}")
+    for label, (us, reuse, hit_rate) in results.items():
+        hits = f"{hit_rate:.1%}" if hit_rate is not None else "-"
+        print(f"{label:>7} | {us:>13.1f} | {reuse:>22.1%} | {hits:>27}")
+
+
+if __name__ == "__main__":
+    main()
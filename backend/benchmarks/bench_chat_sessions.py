@@ -0,0 +1,66 @@
+"""
+Benchmark das sessões do Chat: histórico no cliente x no servidor com orçamento.
+
+Simula uma conversa longa (até 300 trocas) e mede, em alguns pontos dela:
+- tamanho do corpo da requisição (cliente reenviando tudo x só a mensagem nova);
+- tokens do prompt (histórico integral x orçamento CHAT_PROMPT_MAX_TOKENS);
+- tempo de montagem do prompt no servidor.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_chat_sessions
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from app.services.chat_orchestrator import ChatOrchestrator
+from app.services.llm_client import StubLLMClient
+from app.services.rag_service import RAGService
+from app.services.token_counter import count_message_tokens
+from app.services.user_profile_service import UserProfileService
+
+CHECKPOINTS = (10, 50, 150, 300)
+MESSAGES = (
+    "Estou com vontade de apostar de novo, hoje foi um dia difícil no trabalho.",
+    "Perdi muito dinheiro no mês passado e não sei como contar para a família.",
+    "Consegui ficar três dias sem jogar, mas a ansiedade voltou à noite.",
+)
+REPEAT = 20
+
+
+async def build_ms(orchestrator, message, history, user) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        plan = await orchestrator.build_prompt(message, history, user)
+    return (time.perf_counter() - started) / REPEAT * 1000, plan
+
+
+async def main_async() -> None:
+    user = SimpleNamespace(id="user_123", nickname="Adonis", gender="Masculino", age=35)
+    server = ChatOrchestrator(RAGService(), StubLLMClient(), UserProfileService())
+    legacy = ChatOrchestrator(RAGService(), StubLLMClient(), UserProfileService())
+    history = []
+
+    print(f"{'troca':>6} | {'corpo antes':>11} {'depois':>7} (bytes) | {'tokens antes':>12} {'depois':>7} | {'montagem antes':>14} {'depois':>7} (ms)")
+    for turn in range(1, max(CHECKPOINTS) + 1):
+        message = MESSAGES[turn % len(MESSAGES)]
+        if turn in CHECKPOINTS:
+            legacy_body = len(json.dumps({"message": message, "history": history}, ensure_ascii=False).encode("utf-8"))
+            body = len(json.dumps({"message": message}, ensure_ascii=False).encode("utf-8"))
+            # Antes: o prompt levava o histórico inteiro reenviado pelo cliente
+            legacy_ms, legacy_plan = await build_ms(legacy, message, history, user)
+            legacy_tokens = count_message_tokens(legacy_plan.messages[:2] + history + legacy_plan.messages[-2:])
+            server_ms, plan = await build_ms(server, message, [], user)
+            print(f"{turn:>6} | {legacy_body:>11} {body:>7}         | {legacy_tokens:>12} {plan.prompt_tokens:>7} | "
+                  f"{legacy_ms:>14.2f} {server_ms:>7.2f}")
+        turn_result = await server.complete(message, [], user)
+        history += [{"role": "user", "content": message}, {"role": "assistant", "content": turn_result.response}]
+
+
+def main() -> None:
+    asyncio.run(main_async())
+
+
+if __name__ == "__main__":
+    main()
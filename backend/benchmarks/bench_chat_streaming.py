@@ -0,0 +1,69 @@
+"""
+Benchmark da orquestração assíncrona do Chat: tempo até o primeiro token (TTFT).
+
+Provedor stub com latência realista (primeiro token em 300 ms, 15 ms por token
+seguinte), perfil com 30 ms de I/O e o RAG real. Compara, para N conversas
+simultâneas num único event loop:
+- preparo sequencial (perfil e depois RAG) x concorrente;
+- latência percebida: resposta completa (o /send antigo) x primeiro token (SSE).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_chat_streaming
+"""
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+
+from app.services.chat_orchestrator import ChatOrchestrator
+from app.services.llm_client import StubLLMClient
+from app.services.rag_service import RAGService
+from app.services.user_profile_service import UserProfileService
+
+CONCURRENT_USERS = (1, 50, 200)
+FIRST_TOKEN_DELAY = 0.3
+TOKEN_DELAY = 0.015
+PROFILE_LATENCY = 0.03
+MESSAGES = ("Estou com vontade de apostar", "Perdi muito dinheiro ontem", "Preciso de um psicólogo")
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0]
+
+
+async def sequential_prepare(orchestrator, message, user):
+    """Preparo antigo: perfil e RAG um depois do outro (RAG também em thread)."""
+    started = time.perf_counter()
+    await orchestrator.profiles.get_profile(user.id)
+    await asyncio.get_running_loop().run_in_executor(None, orchestrator.rag_service.retrieve_context, message)
+    return (time.perf_counter() - started) * 1000
+
+
+async def run(users: int):
+    rag = RAGService()
+    orchestrator = ChatOrchestrator(
+        rag, StubLLMClient(token_delay_seconds=TOKEN_DELAY, first_token_delay_seconds=FIRST_TOKEN_DELAY),
+        UserProfileService(latency_seconds=PROFILE_LATENCY),
+    )
+    people = [SimpleNamespace(id="user_123", nickname="Adonis", gender="Masculino", age=35) for _ in range(users)]
+
+    sequential = await asyncio.gather(*(sequential_prepare(orchestrator, MESSAGES[i % 3], u) for i, u in enumerate(people)))
+    turns = await asyncio.gather(*(orchestrator.complete(MESSAGES[i % 3], [], u) for i, u in enumerate(people)))
+
+    prepare_sequential = summarize(sequential)
+    prepare = summarize([turn.prepare_ms for turn in turns])
+    ttft = summarize([turn.ttft_ms for turn in turns])
+    total = summarize([turn.total_ms for turn in turns])
+    print(f"{users:>8} {prepare_sequential[0]:>9.1f} {prepare[0]:>9.1f} "
+          f"{total[0]:>9.0f} {total[1]:>7.0f} {ttft[0]:>9.0f} {ttft[1]:>7.0f}")
+
+
+def main() -> None:
+    print(f"{'usuários':>8} {'prep seq':>9} {'prep conc':>9} {'total p50':>9} {'p95':>7} {'TTFT p50':>9} {'p95':>7}  (ms)")
+    for users in CONCURRENT_USERS:
+        asyncio.run(run(users))
+
+
+if __name__ == "__main__":
+    main()
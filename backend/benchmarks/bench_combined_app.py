@@ -0,0 +1,126 @@
+"""
+Benchmark ponta a ponta: todas as funcionalidades num único app vs. separadas.
+
+Carga mista de um usuário logado (Dashboard com e sem ETag, detector /check,
+Chat), com CONCURRENCY requisições simultâneas num event loop:
+- app único: create_application() do main, todas as rotas no mesmo worker,
+  com os mesmos Singletons;
+- separado: um gateway na frente de um app por funcionalidade. Cada requisição
+  faz um salto a mais, e o gateway desserializa e serializa o JSON de novo
+  (o salto é em processo, via ASGI: o custo de rede real viria por cima).
+As rodadas dos dois modos se alternam (o mesmo ruído da máquina para ambos).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_combined_app
+"""
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.api.advertorial_detector_router import advertorial_detector_router
+from app.config.settings import settings
+from app.routers import chat, dashboard
+from app.services.auth_tokens import get_jwt_service
+from main import create_application
+
+CONCURRENCY = 32
+REQUESTS = 2_000
+ROUNDS = 3
+PREFIX = settings.API_V1_STR
+
+CHECK_BODY = {"url": "https://portal-exemplo.com/publi/ganhe", "content": "Conteúdo patrocinado. Cadastre-se na betano e ganhe bônus!"}
+CHAT_BODY = {"message": "Estou com vontade de apostar.", "history": []}
+
+
+def feature_app(router, prefix: str) -> FastAPI:
+    application = FastAPI()
+    application.include_router(router, prefix=f"{PREFIX}{prefix}")
+    return application
+
+
+def gateway_app() -> FastAPI:
+    """Gateway que encaminha cada rota ao app da funcionalidade (um salto a mais)."""
+    upstreams = [
+        (f"{PREFIX}/dashboard", feature_app(dashboard.router, "/dashboard")),
+        (f"{PREFIX}/chat", feature_app(chat.router, "/chat")),
+        (PREFIX, feature_app(advertorial_detector_router, "")),
+    ]
+    clients = [(prefix, httpx.AsyncClient(app=app, base_url="http://upstream")) for prefix, app in upstreams]
+    gateway = FastAPI()
+
+    @gateway.api_route("/{path:path}", methods=["GET", "POST"])
+    async def forward(path: str, request: Request):
+        client = next(client for prefix, client in clients if request.url.path.startswith(prefix))
+        body = await request.body()
+        headers = {k: v for k, v in request.headers.items() if k in ("authorization", "if-none-match")}
+        upstream = await client.request(
+            request.method, request.url.path,
+            json=json.loads(body) if body else None,  # validação/normalização no gateway
+            headers=headers,
+        )
+        passthrough = {k: v for k, v in upstream.headers.items() if k in ("etag", "cache-control")}
+        if upstream.status_code == 304 or not upstream.content:
+            return Response(status_code=upstream.status_code, headers=passthrough)
+        return JSONResponse(upstream.json(), status_code=upstream.status_code, headers=passthrough)
+
+    return gateway
+
+
+async def run_round(application: FastAPI, token: str) -> tuple:
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(app=application, base_url="http://bench", headers=headers) as client:
+        etag = (await client.get(f"{PREFIX}/dashboard/data")).headers["etag"]
+        workload = [
+            ("GET", f"{PREFIX}/dashboard/data", None, {}),
+            ("GET", f"{PREFIX}/dashboard/data", None, {"If-None-Match": etag}),
+            ("POST", f"{PREFIX}/check", CHECK_BODY, {}),
+            ("POST", f"{PREFIX}/chat/send", CHAT_BODY, {}),
+        ]
+        latencies = []
+        errors = 0
+        queue: "asyncio.Queue[int]" = asyncio.Queue()
+        for i in range(REQUESTS):
+            queue.put_nowait(i)
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                method, path, body, extra = workload[queue.get_nowait() % len(workload)]
+                t0 = time.perf_counter()
+                response = await client.request(method, path, json=body, headers=extra)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                errors += response.status_code not in (200, 304)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return REQUESTS / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1], errors
+
+
+async def bench() -> None:
+    combined = create_application()
+    split = gateway_app()
+    token = get_jwt_service().issue("user_123", {"nickname": "Adonis"})
+    async with combined.router.lifespan_context(combined):  # aquece os Singletons compartilhados
+        results = {"app único": [], "separado (gateway)": []}
+        for _ in range(ROUNDS):
+            results["app único"].append(await run_round(combined, token))
+            results["separado (gateway)"].append(await run_round(split, token))
+
+    for label, rounds in results.items():
+        rps, p50, p99, errors = max(rounds)  # melhor rodada de cada modo
+        print(f"{label:<20} | {rps:8,.0f} req/s | p50 {p50:7.2f} ms | p99 {p99:7.2f} ms | erros {errors}")
+
+
+def main() -> None:
+    asyncio.run(bench())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark do GET /dashboard/data: montagem a cada chamada x snapshot materializado.
+
+Mede, pela API (TestClient), o tempo por requisição e os bytes do corpo para:
+- antes: DashboardData remontado e serializado a cada chamada;
+- snapshot (200): corpo pronto servido do snapshot do usuário;
+- revalidação (304): o app envia If-None-Match com o ETag que já tem.
+Também mede só o custo no servidor (sem a pilha HTTP) de montar x obter o snapshot.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_dashboard_snapshot
+"""
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers.chat import UserModel, jwt_auth_guard
+from app.routers.dashboard import DashboardData, get_dashboard_snapshots, render_dashboard, router
+from app.services.dashboard_snapshot import DashboardSnapshotStore
+from app.services.goals_repository import InMemoryGoalsRepository, get_goals_repository
+from app.services.progress_ledger import InMemoryProgressLedger
+
+REQUESTS = 2_000
+GOALS = 30
+
+
+def main() -> None:
+    repository = InMemoryGoalsRepository()
+    repository.seed({"user_123": [(f"g{i}", f"Meta diária número {i}: respirar antes de decidir", i % 3 == 0) for i in range(GOALS)]})
+    ledger = InMemoryProgressLedger()
+    ledger.seed({"user_123": [("check_in", 0.0, 1609459200.0), ("avoided_bet", 7345.50, 1609459200.0)]})
+    snapshots = DashboardSnapshotStore(repository, ledger, render_dashboard)
+
+    def legacy_render() -> bytes:
+        body, _ = render_dashboard("user_123", repository.list_goals("user_123"), ledger.aggregate("user_123"), time.time())
+        return body
+
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        legacy_render()
+    build_us = (time.perf_counter() - started) / REQUESTS * 1e6
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        snapshots.get("user_123")
+    snapshot_us = (time.perf_counter() - started) / REQUESTS * 1e6
+    print(f"servidor (sem HTTP): montagem {build_us:.1f} µs -> snapshot {snapshot_us:.1f} µs")
+
+    application = FastAPI()
+    application.include_router(router, prefix="/api/v1/dashboard")
+    application.dependency_overrides[get_goals_repository] = lambda: repository
+    application.dependency_overrides[get_dashboard_snapshots] = lambda: snapshots
+
+    @application.get("/legacy", response_model=DashboardData)
+    def legacy(current_user: UserModel = Depends(jwt_auth_guard), goals_repository=Depends(get_goals_repository)):
+        # Como era: o modelo remontado e validado/serializado pelo FastAPI a cada chamada
+        return DashboardData.model_validate_json(legacy_render())
+
+    client = TestClient(application)
+    etag = client.get("/api/v1/dashboard/data").headers["etag"]
+    cases = (
+        ("antes (remonta)", "/legacy", {}),
+        ("snapshot (200)", "/api/v1/dashboard/data", {}),
+        ("revalidação (304)", "/api/v1/dashboard/data", {"If-None-Match": etag}),
+    )
+    # Casos intercalados requisição a requisição: o TestClient fica mais lento ao longo
+    # da execução, e medir um caso depois do outro distorceria a comparação
+    elapsed = [0.0] * len(cases)
+    sizes = [0] * len(cases)
+    for _ in range(REQUESTS):
+        for i, (_, path, headers) in enumerate(cases):
+            started = time.perf_counter()
+            response = client.get(path, headers=headers)
+            elapsed[i] += time.perf_counter() - started
+            sizes[i] = len(response.content)
+    print(f"{'':<18} | {'ms/req':>7} | {'bytes do corpo':>14}")
+    for (label, _, _), total, size in zip(cases, elapsed, sizes):
+        print(f"{label:<18} | {total / REQUESTS * 1000:>7.3f} | {size:>14}")
+    print(f"snapshots: {snapshots.stats()}")
+
+
+if __name__ == "__main__":
+    main()
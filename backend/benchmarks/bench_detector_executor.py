@@ -0,0 +1,75 @@
+"""
+Benchmark dos modos de execução do detector (Card 1) sob carga concorrente.
+
+Gera chegadas em taxa fixa (carga em malha aberta) em um único event loop, como
+em um worker uvicorn: a maioria das requisições é pequena e algumas trazem
+páginas grandes. A latência é medida a partir do instante agendado de chegada,
+então o tempo em que o loop ficou bloqueado por outra requisição também conta.
+Reporta p50/p99 por tipo de documento para cada modo de execução.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_detector_executor
+"""
+import asyncio
+import os
+import random
+import statistics
+import time
+
+from app.services.advertorial_detector_service import AdvertorialDetectorService
+
+ARRIVALS_PER_SECOND = 150
+DURATION_SECONDS = 4
+LARGE_RATIO = 0.05
+SMALL_DOC = "Conteúdo patrocinado: cadastre-se na Betano e ganhe bônus. " * 20
+LARGE_DOC = ("O banco central anunciou novas medidas para conter a inflação. " * 8000) + SMALL_DOC
+OFFLOAD_MIN_CHARS = 50_000
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def handle(service, kind, arrival, latencies):
+    text = LARGE_DOC if kind == "large" else SMALL_DOC
+    await service.detect_async("https://portal-exemplo.com/noticia", text)
+    latencies[kind].append((time.perf_counter() - arrival) * 1000)
+
+
+async def run(mode):
+    service = AdvertorialDetectorService(
+        executor_mode=mode, max_workers=os.cpu_count(), offload_min_chars=OFFLOAD_MIN_CHARS
+    )
+    service.warm_up()
+    latencies = {"small": [], "large": []}
+    rng = random.Random(3)
+    tasks = []
+    start = time.perf_counter()
+    for i in range(ARRIVALS_PER_SECOND * DURATION_SECONDS):
+        arrival = start + i / ARRIVALS_PER_SECOND
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        kind = "large" if rng.random() < LARGE_RATIO else "small"
+        tasks.append(asyncio.create_task(handle(service, kind, arrival, latencies)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    service.shutdown()
+    return latencies, len(tasks) / elapsed
+
+
+def main():
+    print(f"CPUs: {os.cpu_count()}  chegadas/s: {ARRIVALS_PER_SECOND}  páginas grandes: {LARGE_RATIO:.0%}")
+    print(f"{'modo':>8} {'req/s':>8} {'pequeno p50':>12} {'pequeno p99':>12} {'grande p50':>11} {'grande p99':>11}  (ms)")
+    for mode in ("inline", "thread", "process"):
+        latencies, throughput = asyncio.run(run(mode))
+        small, large = latencies["small"], latencies["large"]
+        print(
+            f"{mode:>8} {throughput:>8.0f} {statistics.median(small):>12.2f} {percentile(small, 99):>12.2f} "
+            f"{statistics.median(large):>11.2f} {percentile(large, 99):>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
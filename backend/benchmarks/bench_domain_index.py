@@ -0,0 +1,81 @@
+"""
+Benchmark do índice de domínios por sufixo (Card 4) com listas grandes.
+
+Compara, para listas de 1k a 100k entradas (exatas, curingas e registráveis):
+- índice por sufixo (DomainIndex): uma busca hash por rótulo do host;
+- varredura linear dos curingas (o contorno que os chamadores faziam).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_domain_index
+"""
+import random
+import string
+import time
+
+from app.services.domain_index import DomainIndex
+
+LIST_SIZES = (1_000, 10_000, 100_000)
+LOOKUPS = 20_000
+SUFFIXES = ("com", "com.br", "bet.br", "net")
+
+
+def random_label(rng, size=8):
+    return "".join(rng.choices(string.ascii_lowercase, k=size))
+
+
+def build_entries(size, rng):
+    entries = []
+    for i in range(size):
+        base = f"{random_label(rng)}.{rng.choice(SUFFIXES)}"
+        kind = i % 3
+        entries.append(base if kind == 0 else f"*.{base}" if kind == 1 else f"app.{base}")
+    return entries
+
+
+def build_queries(entries, rng):
+    queries = []
+    for _ in range(LOOKUPS):
+        entry = rng.choice(entries).lstrip("*.")
+        roll = rng.random()
+        if roll < 0.4:
+            queries.append(f"m.{entry}")
+        elif roll < 0.7:
+            queries.append(entry)
+        else:
+            queries.append(f"www.{random_label(rng)}.{rng.choice(SUFFIXES)}")
+    return queries
+
+
+def linear_wildcard_lookup(exact, wildcards, domain):
+    return domain in exact or any(domain.endswith("." + base) for base in wildcards)
+
+
+def main():
+    rng = random.Random(11)
+    print(f"{'entradas':>9} {'montagem (ms)':>14} {'índice (ns/busca)':>18} {'linear (ns/busca)':>18}")
+    for size in LIST_SIZES:
+        entries = build_entries(size, rng)
+        queries = build_queries(entries, rng)
+
+        start = time.perf_counter()
+        index = DomainIndex(entries)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for query in queries:
+            index.is_authorized(query)
+        index_ns = (time.perf_counter() - start) / len(queries) * 1e9
+
+        exact = {e for e in entries if not e.startswith("*.")}
+        wildcards = [e[2:] for e in entries if e.startswith("*.")]
+        sample = queries[:200]
+        start = time.perf_counter()
+        for query in sample:
+            linear_wildcard_lookup(exact, wildcards, query)
+        linear_ns = (time.perf_counter() - start) / len(sample) * 1e9
+
+        print(f"{size:>9} {build_ms:>14.1f} {index_ns:>18.0f} {linear_ns:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Teste de carga do repositório de metas: leitura (GET /dashboard/data) e
+conclusão (POST /goals/complete) concorrentes.
+
+Vários processos (simulando workers do uvicorn), cada um com várias threads
+(o threadpool das rotas síncronas), sobre o mesmo arquivo SQLite. Cada
+operação é uma leitura das metas de um usuário ou, com probabilidade
+COMPLETE_RATIO, a conclusão de uma meta. Ao final, confere que cada meta foi
+concluída exatamente uma vez (soma de `newly_completed` entre os processos).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_goals_repository
+"""
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+
+from app.services.goals_repository import InMemoryGoalsRepository, SQLiteGoalsRepository
+
+USERS = 5_000
+GOALS_PER_USER = 10
+OPS_PER_THREAD = 5_000
+THREADS = 4
+COMPLETE_RATIO = 0.2
+
+
+def run_threads(repository, seed: int) -> tuple:
+    counters = {"reads": 0, "completes": 0, "newly": 0}
+    lock = threading.Lock()
+
+    def worker(worker_seed: int) -> None:
+        rng = random.Random(worker_seed)
+        reads = completes = newly = 0
+        for _ in range(OPS_PER_THREAD):
+            user_id = f"user_{rng.randrange(USERS)}"
+            if rng.random() < COMPLETE_RATIO:
+                newly += repository.complete_goal(user_id, f"g{rng.randrange(GOALS_PER_USER)}").newly_completed
+                completes += 1
+            else:
+                repository.list_goals(user_id)
+                reads += 1
+        with lock:
+            counters["reads"] += reads
+            counters["completes"] += completes
+            counters["newly"] += newly
+
+    threads = [threading.Thread(target=worker, args=(seed * 100 + i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counters["reads"], counters["completes"], counters["newly"]
+
+
+def sqlite_worker(path: str, seed: int, results) -> None:
+    repository = SQLiteGoalsRepository(path, pool_size=THREADS)
+    results.put(run_threads(repository, seed))
+    repository.close()
+
+
+def seed_goals() -> dict:
+    return {f"user_{u}": [(f"g{g}", f"Meta {g}", False) for g in range(GOALS_PER_USER)] for u in range(USERS)}
+
+
+def report(label: str, elapsed: float, totals: tuple, completed: int) -> None:
+    reads, completes, newly = totals
+    ops = reads + completes
+    status = "ok" if newly == completed else f"ERRO ({newly} conclusões para {completed} metas)"
+    print(f"{label:<28} | {ops / elapsed:>10,.0f} ops/s | {reads:>7} leituras | {completes:>6} conclusões | exatamente uma vez: {status}")
+
+
+def main() -> None:
+    goals = seed_goals()
+
+    memory = InMemoryGoalsRepository()
+    memory.seed(goals)
+    started = time.perf_counter()
+    totals = run_threads(memory, 1)
+    completed = sum(goal.is_completed for user in goals for goal in memory.list_goals(user))
+    report(f"memória (1 processo)", time.perf_counter() - started, totals, completed)
+
+    for processes in (1, 2, 4):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "goals.db")
+            repository = SQLiteGoalsRepository(path)
+            repository.seed(goals)
+            results = multiprocessing.Queue()
+            workers = [multiprocessing.Process(target=sqlite_worker, args=(path, seed, results)) for seed in range(processes)]
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            partials = [results.get() for _ in workers]
+            elapsed = time.perf_counter() - started
+            for worker in workers:
+                worker.join()
+            totals = tuple(sum(values) for values in zip(*partials))
+            completed = sum(goal.is_completed for user in goals for goal in repository.list_goals(user))
+            repository.close()
+            report(f"SQLite WAL ({processes} processo(s))", elapsed, totals, completed)
+
+
+if __name__ == "__main__":
+    main()
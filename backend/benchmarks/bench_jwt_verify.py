@@ -0,0 +1,83 @@
+"""
+Benchmark da verificação de JWT: verificações por segundo por núcleo.
+
+Uma thread (um núcleo), tokens HS256 distintos de N usuários:
+- ingênuo: decodifica o cabeçalho e inicializa o HMAC com o segredo a cada token;
+- chave cacheada: HMAC pré-inicializado e cabeçalho memoizado (cache de claims
+  desligado: toda verificação refaz a assinatura);
+- cache de claims: o mesmo token repetido (o app reenvia o token a cada tela).
+EdDSA entra na comparação se o pacote cryptography estiver instalado.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_jwt_verify
+"""
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+from app.services.auth_tokens import Ed25519PrivateKey, JWTService, SigningKey
+from app.services.result_cache import ResultCache
+
+SECRET = "segredo-de-benchmark-com-mais-de-32-bytes"
+USERS = 1_000
+ROUNDS = 20
+
+
+def naive_verify(token: str, secret: bytes) -> dict:
+    header_segment, payload_segment, signature_segment = token.split(".")
+    header = json.loads(base64.urlsafe_b64decode(header_segment + "=" * (-len(header_segment) % 4)))
+    assert header["alg"] == "HS256"
+    expected = hmac.new(secret, f"{header_segment}.{payload_segment}".encode("ascii"), hashlib.sha256).digest()
+    signature = base64.urlsafe_b64decode(signature_segment + "=" * (-len(signature_segment) % 4))
+    if not hmac.compare_digest(expected, signature):
+        raise ValueError("assinatura")
+    claims = json.loads(base64.urlsafe_b64decode(payload_segment + "=" * (-len(payload_segment) % 4)))
+    if claims["exp"] <= time.time():
+        raise ValueError("expirado")
+    return claims
+
+
+def rate(verify, tokens) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for token in tokens:
+            verify(token)
+    return ROUNDS * len(tokens) / (time.perf_counter() - started)
+
+
+def uncached(key: SigningKey) -> JWTService:
+    # Cache de claims sem espaço: toda verificação refaz a assinatura
+    return JWTService(key, claims_cache=ResultCache(max_entries=0, sizeof=lambda _: 1))
+
+
+def main() -> None:
+    service = uncached(SigningKey.hs256(SECRET))
+    tokens = [service.issue(f"user_{i}", {"nickname": f"Apelido {i}"}) for i in range(USERS)]
+    cached = JWTService(SigningKey.hs256(SECRET))
+    for token in tokens:
+        cached.verify(token)
+
+    results = [
+        ("HS256 ingênuo", rate(lambda t: naive_verify(t, SECRET.encode()), tokens)),
+        ("HS256 chave cacheada", rate(service.verify, tokens)),
+        ("HS256 + cache de claims", rate(cached.verify, tokens)),
+    ]
+    if Ed25519PrivateKey is not None:
+        from cryptography.hazmat.primitives import serialization
+
+        pem = Ed25519PrivateKey.generate().private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        eddsa = uncached(SigningKey.eddsa(private_pem=pem))
+        results.append(("EdDSA chave cacheada", rate(eddsa.verify, [eddsa.issue(f"user_{i}") for i in range(USERS)])))
+    else:
+        print("(cryptography não instalado: EdDSA fora da comparação)")
+
+    for label, per_second in results:
+        print(f"{label:<24} | {per_second:>12,.0f} verificações/s/núcleo | {1e6 / per_second:>6.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark de uma rajada de logins (credential stuffing) contra as outras rotas.
+
+Em um único event loop (um worker uvicorn), 300 logins simultâneos com o
+scrypt da configuração, e durante a rajada uma rota barata síncrona
+(como o Dashboard) é chamada em sequência. Compara:
+- ingênuo: /login síncrono, o hash ocupa o threadpool compartilhado do
+  Starlette (40 threads), o mesmo que serve as rotas síncronas;
+- executor de login: pool dedicado e limitado, com fila máxima (429 acima dela).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_login_burst
+"""
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.routers import auth
+from app.services.login_guard import LoginExecutor, LoginGuard, TokenBucketLimiter, get_login_guard
+from app.services.password_hashing import get_password_hasher
+
+BURST = 300
+
+
+def build_app(guarded: bool) -> FastAPI:
+    application = FastAPI()
+
+    @application.get("/barata")
+    def cheap_route():
+        return {"ok": True}
+
+    if guarded:
+        application.include_router(auth.router, prefix="/auth")
+        guard = LoginGuard(
+            LoginExecutor(workers=4, max_queue=32),
+            # Limites folgados: aqui o que se mede é a fila, não o limitador por IP/e-mail
+            per_ip=TokenBucketLimiter(rate=1e6, burst=10**6),
+            per_email=TokenBucketLimiter(rate=1e6, burst=10**6),
+        )
+        application.dependency_overrides[get_login_guard] = lambda: guard
+        application.state.guard = guard
+    else:
+        @application.post("/auth/login")
+        def naive_login(form_data: auth.LoginRequest):
+            if not auth.verify_user_credentials(form_data.email, form_data.password):
+                return {"ok": False}
+            return {"access_token": auth.create_access_token(form_data.email.split("@")[0])}
+
+    return application
+
+
+async def run(guarded: bool) -> None:
+    application = build_app(guarded)
+    async with httpx.AsyncClient(app=application, base_url="http://bench", timeout=120) as client:
+        async def login(i: int) -> int:
+            response = await client.post("/auth/login", json={"email": f"u{i}@inovexa.com", "password": "senha"})
+            return response.status_code
+
+        started = time.perf_counter()
+        burst = [asyncio.ensure_future(login(i)) for i in range(BURST)]
+        await asyncio.sleep(0.01)
+        cheap_ms = []
+        while not all(task.done() for task in burst) and len(cheap_ms) < 200:
+            t0 = time.perf_counter()
+            await client.get("/barata")
+            cheap_ms.append((time.perf_counter() - t0) * 1000)
+        statuses = await asyncio.gather(*burst)
+        elapsed = time.perf_counter() - started
+
+    cheap_ms.sort()
+    label = "executor de login" if guarded else "ingênuo"
+    print(
+        f"{label:<18} | rota barata p50 {statistics.median(cheap_ms):8.1f} ms  p99 {cheap_ms[int(len(cheap_ms) * 0.99) - 1]:8.1f} ms"
+        f" | logins 200: {statuses.count(200):3d}  429: {statuses.count(429):3d} | rajada {elapsed:5.2f} s"
+    )
+    if guarded:
+        stats = application.state.guard.executor.stats()
+        print(f"{'':<18} | fila p99 {stats['queue_wait_ms']['p99']} ms | hash p50 {stats['hash_ms']['p50']} ms")
+        application.state.guard.executor.shutdown()
+
+
+def main() -> None:
+    get_password_hasher()  # hash de referência fora da medição
+    asyncio.run(run(guarded=False))
+    asyncio.run(run(guarded=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark do registro de progresso: leitura do Dashboard x tamanho do histórico.
+
+Para usuários com históricos de tamanhos crescentes (SQLite, WAL), compara:
+- recálculo: ler todos os eventos do usuário e refazer o agregado a cada leitura
+  (o que uma implementação ingênua faria a cada GET /dashboard/data);
+- agregado: ler o agregado mantido incrementalmente (consulta por chave).
+Também mede a escrita (evento + agregado numa transação) e o replay completo.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_progress_ledger
+"""
+import os
+import random
+import tempfile
+import time
+
+from app.services.progress_ledger import SQLiteProgressLedger, fold_events
+
+HISTORY_SIZES = (10, 1_000, 10_000, 100_000)
+READS = 200
+
+
+def main() -> None:
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as directory:
+        ledger = SQLiteProgressLedger(os.path.join(directory, "progress.db"))
+        now = time.time()
+        started = time.perf_counter()
+        appended = 0
+        for size in HISTORY_SIZES:
+            user_id = f"user_{size}"
+            with ledger._pool.connection() as conn:
+                with ledger._pool.transaction(conn):
+                    for i in range(size):
+                        kind = rng.choice(("check_in", "check_in", "avoided_bet", "relapse"))
+                        ledger._append(conn, user_id, kind, rng.uniform(5, 200) if kind == "avoided_bet" else 0.0, now - (size - i) * 60)
+            appended += size
+        print(f"carga: {appended} eventos em {time.perf_counter() - started:.1f} s (em lote)")
+
+        started = time.perf_counter()
+        for i in range(500):
+            ledger.append("user_writes", "check_in")
+        print(f"escrita avulsa (evento + agregado, 1 transação): {(time.perf_counter() - started) / 500 * 1000:.3f} ms")
+
+        print(f"{'histórico':>10} | {'recálculo (ms)':>14} | {'agregado (ms)':>13}")
+        for size in HISTORY_SIZES:
+            user_id = f"user_{size}"
+            reads = max(3, READS * 10 // size) if size >= 1_000 else READS
+            started = time.perf_counter()
+            for _ in range(reads):
+                recomputed = fold_events(ledger.events(user_id))[user_id]
+            recompute_ms = (time.perf_counter() - started) / reads * 1000
+            started = time.perf_counter()
+            for _ in range(READS):
+                aggregate = ledger.aggregate(user_id)
+            aggregate_ms = (time.perf_counter() - started) / READS * 1000
+            assert aggregate == recomputed
+            print(f"{size:>10} | {recompute_ms:>14.3f} | {aggregate_ms:>13.4f}")
+
+        report = ledger.replay()
+        print(f"replay completo: {report['events']} eventos, {report['users']} usuários em {report['elapsed_seconds']} s")
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark do índice invertido BM25 do RAG (Chat) com bases grandes.
+
+Base sintética em português (vocabulário com distribuição de Zipf, cujo topo
+são as stopwords, como em texto real) de 1k a 50k chunks. Mede o tempo de construção e a latência por consulta (p50/p99)
+do índice invertido versus a varredura linear de palavras-chave de todos os
+chunks (o algoritmo anterior de _get_relevant_chunks).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_rag_index
+"""
+import random
+import statistics
+import string
+import time
+
+from app.services.rag_index import _STOPWORDS, InvertedIndex
+
+CHUNK_COUNTS = (1_000, 10_000, 50_000)
+QUERIES = 500
+VOCABULARY = 30_000
+WORDS_PER_CHUNK = 80
+
+SEED_WORDS = (
+    "impulso ansiedade crise recaída apostar jogar dinheiro perdas economia terapia psicólogo "
+    "vontade controle respiração finanças dívida família trabalho sono bônus cassino roleta"
+).split()
+
+
+def build_vocabulary(rng: random.Random):
+    words = sorted(_STOPWORDS) + list(SEED_WORDS)
+    while len(words) < VOCABULARY:
+        words.append("".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) + rng.choice(("ar", "ção", "mente", "ado", "as", "o")))
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    return words, weights
+
+
+def build_chunks(count, words, weights, rng):
+    return [
+        {
+            "id": f"C{i}",
+            "keywords": rng.choices(words, weights=weights, k=4),
+            "content": " ".join(rng.choices(words, weights=weights, k=WORDS_PER_CHUNK)),
+        }
+        for i in range(count)
+    ]
+
+
+def linear_scan(chunks, keywords):
+    keyword_set = set(keywords)
+    return [chunk for chunk in chunks if any(kw in keyword_set for kw in chunk["keywords"])]
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.99) - 1] * 1000
+
+
+def main() -> None:
+    rng = random.Random(13)
+    words, weights = build_vocabulary(rng)
+    queries = [" ".join(rng.choices(words, weights=weights, k=rng.randint(3, 8))) for _ in range(QUERIES)]
+
+    print(f"{'chunks':>7} {'construção':>11} {'termos':>8} {'índice p50':>11} {'p99':>8} {'linear p50':>11} {'p99':>8}")
+    for count in CHUNK_COUNTS:
+        chunks = build_chunks(count, words, weights, rng)
+        started = time.perf_counter()
+        index = InvertedIndex(chunks, {"keywords": 2.0, "content": 1.0})
+        build_seconds = time.perf_counter() - started
+
+        indexed, linear = [], []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, k=3)
+            indexed.append(time.perf_counter() - started)
+            keywords = query.split()
+            started = time.perf_counter()
+            linear_scan(chunks, keywords)
+            linear.append(time.perf_counter() - started)
+
+        print(
+            f"{count:>7} {build_seconds:>10.2f}s {index.vocabulary_size:>8} "
+            f"{percentiles(indexed)[0]:>9.3f}ms {percentiles(indexed)[1]:>6.3f}ms "
+            f"{percentiles(linear)[0]:>9.3f}ms {percentiles(linear)[1]:>6.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
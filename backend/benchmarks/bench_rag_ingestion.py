@@ -0,0 +1,78 @@
+"""
+Benchmark da ingestão incremental da base de conhecimento do RAG (Chat).
+
+Gera um corpus markdown sintético (mesmo vocabulário do bench_rag_index) e mede:
+- ingestão completa (store vazio: equivale a um rebuild total);
+- ingestão sem mudanças (apenas stat dos arquivos);
+- ingestão após a edição de um único arquivo;
+- recarga da nova geração pelo RAGService (índice montado dos termos persistidos).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_rag_ingestion [arquivos]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from app.services.rag_ingestion import KnowledgeBaseStore
+from app.services.rag_service import RAGService
+from benchmarks.bench_rag_index import build_vocabulary
+
+FILES = 2_000
+SECTIONS_PER_FILE = 10
+WORDS_PER_SECTION = 110
+
+
+def write_document(path, rng, words, weights, marker=""):
+    sections = [
+        f"## Seção {section}\n" + " ".join(rng.choices(words, weights=weights, k=WORDS_PER_SECTION))
+        for section in range(SECTIONS_PER_FILE)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"# Documento {os.path.basename(path)}\n" + "\n\n".join(sections) + marker + "\n")
+
+
+def timed(label, function):
+    started = time.perf_counter()
+    result = function()
+    print(f"{label:<42} {time.perf_counter() - started:8.2f} s")
+    return result
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else FILES
+    rng = random.Random(13)
+    words, weights = build_vocabulary(rng)
+    workdir = tempfile.mkdtemp(prefix="rag-ingestion-bench-")
+    source_dir = os.path.join(workdir, "docs")
+    os.makedirs(source_dir)
+    try:
+        for i in range(files):
+            write_document(os.path.join(source_dir, f"doc{i:05d}.md"), rng, words, weights)
+        store = KnowledgeBaseStore(os.path.join(workdir, "kb"))
+
+        report = timed("ingestão completa (rebuild)", lambda: store.ingest(source_dir))
+        print(f"  {report['files']} arquivos, {report['chunks']} chunks")
+        service = timed("RAGService: carga inicial", lambda: RAGService(kb_store=store))
+
+        report = timed("ingestão sem mudanças", lambda: store.ingest(source_dir))
+        print(f"  publicada={report['published']}, analisados={report['analyzed_chunks']}")
+
+        # Edição de um arquivo: uma frase nova no fim da última seção
+        edited = os.path.join(source_dir, f"doc{files // 2:05d}.md")
+        with open(edited, "a", encoding="utf-8") as f:
+            f.write("Procure ajuda profissional no CAPS AD.\n")
+        report = timed("ingestão após editar 1 arquivo", lambda: store.ingest(source_dir))
+        print(f"  geração {report['generation']}, analisados={report['analyzed_chunks']}, "
+              f"reaproveitados={report['reused_chunks']}")
+        timed("RAGService: recarga da nova geração", service.reload_if_changed)
+        print(f"  geração em uso: {service.generation}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark do cache de contextos do RAGService.retrieve_context.
+
+Tráfego de chat repetitivo: frases frequentes (distribuição de Zipf) com
+variações de caixa e pontuação, sobre uma base de 10k chunks. Compara o custo
+por chamada sem cache (limite de entradas 0) e com cache, e a taxa de acerto.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_rag_query_cache
+"""
+import random
+import time
+from unittest.mock import patch
+
+from app.services.rag_service import RAGService
+from benchmarks.bench_rag_index import build_chunks, build_vocabulary
+
+CHUNKS = 10_000
+PHRASES = 300
+REQUESTS = 50_000
+
+BASE_PHRASES = (
+    "estou com vontade de apostar", "perdi muito dinheiro ontem", "preciso de ajuda de um psicólogo",
+    "não consigo controlar o impulso de jogar", "tive uma recaída hoje", "como economizar depois das perdas",
+)
+
+
+def build_traffic(rng, words, weights):
+    phrases = list(BASE_PHRASES)
+    while len(phrases) < PHRASES:
+        phrases.append(" ".join(rng.choices(words[:2000], k=rng.randint(3, 8))))
+    variants = (str.lower, str.upper, str.capitalize, lambda text: text + "!", lambda text: text + "...")
+    popularity = [1 / (rank + 1) for rank in range(len(phrases))]
+    return [rng.choice(variants)(phrase) for phrase in rng.choices(phrases, weights=popularity, k=REQUESTS)]
+
+
+def run(service, traffic):
+    started = time.perf_counter()
+    for query in traffic:
+        service.retrieve_context(query)
+    return (time.perf_counter() - started) / len(traffic) * 1e6
+
+
+def main() -> None:
+    rng = random.Random(14)
+    words, weights = build_vocabulary(rng)
+    chunks = [dict(chunk, source="Benchmark") for chunk in build_chunks(CHUNKS, words, weights, rng)]
+    traffic = build_traffic(rng, words, weights)
+
+    with patch("app.services.rag_service.settings.RAG_CACHE_MAX_ENTRIES", 0):
+        uncached = RAGService(knowledge_base=chunks)
+    cached = RAGService(knowledge_base=chunks)
+
+    print(f"sem cache: {run(uncached, traffic):8.1f} µs/chamada")
+    print(f"com cache: {run(cached, traffic):8.1f} µs/chamada (frio + quente)")
+    print(f"com cache: {run(cached, traffic):8.1f} µs/chamada (quente)")
+    stats = cached.cache_stats()
+    print(f"taxa de acerto: {stats['hit_rate']:.1%} (exato: {stats['exact_hits']}, "
+          f"normalizado: {stats['normalized_hits']}), entradas: {stats['entries']}, {stats['bytes'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
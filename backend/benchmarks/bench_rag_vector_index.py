@@ -0,0 +1,98 @@
+"""
+Benchmark de recall e latência do índice vetorial do RAG versus o BM25.
+
+Base sintética com estrutura temática, como uma base de conhecimento real:
+cada chunk mistura palavras gerais (Zipf, vocabulário de bench_rag_index) com
+palavras do seu tema. Cada consulta é formada por palavras de um chunk sorteado
+mais palavras de ruído; o chunk de origem é o relevante. Mede recall@5 (o chunk de origem está entre os 5 primeiros) e
+latência p50/p99 para:
+- BM25 (InvertedIndex, a linha de base por palavras-chave);
+- vetorial exaustivo float32 e int8;
+- vetorial IVF (listas) float32 e int8, variando nprobe (recall x latência).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_rag_vector_index
+"""
+import random
+import tempfile
+import time
+
+from app.services.rag_index import InvertedIndex, analyze
+from app.services.rag_vector_index import VectorIndex, build_vector_index
+from benchmarks.bench_rag_index import build_vocabulary, percentiles
+
+CHUNKS = 20_000
+QUERIES = 300
+DIM = 1024
+TOPICS = 400
+WORDS_PER_TOPIC = 300
+IVF_LISTS = 128
+NPROBES = (4, 16, 32)
+K = 5
+
+
+def build_chunks(words, weights, rng):
+    general, general_weights = words[:3000], weights[:3000]
+    topics = [rng.sample(words[3000:], WORDS_PER_TOPIC) for _ in range(TOPICS)]
+    chunks = []
+    for i in range(CHUNKS):
+        content = rng.choices(general, weights=general_weights, k=40) + rng.choices(topics[i % TOPICS], k=40)
+        rng.shuffle(content)
+        chunks.append({"id": f"C{i}", "content": " ".join(content)})
+    return chunks
+
+
+def build_queries(chunks, words, rng):
+    queries = []
+    for _ in range(QUERIES):
+        position = rng.randrange(len(chunks))
+        content = chunks[position]["content"].split()
+        terms = rng.sample(content, 6) + rng.sample(words, 2)
+        queries.append((position, " ".join(terms)))
+    return queries
+
+
+def evaluate(label, search, chunk_id, queries, chunks):
+    latencies, hits = [], 0
+    for position, query in queries:
+        terms = analyze(query)
+        started = time.perf_counter()
+        ranked = search(terms)
+        latencies.append(time.perf_counter() - started)
+        hits += any(chunk_id(found) == chunks[position]["id"] for _, found in ranked)
+    p50, p99 = percentiles(latencies)
+    print(f"{label:<34} recall@{K} {hits / len(queries):6.1%}   p50 {p50:7.3f}ms   p99 {p99:7.3f}ms")
+
+
+def main() -> None:
+    rng = random.Random(17)
+    words, weights = build_vocabulary(rng)
+    chunks = build_chunks(words, weights, rng)
+    queries = build_queries(chunks, words, rng)
+    print(f"{CHUNKS} chunks, {QUERIES} consultas, dim={DIM}")
+
+    bm25 = InvertedIndex(chunks, {"keywords": 2.0, "content": 1.0})
+    evaluate("BM25 (palavras-chave)", lambda terms: bm25.search_terms(terms, K), lambda p: chunks[p]["id"], queries, chunks)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for quantize in ("float32", "int8"):
+            for ivf_lists in (0, IVF_LISTS):
+                out = f"{directory}/{quantize}_{ivf_lists}"
+                started = time.perf_counter()
+                build_vector_index(chunks, out, dim=DIM, quantize=quantize, ivf_lists=ivf_lists)
+                build_seconds = time.perf_counter() - started
+                print(f"-- vetorial {quantize}: construção {build_seconds:.1f}s")
+                for nprobe in (NPROBES if ivf_lists else (None,)):
+                    index = VectorIndex(out, nprobe=nprobe or 1)
+                    mode = f"IVF {ivf_lists}/nprobe {nprobe}" if ivf_lists else "exaustivo"
+                    evaluate(
+                        f"vetorial {quantize} {mode}",
+                        lambda terms: index.search_terms(terms, K),
+                        lambda p: index.chunk(p)["id"],
+                        queries,
+                        chunks,
+                    )
+                print(f"{'':<30} matriz {index.vectors.nbytes / 2**20:.0f} MB (mmap)")
+
+if __name__ == "__main__":
+    main()
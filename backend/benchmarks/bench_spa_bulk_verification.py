@@ -0,0 +1,80 @@
+"""
+Benchmark da verificação SPA em massa (Cards 2 e 4).
+
+Exportação sintética de rede de anúncios (URLs com caminhos e query strings,
+domínios repetidos em distribuição de Zipf) contra uma lista de 10k SPAs:
+- uma URL por vez: SPAVerifierService.is_url_authorized (como as chamadas HTTP unitárias);
+- em massa: SPAVerifierService.verify_bulk (lotes, dedupe de domínios, snapshot);
+- endpoint POST /spa/verify/bulk (text/plain -> NDJSON), em processo via TestClient.
+Resultados em URLs por segundo.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_spa_bulk_verification
+"""
+import random
+import time
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.spa_verifier_router import spa_verifier_router
+from app.services.domain_index import DomainIndex
+from app.services.spa_list_repository import SPAListRepository
+from app.services.spa_verifier_service import SPAVerifierService, get_spa_verifier_service
+
+URLS = 300_000
+LIST_SIZE = 10_000
+DOMAINS = 50_000
+
+
+def build_service() -> SPAVerifierService:
+    index = DomainIndex([f"operador{i}.bet.br" for i in range(LIST_SIZE)])
+    repository = MagicMock(spec=SPAListRepository)
+    repository.snapshot.return_value = index
+    repository.is_domain_authorized.side_effect = index.is_authorized
+    return SPAVerifierService(repository=repository)
+
+
+def build_urls(rng: random.Random):
+    hosts = [f"operador{i}.bet.br" if i % 5 == 0 else f"site{i}.com.br" for i in range(DOMAINS)]
+    weights = [1 / (rank + 1) ** 0.8 for rank in range(DOMAINS)]
+    return [
+        f"https://www.{host}/lp/{rng.randrange(1000)}?utm_campaign={rng.randrange(50)}"
+        for host in rng.choices(hosts, weights=weights, k=URLS)
+    ]
+
+
+def report(label: str, count: int, elapsed: float) -> None:
+    print(f"{label:<34} {elapsed:7.2f}s  {count / elapsed:>10,.0f} URLs/s")
+
+
+def main() -> None:
+    service = build_service()
+    urls = build_urls(random.Random(5))
+    print(f"{URLS} URLs, {len(set(urls))} distintas, lista com {LIST_SIZE} SPAs")
+
+    started = time.perf_counter()
+    authorized = sum(1 for url in urls if service.is_url_authorized(url).is_authorized)
+    report("uma URL por vez (is_url_authorized)", URLS, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    bulk_authorized = sum(1 for _, _, is_auth in service.verify_bulk(urls) if is_auth)
+    report("em massa (verify_bulk)", URLS, time.perf_counter() - started)
+    assert bulk_authorized == authorized
+
+    application = FastAPI()
+    application.include_router(spa_verifier_router, prefix="/api/v1")
+    application.dependency_overrides[get_spa_verifier_service] = lambda: service
+    client = TestClient(application)
+    body = "\n".join(urls).encode("utf-8")
+    started = time.perf_counter()
+    response = client.post("/api/v1/spa/verify/bulk", content=body, headers={"content-type": "text/plain"})
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    report("endpoint /spa/verify/bulk (NDJSON)", URLS, elapsed)
+    print(f"resumo do endpoint: {response.text.rsplit(chr(10), 2)[-2]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark do índice binário (mmap) da lista de SPAs (Card 4) versus o JSON.
+
+Para listas de 100k e 1M entradas, mede em um processo novo (como um worker
+recém-iniciado):
+- tempo de carga: json.load + DomainIndex versus MappedDomainIndex.open;
+- memória privada (RSS anônimo) após a carga: o índice mmap vive no page cache,
+  compartilhado entre os workers, e não conta como memória do processo;
+- custo médio por busca.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_spa_index_file
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.services.spa_index_file import write_index_file
+
+LIST_SIZES = (100_000, 1_000_000)
+LOOKUPS = 50_000
+
+
+def private_rss_kb() -> int:
+    """RSS anônimo (não mapeado de arquivo) do processo atual, via /proc (Linux)."""
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1])
+    return 0
+
+
+def child(kind: str, path: str) -> None:
+    """Executado em subprocesso: carrega a lista e imprime as métricas em JSON."""
+    from app.services.domain_index import DomainIndex
+    from app.services.spa_index_file import MappedDomainIndex
+
+    rng = random.Random(3)
+    before = private_rss_kb()
+    started = time.perf_counter()
+    if kind == "json":
+        with open(path, "r", encoding="utf-8") as f:
+            index = DomainIndex(json.load(f)["authorized_domains"])
+    else:
+        index = MappedDomainIndex.open(path)
+    load_ms = (time.perf_counter() - started) * 1000
+    rss_mb = (private_rss_kb() - before) / 1024
+
+    size = int(os.environ["BENCH_LIST_SIZE"])
+    queries = [f"m.op{rng.randrange(size * 2)}.bet.br" for _ in range(LOOKUPS)]
+    started = time.perf_counter()
+    hits = sum(1 for query in queries if index.is_authorized(query))
+    lookup_us = (time.perf_counter() - started) / LOOKUPS * 1e6
+    print(json.dumps({"load_ms": load_ms, "rss_mb": rss_mb, "lookup_us": lookup_us, "hits": hits}))
+
+
+def run_child(kind: str, path: str, size: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_spa_index_file", "--child", kind, path],
+        check=True, capture_output=True, text=True,
+        env={**os.environ, "BENCH_LIST_SIZE": str(size)},
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    print(f"{'entradas':>10} {'formato':>8} {'arquivo':>10} {'carga':>10} {'RSS priv.':>10} {'busca':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in LIST_SIZES:
+            domains = [f"op{i}.bet.br" for i in range(size)]
+            json_path = os.path.join(directory, f"lista_{size}.json")
+            index_path = os.path.join(directory, f"lista_{size}.idx")
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump({"authorized_domains": domains}, f)
+            write_index_file(domains, index_path)
+
+            for kind, path in (("json", json_path), ("mmap", index_path)):
+                result = run_child(kind, path, size)
+                print(
+                    f"{size:>10} {kind:>8} {os.path.getsize(path) / 2**20:>8.1f}MB "
+                    f"{result['load_ms']:>8.1f}ms {result['rss_mb']:>8.1f}MB {result['lookup_us']:>7.2f}us"
+                )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
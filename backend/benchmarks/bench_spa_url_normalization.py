@@ -0,0 +1,89 @@
+"""
+Micro-benchmark da normalização de URLs do verificador de SPA (Card 2).
+
+Corpus realista: poucos domínios populares (distribuição de Zipf) em URLs com
+caminhos, query strings, 'www.', portas, credenciais, IDN e hosts nus.
+Compara o custo por chamada:
+- antes: urlparse + concatenação + lower a cada chamada;
+- depois: recorte por string + cache de autoridade (frio e aquecido).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_spa_url_normalization
+"""
+import random
+import time
+from urllib.parse import urlparse
+
+from app.services.spa_verifier_service import normalize_authority, normalize_url_domain
+
+CORPUS_SIZE = 200_000
+DOMAINS = 5_000
+ROUNDS = 3
+
+
+def baseline(url: str) -> str:
+    """Implementação anterior de SPAVerifierService._extract_and_normalize_domain."""
+    if not url:
+        return ""
+    try:
+        if '://' not in url:
+            url = f"http://{url}"
+        domain = urlparse(url).netloc
+        if domain.startswith('www.'):
+            domain = domain[4:]
+        return domain.lower()
+    except Exception:
+        return url.lower()
+
+
+def build_corpus(rng: random.Random):
+    hosts = [f"apostas{i}.{rng.choice(('com', 'com.br', 'bet.br', 'net'))}" for i in range(DOMAINS)]
+    hosts[:20] = [f"apostá{i}.bet.br" for i in range(20)]
+    weights = [1 / (rank + 1) for rank in range(DOMAINS)]
+    corpus = []
+    for host in rng.choices(hosts, weights=weights, k=CORPUS_SIZE):
+        roll = rng.random()
+        if roll < 0.25:
+            url = host
+        elif roll < 0.55:
+            url = f"https://www.{host}/promo/{rng.randrange(10_000)}?utm_source=x&ref={rng.randrange(999)}"
+        elif roll < 0.75:
+            url = f"https://{host}/jogo/{rng.randrange(500)}#topo"
+        elif roll < 0.9:
+            url = f"http://{host.upper()}:8080/login"
+        else:
+            url = f"https://afiliado:token@m.{host}/cadastro"
+        corpus.append(url)
+    return corpus
+
+
+def measure(function, corpus) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        for url in corpus:
+            function(url)
+        best = min(best, time.perf_counter() - started)
+    return best / len(corpus) * 1e9
+
+
+def main() -> None:
+    corpus = build_corpus(random.Random(11))
+    bare = [url for url in corpus if "/" not in url and ":" not in url]
+
+    print(f"Corpus: {len(corpus)} URLs, {len(set(corpus))} distintas, {DOMAINS} domínios")
+    print(f"antes (urlparse):           {measure(baseline, corpus):8.0f} ns/chamada")
+
+    normalize_authority.cache_clear()
+    started = time.perf_counter()
+    for url in corpus:
+        normalize_url_domain(url)
+    cold = (time.perf_counter() - started) / len(corpus) * 1e9
+    print(f"depois (cache frio, 1 pass): {cold:8.0f} ns/chamada")
+    print(f"depois (cache aquecido):    {measure(normalize_url_domain, corpus):8.0f} ns/chamada")
+    print(f"hosts nus: antes {measure(baseline, bare):.0f} ns, depois {measure(normalize_url_domain, bare):.0f} ns")
+    print(f"cache: {normalize_authority.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark da checagem de revogação (logout) por requisição.
+
+10.000 tokens revogados num SQLite; 100.000 checagens de tokens válidos
+(o caso comum) e de tokens revogados:
+- consulta direta: toda checagem vai ao SQLite (o que uma blacklist remota
+  faria em toda requisição autenticada, sem contar a ida à rede);
+- filtro de Bloom: só as respostas "talvez revogado" consultam o SQLite.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_token_revocation
+"""
+import os
+import tempfile
+import time
+
+from app.services.token_revocation import SQLiteRevocationStore, TokenRevocationList
+
+REVOKED = 10_000
+CHECKS = 100_000
+
+
+def rate(label: str, check, jtis) -> None:
+    start = time.perf_counter()
+    for jti in jtis:
+        check(jti)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} | {len(jtis) / elapsed:>12,.0f} checagens/s | {elapsed / len(jtis) * 1e6:6.2f} µs")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteRevocationStore(os.path.join(tmp, "revogacoes.db"))
+        expires_at = time.time() + 3600
+        for i in range(REVOKED):
+            store.revoke(f"revogado-{i}", expires_at)
+        revocations = TokenRevocationList(store, expected_revocations=100_000, false_positive_rate=0.001)
+
+        valid = [f"valido-{i}" for i in range(CHECKS)]
+        revoked = [f"revogado-{i % REVOKED}" for i in range(CHECKS // 10)]
+        now = time.time()
+
+        rate("consulta direta (válidos)", lambda jti: store.is_revoked(jti, now), valid)
+        rate("filtro de Bloom (válidos)", revocations.is_revoked, valid)
+        rate("consulta direta (revogados)", lambda jti: store.is_revoked(jti, now), revoked)
+        rate("filtro de Bloom (revogados)", revocations.is_revoked, revoked)
+
+        stats = revocations.stats()
+        print(
+            f"\nsem I/O: {stats['no_io_rate']:.2%} das checagens | falsos positivos: {stats['false_positives']}"
+            f" | filtro: {stats['filter']['bytes'] / 1024:.0f} KiB, {stats['filter']['hashes']} hashes"
+        )
+        revocations.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,87 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import APIRouter, FastAPI
 import logging
 
 # Importações de configurações e rotas
 from app.config.settings import settings # Card 5
 from app.api.advertorial_detector_router import advertorial_detector_router
+from app.api.spa_verifier_router import spa_verifier_router
+from app.routers import advertorial_detector_router as legacy_detector
+from app.routers import auth, chat, dashboard
+from app.services.service_registry import get_service_registry
+from app.services.sqlite_pool import close_sqlite_pools
 
 # --- Configuração de Logging ---
 # Configura o logger para mostrar logs no console
 logging.basicConfig(level=logging.INFO if not settings.DEBUG else logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# --- Routers do App ---
+# (router, prefixo dentro da versão, tags). Todos no mesmo app: um único pool de
+# workers serve todas as funcionalidades, com os mesmos Singletons (factories com
+# lru_cache), o mesmo pool SQLite por banco e os mesmos caches.
+API_V1_ROUTERS = [
+    (advertorial_detector_router, "", ["Advertorial Detector"]),     # Cards 1, 2, 3
+    (spa_verifier_router, "", ["SPA Verifier"]),                     # Cards 2, 4
+    (legacy_detector.router, "/detector", ["Advertorial Detector"]), # relatório detalhado (Cards 1-3)
+    (auth.router, "/auth", ["Auth"]),
+    (chat.router, "/chat", ["Chat & IA"]),
+    (dashboard.router, "/dashboard", ["Dashboard & Goals"]),
+]
+
+
+# --- Ciclo de Vida (startup/shutdown) ---
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """
+    Nenhum serviço é criado no import: no startup eles são aquecidos em paralelo
+    (tempo por componente em /startup) e, no shutdown, os que foram construídos
+    são encerrados.
+    """
+    registry = get_service_registry()
+    if settings.STARTUP_WARMUP:
+        await registry.warm_up(max_workers=settings.STARTUP_WARMUP_WORKERS)
+
+    # Recarga a quente da lista SPA (Card 4), sem reiniciar os workers
+    if settings.SPA_LIST_WATCH_INTERVAL_SECONDS > 0:
+        registry.get("spa_list_repository").start_watcher(settings.SPA_LIST_WATCH_INTERVAL_SECONDS)
+    # Novas gerações da base de conhecimento do RAG (ingestão incremental)
+    if settings.RAG_KB_DIR and settings.RAG_KB_WATCH_INTERVAL_SECONDS > 0:
+        registry.get("rag_service").start_watcher(settings.RAG_KB_WATCH_INTERVAL_SECONDS)
+
+    yield
+
+    # Watchers, pool HTTP do LLM, bancos SQLite e executores
+    await registry.shutdown()
+    close_sqlite_pools()
+
+
+# --- Rotas de Sistema ---
+system_router = APIRouter(tags=["System"])
+
+@system_router.get("/", summary="Health Check")
+async def root():
+    """
+    Retorna o status da API e informações básicas.
+    """
+    return {
+        "message": "AntiBet Backend API is running smoothly.",
+        "project": settings.PROJECT_NAME,
+        "debug": settings.DEBUG
+    }
+
+# --- Startup: tempo de construção de cada serviço ---
+@system_router.get("/startup", summary="Tempo de inicialização dos serviços do worker.")
+async def startup_report():
+    return get_service_registry().stats()
+
 
 # --- Inicialização do FastAPI ---
 def create_application() -> FastAPI:
     """
-    Cria e configura a instância principal do FastAPI.
+    Cria e configura a instância principal do FastAPI, com todos os routers
+    sob o prefixo da versão (settings.API_V1_STR).
     """
     application = FastAPI(
         title=settings.PROJECT_NAME,
@@ -22,38 +89,23 @@ def create_application() -> FastAPI:
         version="0.1.0",
         docs_url=f"{settings.API_V1_STR}/docs" if settings.DEBUG else None,
         redoc_url=f"{settings.API_V1_STR}/redoc" if settings.DEBUG else None,
+        lifespan=lifespan,
     )
 
     # 1. Registro de Rotas
-    # Router de Detecção (Cards 1, 2, 3)
-    application.include_router(
-        advertorial_detector_router, 
-        prefix=settings.API_V1_STR, 
-        tags=["Advertorial Detector"]
-    )
-    
+    application.include_router(system_router)
+    for router, prefix, tags in API_V1_ROUTERS:
+        application.include_router(router, prefix=f"{settings.API_V1_STR}{prefix}", tags=tags)
+
     # 2. Log de Startup
     if settings.DEBUG:
         logger.info(f"Modo Debug: {settings.DEBUG}")
         logger.info(f"API V1 Prefix: {settings.API_V1_STR}")
         logger.info(f"SPA List Path: {settings.SPA_LIST_FILE_PATH}")
-        
+
     return application
 
 app = create_application()
 
-
-# --- Health Check Route ---
-@app.get("/", summary="Health Check", tags=["System"])
-async def root():
-    """
-    Retorna o status da API e informações básicas.
-    """
-    return {
-        "message": "AntiBet Backend API is running smoothly.",
-        "project": settings.PROJECT_NAME,
-        "debug": settings.DEBUG
-    }
-
 # Para rodar com Uvicorn:
-# uvicorn main:app --reload
\ No newline at end of file
+# uvicorn main:app --reload
@@ -31,7 +31,7 @@ def test_health_check_root():
 def test_advertorial_check_endpoint_is_reachable():
     """
     Testa se o endpoint principal /api/v1/check está acessível.
-    Verifica se o retorno possui o formato de AdvertorialDetectorResponse.
+    Verifica se o retorno possui o formato de BatchCheckResult (o mesmo de cada item do /check/batch).
     """
     # A rota é /api/v1/check, onde /api/v1 é o prefixo (settings.API_V1_STR)
     response = client.post(f"{settings.API_V1_STR}/check", json=TEST_PAYLOAD)
@@ -40,17 +40,16 @@ def test_advertorial_check_endpoint_is_reachable():
     assert response.status_code == 200
     data = response.json()
 
-    # Verifica a estrutura (AdvertorialDetectorResponse)
-    assert "detector" in data
-    assert "spa" in data
-    assert "education" in data
-    
-    # Verifica um resultado esperado do Detector (o payload é um advertorial claro)
-    assert data["detector"]["is_advertorial"] is True
-    assert data["education"]["priority"] >= 1 # Deve ter alguma prioridade
-    
-    # O domínio não está na lista autorizada default, então is_authorized deve ser False
-    assert data["spa"]["is_authorized"] is False
+    # Verifica a estrutura (BatchCheckResult)
+    assert data["url_analyzed"] == TEST_PAYLOAD["url"]
+    assert 0 <= data["score"] <= 100
+    assert data["risk_label"]
+    assert isinstance(data["advertorial_evidence"], dict)
+    # Cards 2/4: uma verificação por operadora citada no conteúdo (nenhuma neste payload)
+    assert data["spa_verification"] == []
+    # Card 3: sempre há um cartão educativo
+    assert data["education_card"]["title"]
+    assert data["education_card"]["content"]
 
 def test_advertorial_check_with_invalid_payload():
     """